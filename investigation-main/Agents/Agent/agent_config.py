@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Agent Config - Versioned, persisted agent configuration snapshots
+
+The unified server's agent configuration (which agents exist, their system
+prompts and whether they are enabled) is held as an immutable snapshot.
+Request threads read current() without locking; an update builds a new
+snapshot with the next version number, writes it to disk (temporary file and
+rename) and swaps the active reference, so readers see either the old or the
+new configuration, never half of an update.
+
+Every process serving the same config file (the supervisor's workers, or a
+second unified server) runs a watcher that checks the file signature every
+POLL_INTERVAL seconds and adopts a higher version, so a toggle made in one
+process reaches the others within a second. Updates from several processes
+are serialized with an advisory lock on the file where the platform has
+fcntl; each update re-reads the file first, so none is lost.
+
+Only the enabled flags are persisted. Agents and prompts come from the
+defaults in code, so a removed agent is dropped and a new one appears with
+its default state.
+
+Usage:
+    store = AgentConfigStore(AGENTS)
+    store.start()
+    store.current().is_enabled("theft")
+    store.update({"theft": True})
+
+Author: Augment Agent
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from helpers import file_signature
+
+try:
+    import fcntl
+except ImportError:  # Windows: updates from several processes are not serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Constants
+AGENT_DIR = Path(__file__).resolve().parent
+AGENT_CONFIG_FILE = Path(os.getenv("AGENT_CONFIG_FILE", AGENT_DIR / "data" / "agent_config.json"))
+POLL_INTERVAL = 0.5  # Seconds between config file checks
+
+@dataclass(frozen=True)
+class AgentConfigSnapshot:
+    """An immutable version of the agent configuration."""
+    version: int
+    updated_at: float
+    agents: Mapping[str, Mapping[str, Any]] = field(repr=False)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self.agents
+
+    def is_enabled(self, agent_id: str) -> bool:
+        """Whether an agent exists and is enabled."""
+        agent = self.agents.get(agent_id)
+        return bool(agent and agent["enabled"])
+
+    def enabled_agents(self) -> Dict[str, bool]:
+        """Enabled flag per agent."""
+        return {name: config["enabled"] for name, config in self.agents.items()}
+
+def _freeze(agents: Dict[str, Dict[str, Any]]) -> Mapping[str, Mapping[str, Any]]:
+    """Read-only copy of an agents dictionary."""
+    return MappingProxyType({name: MappingProxyType(dict(config)) for name, config in agents.items()})
+
+class AgentConfigStore:
+    """
+    Holds the active agent configuration snapshot, persists updates and follows changes made by other processes.
+    """
+
+    def __init__(self, defaults: Dict[str, Dict[str, Any]], path: Optional[Path] = None,
+                 poll_interval: float = POLL_INTERVAL):
+        """
+        Initialize the store from the defaults and the config file, if it exists.
+
+        Args:
+            defaults: Agent name -> {"system_prompt", "enabled", ...} as defined in code
+            path: Config file (defaults to AGENT_CONFIG_FILE)
+            poll_interval: Seconds between config file checks
+        """
+        self.defaults = {name: dict(config) for name, config in defaults.items()}
+        self.path = Path(path) if path else AGENT_CONFIG_FILE
+        self.poll_interval = poll_interval
+
+        self._update_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher = None
+        self._listeners: List[Callable[[AgentConfigSnapshot, AgentConfigSnapshot], None]] = []
+        self._signature = None
+        self._last_error = None
+
+        self._active = self._read() or AgentConfigSnapshot(0, time.time(), _freeze(self.defaults))
+
+    def current(self) -> AgentConfigSnapshot:
+        """
+        Return the active snapshot.
+
+        Callers that check more than one thing should keep the returned reference
+        instead of calling current() repeatedly, so a swap never mixes two versions.
+        """
+        return self._active
+
+    def add_listener(self, listener: Callable[[AgentConfigSnapshot, AgentConfigSnapshot], None]):
+        """
+        Call listener(previous, snapshot) after every swap, including swaps picked up from the file.
+
+        Args:
+            listener: Callback; exceptions are logged and ignored
+        """
+        self._listeners.append(listener)
+
+    def _read(self) -> Optional[AgentConfigSnapshot]:
+        """Build a snapshot from the config file, or None if it is missing or unreadable."""
+        signature = file_signature(self.path)
+        if signature is None:
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            self._last_error = f"{self.path.name}: {str(e)}"
+            logger.error(f"Error reading agent config {self.path}: {str(e)}")
+            return None
+        self._signature = signature
+        self._last_error = None
+
+        agents = {name: dict(config) for name, config in self.defaults.items()}
+        for name, config in stored.get("agents", {}).items():
+            if name in agents:
+                agents[name]["enabled"] = bool(config.get("enabled", agents[name]["enabled"]))
+        return AgentConfigSnapshot(int(stored.get("version", 0)), float(stored.get("updated_at", 0)), _freeze(agents))
+
+    def _write(self, snapshot: AgentConfigSnapshot):
+        """Persist a snapshot (written to a temporary file, fsynced and renamed)."""
+        payload = {
+            "version": snapshot.version,
+            "updated_at": snapshot.updated_at,
+            "agents": {name: {"enabled": config["enabled"]} for name, config in snapshot.agents.items()}
+        }
+        temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        self._signature = file_signature(self.path)
+
+    def update(self, changes: Dict[str, bool]) -> AgentConfigSnapshot:
+        """
+        Set enabled flags, persist the result and activate it.
+
+        Args:
+            changes: Agent name -> enabled; unknown agents are ignored
+
+        Returns:
+            The new active snapshot
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._update_lock, open(self.path.with_name(self.path.name + ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Start from the newest persisted version, which another process may have written
+            base = self._active
+            stored = self._read()
+            if stored is not None and stored.version > base.version:
+                base = stored
+
+            agents = {name: dict(config) for name, config in base.agents.items()}
+            for name, enabled in changes.items():
+                if name in agents:
+                    agents[name]["enabled"] = bool(enabled)
+            snapshot = AgentConfigSnapshot(base.version + 1, time.time(), _freeze(agents))
+            self._write(snapshot)
+            self._swap(snapshot)
+        return snapshot
+
+    def _swap(self, snapshot: AgentConfigSnapshot):
+        """Replace the active snapshot and notify listeners."""
+        previous = self._active
+        self._active = snapshot
+        logger.info(f"Activated agent config v{snapshot.version}")
+        for listener in self._listeners:
+            try:
+                listener(previous, snapshot)
+            except Exception as e:
+                logger.error(f"Error in agent config listener: {str(e)}")
+
+    def _poll_once(self):
+        """Adopt the config file if another process has written a newer version."""
+        signature = file_signature(self.path)
+        if signature is None or signature == self._signature:
+            return
+        with self._update_lock:
+            snapshot = self._read()
+            if snapshot is not None and snapshot.version > self._active.version:
+                self._swap(snapshot)
+
+    def _watch(self):
+        """Background watcher loop."""
+        logger.info(f"Watching {self.path} for agent config changes every {self.poll_interval}s")
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self._poll_once()
+            except Exception as e:
+                logger.error(f"Error checking for agent config updates: {str(e)}")
+
+    def start(self):
+        """Start the background watcher."""
+        if self._watcher is None or not self._watcher.is_alive():
+            self._stop_event.clear()
+            self._watcher = threading.Thread(target=self._watch, name="agent-config-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        """Stop the background watcher."""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval + 1)
+
+    def status(self) -> Dict[str, Any]:
+        """Return the active version and watcher state."""
+        snapshot = self._active
+        return {
+            "version": snapshot.version,
+            "updated_at": snapshot.updated_at,
+            "file": str(self.path),
+            "watcher_running": bool(self._watcher and self._watcher.is_alive()),
+            "last_error": self._last_error
+        }
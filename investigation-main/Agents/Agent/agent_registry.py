@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Agent Registry - Lazily built agent instances
+
+This module keeps the agents of a server behind factories, so an agent's
+module is imported and its API client built only when the agent is enabled
+or first requested, not when the server starts. Disabling an agent releases
+its instance; requests already holding it finish normally, and the next
+enable or request builds a fresh one. (Imported modules stay loaded, since
+Python cannot reliably unload them, but their agent objects and clients are
+dropped.)
+
+Usage:
+    registry = AgentRegistry()
+    registry.register("theft", build_theft_agent)
+    agent = registry.get("theft")   # built on first use
+    registry.release("theft")
+
+Author: Augment Agent
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class AgentRegistry:
+    """
+    Builds registered agents on demand and drops them when released.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._builds: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """
+        Register a factory for an agent.
+
+        Args:
+            name: Agent name (an AGENTS key)
+            factory: Callable that imports what the agent needs and returns a new instance
+        """
+        self._factories[name] = factory
+        self._locks[name] = threading.Lock()
+        self._builds[name] = {"builds": 0, "releases": 0, "build_seconds": None, "built_at": None}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories
+
+    def get(self, name: str) -> Any:
+        """
+        Return the agent, building it if needed.
+
+        Args:
+            name: Registered agent name
+
+        Returns:
+            Agent instance
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        # Concurrent first requests for the same agent wait for one build
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is None:
+                start = time.time()
+                instance = self._factories[name]()
+                build_seconds = time.time() - start
+                self._instances[name] = instance
+                self._builds[name].update(builds=self._builds[name]["builds"] + 1,
+                                          build_seconds=round(build_seconds, 3), built_at=start)
+                logger.info(f"Built {name} agent in {build_seconds:.3f} seconds")
+        return instance
+
+    def release(self, name: str) -> bool:
+        """
+        Drop an agent instance.
+
+        Args:
+            name: Registered agent name
+
+        Returns:
+            True if an instance was released
+        """
+        if name not in self._factories:
+            return False
+        with self._locks[name]:
+            instance = self._instances.pop(name, None)
+            if instance is None:
+                return False
+            self._builds[name]["releases"] += 1
+        logger.info(f"Released {name} agent")
+        return True
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether an agent is currently built."""
+        return name in self._instances
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Load state and build history per registered agent."""
+        return {name: dict(build, loaded=name in self._instances) for name, build in self._builds.items()}
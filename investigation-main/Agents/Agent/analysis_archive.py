@@ -0,0 +1,498 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Analysis Archive - Compressed Append-Only Storage for Case Analyses
+
+Analyses are multi-KB texts and will accumulate into the hundreds of thousands.
+Writing each one to its own text file wastes a filesystem block per case and
+stores the text uncompressed. This module appends them to segment files as
+individually compressed records (zlib or lzma) and keeps an in-memory offset
+index from case ID to record, so reading any case is one dictionary lookup and
+one slice of a memory-mapped segment.
+
+Layout of a record (little-endian):
+
+    magic "AR" | codec (1 byte) | dictionary id (1 byte) | key length (2 bytes)
+    | payload length (4 bytes) | CRC-32 of key + payload (4 bytes) | key | payload
+
+Segments are never modified in place. A newer record for a case ID supersedes
+the older one and deletions are tombstone records. The compaction job rewrites
+segments that are mostly superseded records and, when asked, trains a zlib
+preset dictionary from stored analyses so small records compress much better.
+
+Usage:
+    python analysis_archive.py --import-repository      # Archive every stored case
+    python analysis_archive.py --get SAMPLE-001
+    python analysis_archive.py --compact --train-dictionary
+    python analysis_archive.py --stats
+
+Author: Augment Agent
+"""
+
+import argparse
+import json
+import logging
+import lzma
+import mmap
+import os
+import random
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constants
+AGENT_DIR = Path(__file__).resolve().parent
+ARCHIVE_DIR = Path(os.getenv("ANALYSIS_ARCHIVE_DIR", AGENT_DIR / "data" / "archive"))
+SEGMENT_SIZE = 64 * 1024 * 1024
+MAGIC = b"AR"
+HEADER = struct.Struct("<2sBBHII")
+CODEC_ZLIB = 0
+CODEC_LZMA = 1
+CODEC_TOMBSTONE = 2
+CODECS = {"zlib": CODEC_ZLIB, "lzma": CODEC_LZMA}
+ZLIB_LEVEL = 6
+# zlib preset dictionaries are limited to the 32 KiB window
+DICTIONARY_SIZE = 32 * 1024
+DICTIONARY_SAMPLES = 256
+# Sealed segments with at least this share of superseded bytes are rewritten by compaction
+MIN_GARBAGE_RATIO = 0.3
+
+class ArchiveError(Exception):
+    """Raised for corrupt records."""
+
+class AnalysisArchive:
+    """
+    Append-only segmented archive of case analyses with O(1) lookup by case ID.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, codec: str = "zlib",
+                 segment_size: int = SEGMENT_SIZE, sync: bool = False):
+        """
+        Open (and create if needed) an archive directory.
+
+        Args:
+            directory: Archive directory (defaults to data/archive or $ANALYSIS_ARCHIVE_DIR)
+            codec: Compression for new records ("zlib" or "lzma")
+            segment_size: Size after which a new segment is started
+            sync: fsync every append (otherwise only on roll and close)
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec}; expected one of {', '.join(CODECS)}")
+
+        self.directory = Path(directory) if directory else ARCHIVE_DIR
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.codec = CODECS[codec]
+        self.segment_size = segment_size
+        self.sync = sync
+
+        self._lock = threading.Lock()
+        # Case ID -> (segment number, offset, record length)
+        self._index = {}
+        # Segment number -> [total bytes, superseded bytes]
+        self._usage = {}
+        self._maps = {}
+        self._dictionaries = {}
+        self._load_dictionaries()
+
+        segments = self._segment_numbers()
+        for number in segments:
+            self._scan_segment(number, is_last=(number == segments[-1]))
+        self._active = segments[-1] if segments else 1
+        self._usage.setdefault(self._active, [0, 0])
+        self._writer = open(self._segment_path(self._active), "ab")
+        logger.info(f"Opened analysis archive {self.directory}: {len(self._index)} cases in "
+                    f"{len(self._usage)} segments")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, case_id: str) -> bool:
+        return case_id in self._index
+
+    def close(self):
+        """Flush and close the active segment and release the memory maps."""
+        with self._lock:
+            if self._writer.closed:
+                return
+            self._writer.flush()
+            os.fsync(self._writer.fileno())
+            self._writer.close()
+            for segment_map in self._maps.values():
+                segment_map.close()
+            self._maps = {}
+
+    def keys(self) -> List[str]:
+        """Case IDs with a live record."""
+        with self._lock:
+            return list(self._index)
+
+    # Files
+
+    def _segment_path(self, number: int) -> Path:
+        return self.directory / f"segment-{number:06d}.seg"
+
+    def _segment_numbers(self) -> List[int]:
+        return sorted(int(path.stem.split("-")[1]) for path in self.directory.glob("segment-*.seg"))
+
+    def _load_dictionaries(self):
+        for path in sorted(self.directory.glob("dictionary-*.bin")):
+            self._dictionaries[int(path.stem.split("-")[1])] = path.read_bytes()
+
+    @property
+    def dictionary_id(self) -> int:
+        """ID of the dictionary used for new zlib records (0 = none)."""
+        return max(self._dictionaries, default=0)
+
+    def _map(self, number: int) -> Optional[mmap.mmap]:
+        """Memory map of a segment, remapped if the segment grew since it was mapped (caller holds the lock)."""
+        segment_map = self._maps.get(number)
+        size = self._usage[number][0]
+        if segment_map is None or len(segment_map) < size:
+            if segment_map is not None:
+                segment_map.close()
+            with open(self._segment_path(number), "rb") as f:
+                segment_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            self._maps[number] = segment_map
+        return segment_map
+
+    def _scan_segment(self, number: int, is_last: bool):
+        """Add a segment's records to the index, truncating a torn write at the end of the last segment."""
+        path = self._segment_path(number)
+        size = path.stat().st_size
+        self._usage[number] = [size, 0]
+        if size == 0:
+            return
+
+        segment_map = self._map(number)
+        offset = 0
+        while offset < size:
+            record = self._read_header(segment_map, offset, size)
+            if record is None:
+                if not is_last:
+                    raise ArchiveError(f"Corrupt record in {path.name} at offset {offset}")
+                logger.warning(f"Truncating torn record in {path.name} at offset {offset}")
+                segment_map.close()
+                del self._maps[number]
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+                self._usage[number][0] = offset
+                break
+
+            codec, key, length = record
+            self._apply(key, codec, (number, offset, length))
+            offset += length
+
+    @staticmethod
+    def _read_header(segment_map, offset: int, size: int) -> Optional[Tuple[int, str, int]]:
+        """Validate the record at an offset; return (codec, key, record length) or None."""
+        if offset + HEADER.size > size:
+            return None
+        magic, codec, _, key_length, payload_length, checksum = HEADER.unpack_from(segment_map, offset)
+        length = HEADER.size + key_length + payload_length
+        if magic != MAGIC or offset + length > size:
+            return None
+        body = segment_map[offset + HEADER.size:offset + length]
+        if zlib.crc32(body) != checksum:
+            return None
+        return codec, body[:key_length].decode("utf-8"), length
+
+    def _apply(self, key: str, codec: int, location: Tuple[int, int, int]):
+        """Point the index at a new record and account the superseded one (caller holds the lock)."""
+        previous = self._index.get(key)
+        if previous is not None:
+            self._usage[previous[0]][1] += previous[2]
+        if codec == CODEC_TOMBSTONE:
+            self._index.pop(key, None)
+            self._usage[location[0]][1] += location[2]
+        else:
+            self._index[key] = location
+
+    # Records
+
+    def _encode(self, case_id: str, document: Optional[Dict[str, Any]], codec: Optional[int] = None,
+                dictionary_id: Optional[int] = None) -> bytes:
+        """Serialize one record."""
+        key = case_id.encode("utf-8")
+        if document is None:
+            codec, dictionary_id, payload = CODEC_TOMBSTONE, 0, b""
+        else:
+            codec = self.codec if codec is None else codec
+            raw = json.dumps(document, ensure_ascii=False).encode("utf-8")
+            if codec == CODEC_LZMA:
+                dictionary_id, payload = 0, lzma.compress(raw)
+            else:
+                dictionary_id = self.dictionary_id if dictionary_id is None else dictionary_id
+                compressor = (zlib.compressobj(ZLIB_LEVEL, zdict=self._dictionaries[dictionary_id])
+                              if dictionary_id else zlib.compressobj(ZLIB_LEVEL))
+                payload = compressor.compress(raw) + compressor.flush()
+
+        header = HEADER.pack(MAGIC, codec, dictionary_id, len(key), len(payload), zlib.crc32(key + payload))
+        return header + key + payload
+
+    def _decode(self, record: bytes) -> Dict[str, Any]:
+        """Deserialize one record."""
+        _, codec, dictionary_id, key_length, payload_length, checksum = HEADER.unpack_from(record)
+        body = record[HEADER.size:]
+        if zlib.crc32(body) != checksum:
+            raise ArchiveError("Record checksum mismatch")
+        payload = body[key_length:key_length + payload_length]
+        if codec == CODEC_LZMA:
+            raw = lzma.decompress(payload)
+        else:
+            decompressor = (zlib.decompressobj(zdict=self._dictionaries[dictionary_id])
+                            if dictionary_id else zlib.decompressobj())
+            raw = decompressor.decompress(payload) + decompressor.flush()
+        return json.loads(raw)
+
+    def _append(self, key: str, record: bytes, codec: int):
+        """Append an encoded record to the active segment (caller holds the lock)."""
+        if self._usage[self._active][0] and self._usage[self._active][0] + len(record) > self.segment_size:
+            self._roll()
+        offset = self._usage[self._active][0]
+        self._writer.write(record)
+        self._writer.flush()
+        if self.sync:
+            os.fsync(self._writer.fileno())
+        self._usage[self._active][0] += len(record)
+        self._apply(key, codec, (self._active, offset, len(record)))
+
+    def _roll(self):
+        """Seal the active segment and start a new one (caller holds the lock)."""
+        os.fsync(self._writer.fileno())
+        self._writer.close()
+        self._active += 1
+        self._usage[self._active] = [0, 0]
+        self._writer = open(self._segment_path(self._active), "ab")
+
+    def put(self, case_id: str, document: Dict[str, Any]):
+        """
+        Store the analysis document of a case, superseding any earlier one.
+
+        Args:
+            case_id: Case ID
+            document: JSON-serializable document (analysis, collected_data, agent, ...)
+        """
+        record = self._encode(case_id, document)
+        with self._lock:
+            self._append(case_id, record, record[2])
+
+    def delete(self, case_id: str) -> bool:
+        """Remove a case; returns False if it was not archived."""
+        with self._lock:
+            if case_id not in self._index:
+                return False
+            self._append(case_id, self._encode(case_id, None), CODEC_TOMBSTONE)
+            return True
+
+    def get(self, case_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the latest document of a case.
+
+        Args:
+            case_id: Case ID
+
+        Returns:
+            Document or None if the case is not archived
+        """
+        with self._lock:
+            location = self._index.get(case_id)
+            if location is None:
+                return None
+            number, offset, length = location
+            record = self._map(number)[offset:offset + length]
+        return self._decode(record)
+
+    # Maintenance
+
+    def train_dictionary(self, samples: int = DICTIONARY_SAMPLES) -> int:
+        """
+        Build a zlib preset dictionary from a sample of archived documents.
+
+        Substrings near the end of a zlib dictionary are the cheapest to reference, so the
+        sampled documents are concatenated and the last DICTIONARY_SIZE bytes are kept.
+
+        Args:
+            samples: Number of documents to sample
+
+        Returns:
+            ID of the new dictionary (0 if the archive is empty)
+        """
+        keys = self.keys()
+        if not keys:
+            return 0
+        sample = random.Random(len(keys)).sample(keys, min(samples, len(keys)))
+        documents = [json.dumps(self.get(key), ensure_ascii=False).encode("utf-8") for key in sample]
+        dictionary = b"".join(documents)[-DICTIONARY_SIZE:]
+
+        with self._lock:
+            dictionary_id = self.dictionary_id + 1
+            if dictionary_id > 255:
+                raise ArchiveError("Dictionary IDs exhausted")
+            path = self.directory / f"dictionary-{dictionary_id:03d}.bin"
+            temporary = path.with_suffix(".tmp")
+            temporary.write_bytes(dictionary)
+            os.replace(temporary, path)
+            self._dictionaries[dictionary_id] = dictionary
+        logger.info(f"Trained dictionary {dictionary_id} from {len(sample)} documents")
+        return dictionary_id
+
+    def compact(self, min_garbage_ratio: float = MIN_GARBAGE_RATIO, recompress: bool = False) -> Dict[str, int]:
+        """
+        Rewrite sealed segments that are mostly superseded records.
+
+        Live records are copied to the active segment (re-encoded with the current codec and
+        dictionary if recompress is set, byte-for-byte otherwise), together with the tombstones
+        of cases an older segment still holds a record of. The old segment is deleted once the
+        copies are fsynced. The lock is held per segment, so reads and appends continue between
+        segments.
+
+        Args:
+            min_garbage_ratio: Minimum share of superseded bytes for a segment to be rewritten
+            recompress: Rewrite every sealed segment and re-encode records with the current settings
+
+        Returns:
+            Dictionary with segments/records/tombstones rewritten and bytes before/after
+        """
+        with self._lock:
+            if self._usage[self._active][0]:
+                self._roll()
+            candidates = [
+                number for number, (size, garbage) in self._usage.items()
+                if number != self._active and (recompress or size == 0 or garbage / size >= min_garbage_ratio)
+            ]
+
+        stats = {"segments": 0, "records": 0, "tombstones": 0, "bytes_before": self.disk_usage(), "bytes_after": 0}
+        segment_keys = {}
+        for number in candidates:
+            with self._lock:
+                live = [(key, location) for key, location in self._index.items() if location[0] == number]
+                segment_map = self._map(number)
+                for key, (_, offset, length) in live:
+                    record = segment_map[offset:offset + length]
+                    if recompress:
+                        record = self._encode(key, self._decode(record))
+                    self._append(key, record, record[2])
+
+                # A deletion must outlive its segment while an older segment still holds the case
+                deleted = [key for codec, key in self._segment_records(number)
+                           if codec == CODEC_TOMBSTONE and key not in self._index]
+                older = [other for other in self._usage if other < number]
+                for key in dict.fromkeys(deleted):
+                    if any(key in segment_keys.setdefault(other, self._segment_keys(other)) for other in older):
+                        self._append(key, self._encode(key, None), CODEC_TOMBSTONE)
+                        stats["tombstones"] += 1
+
+                # The copies must be durable before the only other copy is deleted
+                self._writer.flush()
+                os.fsync(self._writer.fileno())
+                if segment_map is not None:
+                    segment_map.close()
+                self._maps.pop(number, None)
+                del self._usage[number]
+                self._segment_path(number).unlink()
+
+            stats["segments"] += 1
+            stats["records"] += len(live)
+
+        stats["bytes_after"] = self.disk_usage()
+        logger.info(f"Compacted {stats['segments']} segments ({stats['records']} live records, "
+                    f"{stats['tombstones']} tombstones kept): "
+                    f"{stats['bytes_before']:,} -> {stats['bytes_after']:,} bytes")
+        return stats
+
+    def _segment_records(self, number: int) -> List[Tuple[int, str]]:
+        """(codec, case ID) of every record of a sealed segment, in order (caller holds the lock)."""
+        segment_map = self._map(number)
+        size = self._usage[number][0]
+        records, offset = [], 0
+        while offset < size:
+            _, codec, _, key_length, payload_length, _ = HEADER.unpack_from(segment_map, offset)
+            start = offset + HEADER.size
+            records.append((codec, segment_map[start:start + key_length].decode("utf-8")))
+            offset = start + key_length + payload_length
+        return records
+
+    def _segment_keys(self, number: int) -> set:
+        """Case IDs with any record in a sealed segment (caller holds the lock)."""
+        return {key for _, key in self._segment_records(number)}
+
+    def disk_usage(self) -> int:
+        """Bytes used by segments and dictionaries."""
+        with self._lock:
+            return sum(size for size, _ in self._usage.values()) + sum(map(len, self._dictionaries.values()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Archive summary."""
+        with self._lock:
+            total = sum(size for size, _ in self._usage.values())
+            garbage = sum(garbage for _, garbage in self._usage.values())
+            return {
+                "directory": str(self.directory),
+                "cases": len(self._index),
+                "segments": len(self._usage),
+                "bytes": total,
+                "superseded_bytes": garbage,
+                "dictionary_id": self.dictionary_id
+            }
+
+def case_document(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Archive document of a case repository record."""
+    return {key: record[key] for key in ("case_id", "agent", "model", "date_of_crime", "collected_data",
+                                         "analysis", "duration_seconds", "source", "created_at")}
+
+def main():
+    """Main function to manage the analysis archive."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Compressed analysis archive")
+    parser.add_argument("--dir", help="Archive directory")
+    parser.add_argument("--codec", choices=list(CODECS), default="zlib", help="Compression for new records")
+    parser.add_argument("--import-repository", action="store_true",
+                        help="Archive every case of the case repository (latest analysis per case ID)")
+    parser.add_argument("--get", help="Print the archived analysis of a case ID")
+    parser.add_argument("--compact", action="store_true", help="Rewrite mostly superseded segments")
+    parser.add_argument("--train-dictionary", action="store_true",
+                        help="Train a zlib dictionary first and recompress every sealed segment with it")
+    parser.add_argument("--stats", action="store_true", help="Print archive statistics")
+
+    args = parser.parse_args()
+
+    with AnalysisArchive(args.dir, codec=args.codec) as archive:
+        if args.import_repository:
+            from case_repository import CaseRepository
+            with CaseRepository() as repository:
+                count = 0
+                for record in repository.iter_cases():
+                    archive.put(record["case_id"] or f"record-{record['id']}", case_document(record))
+                    count += 1
+            print(f"Archived {count} cases")
+
+        if args.train_dictionary:
+            archive.train_dictionary()
+        if args.compact or args.train_dictionary:
+            stats = archive.compact(recompress=args.train_dictionary)
+            print(f"Compacted {stats['segments']} segments: {stats['bytes_before']:,} -> {stats['bytes_after']:,} bytes")
+
+        if args.get:
+            document = archive.get(args.get)
+            print(document["analysis"] if document else f"No archived analysis for case {args.get}")
+
+        if args.stats or not any([args.import_repository, args.get, args.compact, args.train_dictionary]):
+            print(json.dumps(archive.stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Analysis Sections - Streaming Parser for Generated Case Analyses
+
+The agents ask the model for five numbered sections (case analysis, motives or
+methods, investigative approaches, key evidence, solutions) and get them back
+as markdown with "**1. ...**" or "### 1. ..." headings. This module splits an
+analysis into those typed sections line by line as tokens arrive, so the case
+repository can store each section in its own column and report panels can
+fetch one section for many cases without re-parsing full texts.
+
+Usage:
+    from analysis_sections import SectionParser, parse_sections
+
+    parser = SectionParser()
+    for token in stream:
+        parser.feed(token)          # Returns the sections completed by this chunk
+    sections = parser.close()       # {"overview": ..., "key_evidence": ..., ...}
+
+    sections = parse_sections(analysis_text)
+
+Author: Augment Agent
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Constants
+# Order of the numbered sections requested by the agent prompts
+SECTION_TYPES = ["overview", "motives", "approaches", "key_evidence", "solutions"]
+MAX_HEADING_LENGTH = 120
+
+SECTION_TITLES = {
+    "overview": "Case Analysis",
+    "motives": "Motives, Suspects and Methods",
+    "approaches": "Investigative Approaches",
+    "key_evidence": "Key Evidence",
+    "solutions": "Solutions and Conclusions"
+}
+
+# Heading keywords, checked in order ("Recommended Investigative Approaches" is an approach, not a solution)
+SECTION_KEYWORDS = [
+    ("key_evidence", re.compile(r"\bevidence\b", re.IGNORECASE)),
+    ("approaches", re.compile(r"\bapproach|\binvestigative (?:steps|strategy|plan)|\bnext steps", re.IGNORECASE)),
+    ("motives", re.compile(r"\bmotive|\bsuspect|\bmethod|\btechnique|\bmodus operandi", re.IGNORECASE)),
+    ("solutions", re.compile(r"\bsolution|\bconclusion|\bprevent|\brecovery", re.IGNORECASE)),
+    ("overview", re.compile(r"\banalysis\b|\boverview\b|\bsummary\b", re.IGNORECASE))
+]
+
+MARKDOWN_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.+?)\s*#*\s*$")
+BOLD_HEADING = re.compile(r"^\s{0,3}(?:\*\*|__)(.+?)(?:\*\*|__)\s*:?\s*$")
+NUMBERED_LINE = re.compile(r"^\s{0,3}(\d{1,2}[.)]\s+[A-Z].*?):?\s*$")
+HEADING_NUMBER = re.compile(r"^(\d{1,2})[.)]\s*")
+
+def classify_heading(line: str) -> Optional[tuple]:
+    """
+    Recognize a section heading line.
+
+    Args:
+        line: One line of the analysis
+
+    Returns:
+        (section type or None, heading number or None) for heading lines, None for other lines
+    """
+    match = MARKDOWN_HEADING.match(line) or BOLD_HEADING.match(line) or NUMBERED_LINE.match(line)
+    if not match:
+        return None
+
+    title = match.group(1).strip("*_#: \t")
+    if not title or len(title) > MAX_HEADING_LENGTH:
+        return None
+
+    number_match = HEADING_NUMBER.match(title)
+    number = int(number_match.group(1)) if number_match else None
+    if match.re is NUMBERED_LINE and number is None:
+        return None
+
+    section = next((section for section, pattern in SECTION_KEYWORDS if pattern.search(title)), None)
+    return section, number
+
+class SectionParser:
+    """
+    Incremental splitter of an analysis into typed sections.
+
+    Lines before the first recognized heading go to "overview". Once the analysis
+    uses numbered headings, only headings that continue the numbering start a new
+    section, so numbered or bold sub-headings inside a section stay in that section.
+    """
+
+    def __init__(self):
+        """Initialize an empty parser."""
+        self._buffer = ""
+        self._lines = {section: [] for section in SECTION_TYPES}
+        self._current = "overview"
+        self._number = 0
+        self._numbered = False
+        self._closed = False
+
+    @property
+    def current_section(self) -> str:
+        """Section the parser is currently filling."""
+        return self._current
+
+    def feed(self, chunk: str) -> List[str]:
+        """
+        Consume a chunk of streamed text.
+
+        Args:
+            chunk: Next piece of the analysis (any length, may split lines)
+
+        Returns:
+            Section types completed by this chunk (a following section heading was seen)
+        """
+        if not chunk:
+            return []
+        self._buffer += chunk
+        if "\n" not in self._buffer:
+            return []
+
+        *lines, self._buffer = self._buffer.split("\n")
+        completed = []
+        for line in lines:
+            finished = self._consume_line(line)
+            if finished:
+                completed.append(finished)
+        return completed
+
+    def _consume_line(self, line: str) -> Optional[str]:
+        """Route one complete line; return the section it closed, if any."""
+        heading = classify_heading(line)
+        if heading is not None:
+            section, number = heading
+            if number is not None:
+                # Numbered headings must continue the numbering (1-5 as requested in the prompt)
+                if number == self._number + 1 and number <= len(SECTION_TYPES):
+                    section = section or SECTION_TYPES[number - 1]
+                elif number <= self._number or section is None:
+                    section = None
+                if section is not None:
+                    self._number = number
+                    self._numbered = True
+            elif self._numbered:
+                # Unnumbered bold lines inside a numbered analysis are sub-headings
+                section = None
+
+            if section is not None:
+                previous, self._current = self._current, section
+                return previous if previous != section and self._lines[previous] else None
+
+        self._lines[self._current].append(line)
+        return None
+
+    def close(self) -> Dict[str, str]:
+        """
+        Flush the last partial line.
+
+        Returns:
+            Section type -> text (empty string for sections the analysis did not contain)
+        """
+        if not self._closed:
+            if self._buffer:
+                self._consume_line(self._buffer)
+                self._buffer = ""
+            self._closed = True
+        return self.sections
+
+    @property
+    def sections(self) -> Dict[str, str]:
+        """Text of each section parsed so far."""
+        return {section: "\n".join(lines).strip() for section, lines in self._lines.items()}
+
+def parse_sections(analysis: str) -> Dict[str, str]:
+    """
+    Split a complete analysis into typed sections.
+
+    Args:
+        analysis: Analysis text
+
+    Returns:
+        Section type -> text
+    """
+    parser = SectionParser()
+    parser.feed(analysis)
+    return parser.close()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Batch Journal - Write-ahead status log for resumable batch runs
+
+This module records the status of every case in a batch run (pending,
+in_flight, done, failed) in an append-only JSON-lines journal next to the
+batch output. Entries are written and fsynced in groups by a background
+thread every JOURNAL_SYNC_INTERVAL seconds, so a batch of thousands of cases
+costs a few fsyncs per second instead of one per entry. A caller that must
+not proceed before its entry is durable (the batch runner records in_flight
+before every model call) passes wait=True; that wakes the writer at once, and
+every entry buffered meanwhile shares the same fsync.
+
+If a write or fsync fails, the journal stops: waiting callers and every
+later record() raise JournalError, so the batch fails instead of waiting for
+an entry that will never be durable.
+
+Reopening a journal replays it to the latest status per case (a torn last
+line from a crash is dropped), which is what lets an interrupted batch skip
+finished cases and retry the rest.
+
+Usage:
+    journal = BatchJournal("cases.results.jsonl.journal")
+    journal.record(0, "in_flight", wait=True, case_id="CASE-1", attempt=1)
+    journal.record(0, "done", case_id="CASE-1", record_id=42)
+    journal.close()
+
+Author: Augment Agent
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Constants
+STATUSES = ["pending", "in_flight", "done", "failed"]
+JOURNAL_SYNC_INTERVAL = 0.2  # Seconds between group commits
+
+class JournalError(Exception):
+    """Raised when journal entries cannot be written, so they will never become durable."""
+
+    def __init__(self, path: Path, error: Exception):
+        super().__init__(f"Batch journal {path} failed: {str(error)}")
+        self.path = path
+
+class BatchJournal:
+    """
+    Append-only journal of batch case statuses with batched fsync.
+    """
+
+    def __init__(self, path, sync_interval: float = JOURNAL_SYNC_INTERVAL):
+        """
+        Open (and replay, if it exists) a journal.
+
+        Args:
+            path: Journal file
+            sync_interval: Seconds between group commits
+        """
+        self.path = Path(path)
+        self.sync_interval = sync_interval
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self._replay()
+
+        self._file = open(self.path, "ab")
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._buffer: List[bytes] = []
+        self._appended = 0  # Entries handed to record()
+        self._durable = 0   # Entries fsynced
+        self._waiters = 0
+        self._closed = False
+        self._error: Optional[JournalError] = None
+        self.syncs = 0
+        self._thread = threading.Thread(target=self._sync_loop, name="batch-journal", daemon=True)
+        self._thread.start()
+
+    def _replay(self):
+        """Load the latest entry per case and cut off a torn last line."""
+        if not self.path.exists():
+            return
+        good_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self.entries[entry["index"]] = entry
+                good_bytes += len(line)
+        if good_bytes < self.path.stat().st_size:
+            logger.warning(f"Truncating torn entry at the end of {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(good_bytes)
+
+    def record(self, index: int, status: str, wait: bool = False, **fields):
+        """
+        Append a status entry for a case.
+
+        Args:
+            index: Case index in the batch input
+            status: One of STATUSES
+            wait: Block until the entry has been fsynced
+            **fields: Extra fields stored with the entry (case_id, attempt, error, record_id, ...)
+
+        Raises:
+            JournalError: If the journal failed to write (before or while waiting)
+        """
+        if status not in STATUSES:
+            raise ValueError(f"Unknown batch status: {status}")
+        entry = dict(fields, index=index, status=status, time=round(time.time(), 3))
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._lock:
+            if self._error:
+                raise self._error
+            self.entries[index] = entry
+            self._buffer.append(line)
+            self._appended += 1
+            if wait:
+                position = self._appended
+                self._waiters += 1
+                self._changed.notify_all()
+                self._changed.wait_for(lambda: self._durable >= position or self._closed or self._error)
+                self._waiters -= 1
+                if self._error and self._durable < position:
+                    raise self._error
+
+    def status(self, index: int) -> Optional[Dict[str, Any]]:
+        """
+        Latest entry for a case.
+
+        Args:
+            index: Case index in the batch input
+
+        Returns:
+            Entry dictionary, or None if the case has never been recorded
+        """
+        return self.entries.get(index)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of cases per latest status."""
+        counts = {status: 0 for status in STATUSES}
+        for entry in list(self.entries.values()):
+            counts[entry["status"]] += 1
+        return counts
+
+    def _sync_loop(self):
+        """Write and fsync buffered entries every sync_interval, or at once when someone waits."""
+        while True:
+            with self._lock:
+                self._changed.wait_for(lambda: self._waiters or self._closed, timeout=self.sync_interval)
+            if not self._flush():
+                return
+
+    def _flush(self) -> bool:
+        """Group commit of the buffered entries; returns False once the journal is closed or failed."""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+            position = self._appended
+            closed = self._closed
+        if lines:
+            # Writes happen outside the lock so record() never waits on the disk
+            try:
+                self._write(b"".join(lines))
+            except OSError as e:
+                logger.error(f"Error writing batch journal {self.path}: {str(e)}")
+                with self._lock:
+                    self._error = JournalError(self.path, e)
+                    self._changed.notify_all()
+                return False
+            self.syncs += 1
+        with self._lock:
+            self._durable = position
+            self._changed.notify_all()
+        return not closed
+
+    def _write(self, data: bytes):
+        """Append and fsync a group of entries."""
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        """
+        Flush the remaining entries and close the file.
+
+        Raises:
+            JournalError: If the journal failed to write, now or earlier
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._changed.notify_all()
+        self._thread.join()
+        if not self._error:
+            self._flush()
+        try:
+            self._file.close()
+        except OSError as e:
+            logger.error(f"Error closing batch journal {self.path}: {str(e)}")
+        if self._error:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
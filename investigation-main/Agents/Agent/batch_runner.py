@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Batch Runner - Concurrent JSONL case analysis
+
+This module runs an agent's analyze_case over a JSONL file of cases (one JSON
+object of case details per line) with bounded concurrency, so thousands of
+historical cases can be backfilled in one unattended run. Cases are read from
+disk as workers free up rather than loaded up front. Results are written to an
+output JSONL as soon as every earlier case has finished, so the output is
+always in input order; a bounded reorder window keeps memory flat when one
+slow case holds up the ones behind it. Successful analyses are stored in the
+case repository with source "batch:<input path>" (resolved, so same-named
+inputs in different folders are kept apart). Progress (cases done, rate,
+per-case latency) is printed while the batch runs.
+
+Every status change is recorded in a write-ahead journal next to the output
+(see batch_journal.py). Running the same batch again resumes it: cases the
+journal marks done are skipped (their results are rebuilt from the case
+repository, which also covers a case stored just before a crash), and
+interrupted and failed ones are analyzed again. Failed analyses
+are retried with exponential backoff within a run. A summary with throughput
+and token usage is printed and saved next to the output as
+<output stem>.summary.json (results.jsonl -> results.summary.json).
+
+A batch fails (raises) instead of hanging if the journal or the output
+cannot be written; the cases not yet done are retried by the next run.
+
+Each output line holds index, case_id, success, analysis, error,
+duration_seconds, attempts and record_id.
+
+Usage:
+    python murder_agent_main.py --batch cases.jsonl
+    python theft_agent_main.py --batch cases.jsonl --output results.jsonl --concurrency 16
+    python financial_fraud_agent_main.py --batch cases.jsonl
+
+Author: Augment Agent
+"""
+
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator, Tuple
+
+from batch_journal import BatchJournal, JournalError
+from case_repository import CaseRepository
+from helpers import percentile
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_CONCURRENCY = 8
+REORDER_WINDOW = 8  # Cases read ahead of the oldest unfinished one, per worker
+PROGRESS_INTERVAL = 5.0  # Seconds between progress lines
+ANALYSIS_ERROR_PREFIX = "Error analyzing case: "  # What the agents' analyze_case returns on failure
+MAX_ATTEMPTS = 3  # Analysis attempts per case within one run
+RETRY_BASE_DELAY = 2.0  # Seconds before the first retry, doubled for each further one
+RETRY_MAX_DELAY = 60.0
+TOKEN_FIELDS = ["prompt_tokens", "completion_tokens", "total_tokens"]
+
+def read_cases(input_path: Path) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Read cases from a JSONL file one line at a time.
+
+    Args:
+        input_path: JSONL file with one JSON object of case details per line
+
+    Returns:
+        Iterator of (index, case_details, error); case_details is None when the line is invalid
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                case_details = json.loads(line)
+                error = None if isinstance(case_details, dict) else "Case must be a JSON object"
+            except ValueError as e:
+                case_details, error = None, f"Invalid JSON: {str(e)}"
+            yield index, case_details if error is None else None, error
+            index += 1
+
+def default_output_path(input_path: Path) -> Path:
+    """Output file next to the input: cases.jsonl -> cases.results.jsonl."""
+    return input_path.with_name(f"{input_path.stem}.results.jsonl")
+
+def retry_delay(attempt: int) -> float:
+    """Backoff before retrying after a given failed attempt (exponential with jitter)."""
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+def run_batch(agent, agent_type: str, input_path, output_path=None,
+              concurrency: int = DEFAULT_CONCURRENCY, model: Optional[str] = None,
+              max_attempts: int = MAX_ATTEMPTS) -> Dict[str, Any]:
+    """
+    Analyze every case in a JSONL file with bounded concurrency, resuming an interrupted run.
+
+    Args:
+        agent: Initialized agent with an analyze_case(case_details, usage) method
+        agent_type: Agent type for the case repository ("murder", "theft", "finance")
+        input_path: JSONL file of cases
+        output_path: Output JSONL (defaults to <input>.results.jsonl)
+        concurrency: Maximum number of analyses in flight
+        model: Model name recorded with stored cases
+        max_attempts: Analysis attempts per case before it is marked failed
+
+    Returns:
+        Summary with counts, throughput, latency percentiles and token usage
+
+    Raises:
+        JournalError: If the journal could not be written
+        OSError: If the output could not be written
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path) if output_path else default_output_path(input_path)
+    source = f"batch:{input_path.resolve()}"
+
+    journal = BatchJournal(output_path.with_name(output_path.name + ".journal"))
+    resumed = journal.counts()
+    if journal.entries:
+        print(f"[batch] Resuming {input_path.name}: {resumed['done']} cases done, "
+              f"{resumed['failed']} failed and {resumed['pending'] + resumed['in_flight']} unfinished "
+              f"cases will be retried", flush=True)
+
+    window = threading.BoundedSemaphore(concurrency * REORDER_WINDOW)
+    lock = threading.Lock()
+    waiting = {}  # index -> result of a finished case with an unfinished predecessor
+    state = {"next_index": 0, "done": 0, "failed": 0, "analyzed": 0, "skipped": 0, "retries": 0,
+             "last_progress": time.time(), "error": None}
+    tokens = {field: 0 for field in TOKEN_FIELDS}
+    latencies = []
+    start_time = time.time()
+
+    def analyze(index, case_details, repository):
+        result = {"index": index, "case_id": case_details.get("case_id"), "success": False, "analysis": None,
+                  "error": None, "duration_seconds": None, "attempts": 0, "record_id": None}
+        for attempt in range(1, max_attempts + 1):
+            result["attempts"] = attempt
+            usage = {}
+            try:
+                # Durable before the model call, so a crash afterwards can find the stored case
+                journal.record(index, "in_flight", wait=True, case_id=result["case_id"], attempt=attempt)
+                case_start = time.time()
+                analysis = agent.analyze_case(case_details, usage=usage)
+                duration = time.time() - case_start
+                result["duration_seconds"] = round(duration, 3)
+                with lock:
+                    for field in TOKEN_FIELDS:
+                        tokens[field] += usage.get(field) or 0
+                if analysis.startswith(ANALYSIS_ERROR_PREFIX):
+                    raise RuntimeError(analysis[len(ANALYSIS_ERROR_PREFIX):])
+                result["record_id"] = repository.add_case(agent_type, case_details, analysis, model=model,
+                                                          duration_seconds=duration, source=source)
+                result.update(success=True, analysis=analysis, error=None)
+                journal.record(index, "done", case_id=result["case_id"], attempt=attempt,
+                               record_id=result["record_id"], duration_seconds=result["duration_seconds"],
+                               **usage)
+                return result
+            except JournalError:
+                # Retrying cannot help; the case fails and the main loop stops the batch
+                raise
+            except Exception as e:
+                result["error"] = str(e)
+                if attempt < max_attempts:
+                    delay = retry_delay(attempt)
+                    logger.warning(f"Batch case {index} failed (attempt {attempt}), retrying in {delay:.1f} s: "
+                                   f"{str(e)}")
+                    with lock:
+                        state["retries"] += 1
+                    time.sleep(delay)
+        logger.error(f"Batch case {index} failed after {max_attempts} attempts: {result['error']}")
+        journal.record(index, "failed", case_id=result["case_id"], attempt=max_attempts,
+                       error=result["error"])
+        return result
+
+    def completed(index, case_details, repository):
+        """Result of a case finished by an earlier run, or None if it has to be analyzed (again)."""
+        entry = journal.status(index)
+        if not entry or entry.get("case_id") != case_details.get("case_id"):
+            return None
+        record = None
+        if entry["status"] == "done":
+            record = repository.get(entry["record_id"])
+        elif entry["status"] == "in_flight" and entry.get("case_id"):
+            # Stored just before a crash, while its done entry was still waiting for the group commit
+            started = datetime.fromtimestamp(entry["time"] - 1).isoformat()
+            record = next((candidate for candidate in repository.find_by_case_id(entry["case_id"], agent_type)
+                           if candidate["source"] == source and candidate["created_at"] >= started), None)
+            if record:
+                journal.record(index, "done", case_id=entry["case_id"], attempt=entry.get("attempt"),
+                               record_id=record["id"], duration_seconds=record["duration_seconds"])
+        if not record:
+            return None
+        return {"index": index, "case_id": entry.get("case_id"), "success": True, "analysis": record["analysis"],
+                "error": None, "duration_seconds": record["duration_seconds"], "attempts": entry.get("attempt"),
+                "record_id": record["id"]}
+
+    def finish(result, out, skipped=False):
+        with lock:
+            waiting[result["index"]] = result
+            state["done"] += 1
+            if skipped:
+                state["skipped"] += 1
+            else:
+                state["analyzed"] += 1
+                if result["duration_seconds"] is not None:
+                    latencies.append(result["duration_seconds"])
+            if not result["success"]:
+                state["failed"] += 1
+
+            # Write every result that is now in input order; after a write error the rest are dropped
+            # (the main loop raises it), but their window slots are still released so it cannot block
+            while state["next_index"] in waiting:
+                ordered = waiting.pop(state["next_index"])
+                state["next_index"] += 1
+                try:
+                    if not state["error"]:
+                        out.write(json.dumps(ordered) + "\n")
+                except Exception as e:
+                    logger.error(f"Error writing batch output {output_path}: {str(e)}")
+                    state["error"] = e
+                finally:
+                    window.release()
+            try:
+                if not state["error"]:
+                    out.flush()
+            except Exception as e:
+                logger.error(f"Error writing batch output {output_path}: {str(e)}")
+                state["error"] = e
+
+            now = time.time()
+            if now - state["last_progress"] >= PROGRESS_INTERVAL:
+                state["last_progress"] = now
+                print(f"[batch] {state['done']} cases done ({state['failed']} failed, {state['skipped']} resumed), "
+                      f"{state['analyzed'] / (now - start_time):.2f} cases/s, "
+                      f"median latency {statistics.median(latencies) if latencies else 0:.1f} s", flush=True)
+
+    def finished(future, index, case_id, out):
+        """Done callback: a case whose analysis raised still gets a failed result and frees its slot."""
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Batch case {index} failed: {str(e)}")
+            result = {"index": index, "case_id": case_id, "success": False, "analysis": None, "error": str(e),
+                      "duration_seconds": None, "attempts": 0, "record_id": None}
+        finish(result, out)
+
+    # The output is rewritten in full on every run; resumed cases are filled in from the repository
+    try:
+        with CaseRepository() as repository, open(output_path, "w", encoding="utf-8") as out:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"{agent_type}-batch") as executor:
+                for index, case_details, error in read_cases(input_path):
+                    window.acquire()
+                    if state["error"]:
+                        raise state["error"]
+                    if error:
+                        journal.record(index, "failed", error=error)
+                        finish({"index": index, "case_id": None, "success": False, "analysis": None, "error": error,
+                                "duration_seconds": None, "attempts": 0, "record_id": None}, out)
+                        continue
+                    result = completed(index, case_details, repository)
+                    if result:
+                        finish(result, out, skipped=True)
+                        continue
+                    journal.record(index, "pending", case_id=case_details.get("case_id"))
+                    future = executor.submit(analyze, index, case_details, repository)
+                    future.add_done_callback(lambda done, index=index, case_id=case_details.get("case_id"):
+                                             finished(done, index, case_id, out))
+            if state["error"]:
+                raise state["error"]
+    finally:
+        journal.close()
+
+    elapsed = time.time() - start_time
+    latencies.sort()
+    analyzed = state["analyzed"]
+    summary = {
+        "input": str(input_path),
+        "output": str(output_path),
+        "cases": state["done"],
+        "succeeded": state["done"] - state["failed"],
+        "failed": state["failed"],
+        "resumed": state["skipped"],
+        "analyzed": analyzed,
+        "retries": state["retries"],
+        "elapsed_seconds": round(elapsed, 1),
+        "cases_per_second": round(analyzed / elapsed, 2) if elapsed else None,
+        "latency_median_seconds": round(statistics.median(latencies), 2) if latencies else None,
+        "latency_p95_seconds": round(percentile(latencies, 0.95), 2) if latencies else None,
+        "tokens": tokens,
+        "tokens_per_case": round(tokens["total_tokens"] / analyzed) if analyzed else None,
+        "tokens_per_second": round(tokens["total_tokens"] / elapsed) if elapsed else None,
+        "journal_syncs": journal.syncs
+    }
+    with open(output_path.with_name(output_path.stem + ".summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    logger.info(f"Batch {input_path.name} finished: {summary['succeeded']}/{summary['cases']} cases "
+                f"in {summary['elapsed_seconds']} s")
+    return summary
+
+def print_summary(summary: Dict[str, Any]):
+    """
+    Print a batch summary.
+
+    Args:
+        summary: Summary returned by run_batch
+    """
+    print("\n" + "="*50)
+    print("BATCH SUMMARY")
+    print("="*50)
+    print(f"Cases: {summary['cases']} ({summary['succeeded']} succeeded, {summary['failed']} failed)")
+    if summary["resumed"]:
+        print(f"Resumed from the journal: {summary['resumed']} cases already done")
+    print(f"Analyzed: {summary['analyzed']} cases in {summary['elapsed_seconds']} s "
+          f"({summary['cases_per_second']} cases/s, {summary['retries']} retries)")
+    if summary["latency_median_seconds"] is not None:
+        print(f"Latency per case: median {summary['latency_median_seconds']} s, "
+              f"p95 {summary['latency_p95_seconds']} s")
+    tokens = summary["tokens"]
+    print(f"Tokens: {tokens['total_tokens']:,} ({tokens['prompt_tokens']:,} prompt, "
+          f"{tokens['completion_tokens']:,} completion), {summary['tokens_per_case']} per case, "
+          f"{summary['tokens_per_second']} per second")
+    print(f"Results: {summary['output']}")
+    print("="*50)
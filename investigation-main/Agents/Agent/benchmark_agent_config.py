@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for agent toggle propagation between server processes
+
+This script starts several unified servers that share one agent config file
+(AGENT_CONFIG_FILE), toggles an agent through /toggle-agent on one of them
+(rotating through the servers) and measures how long it takes until every
+other server reports the new state on /agents. It also checks that toggles
+survive a restart and that concurrent /update-agents calls on different
+servers are all persisted (no lost update).
+
+Usage:
+    python benchmark_agent_config.py
+    python benchmark_agent_config.py --servers 4 --toggles 40
+
+Author: Augment Agent
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmark_murder_worker import print_separator, start_stub_api
+from benchmark_agent_router import free_port, post_json, start_unified, stop
+from helpers import percentile
+
+def enabled_agents(port):
+    """Enabled flag per agent as reported by one server."""
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/agents", timeout=5) as response:
+        return json.loads(response.read())["enabled_agents"]
+
+def wait_for(ports, agent_id, enabled, timeout=10):
+    """Seconds until every server in ports reports the agent state."""
+    start = time.perf_counter()
+    pending = set(ports)
+    while pending:
+        if time.perf_counter() - start > timeout:
+            raise RuntimeError(f"Servers {sorted(pending)} did not pick up {agent_id}={enabled}")
+        pending = {port for port in pending if enabled_agents(port)[agent_id] != enabled}
+        if pending:
+            time.sleep(0.01)
+    return time.perf_counter() - start
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark agent toggle propagation between server processes")
+    parser.add_argument("--servers", type=int, default=3, help="Unified server processes sharing the config file")
+    parser.add_argument("--toggles", type=int, default=20, help="Toggles to measure")
+    args = parser.parse_args()
+
+    server = start_stub_api(100)
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ,
+                   NVIDIA_API_BASE_URL=f"http://127.0.0.1:{server.server_address[1]}/v1",
+                   CASE_REPOSITORY_DB=str(Path(directory) / "cases.db"),
+                   TEMPORAL_INDEX_FILE=str(Path(directory) / "temporal_index.npz"),
+                   AGENT_CONFIG_FILE=str(Path(directory) / "agent_config.json"))
+        ports = [free_port() for _ in range(args.servers)]
+        processes = [start_unified(env, directory, port) for port in ports]
+        print(f"{args.servers} servers sharing one agent config file; {args.toggles} toggles")
+        print_separator()
+
+        delays = []
+        for number in range(args.toggles):
+            port = ports[number % len(ports)]
+            enabled = number % 2 == 0
+            status, body = post_json(f"http://127.0.0.1:{port}/toggle-agent", {"agentId": "smuggle", "enabled": enabled})
+            assert status == 200, body
+            delays.append(wait_for([other for other in ports if other != port], "smuggle", enabled) * 1000)
+        delays.sort()
+        print(f"{'Toggle visible on every other server':38s} median {statistics.median(delays):7.0f} ms, "
+              f"p95 {percentile(delays, 0.95):7.0f} ms, max {delays[-1]:7.0f} ms")
+
+        # Concurrent bulk updates of different agents on different servers
+        agents = ["theft", "finance", "crime-accident", "crime-abuse"]
+        with ThreadPoolExecutor(max_workers=len(agents)) as executor:
+            list(executor.map(lambda item: post_json(f"http://127.0.0.1:{ports[item[0] % len(ports)]}/update-agents",
+                                                     {"agents": {item[1]: True}}), enumerate(agents)))
+        time.sleep(1)
+        lost = [agent for agent in agents if not enabled_agents(ports[0]).get(agent)]
+        print(f"{'Concurrent updates, different servers':38s} {len(agents) - len(lost)}/{len(agents)} persisted")
+
+        stop(processes)
+        port = free_port()
+        process = start_unified(env, directory, port)
+        survived = all(enabled_agents(port)[agent] for agent in agents)
+        print(f"{'Toggles kept across a restart':38s} {'yes' if survived else 'no'}")
+        stop([process])
+    server.shutdown()
+    print_separator()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for lazily built agents in the unified server
+
+This script starts the unified server a number of times in each of two modes
+and reports how long it takes until /health answers and the resident memory
+of the idle process:
+
+  * lazy (default): agents are built on first enable or request, so the
+    openai package and the agent modules are not even imported at startup
+  * preloaded (PRELOAD_AGENTS=true): the enabled agents are built at startup
+
+It then enables the theft and financial fraud agents and sends one murder
+request, and reports the build time of each agent (from
+/api/health/full) and the memory with every agent built, which is what the
+server used at idle before agents were built lazily.
+
+Usage:
+    python benchmark_agent_registry.py
+    python benchmark_agent_registry.py --runs 10
+
+Author: Augment Agent
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from benchmark_murder_worker import print_separator, start_stub_api
+from benchmark_agent_router import free_port, post_json, layout_memory, start_unified, stop
+
+def start_and_measure(env, directory):
+    """Start a unified server and return (process, port, startup ms, idle RSS MB)."""
+    port = free_port()
+    start = time.perf_counter()
+    process = start_unified(env, directory, port)
+    startup_ms = (time.perf_counter() - start) * 1000
+    time.sleep(0.5)
+    return process, port, startup_ms, layout_memory([process])[0]
+
+def build_all(port):
+    """Enable theft and finance and send one murder request, so every agent is built."""
+    for agent_id in ("theft", "finance"):
+        status, body = post_json(f"http://127.0.0.1:{port}/toggle-agent", {"agentId": agent_id, "enabled": True})
+        assert status == 200, body
+    status, body = post_json(f"http://127.0.0.1:{port}/api/augment/murder", {"question": "FORCE_NEW_SESSION"})
+    assert status == 200, body
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health/full") as response:
+        return json.loads(response.read())["hosted_agents"]
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark lazy agent building in the unified server")
+    parser.add_argument("--runs", type=int, default=5, help="Server starts per mode")
+    args = parser.parse_args()
+
+    server = start_stub_api(100)
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ,
+                   NVIDIA_API_BASE_URL=f"http://127.0.0.1:{server.server_address[1]}/v1",
+                   CASE_REPOSITORY_DB=str(Path(directory) / "cases.db"),
+                   TEMPORAL_INDEX_FILE=str(Path(directory) / "temporal_index.npz"))
+        print(f"{args.runs} server starts per mode")
+        print_separator()
+
+        results = {}
+        for mode, preload in (("Lazy", "false"), ("Preloaded", "true")):
+            startups, idle, built = [], [], []
+            for _ in range(args.runs):
+                process, port, startup_ms, rss = start_and_measure(dict(env, PRELOAD_AGENTS=preload), directory)
+                startups.append(startup_ms)
+                idle.append(rss)
+                hosted = build_all(port)
+                built.append(layout_memory([process])[0])
+                stop([process])
+            results[mode] = (statistics.median(startups), statistics.median(idle), statistics.median(built))
+            print(f"{mode + ' startup':38s} median {results[mode][0]:7.0f} ms")
+            print(f"{mode + ' idle RSS':38s} median {results[mode][1]:7.1f} MB")
+            print(f"{mode + ' RSS with every agent built':38s} median {results[mode][2]:7.1f} MB")
+            for name, build in sorted(hosted.items()):
+                if build["build_seconds"] is not None:
+                    print(f"  {name + ' agent build':36s} {build['build_seconds'] * 1000:7.0f} ms")
+            print_separator()
+
+        lazy, preloaded = results["Lazy"], results["Preloaded"]
+        print(f"Lazy building saves {preloaded[0] - lazy[0]:.0f} ms of startup against preloading the murder agent, "
+              f"and {lazy[2] - lazy[1]:.1f} MB of idle RSS against having every agent built")
+    server.shutdown()
+    print_separator()
+
+if __name__ == "__main__":
+    main()
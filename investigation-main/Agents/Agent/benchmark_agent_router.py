@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for hosting the theft and financial fraud agents in the unified server
+
+This script compares the two deployment layouts for the three agents:
+
+  * separate: the unified server (murder) plus one server process per agent
+    for theft and financial fraud, each with its own interpreter, Flask app
+    and API client
+  * unified: one unified_server process serving /api/augment/theft and
+    /api/augment/financial-fraud through its router and shared upstream pool
+
+For each layout it reports the summed resident memory (RSS, and PSS where
+/proc/<pid>/smaps_rollup is available) after startup and after load, plus the
+latency and throughput of concurrent theft and fraud requests. All agents
+talk to a local stub of the chat completions endpoint (via
+NVIDIA_API_BASE_URL) that answers after a fixed delay, and cases are stored
+in a temporary repository.
+
+Usage:
+    python benchmark_agent_router.py
+    python benchmark_agent_router.py --requests 400 --concurrency 32 --latency-ms 200
+
+Author: Augment Agent
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmark_murder_worker import print_separator, start_stub_api
+from helpers import percentile
+
+AGENT_DIR = Path(__file__).resolve().parent
+
+THEFT_CASE = {
+    "case_id": "THEFT-BENCH",
+    "date_of_theft": "2023-11-02",
+    "location": "Central Mall, Parking Level 2",
+    "stolen_items": "Laptop, camera bag",
+    "estimated_value": "2500",
+    "evidence_found": "Broken rear window, CCTV footage"
+}
+
+FRAUD_CASE = {
+    "case_id": "FRAUD-BENCH",
+    "date_of_fraud": "2023-09-18",
+    "fraud_type": "Invoice fraud",
+    "amount_involved": "48000",
+    "transactions": "Three transfers to a newly added supplier account",
+    "evidence_found": "Altered bank details on supplier invoices"
+}
+
+# Starts one unified server on the given port without the debug reloader (which would add a second process)
+UNIFIED_SERVER_CODE = """
+import sys
+sys.path.insert(0, {agent_dir!r})
+import unified_server
+unified_server.app.run(host="127.0.0.1", port={port}, threaded=True)
+"""
+
+def free_port():
+    """Return a free local TCP port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def post_json(url, payload, timeout=60):
+    """POST a JSON payload and return (status, body)."""
+    request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+def wait_until_up(url, process, timeout=120):
+    """Poll a GET endpoint until it answers."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server did not answer at {url}")
+
+def memory_kb(pid):
+    """Resident (RSS) and proportional (PSS) memory of a process in kB; PSS is None where unavailable."""
+    rss, pss = 0, None
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Rss:"):
+                    rss = int(line.split()[1])
+                elif line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+        return rss, pss
+    except OSError:
+        pass
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+    return rss, pss
+
+def layout_memory(processes):
+    """Summed RSS and PSS in MB across the processes of a layout."""
+    readings = [memory_kb(process.pid) for process in processes]
+    rss = sum(reading[0] for reading in readings) / 1024
+    pss = None if any(reading[1] is None for reading in readings) else sum(reading[1] for reading in readings) / 1024
+    return rss, pss
+
+def format_memory(label, processes):
+    rss, pss = layout_memory(processes)
+    pss_text = f", PSS {pss:6.1f} MB" if pss is not None else ""
+    print(f"{label:38s} {len(processes)} process(es), RSS {rss:6.1f} MB{pss_text}")
+    return rss
+
+def start_unified(env, directory, port):
+    """Start a unified server (without the debug reloader) and wait until it answers."""
+    process = subprocess.Popen([sys.executable, "-c", UNIFIED_SERVER_CODE.format(agent_dir=str(AGENT_DIR), port=port)],
+                               cwd=directory, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_until_up(f"http://127.0.0.1:{port}/health", process)
+    return process
+
+def start_single_agent(env, directory, agent, port):
+    """Start one dedicated server process for an agent (see --serve)."""
+    process = subprocess.Popen([sys.executable, str(Path(__file__).resolve()), "--serve", agent, "--port", str(port)],
+                               cwd=directory, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_until_up(f"http://127.0.0.1:{port}/api/health", process)
+    return process
+
+def serve_single_agent(agent, port):
+    """
+    Dedicated server for one agent, as in the one-process-per-agent layout.
+
+    Args:
+        agent: "theft" or "finance"
+        port: Port to listen on
+    """
+    sys.path.insert(0, str(AGENT_DIR))
+    from flask import Flask, request, jsonify
+    from openai import OpenAI
+    from upstream import API_BASE_URL
+
+    if agent == "theft":
+        from theft_agent_main import TheftAgent as Agent, API_KEY
+        route = "theft"
+    else:
+        from financial_fraud_agent_main import FinancialFraudAgent as Agent, API_KEY
+        route = "financial-fraud"
+    instance = Agent(API_KEY, client=OpenAI(base_url=API_BASE_URL, api_key=API_KEY))
+
+    app = Flask(__name__)
+
+    @app.route(f"/api/augment/{route}", methods=["POST"])
+    def analyze():
+        return jsonify({"response": instance.analyze_case(request.get_json())})
+
+    @app.route("/api/health", methods=["GET"])
+    def health():
+        return jsonify({"status": "healthy", "agent": agent})
+
+    app.run(host="127.0.0.1", port=port, threaded=True)
+
+def run_load(label, urls, requests, concurrency):
+    """Send requests alternating between the theft and fraud URLs and print latency and throughput."""
+    cases = [THEFT_CASE, FRAUD_CASE]
+
+    def one(number):
+        start = time.perf_counter()
+        status, body = post_json(urls[number % 2], dict(cases[number % 2], case_id=f"BENCH-{number:05d}"))
+        assert status == 200, body
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:38s} median {statistics.median(latencies):7.0f} ms, p99 {percentile(latencies, 0.99):7.0f} ms, "
+          f"{requests / elapsed:6.1f} requests/s")
+
+def stop(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.wait()
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the unified agent router against one process per agent")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per layout")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests")
+    parser.add_argument("--latency-ms", type=float, default=100, help="Simulated model latency of the stub API")
+    parser.add_argument("--serve", choices=["theft", "finance"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_single_agent(args.serve, args.port)
+        return
+
+    server = start_stub_api(args.latency_ms)
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ,
+                   NVIDIA_API_BASE_URL=f"http://127.0.0.1:{server.server_address[1]}/v1",
+                   CASE_REPOSITORY_DB=str(Path(directory) / "cases.db"),
+                   TEMPORAL_INDEX_FILE=str(Path(directory) / "temporal_index.npz"),
+                   UPSTREAM_CONCURRENCY=str(max(16, args.concurrency)))
+        print(f"Stub API answering after {args.latency_ms:.0f} ms; {args.requests} requests at "
+              f"concurrency {args.concurrency} per layout")
+        print_separator()
+
+        # One process per agent
+        unified_port, theft_port, finance_port = free_port(), free_port(), free_port()
+        start = time.perf_counter()
+        processes = [start_unified(env, directory, unified_port),
+                     start_single_agent(env, directory, "theft", theft_port),
+                     start_single_agent(env, directory, "finance", finance_port)]
+        print(f"{'Separate processes startup':38s} {(time.perf_counter() - start) * 1000:7.0f} ms")
+        separate_idle = format_memory("Separate processes, idle", processes)
+        run_load("Separate processes, theft + fraud",
+                 [f"http://127.0.0.1:{theft_port}/api/augment/theft",
+                  f"http://127.0.0.1:{finance_port}/api/augment/financial-fraud"],
+                 args.requests, args.concurrency)
+        separate_loaded = format_memory("Separate processes, after load", processes)
+        stop(processes)
+        print_separator()
+
+        # Unified router
+        port = free_port()
+        start = time.perf_counter()
+        process = start_unified(env, directory, port)
+        for agent_id in ("theft", "finance"):
+            status, body = post_json(f"http://127.0.0.1:{port}/toggle-agent", {"agentId": agent_id, "enabled": True})
+            assert status == 200, body
+        print(f"{'Unified router startup':38s} {(time.perf_counter() - start) * 1000:7.0f} ms")
+        unified_idle = format_memory("Unified router, idle", [process])
+        run_load("Unified router, theft + fraud",
+                 [f"http://127.0.0.1:{port}/api/augment/theft",
+                  f"http://127.0.0.1:{port}/api/augment/financial-fraud"],
+                 args.requests, args.concurrency)
+        unified_loaded = format_memory("Unified router, after load", [process])
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health/full") as response:
+            upstream = json.loads(response.read())["upstream"]
+        print(f"{'Shared upstream scheduler':38s} {upstream['completed']} completions, "
+              f"mean wait {upstream['mean_wait_seconds'] * 1000:.1f} ms")
+        stop([process])
+        print_separator()
+
+        print(f"Memory saved by the unified router: {separate_idle - unified_idle:.1f} MB idle, "
+              f"{separate_loaded - unified_loaded:.1f} MB after load (RSS)")
+    server.shutdown()
+    print_separator()
+
+if __name__ == "__main__":
+    main()
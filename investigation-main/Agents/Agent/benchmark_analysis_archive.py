@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for the compressed analysis archive
+
+This script compares the archive with the text file approach the CLIs used
+before the case repository (interactive_session wrote one
+analysis_{case_id}.txt per case in the CASE DETAILS / ANALYSIS layout). It
+writes the same synthetic analyses both ways and reports write throughput,
+disk usage (allocated blocks), random read latency by case ID, the time to
+reopen the archive and the effect of compaction with a trained dictionary.
+
+Synthetic analyses are assembled from randomly chosen lines of the sample
+analyses in the agent folder, with randomized names, places and numbers.
+
+Usage:
+    python benchmark_analysis_archive.py
+    python benchmark_analysis_archive.py --cases 100000 --codec lzma
+
+Author: Augment Agent
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from analysis_archive import AnalysisArchive, CODECS
+from case_repository import parse_analysis_file, format_case_text, AGENT_DIR
+from helpers import percentile
+
+NAMES = ["Robert", "Maria", "James", "Aisha", "Wei", "Carlos", "Olga", "Samuel", "Priya", "Liam", "Fatima", "Noah"]
+SURNAMES = ["Johnson", "Garcia", "Smith", "Khan", "Chen", "Silva", "Ivanova", "Okafor", "Patel", "Murphy"]
+STREETS = ["Elm Street", "Main Road", "Oak Avenue", "Station Lane", "Mill Road", "Park Drive"]
+
+def print_separator():
+    """Print a separator line."""
+    print("\n" + "="*80 + "\n")
+
+def sample_lines():
+    """Non-empty lines of the sample analyses and the case details they came with."""
+    lines, details = [], []
+    for path in sorted(AGENT_DIR.glob("*analysis*.txt")):
+        parsed = parse_analysis_file(path)
+        if parsed:
+            lines.extend(line for line in parsed["analysis"].splitlines() if line.strip())
+            details.append(parsed["collected_data"])
+    return lines, details
+
+def synthetic_case(rng, lines, details, number):
+    """One synthetic case: randomized details and an analysis of ~40 sample lines."""
+    name = f"{rng.choice(NAMES)} {rng.choice(SURNAMES)}"
+    collected_data = dict(rng.choice(details), case_id=f"CASE-{number:06d}", victim_name=name,
+                          location=f"{rng.randint(1, 999)} {rng.choice(STREETS)}",
+                          date_of_crime=f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+    analysis = "\n\n".join(
+        line.replace("Robert Johnson", name).replace("23:00", f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}")
+        for line in rng.sample(lines, min(40, len(lines)))
+    )
+    return collected_data, analysis
+
+def allocated_bytes(paths):
+    """Disk space allocated to files (block-rounded where the platform reports blocks)."""
+    total = 0
+    for path in paths:
+        stat = os.stat(path)
+        total += stat.st_blocks * 512 if hasattr(stat, "st_blocks") else stat.st_size
+    return total
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the analysis archive against text files")
+    parser.add_argument("--cases", type=int, default=20000, help="Number of analyses")
+    parser.add_argument("--reads", type=int, default=2000, help="Number of timed random reads")
+    parser.add_argument("--codec", choices=list(CODECS), default="zlib", help="Archive compression")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lines, details = sample_lines()
+    if not lines:
+        print("No sample analyses found")
+        return
+    cases = [synthetic_case(rng, lines, details, number) for number in range(args.cases)]
+    plain_bytes = sum(len(format_case_text(data, analysis).encode("utf-8")) for data, analysis in cases)
+    print(f"{args.cases} synthetic cases, {plain_bytes / args.cases:,.0f} bytes of text each on average")
+    print_separator()
+
+    with tempfile.TemporaryDirectory() as directory:
+        text_dir = Path(directory) / "text"
+        text_dir.mkdir()
+        start = time.perf_counter()
+        for collected_data, analysis in cases:
+            with open(text_dir / f"analysis_{collected_data['case_id']}.txt", "w", encoding="utf-8") as f:
+                f.write(format_case_text(collected_data, analysis))
+        text_write_s = time.perf_counter() - start
+        text_disk = allocated_bytes(text_dir.iterdir())
+
+        archive_dir = Path(directory) / "archive"
+        archive = AnalysisArchive(archive_dir, codec=args.codec)
+        start = time.perf_counter()
+        for collected_data, analysis in cases:
+            archive.put(collected_data["case_id"], {"collected_data": collected_data, "analysis": analysis})
+        archive_write_s = time.perf_counter() - start
+        archive.close()
+        archive_disk = allocated_bytes(archive_dir.iterdir())
+
+        print("Writes:")
+        print(f"  text files: {args.cases / text_write_s:10,.0f} cases/s, {text_disk / 1e6:8.1f} MB on disk")
+        print(f"  archive:    {args.cases / archive_write_s:10,.0f} cases/s, {archive_disk / 1e6:8.1f} MB on disk "
+              f"({archive_disk / text_disk:.0%} of text files, codec {args.codec})")
+        print_separator()
+
+        start = time.perf_counter()
+        archive = AnalysisArchive(archive_dir, codec=args.codec)
+        print(f"Archive reopened (index rebuilt from segment headers) in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        read_ids = [rng.choice(cases)[0]["case_id"] for _ in range(args.reads)]
+        text_latencies, archive_latencies = [], []
+        for case_id in read_ids:
+            t0 = time.perf_counter()
+            with open(text_dir / f"analysis_{case_id}.txt", "r", encoding="utf-8") as f:
+                f.read()
+            text_latencies.append((time.perf_counter() - t0) * 1e6)
+            t0 = time.perf_counter()
+            archive.get(case_id)
+            archive_latencies.append((time.perf_counter() - t0) * 1e6)
+        for label, latencies in [("text files", text_latencies), ("archive", archive_latencies)]:
+            latencies.sort()
+            print(f"Random read {label}: median {statistics.median(latencies):.0f} us, "
+                  f"p99 {percentile(latencies, 0.99):.0f} us")
+        print_separator()
+
+        # Re-analyze a third of the cases, then compact with a trained dictionary
+        for collected_data, analysis in rng.sample(cases, args.cases // 3):
+            archive.put(collected_data["case_id"], {"collected_data": collected_data, "analysis": analysis + "\n"})
+        before = archive.stats()
+        # Preset dictionaries only apply to zlib records
+        if args.codec == "zlib":
+            archive.train_dictionary()
+        start = time.perf_counter()
+        stats = archive.compact(recompress=args.codec == "zlib")
+        print(f"Compaction after re-analyzing {args.cases // 3} cases: "
+              f"{before['bytes'] / 1e6:.1f} MB ({before['superseded_bytes'] / 1e6:.1f} MB superseded) -> "
+              f"{stats['bytes_after'] / 1e6:.1f} MB in {time.perf_counter() - start:.1f} s "
+              f"({stats['bytes_after'] / text_disk:.0%} of text files)")
+        assert archive.get(read_ids[0])["collected_data"]["case_id"] == read_ids[0]
+        archive.close()
+        print_separator()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for section-level storage of case analyses
+
+This script fills a temporary case repository with analyses built from the
+sample analysis files, then compares fetching the key evidence section of
+1,000 cases from the section rows with the previous approach of loading the
+full analyses and parsing them. It also reports the streaming parser's
+throughput on token-sized chunks.
+
+Usage:
+    python benchmark_analysis_sections.py
+    python benchmark_analysis_sections.py --cases 50000 --fetch 1000
+
+Author: Augment Agent
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from analysis_sections import SectionParser, parse_sections
+from case_repository import CaseRepository, parse_analysis_file, AGENT_DIR
+
+def print_separator():
+    """Print a separator line."""
+    print("\n" + "="*80 + "\n")
+
+def load_sample_analyses():
+    """Analyses from the sample and legacy analysis files in the agent folder."""
+    analyses = []
+    for path in sorted(AGENT_DIR.glob("*analysis*.txt")):
+        parsed = parse_analysis_file(path)
+        if parsed:
+            analyses.append(parsed["analysis"])
+    return analyses
+
+def time_runs(function, runs):
+    """Median wall time of a function in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark section-level analysis storage")
+    parser.add_argument("--cases", type=int, default=20000, help="Number of stored cases")
+    parser.add_argument("--fetch", type=int, default=1000, help="Cases per section fetch")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per method")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    analyses = load_sample_analyses()
+    if not analyses:
+        print("No sample analyses found")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        with CaseRepository(Path(directory) / "cases.db") as repository:
+            start = time.perf_counter()
+            for number in range(args.cases):
+                analysis = rng.choice(analyses).replace("Robert Johnson", f"Victim {number}")
+                repository.add_case("murder", {"case_id": f"BENCH-{number:06d}"}, analysis, source="benchmark")
+            print(f"Stored {args.cases} cases in {time.perf_counter() - start:.1f} s "
+                  f"(average analysis {sum(map(len, analyses)) / len(analyses):,.0f} characters)")
+            print_separator()
+
+            def from_sections():
+                return repository.get_sections("key_evidence", limit=args.fetch)
+
+            def from_full_texts():
+                return [parse_sections(record["analysis"])["key_evidence"]
+                        for record in repository.list_cases(limit=args.fetch)]
+
+            sections_ms = time_runs(from_sections, args.runs)
+            full_ms = time_runs(from_full_texts, args.runs)
+            print(f"Key evidence of {args.fetch} cases:")
+            print(f"  section rows:              {sections_ms:8.1f} ms")
+            print(f"  full analyses + parsing:   {full_ms:8.1f} ms ({full_ms / sections_ms:.1f}x slower)")
+            print_separator()
+
+    text = "\n\n".join(analyses)
+    # Model streams arrive as a few characters per token
+    chunks = [text[i:i + 4] for i in range(0, len(text), 4)]
+    start = time.perf_counter()
+    section_parser = SectionParser()
+    for chunk in chunks:
+        section_parser.feed(chunk)
+    section_parser.close()
+    elapsed = time.perf_counter() - start
+    print(f"Streaming parser: {len(chunks) / elapsed:,.0f} chunks/s ({len(text) / elapsed / 1e6:.1f} MB/s)")
+    print_separator()
+
+if __name__ == "__main__":
+    main()
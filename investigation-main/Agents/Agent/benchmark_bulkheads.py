@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for per-agent bulkheads in the unified server
+
+This script floods the financial fraud agent with slow analyses and
+measures, at the same time, murder intake steps (fast lane) and murder
+analyses (/api/augment/murder/sample). It runs twice: once with a finance
+bulkhead large enough to take the whole surge (so fraud analyses take every
+shared upstream slot, as they could before bulkheads) and once with the
+default bulkhead size, where the surge beyond the finance workers and queue
+is rejected with 503. Queue depth and saturation are sampled from
+/api/health/full during the surge.
+
+Usage:
+    python benchmark_bulkheads.py
+    python benchmark_bulkheads.py --surge 128 --latency-ms 1000
+
+Author: Augment Agent
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmark_murder_worker import print_separator, start_stub_api
+from benchmark_agent_router import FRAUD_CASE, free_port, post_json, start_unified, stop
+from helpers import percentile
+
+def timed_post(url, payload):
+    """POST and return (status, milliseconds)."""
+    start = time.perf_counter()
+    status, _ = post_json(url, payload, timeout=300)
+    return status, (time.perf_counter() - start) * 1000
+
+def summarize(label, latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        print(f"{label:38s} no requests")
+        return
+    print(f"{label:38s} median {statistics.median(latencies):7.0f} ms, p95 {percentile(latencies, 0.95):7.0f} ms "
+          f"({len(latencies)} requests)")
+
+def run_scenario(label, env, directory, args):
+    """Surge the finance agent while measuring murder traffic."""
+    port = free_port()
+    process = start_unified(env, directory, port)
+    base = f"http://127.0.0.1:{port}"
+    status, body = post_json(f"{base}/toggle-agent", {"agentId": "finance", "enabled": True})
+    assert status == 200, body
+
+    surge_done = threading.Event()
+    finance_statuses = []
+    peak = {"queued": 0, "saturation": 0.0}
+
+    def surge():
+        with ThreadPoolExecutor(max_workers=args.surge) as executor:
+            finance_statuses.extend(status for status, _ in executor.map(
+                lambda number: timed_post(f"{base}/api/augment/finance", dict(FRAUD_CASE, case_id=f"SURGE-{number}")),
+                range(args.surge * 2)))
+        surge_done.set()
+
+    def sample_load():
+        while not surge_done.is_set():
+            with urllib.request.urlopen(f"{base}/api/health/full") as response:
+                finance = json.loads(response.read())["bulkheads"]["finance"]
+            peak["queued"] = max(peak["queued"], finance["queued"])
+            peak["saturation"] = max(peak["saturation"], finance["saturation"])
+            time.sleep(0.05)
+
+    threading.Thread(target=surge, daemon=True).start()
+    threading.Thread(target=sample_load, daemon=True).start()
+    time.sleep(0.5)
+
+    intake, analyses = [], []
+
+    def murder_request(number):
+        # Every fourth request is a full analysis, the rest are intake steps
+        start = time.perf_counter()
+        if number % 4 == 0:
+            with urllib.request.urlopen(f"{base}/api/augment/murder/sample", timeout=300) as response:
+                response.read()
+            analyses.append((time.perf_counter() - start) * 1000)
+        else:
+            status, elapsed = timed_post(f"{base}/api/augment/murder", {"question": "FORCE_NEW_SESSION"})
+            assert status == 200, status
+            intake.append(elapsed)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(murder_request, range(args.murder_requests)))
+    surge_done.wait()
+    stop([process])
+
+    print(label)
+    summarize("  Murder intake steps", intake)
+    summarize("  Murder analyses", analyses)
+    rejected = sum(1 for status in finance_statuses if status == 503)
+    print(f"  {'Finance surge':36s} {len(finance_statuses) - rejected} analyzed, {rejected} rejected with 503")
+    print(f"  {'Finance bulkhead peak':36s} queue {peak['queued']}, saturation {peak['saturation']:.2f}")
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark per-agent bulkheads under a financial fraud surge")
+    parser.add_argument("--surge", type=int, default=64, help="Concurrent financial fraud requests")
+    parser.add_argument("--murder-requests", type=int, default=40, help="Murder requests during the surge")
+    parser.add_argument("--latency-ms", type=float, default=500, help="Simulated model latency of the stub API")
+    args = parser.parse_args()
+
+    server = start_stub_api(args.latency_ms)
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ,
+                   NVIDIA_API_BASE_URL=f"http://127.0.0.1:{server.server_address[1]}/v1",
+                   CASE_REPOSITORY_DB=str(Path(directory) / "cases.db"),
+                   TEMPORAL_INDEX_FILE=str(Path(directory) / "temporal_index.npz"),
+                   AGENT_CONFIG_FILE=str(Path(directory) / "agent_config.json"))
+        print(f"Stub API answering after {args.latency_ms:.0f} ms; {args.surge} concurrent fraud requests; "
+              f"upstream limit 16")
+        print_separator()
+        run_scenario(f"Finance bulkhead {args.surge}:{args.surge} (takes the whole surge)",
+                     dict(env, AGENT_BULKHEADS=f"finance={args.surge}:{args.surge}"), directory, args)
+        print_separator()
+        run_scenario("Default bulkheads (4 workers, queue 16)", env, directory, args)
+    server.shutdown()
+    print_separator()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for the cross-case entity index
+
+This script indexes synthetic murder, theft and fraud cases that share a
+pool of recurring suspects, vehicles, addresses and phone numbers, then
+measures extraction/insert throughput and the latency of entity lookups
+and related-case queries.
+
+Usage:
+    python benchmark_entity_index.py
+    python benchmark_entity_index.py --cases 20000 --queries 2000
+
+Author: Augment Agent
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from entity_index import EntityIndex
+from helpers import percentile
+
+FIRST_NAMES = ["Robert", "Maria", "James", "Aisha", "Wei", "Carlos", "Olga", "Samuel", "Priya", "Liam",
+               "Fatima", "Noah", "Elena", "Kwame", "Yuki", "Diego", "Grace", "Omar", "Ingrid", "Ravi",
+               "Sofia", "Tomas", "Amara", "Hugo", "Leila", "Mateo", "Nadia", "Viktor", "Zara", "Ethan"]
+LAST_NAMES = ["Johnson", "Garcia", "Smith", "Khan", "Chen", "Silva", "Ivanova", "Okafor", "Patel", "Murphy",
+              "Novak", "Haddad", "Tanaka", "Mensah", "Rossi", "Kowalski", "Brown", "Nguyen", "Fischer",
+              "Dubois", "Ali", "Santos", "Larsen", "Moreau", "Cohen", "Reyes", "Sato", "Walsh", "Adeyemi", "Costa"]
+STREETS = ["Elm Street", "Main Road", "Oak Avenue", "Station Lane", "Mill Rd", "Park Drive", "Harbor Blvd"]
+MAKES = ["Toyota Camry", "Honda Civic", "Ford Focus", "Nissan Altima", "BMW X5", "Hyundai Elantra"]
+WEAPONS = ["kitchen knife", "9mm handgun", "baseball bat", "nylon rope", "claw hammer", "crowbar"]
+
+def print_separator():
+    """Print a separator line."""
+    print("\n" + "="*80 + "\n")
+
+def synthetic_pool(rng, size):
+    """Recurring people, plates, addresses and phone numbers shared across cases."""
+    return {
+        "people": [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(size)],
+        "plates": [f"{''.join(rng.choice('ABCDEFGHJKLMNPRSTUVWXYZ') for _ in range(3))}-{rng.randint(1000, 9999)}"
+                   for _ in range(size)],
+        "addresses": [f"{rng.randint(1, 999)} {rng.choice(STREETS)}" for _ in range(size)],
+        "phones": [f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}" for _ in range(size)]
+    }
+
+def synthetic_case(rng, pool, number):
+    """Generate one synthetic murder, theft or fraud case."""
+    person, other = rng.sample(pool["people"], 2)
+    plate = rng.choice(pool["plates"])
+    address = rng.choice(pool["addresses"])
+    phone = rng.choice(pool["phones"])
+    agent = rng.choice(["murder", "theft", "finance"])
+    if agent == "murder":
+        details = {
+            "case_id": f"M-{number:06d}",
+            "location": f"{address}, Apartment {rng.randint(1, 40)}",
+            "victim_name": other,
+            "weapon_used": rng.choice(WEAPONS),
+            "witnesses": f"Neighbor heard shouting and called {phone}",
+            "suspects": f"Ex-partner {person}, seen driving a {rng.choice(MAKES)} with plate {plate}"
+        }
+    elif agent == "theft":
+        details = {
+            "case_id": f"T-{number:06d}",
+            "location": address,
+            "items_stolen": "Laptops and jewelry",
+            "witnesses": f"{other} saw a {rng.choice(MAKES)}, registration {plate}",
+            "evidence_found": f"Pry marks from a {rng.choice(WEAPONS)}",
+            "suspects": f"Possibly {person}"
+        }
+    else:
+        details = {
+            "case_id": f"F-{number:06d}",
+            "victim_details": f"{other}, resident of {address}",
+            "suspicious_activities": f"Calls from {phone} asking to reset the account PIN",
+            "suspect_information": f"Account opened in the name of {person}"
+        }
+    return agent, details
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the cross-case entity index")
+    parser.add_argument("--cases", type=int, default=100000, help="Number of indexed cases")
+    parser.add_argument("--pool", type=int, default=5000, help="Distinct recurring entities of each kind")
+    parser.add_argument("--queries", type=int, default=5000, help="Number of timed lookups")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = synthetic_pool(rng, args.pool)
+    cases = [synthetic_case(rng, pool, i) for i in range(args.cases)]
+
+    index = EntityIndex()
+    start = time.perf_counter()
+    for record_id, (agent, details) in enumerate(cases, start=1):
+        index.add(record_id, agent, details)
+    add_s = time.perf_counter() - start
+    print(f"Indexed {args.cases} cases in {add_s:.2f} s ({args.cases / add_s:,.0f} cases/s), "
+          f"{index.entity_count} distinct entities")
+    print_separator()
+
+    lookups = [(rng.choice(pool["people"]).upper(), None) for _ in range(args.queries // 2)]
+    lookups += [(rng.choice(pool["plates"]).replace("-", " ").lower(), "vehicle") for _ in range(args.queries // 2)]
+    for label, queries in [("person (untyped)", lookups[:args.queries // 2]),
+                           ("vehicle (typed)", lookups[args.queries // 2:])]:
+        latencies, hits = [], 0
+        for entity, entity_type in queries:
+            t0 = time.perf_counter()
+            results = index.lookup(entity, entity_type=entity_type)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            hits += bool(results)
+        latencies.sort()
+        print(f"Lookup {label}: median {statistics.median(latencies):.3f} ms, "
+              f"p99 {percentile(latencies, 0.99):.3f} ms, {hits}/{len(queries)} with matches")
+
+    latencies = []
+    for _ in range(1000):
+        record_id = rng.randint(1, args.cases)
+        t0 = time.perf_counter()
+        index.related(record_id)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    print(f"Related cases: median {statistics.median(latencies):.3f} ms, p99 {percentile(latencies, 0.99):.3f} ms")
+    print_separator()
+
+if __name__ == "__main__":
+    main()
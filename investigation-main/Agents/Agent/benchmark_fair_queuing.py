@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for weighted fair queuing between users in the upstream scheduler
+
+This script drives an UpstreamScheduler with simulated users sharing the
+upstream slots: one officer who keeps a large backlog of analyses queued (a
+bulk re-analysis, say), several officers who each submit one analysis at a
+time with a short pause in between, and one inspector who also keeps
+several analyses queued. Each
+call holds its slot for a fixed simulated model time. It runs the mix twice,
+once with every call counted against the same caller (first come, first
+served) and once with each user as their own caller and the default role
+weights, and prints the queue wait and completed calls per user.
+
+Usage:
+    python benchmark_fair_queuing.py
+    python benchmark_fair_queuing.py --slots 8 --backlog 48 --light-users 6
+
+Author: Augment Agent
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from benchmark_murder_worker import print_separator
+from helpers import percentile
+from upstream import UpstreamScheduler, parse_role_weights, DEFAULT_ROLE_WEIGHTS
+
+def run(scheduler, users, args, fair):
+    """Run the simulated users against a scheduler for args.seconds; returns queue waits per user."""
+    stop_at = time.time() + args.seconds
+    waits = {name: [] for name, _, _ in users}
+
+    def call(name, role):
+        ticket = scheduler.acquire("normal", *((name, role) if fair else ("everyone", None)))
+        if ticket[2] < stop_at:
+            # Calls still queued at the end drain in any order, so only earlier grants count
+            waits[name].append(ticket[2] - ticket[1])
+        time.sleep(args.latency_ms / 1000)
+        scheduler.release(ticket)
+
+    def user(name, role, pause):
+        while time.time() < stop_at:
+            call(name, role)
+            time.sleep(pause)
+
+    threads = []
+    for name, role, concurrency in users:
+        # Backlogged users keep `concurrency` calls queued; light users submit one at a time
+        pause = 0 if concurrency > 1 else args.pause_ms / 1000
+        threads += [threading.Thread(target=user, args=(name, role, pause)) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return waits
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark weighted fair queuing between users")
+    parser.add_argument("--slots", type=int, default=4, help="Concurrent upstream completions")
+    parser.add_argument("--latency-ms", type=float, default=200, help="Simulated model time per call")
+    parser.add_argument("--backlog", type=int, default=24, help="Calls the heavy user keeps queued")
+    parser.add_argument("--light-users", type=int, default=4, help="Officers submitting one call at a time")
+    parser.add_argument("--inspector-backlog", type=int, default=8, help="Calls the inspector keeps queued")
+    parser.add_argument("--pause-ms", type=float, default=100, help="Pause of light users between calls")
+    parser.add_argument("--seconds", type=float, default=15, help="Duration of each run")
+    args = parser.parse_args()
+
+    users = [("heavy officer", "officer", args.backlog)]
+    users += [(f"officer {number + 1}", "officer", 1) for number in range(args.light_users)]
+    users += [("inspector", "inspector", args.inspector_backlog)]
+
+    print(f"{args.slots} slots, {args.latency_ms:.0f} ms per call, heavy user backlog {args.backlog}, "
+          f"{args.light_users} light officers, inspector backlog {args.inspector_backlog}; role weights {DEFAULT_ROLE_WEIGHTS}")
+    print_separator()
+
+    for label, fair in (("First come, first served", False), ("Weighted fair queuing", True)):
+        scheduler = UpstreamScheduler(args.slots, role_weights=parse_role_weights(DEFAULT_ROLE_WEIGHTS))
+        waits = run(scheduler, users, args, fair)
+        total = sum(len(values) for values in waits.values())
+        print(label)
+        for name, _, _ in users:
+            values = sorted(waits[name])
+            if not values:
+                print(f"  {name:14s} no calls")
+                continue
+            print(f"  {name:14s} {len(values):5d} calls ({len(values) / total:4.0%} of slots), "
+                  f"median wait {statistics.median(values) * 1000:7.0f} ms, p95 {percentile(values, 0.95) * 1000:7.0f} ms")
+        print_separator()
+
+if __name__ == "__main__":
+    main()
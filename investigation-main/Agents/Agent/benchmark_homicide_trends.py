@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for the batched homicide trend and anomaly job
+
+This script measures the full-dataset runtime of homicide_trends.compute_trends()
+and compares it with a straightforward per-series Python loop that computes the
+same slopes, so regressions in the vectorized path are easy to spot.
+
+Usage:
+    python benchmark_homicide_trends.py
+    python benchmark_homicide_trends.py --repeat 20
+
+Author: Augment Agent
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from homicide_dataset import load_homicide_frame
+from homicide_trends import compute_trends, build_series_matrix
+
+def print_separator():
+    """Print a separator line."""
+    print("\n" + "="*80 + "\n")
+
+def time_call(func, repeat):
+    """Run func `repeat` times and return the list of durations in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+def per_series_loop(frame):
+    """Baseline: fit one least-squares slope per series with a Python loop."""
+    slopes = []
+    for _, group in frame.groupby(["iso3_code", "Indicator", "Gender", "Unit"]):
+        if len(group) >= 2:
+            slopes.append(np.polyfit(group["Year"].to_numpy(), group["Value"].to_numpy(), 1)[0])
+    return slopes
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the homicide trends job")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of timed runs")
+    args = parser.parse_args()
+
+    print("Loading homicide dataset...")
+    start = time.perf_counter()
+    frame = load_homicide_frame()
+    load_ms = (time.perf_counter() - start) * 1000
+    series, years, _ = build_series_matrix(frame)
+    print(f"Loaded {len(frame)} rows ({len(series)} series x {len(years)} years) in {load_ms:.0f} ms")
+    print_separator()
+
+    vectorized = time_call(lambda: compute_trends(frame), args.repeat)
+    print(f"Vectorized compute_trends (full table): median {statistics.median(vectorized):.1f} ms, "
+          f"min {min(vectorized):.1f} ms over {args.repeat} runs")
+
+    baseline = time_call(lambda: per_series_loop(frame), max(1, args.repeat // 5))
+    print(f"Per-series loop (slopes only):          median {statistics.median(baseline):.1f} ms, "
+          f"min {min(baseline):.1f} ms")
+
+    print(f"Speed-up: {statistics.median(baseline) / statistics.median(vectorized):.1f}x")
+    print_separator()
+
+if __name__ == "__main__":
+    main()
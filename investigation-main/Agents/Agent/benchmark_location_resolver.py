@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for the free-text location resolver
+
+This script generates thousands of synthetic case addresses (plain country
+names, aliases, ISO3 codes, misspellings and addresses with no country at all),
+then measures per-lookup latency and throughput of LocationResolver with a cold
+and a warm LRU cache, plus the accuracy against the known labels.
+
+Usage:
+    python benchmark_location_resolver.py
+    python benchmark_location_resolver.py --count 20000 --seed 7
+
+Author: Augment Agent
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from helpers import percentile
+from homicide_dataset import load_homicide_frame
+from location_resolver import LocationResolver, LOCATION_ALIASES
+
+STREET_NAMES = ["Elm", "Main", "Oak", "Maple", "Station", "Church", "Mill", "Park", "High", "Bridge"]
+STREET_TYPES = ["Street", "Avenue", "Road", "Lane", "Boulevard", "Drive"]
+UNITS = ["Apartment 3C", "Unit 12", "Flat 4", "Suite 200", "Floor 2", ""]
+CITIES = ["Springfield", "Riverside", "Fairview", "Centerville", "Kingston", "Greenville"]
+
+def print_separator():
+    """Print a separator line."""
+    print("\n" + "="*80 + "\n")
+
+def misspell(name, rng):
+    """Swap two adjacent letters in the longest word of a name."""
+    word = max(name.split(), key=len)
+    if len(word) < 6:
+        return name
+    i = rng.randrange(1, len(word) - 2)
+    typo = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return name.replace(word, typo)
+
+def synthetic_addresses(countries, count, seed):
+    """
+    Generate labelled synthetic addresses.
+
+    Returns:
+        List of (address, expected ISO3 or None)
+    """
+    rng = random.Random(seed)
+    aliases = [(alias, iso3) for alias, iso3 in LOCATION_ALIASES.items() if len(alias) > 3]
+    addresses = []
+
+    for _ in range(count):
+        street = f"{rng.randint(1, 9999)} {rng.choice(STREET_NAMES)} {rng.choice(STREET_TYPES)}"
+        parts = [street, rng.choice(UNITS), rng.choice(CITIES)]
+        iso3, country = rng.choice(countries)
+        kind = rng.random()
+
+        if kind < 0.4:
+            parts.append(country)
+        elif kind < 0.55:
+            alias, iso3 = rng.choice(aliases)
+            parts.append(alias.title())
+        elif kind < 0.65:
+            parts.append(iso3)
+        elif kind < 0.8:
+            parts.append(misspell(country, rng))
+        else:
+            iso3 = None
+
+        addresses.append((", ".join(part for part in parts if part), iso3))
+
+    return addresses
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the location resolver")
+    parser.add_argument("--count", type=int, default=5000, help="Number of synthetic addresses")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    frame = load_homicide_frame()
+    start = time.perf_counter()
+    resolver = LocationResolver.from_frame(frame)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    countries = list(frame[["iso3_code", "country"]].drop_duplicates().itertuples(index=False, name=None))
+    addresses = synthetic_addresses(countries, args.count, args.seed)
+    print(f"Built resolver in {build_ms:.1f} ms; generated {len(addresses)} synthetic addresses")
+    print_separator()
+
+    # Cold cache: every lookup runs the full trie/fuzzy path
+    resolver.clear_cache()
+    latencies = []
+    correct = 0
+    for address, expected in addresses:
+        t0 = time.perf_counter()
+        match = resolver.resolve(address)
+        latencies.append((time.perf_counter() - t0) * 1e6)
+        if (match.iso3_code if match else None) == expected:
+            correct += 1
+
+    latencies.sort()
+    total_s = sum(latencies) / 1e6
+    print("Cold cache:")
+    print(f"  median {statistics.median(latencies):.1f} us, p95 {percentile(latencies, 0.95):.1f} us, "
+          f"p99 {percentile(latencies, 0.99):.1f} us, max {latencies[-1]:.1f} us")
+    print(f"  throughput {len(addresses) / total_s:,.0f} lookups/s")
+    print(f"  accuracy {correct / len(addresses) * 100:.1f}% ({correct}/{len(addresses)})")
+
+    # Warm cache: repeated locations are served from the LRU memo
+    start = time.perf_counter()
+    for address, _ in addresses:
+        resolver.resolve(address)
+    warm_s = time.perf_counter() - start
+    print("Warm cache:")
+    print(f"  throughput {len(addresses) / warm_s:,.0f} lookups/s ({resolver.cache_info()})")
+    print_separator()
+
+if __name__ == "__main__":
+    main()
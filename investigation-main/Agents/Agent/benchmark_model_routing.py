@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for latency-aware model routing
+
+This script drives a ModelRouter with a simulated request mix: direct
+questions, small case analyses and large case analyses (with similar cases
+and statistics in the prompt), some of them with a latency budget. Each
+routed call sleeps for a simulated model time that grows with the prompt
+size, with the 253B model about three times slower than the 49B model and
+an occasional slow tail. It runs the mix twice, once with every request on
+the 253B model (as the murder agent did before routing) and once with the
+default routing policy, and prints latency, budget hits and the model share
+per request type. Times are scaled down (--scale) so a run takes seconds.
+
+Usage:
+    python benchmark_model_routing.py
+    python benchmark_model_routing.py --requests 600 --budget 20
+
+Author: Augment Agent
+"""
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmark_murder_worker import print_separator
+from helpers import percentile
+from model_router import ModelRouter, latency_budget, DEFAULT_POLICY, ULTRA_MODEL, SUPER_MODEL
+
+# Request type -> (kind, prompt characters, share of requests with a latency budget)
+REQUEST_TYPES = {
+    "direct question": ("question", 400, 0.0),
+    "small analysis": ("analysis", 2000, 0.5),
+    "large analysis": ("analysis", 10000, 1.0)
+}
+
+# Simulated seconds (before scaling) per model: fixed part and per 1000 prompt tokens
+MODEL_TIMES = {
+    ULTRA_MODEL: (12.0, 6.0),
+    SUPER_MODEL: (4.0, 2.0)
+}
+
+def model_seconds(model, prompt_chars, rng):
+    """Simulated model time; one call in ten takes 2.5 times as long."""
+    fixed, per_thousand = MODEL_TIMES[model]
+    seconds = fixed + per_thousand * prompt_chars / 4000
+    return seconds * (2.5 if rng.random() < 0.1 else 1.0) * rng.uniform(0.9, 1.1)
+
+def run(router, args, routed):
+    """Send the request mix; returns (type, model, seconds, budget) per request."""
+    names = list(REQUEST_TYPES)
+
+    def one(number):
+        rng = random.Random(number)
+        name = names[number % len(names)]
+        kind, prompt_chars, budget_share = REQUEST_TYPES[name]
+        budget = args.budget if rng.random() < budget_share else None
+        prompt = "x" * prompt_chars
+        start = time.perf_counter()
+        if routed:
+            with latency_budget(budget and budget * args.scale), router.routed("murder", kind, prompt) as model:
+                time.sleep(model_seconds(model, prompt_chars, rng) * args.scale)
+        else:
+            model = ULTRA_MODEL
+            time.sleep(model_seconds(model, prompt_chars, rng) * args.scale)
+        return name, model, (time.perf_counter() - start) / args.scale, budget
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        return list(executor.map(one, range(args.requests)))
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark latency-aware model routing")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests")
+    parser.add_argument("--budget", type=float, default=40, help="Latency budget in (unscaled) seconds")
+    parser.add_argument("--scale", type=float, default=0.01, help="Real seconds per simulated second")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests at concurrency {args.concurrency}, latency budget {args.budget:.0f} s "
+          f"(half of the small analyses, all large ones); times shown unscaled")
+    print_separator()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The default policy with its expectations scaled like the simulated model times
+        policy = dict(DEFAULT_POLICY, expected_p95_seconds={
+            model: seconds * args.scale for model, seconds in DEFAULT_POLICY["expected_p95_seconds"].items()})
+        policy_path = Path(directory) / "model_routing.json"
+        policy_path.write_text(json.dumps(policy), encoding="utf-8")
+        log_path = Path(directory) / "model_routing.jsonl"
+        router = ModelRouter(policy_path, log_path)
+
+        for label, routed in (("Always the 253B model", False), ("Routed", True)):
+            results = run(router, args, routed)
+            print(label)
+            for name in REQUEST_TYPES:
+                rows = [row for row in results if row[0] == name]
+                latencies = sorted(row[2] for row in rows)
+                budgeted = [row for row in rows if row[3] is not None]
+                within = sum(1 for row in budgeted if row[2] <= row[3])
+                ultra = sum(1 for row in rows if row[1] == ULTRA_MODEL)
+                budget_text = f", {within / len(budgeted):4.0%} within budget" if budgeted else ""
+                print(f"  {name:16s} median {statistics.median(latencies):5.1f} s, p95 {percentile(latencies, 0.95):5.1f} s, "
+                      f"{ultra / len(rows):4.0%} on 253B{budget_text}")
+            print_separator()
+
+        with open(log_path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        reasons = {}
+        for entry in entries:
+            reasons[entry["reason"]] = reasons.get(entry["reason"], 0) + 1
+        print(f"Decision log: {len(entries)} entries; reasons: "
+              + ", ".join(f"{reason} {count}" for reason, count in sorted(reasons.items())))
+    print_separator()
+
+if __name__ == "__main__":
+    main()
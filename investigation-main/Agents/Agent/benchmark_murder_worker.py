@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for the resident Murder Agent worker
+
+This script compares the two ways the Next.js murder-agent route can get an
+analysis: spawning murder_agent_main.py --case_file per request (interpreter
+start, imports, client construction and a temp file every time) and sending
+JSON lines to one resident murder_agent_main.py --worker process. Both paths
+talk to a local stub of the chat completions endpoint (via
+NVIDIA_API_BASE_URL) that answers after a fixed delay, so the numbers show
+process and client overhead rather than model time. Analyses are stored in a
+temporary case repository.
+
+Usage:
+    python benchmark_murder_worker.py
+    python benchmark_murder_worker.py --requests 200 --concurrency 16 --latency-ms 500
+
+Author: Augment Agent
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from helpers import percentile
+
+AGENT_SCRIPT = Path(__file__).resolve().parent / "murder_agent_main.py"
+
+SAMPLE_CASE = {
+    "date_of_crime": "2023-10-15",
+    "time_of_crime": "23:30",
+    "location": "789 Elm Street, Apartment 3C",
+    "victim_name": "Robert Johnson",
+    "cause_of_death": "Multiple stab wounds to the chest",
+    "weapon_used": "Kitchen knife",
+    "evidence_found": "Bloody knife, fingerprints on door handle",
+    "suspects": "Ex-wife with history of threats",
+    "additional_notes": "Who should we interview first?"
+}
+
+def print_separator():
+    """Print a separator line."""
+    print("\n" + "="*80 + "\n")
+
+def start_stub_api(latency_ms):
+    """Start a local chat completions endpoint that answers after latency_ms."""
+    body = json.dumps({
+        "id": "chatcmpl-benchmark",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "nvidia/llama-3.1-nemotron-ultra-253b-v1",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": "## Case Analysis\n\nBenchmark analysis."}}],
+        "usage": {"prompt_tokens": 300, "completion_tokens": 10, "total_tokens": 310}
+    }).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency_ms / 1000)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def spawn_request(number, directory, env):
+    """One analysis through a fresh --case_file process, as the route did per chat message."""
+    start = time.perf_counter()
+    case_file = Path(directory) / f"temp_case_{number}.json"
+    case_file.write_text(json.dumps(dict(SAMPLE_CASE, case_id=f"SPAWN-{number:05d}")), encoding="utf-8")
+    result = subprocess.run([sys.executable, str(AGENT_SCRIPT), "--case_file", str(case_file), "--api_key", "benchmark"],
+                            cwd=directory, env=env, capture_output=True, text=True)
+    case_file.unlink()
+    assert result.returncode == 0 and "MURDER AGENT ANALYSIS" in result.stdout, result.stderr[-2000:]
+    return (time.perf_counter() - start) * 1000
+
+class WorkerClient:
+    """Sends JSON-line requests to a resident worker and matches responses by id."""
+
+    def __init__(self, directory, env, threads):
+        self.process = subprocess.Popen(
+            [sys.executable, str(AGENT_SCRIPT), "--worker", "--threads", str(threads), "--api_key", "benchmark"],
+            cwd=directory, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1)
+        self._lock = threading.Lock()
+        self._waiting = {}
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            response = json.loads(line)
+            event, slot = self._waiting.pop(response["id"])
+            slot.append(response)
+            event.set()
+
+    def request(self, request_id, payload):
+        """Send one request and block until its response arrives."""
+        event, slot = threading.Event(), []
+        self._waiting[request_id] = (event, slot)
+        with self._lock:
+            self.process.stdin.write(json.dumps(dict(payload, id=request_id)) + "\n")
+            self.process.stdin.flush()
+        event.wait()
+        return slot[0]
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+def worker_request(client, number):
+    """One analysis through the resident worker."""
+    start = time.perf_counter()
+    response = client.request(number, {"case_details": dict(SAMPLE_CASE, case_id=f"WORKER-{number:05d}")})
+    assert response["success"], response["error"]
+    return (time.perf_counter() - start) * 1000
+
+def run(label, function, requests, concurrency):
+    """Run requests with a given concurrency and print latency and throughput."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(function, range(requests)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:38s} median {statistics.median(latencies):7.0f} ms, p99 {percentile(latencies, 0.99):7.0f} ms, "
+          f"{requests / elapsed:6.1f} requests/s")
+    return statistics.median(latencies)
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the resident Murder Agent worker against spawn per request")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per measurement")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests in the concurrent runs")
+    parser.add_argument("--latency-ms", type=float, default=100, help="Simulated model latency of the stub API")
+    args = parser.parse_args()
+
+    server = start_stub_api(args.latency_ms)
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ,
+                   NVIDIA_API_BASE_URL=f"http://127.0.0.1:{server.server_address[1]}/v1",
+                   CASE_REPOSITORY_DB=str(Path(directory) / "cases.db"))
+        print(f"Stub API answering after {args.latency_ms:.0f} ms; {args.requests} requests per run")
+        print_separator()
+
+        spawn_median = run("Spawn per request, sequential", lambda n: spawn_request(n, directory, env),
+                           args.requests, 1)
+        run(f"Spawn per request, {args.concurrency} concurrent",
+            lambda n: spawn_request(args.requests + n, directory, env), args.requests, args.concurrency)
+
+        start = time.perf_counter()
+        client = WorkerClient(directory, env, args.concurrency)
+        client.request("warmup", {"op": "ping"})
+        print(f"{'Resident worker startup':38s} {(time.perf_counter() - start) * 1000:7.0f} ms (paid once)")
+        worker_median = run("Resident worker, sequential", lambda n: worker_request(client, n), args.requests, 1)
+        run(f"Resident worker, {args.concurrency} concurrent",
+            lambda n: worker_request(client, args.requests + n), args.requests, args.concurrency)
+        client.close()
+        print_separator()
+
+        print(f"Per-request overhead above the {args.latency_ms:.0f} ms model time: "
+              f"spawn {spawn_median - args.latency_ms:.0f} ms, worker {worker_median - args.latency_ms:.1f} ms")
+    server.shutdown()
+    print_separator()
+
+if __name__ == "__main__":
+    main()
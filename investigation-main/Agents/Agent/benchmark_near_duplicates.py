@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for MinHash/LSH near-duplicate case detection
+
+This script indexes synthetic murder cases, then queries with re-entered
+versions of indexed cases (typos, synonyms, dropped or reordered clauses,
+different formatting) and with genuinely new cases. It reports:
+
+- accuracy: precision and recall of the reuse decision at the index threshold
+- throughput: insert rate, query rate and latency percentiles
+- the cost of an exact Jaccard scan over all cases for comparison
+
+Usage:
+    python benchmark_near_duplicates.py
+    python benchmark_near_duplicates.py --cases 50000 --queries 2000
+
+Author: Augment Agent
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from helpers import percentile
+from near_duplicates import NearDuplicateIndex, fingerprint_text, shingles, DEFAULT_THRESHOLD
+
+FIRST_NAMES = ["Robert", "Maria", "James", "Aisha", "Wei", "Carlos", "Olga", "Samuel", "Priya", "Liam"]
+LAST_NAMES = ["Johnson", "Garcia", "Smith", "Khan", "Chen", "Silva", "Ivanova", "Okafor", "Patel", "Murphy"]
+STREETS = ["Elm Street", "Main Road", "Oak Avenue", "Station Lane", "Mill Road", "Park Drive"]
+CAUSES = ["multiple stab wounds to the chest", "gunshot wound to the head", "blunt force trauma to the skull",
+          "manual strangulation", "arsenic poisoning", "drowning in the bathtub"]
+WEAPONS = ["kitchen knife", "9mm handgun", "baseball bat", "nylon rope", "claw hammer", "unknown poison"]
+SCENES = ["victim found in the living room", "signs of a struggle", "furniture overturned", "no forced entry",
+          "back window broken", "blood trail towards the garage", "lights were switched off",
+          "front door left unlocked", "body partially covered with a blanket", "phone missing"]
+EVIDENCE = ["bloody knife", "fingerprints on the door handle", "cctv footage from the corner shop",
+            "two shell casings", "muddy footprints", "torn shirt button", "text messages on the victim's phone"]
+SUSPECTS = ["ex-wife with a history of threats", "business partner in a financial dispute", "neighbor",
+            "unknown intruder", "former employee", "younger brother"]
+SYNONYMS = {"victim": "deceased", "found": "discovered", "signs": "indications", "broken": "smashed",
+            "unknown": "unidentified", "neighbor": "neighbour", "struggle": "fight", "knife": "blade"}
+
+def print_separator():
+    """Print a separator line."""
+    print("\n" + "="*80 + "\n")
+
+def synthetic_case(rng, number):
+    """Generate one standardized synthetic murder case."""
+    return {
+        "case_id": f"SYN-{number:06d}",
+        "date_of_crime": f"20{rng.randint(15, 24)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "time_of_crime": f"{rng.randint(0, 23):02d}:{rng.choice(['00', '15', '30', '45'])}",
+        "location": f"{rng.randint(1, 999)} {rng.choice(STREETS)}, Apartment {rng.randint(1, 40)}{rng.choice('ABCD')}",
+        "victim_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "victim_age": str(rng.randint(16, 90)),
+        "victim_gender": rng.choice(["Male", "Female"]),
+        "cause_of_death": rng.choice(CAUSES),
+        "weapon_used": rng.choice(WEAPONS),
+        "crime_scene_description": ". ".join(rng.sample(SCENES, 4)),
+        "witnesses": f"{rng.choice(['Neighbor', 'Shop owner', 'Taxi driver'])} heard shouting around "
+                     f"{rng.randint(18, 23)}:{rng.choice(['00', '30'])}",
+        "evidence_found": ", ".join(rng.sample(EVIDENCE, 3)),
+        "suspects": ", ".join(rng.sample(SUSPECTS, 2))
+    }
+
+def typo(word, rng):
+    """Swap two adjacent letters."""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+def reenter(case, rng, number):
+    """Re-enter a case the way another officer might: new case ID, slightly different wording."""
+    variant = dict(case, case_id=f"DUP-{number:06d}")
+    for field in ["crime_scene_description", "evidence_found", "suspects", "witnesses"]:
+        words = variant[field].split()
+        edited = []
+        for word in words:
+            roll = rng.random()
+            if roll < 0.06:
+                edited.append(typo(word, rng))
+            elif roll < 0.12 and word.lower() in SYNONYMS:
+                edited.append(SYNONYMS[word.lower()])
+            else:
+                edited.append(word)
+        variant[field] = " ".join(edited)
+
+    # Reorder the scene clauses and occasionally drop one
+    clauses = variant["crime_scene_description"].split(". ")
+    rng.shuffle(clauses)
+    if len(clauses) > 3 and rng.random() < 0.3:
+        clauses.pop()
+    variant["crime_scene_description"] = ". ".join(clauses)
+    variant["location"] = variant["location"].upper() if rng.random() < 0.3 else variant["location"]
+    return variant
+
+def jaccard(a, b):
+    """Exact Jaccard similarity of two sets."""
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate case detection")
+    parser.add_argument("--cases", type=int, default=20000, help="Number of indexed cases")
+    parser.add_argument("--queries", type=int, default=1000, help="Duplicate queries (and as many new cases)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Similarity threshold")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = [synthetic_case(rng, i) for i in range(args.cases)]
+    duplicates = []
+    for i in range(args.queries):
+        position = rng.randrange(args.cases)
+        duplicates.append((position, reenter(cases[position], rng, i)))
+    new_cases = [synthetic_case(rng, args.cases + i) for i in range(args.queries)]
+
+    index = NearDuplicateIndex(threshold=args.threshold)
+    start = time.perf_counter()
+    for position, case in enumerate(cases):
+        index.add(case, record_id=position)
+    insert_s = time.perf_counter() - start
+    print(f"Indexed {args.cases} cases in {insert_s:.2f} s ({args.cases / insert_s:,.0f} cases/s), "
+          f"{index.bands} bands x {index.rows} rows, threshold {args.threshold}")
+    print_separator()
+
+    latencies = []
+    true_positive = wrong_match = missed = false_positive = 0
+    for position, case in duplicates:
+        t0 = time.perf_counter()
+        match = index.query(case)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if match is None:
+            missed += 1
+        elif match["record_id"] == position:
+            true_positive += 1
+        else:
+            wrong_match += 1
+
+    for case in new_cases:
+        t0 = time.perf_counter()
+        match = index.query(case)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if match is not None:
+            false_positive += 1
+
+    reported = true_positive + wrong_match + false_positive
+    print("Accuracy:")
+    print(f"  re-entered cases matched to the right case: {true_positive}/{args.queries} "
+          f"(recall {true_positive / args.queries * 100:.1f}%)")
+    print(f"  precision {true_positive / reported * 100 if reported else 100:.1f}% "
+          f"({wrong_match} wrong matches, {false_positive} new cases flagged as duplicates)")
+
+    # Exact Jaccard of the re-entered pairs, to show what the threshold cuts
+    exact = sorted(jaccard(set(shingles(fingerprint_text(cases[position]))), set(shingles(fingerprint_text(case))))
+                   for position, case in duplicates)
+    print(f"  exact Jaccard of re-entered pairs: median {statistics.median(exact):.2f}, "
+          f"5th percentile {percentile(exact, 0.05):.2f}")
+    print_separator()
+
+    latencies.sort()
+    total_s = sum(latencies) / 1000
+    print("Throughput:")
+    print(f"  {len(latencies) / total_s:,.0f} queries/s, median {statistics.median(latencies):.3f} ms, "
+          f"p95 {percentile(latencies, 0.95):.3f} ms, p99 {percentile(latencies, 0.99):.3f} ms")
+
+    # Baseline: exact Jaccard against every stored case
+    stored = [set(shingles(fingerprint_text(case))) for case in cases]
+    scan_queries = duplicates[:20]
+    start = time.perf_counter()
+    for _, case in scan_queries:
+        query_set = set(shingles(fingerprint_text(case)))
+        max(range(len(stored)), key=lambda i: jaccard(query_set, stored[i]))
+    scan_ms = (time.perf_counter() - start) * 1000 / len(scan_queries)
+    print(f"  exact Jaccard scan over {args.cases} cases: {scan_ms:.1f} ms per query")
+    print_separator()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for the similar-case TF-IDF index
+
+This script builds a SimilarCaseIndex over synthetic murder cases (100k by
+default), then measures incremental insert throughput, the lazy consolidation
+after inserts, the latency of top-k cosine queries, and add+query pairs (the
+server adds one case per completed intake and then queries).
+
+Usage:
+    python benchmark_similar_cases.py
+    python benchmark_similar_cases.py --cases 20000 --queries 500
+
+Author: Augment Agent
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from helpers import percentile
+from similar_cases import SimilarCaseIndex
+
+CAUSES = ["stab wounds to the chest", "gunshot wound to the head", "blunt force trauma", "strangulation",
+          "poisoning", "drowning", "asphyxiation", "multiple gunshot wounds", "head injury", "blood loss"]
+WEAPONS = ["kitchen knife", "handgun", "baseball bat", "rope", "hammer", "rifle", "arsenic", "pillow",
+           "screwdriver", "brick", "shotgun", "crowbar"]
+SCENES = ["living room", "parking lot", "apartment", "alley", "riverbank", "office", "garage", "motel room",
+          "signs of struggle", "furniture overturned", "no forced entry", "broken window", "blood trail",
+          "body moved", "door left open", "lights off", "car abandoned nearby"]
+EVIDENCE = ["fingerprints", "dna sample", "cctv footage", "shell casings", "footprints", "phone records",
+            "torn clothing", "hair fibers", "tire tracks", "bloody glove", "text messages", "receipt"]
+SUSPECTS = ["ex-wife", "business partner", "neighbor", "unknown intruder", "gang member", "brother",
+            "landlord", "coworker", "former employee", "drug dealer", "boyfriend", "stranger"]
+
+def print_separator():
+    """Print a separator line."""
+    print("\n" + "="*80 + "\n")
+
+def synthetic_case(rng, number):
+    """Generate one synthetic murder case."""
+    return {
+        "case_id": f"SYN-{number:06d}",
+        "cause_of_death": rng.choice(CAUSES),
+        "weapon_used": rng.choice(WEAPONS),
+        "crime_scene_description": ", ".join(rng.sample(SCENES, 3)) + f", unit {rng.randint(1, 500)}",
+        "evidence_found": ", ".join(rng.sample(EVIDENCE, 2)),
+        "suspects": " and ".join(rng.sample(SUSPECTS, 2))
+    }
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the similar-case index")
+    parser.add_argument("--cases", type=int, default=100000, help="Number of indexed cases")
+    parser.add_argument("--queries", type=int, default=1000, help="Number of timed queries")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = [synthetic_case(rng, i) for i in range(args.cases)]
+    queries = [synthetic_case(rng, args.cases + i) for i in range(args.queries)]
+
+    index = SimilarCaseIndex()
+    start = time.perf_counter()
+    for record_id, case in enumerate(cases, start=1):
+        index.add(case, record_id=record_id)
+    add_s = time.perf_counter() - start
+    print(f"Inserted {args.cases} cases in {add_s:.2f} s ({args.cases / add_s:,.0f} cases/s)")
+
+    start = time.perf_counter()
+    index.query(queries[0], k=args.k)
+    print(f"First query (includes consolidation): {(time.perf_counter() - start) * 1000:.1f} ms")
+    print_separator()
+
+    latencies = []
+    for case in queries:
+        t0 = time.perf_counter()
+        index.query(case, k=args.k, exclude_case_id=case["case_id"])
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    print(f"Top-{args.k} queries over {len(index)} cases:")
+    print(f"  median {statistics.median(latencies):.2f} ms, p95 {percentile(latencies, 0.95):.2f} ms, "
+          f"p99 {percentile(latencies, 0.99):.2f} ms")
+
+    # Incremental update: one new case, then the next query scores it in the side matrix
+    index.add(queries[0], record_id=args.cases + 1)
+    t0 = time.perf_counter()
+    results = index.query(queries[0], k=args.k)
+    print(f"Query after one incremental insert: {(time.perf_counter() - t0) * 1000:.1f} ms "
+          f"(top match {results[0]['case_id']}, score {results[0]['score']})")
+
+    # Add+query pairs, including the merges of the side matrix into the main one
+    latencies = []
+    for number, case in enumerate(queries[1:], start=args.cases + 2):
+        t0 = time.perf_counter()
+        index.add(case, record_id=number)
+        index.query(case, k=args.k, exclude_case_id=case["case_id"])
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    print(f"Add+query over {len(index)} cases ({len(latencies)} pairs):")
+    print(f"  median {statistics.median(latencies):.2f} ms, p95 {percentile(latencies, 0.95):.2f} ms, "
+          f"max {latencies[-1]:.1f} ms")
+    print_separator()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for speculative murder analyses
+
+This script simulates murder intakes reaching their last step (additional
+notes). The user takes a while to answer it, and the answer is "none" with a
+given probability. A simulated analysis streams tokens at a fixed rate and
+stops when its cancel event is set. Each run on a Bulkhead measures the
+latency of the final message twice: once with the analysis starting after
+the answer (as before), and once with SpeculativeAnalyses starting it when
+the session reaches the last step. It prints both latencies, the hit rate
+and the tokens used and wasted. Times are scaled down (--scale) so a run
+takes seconds.
+
+Usage:
+    python benchmark_speculative.py
+    python benchmark_speculative.py --sessions 200 --trivial-share 0.5
+
+Author: Augment Agent
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_murder_worker import print_separator
+from bulkhead import Bulkhead
+from helpers import percentile
+from speculative import SpeculativeAnalyses, FINAL_FIELD
+
+CASE = {"case_id": "MC-1", "victim_name": "Robert Johnson", "cause_of_death": "Stab wounds"}
+PROMPT_TOKENS = 1200
+
+def simulated_analysis(args, rng):
+    """Analysis that streams completion tokens until done or cancelled."""
+    completion_tokens = int(rng.uniform(0.7, 1.3) * args.completion_tokens)
+
+    def run(case_details, cancel_event, usage):
+        usage.update(prompt_tokens=PROMPT_TOKENS, completion_tokens=0)
+        time.sleep(args.first_token * args.scale)
+        step = 50
+        for _ in range(0, completion_tokens, step):
+            if cancel_event.is_set():
+                break
+            time.sleep(step / args.tokens_per_second * args.scale)
+            usage["completion_tokens"] += step
+        return "analysis"
+
+    return run
+
+def run(args, speculate):
+    """Simulate the sessions; returns the final-step latencies and the speculation stats."""
+    bulkhead = Bulkhead("murder", max_workers=args.workers, max_queue=2 * args.sessions)
+    speculations = SpeculativeAnalyses(bulkhead.submit)
+
+    def one(number):
+        rng = random.Random(number)
+        session_id = f"session-{number}"
+        analysis = simulated_analysis(args, rng)
+        time.sleep(rng.uniform(0, args.sessions / args.rate) * args.scale)
+        if speculate:
+            speculations.start(session_id, CASE, analysis)
+        time.sleep(rng.uniform(0.5, 1.5) * args.think_time * args.scale)
+
+        final = "None" if rng.random() < args.trivial_share else "Victim changed his will last week"
+        case_details = dict(CASE, **{FINAL_FIELD: final})
+        start = time.perf_counter()
+        if speculations.take(session_id, case_details) is None:
+            bulkhead.run(analysis, case_details, threading.Event(), {})
+        return (time.perf_counter() - start) / args.scale
+
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        latencies = list(executor.map(one, range(args.sessions)))
+    bulkhead.shutdown()
+    return latencies, speculations.stats()
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark speculative murder analyses")
+    parser.add_argument("--sessions", type=int, default=100, help="Intake sessions per run")
+    parser.add_argument("--rate", type=float, default=0.2, help="Sessions reaching the last step per second")
+    parser.add_argument("--workers", type=int, default=8, help="Murder bulkhead workers")
+    parser.add_argument("--trivial-share", type=float, default=0.7, help="Share of last answers that add nothing")
+    parser.add_argument("--think-time", type=float, default=20, help="Mean seconds the user takes to answer")
+    parser.add_argument("--first-token", type=float, default=3, help="Seconds to the first token")
+    parser.add_argument("--completion-tokens", type=int, default=1500, help="Mean tokens per analysis")
+    parser.add_argument("--tokens-per-second", type=float, default=60, help="Decode speed")
+    parser.add_argument("--scale", type=float, default=0.01, help="Real seconds per simulated second")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions, {args.trivial_share:.0%} trivial last answers, about {args.think_time:.0f} s "
+          f"to answer, {args.workers} workers; times shown unscaled")
+    print_separator()
+
+    for label, speculate in (("Analysis after the last answer", False), ("Speculative analysis", True)):
+        latencies, stats = run(args, speculate)
+        latencies.sort()
+        print(label)
+        print(f"  final step: median {statistics.median(latencies):5.1f} s, p95 {percentile(latencies, 0.95):5.1f} s")
+        if speculate:
+            spent = stats["used_tokens"] + stats["wasted_tokens"]
+            print(f"  hits {stats['hits']}, misses {stats['misses']}, not started {stats['not_started']}, "
+                  f"hit rate {stats['hit_rate']:.0%}, {stats['mean_saved_seconds'] / args.scale:.1f} s saved per hit")
+            print(f"  speculative tokens: {stats['used_tokens']} used, {stats['wasted_tokens']} wasted "
+                  f"({stats['wasted_tokens'] / spent if spent else 0:.0%})")
+        print_separator()
+
+if __name__ == "__main__":
+    main()
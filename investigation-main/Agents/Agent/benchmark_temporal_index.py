@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for the temporal case index
+
+This script indexes synthetic cases spread over ten years (some without a
+time of crime, some with coordinates in the location), then measures insert
+throughput, the latency of +/- 2 hour and +/- 3 day window queries with the
+location filters used on every analysis, a linear scan for comparison, and
+the time to save and load the persisted index.
+
+Usage:
+    python benchmark_temporal_index.py
+    python benchmark_temporal_index.py --cases 1000000
+
+Author: Augment Agent
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from helpers import percentile
+from temporal_index import TemporalIndex, case_minutes, MINUTES_PER_DAY
+
+STREETS = ["Elm Street", "Main Road", "Oak Avenue", "Station Lane", "Mill Road", "Park Drive", "Harbor Blvd"]
+
+def print_separator():
+    """Print a separator line."""
+    print("\n" + "="*80 + "\n")
+
+def synthetic_case(rng, number, locations):
+    """One synthetic case between 2015 and 2024."""
+    day = date(2015, 1, 1) + timedelta(days=rng.randrange(3650))
+    location = rng.choice(locations)
+    if rng.random() < 0.3:
+        # Coordinates within roughly 20 km of a city centre
+        location += f" ({40.7 + rng.uniform(-0.2, 0.2):.4f}, {-74.0 + rng.uniform(-0.2, 0.2):.4f})"
+    return {
+        "case_id": f"SYN-{number:07d}",
+        "date_of_crime": day.isoformat(),
+        "time_of_crime": f"{rng.randrange(24):02d}:{rng.randrange(60):02d}" if rng.random() < 0.8 else "Unknown",
+        "location": location
+    }
+
+def time_queries(index, queries, **kwargs):
+    """Median and p99 query latency in milliseconds, and the mean number of results."""
+    latencies, results = [], 0
+    for case in queries:
+        t0 = time.perf_counter()
+        results += len(index.query(case, **kwargs))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), percentile(latencies, 0.99), results / len(queries)
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the temporal case index")
+    parser.add_argument("--cases", type=int, default=200000, help="Number of indexed cases")
+    parser.add_argument("--locations", type=int, default=2000, help="Distinct location strings")
+    parser.add_argument("--queries", type=int, default=2000, help="Number of timed queries")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    locations = [f"{rng.randint(1, 999)} {rng.choice(STREETS)}" for _ in range(args.locations)]
+    cases = [synthetic_case(rng, number, locations) for number in range(args.cases)]
+    queries = [synthetic_case(rng, args.cases + number, locations) for number in range(args.queries)]
+
+    index = TemporalIndex()
+    start = time.perf_counter()
+    for record_id, case in enumerate(cases, start=1):
+        index.add(record_id, "murder", case)
+    add_s = time.perf_counter() - start
+    print(f"Indexed {len(index)} cases in {add_s:.2f} s ({len(index) / add_s:,.0f} cases/s, random order)")
+    print_separator()
+
+    for label, kwargs in [
+        ("+/- 2 hours", {"window_minutes": 120}),
+        ("+/- 3 days", {"window_minutes": 3 * MINUTES_PER_DAY}),
+        ("+/- 3 days, same location or within 5 km",
+         {"window_minutes": 3 * MINUTES_PER_DAY, "radius_km": 5, "same_location": True}),
+    ]:
+        median, p99, mean_results = time_queries(index, queries, limit=10 ** 6, **kwargs)
+        print(f"{label:45s} median {median:.3f} ms, p99 {p99:.3f} ms, {mean_results:.1f} cases on average")
+
+    # Baseline: scan every case for the +/- 3 day window
+    timings = [case_minutes(case) for case in cases]
+    start = time.perf_counter()
+    for case in queries[:100]:
+        query_start, query_span = case_minutes(case)
+        low, high = query_start - 3 * MINUTES_PER_DAY, query_start + query_span + 3 * MINUTES_PER_DAY
+        [position for position, (other_start, other_span) in enumerate(timings)
+         if other_start <= high and other_start + other_span >= low]
+    print(f"{'Linear scan, +/- 3 days':45s} {(time.perf_counter() - start) * 10:.1f} ms per query")
+    print_separator()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "temporal_index.npz"
+        start = time.perf_counter()
+        index.save(path)
+        save_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        loaded = TemporalIndex()
+        loaded._load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        print(f"Persisted index: {path.stat().st_size / 1e6:.1f} MB, saved in {save_ms:.0f} ms, "
+              f"loaded in {load_ms:.0f} ms")
+        assert loaded.query(queries[0], 120) == index.query(queries[0], 120)
+    print_separator()
+
+if __name__ == "__main__":
+    main()
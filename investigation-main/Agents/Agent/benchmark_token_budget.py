@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for local token estimates and adaptive max_tokens
+
+This script plans the generation budget for a set of representative
+requests (a direct question, a sparse theft report, the intake-sized murder
+case, a detailed fraud case and the full sample murder case) under each
+analysis profile, and compares it with the fixed max_tokens=4096 every call
+used before. It prints the planned max_tokens, the worst-case generation
+time at a given decode speed, and the total tokens reserved for the set. It
+also times the token estimator on the prompts, since it runs on every
+request.
+
+Usage:
+    python benchmark_token_budget.py
+    python benchmark_token_budget.py --tokens-per-second 40 --iterations 20000
+
+Author: Augment Agent
+"""
+
+import argparse
+import time
+
+from benchmark_murder_worker import SAMPLE_CASE, print_separator
+from benchmark_agent_router import THEFT_CASE, FRAUD_CASE
+from token_budget import PROFILES, estimate_tokens, plan_completion
+
+FIXED_MAX_TOKENS = 4096
+
+DETAILED_MURDER_CASE = {
+    "case_id": "SAMPLE-001",
+    "date_of_crime": "2023-10-15",
+    "time_of_crime": "23:30",
+    "location": "789 Elm Street, Apartment 3C",
+    "victim_name": "Robert Johnson",
+    "victim_age": "42",
+    "victim_gender": "Male",
+    "cause_of_death": "Multiple stab wounds to the chest",
+    "weapon_used": "Kitchen knife",
+    "crime_scene_description": "Victim found in living room. Signs of struggle. Furniture overturned. No signs of forced entry.",
+    "witnesses": "Neighbor heard argument around 23:00",
+    "evidence_found": "Bloody knife, fingerprints on door handle, victim's phone with text messages",
+    "suspects": "Ex-wife with history of threats, business partner with financial dispute",
+    "additional_notes": "Victim recently changed his will, removing ex-wife as beneficiary"
+}
+
+REQUESTS = {
+    "direct question": {"question": "How is time of death estimated from rigor mortis?",
+                        "additional_notes": "How is time of death estimated from rigor mortis?"},
+    "sparse theft report": {"case_id": "THEFT-1", "location": "Central Mall", "stolen_items": "Laptop"},
+    "intake murder case": SAMPLE_CASE,
+    "detailed fraud case": FRAUD_CASE,
+    "theft case": THEFT_CASE,
+    "full murder case": DETAILED_MURDER_CASE
+}
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark adaptive max_tokens budgets")
+    parser.add_argument("--tokens-per-second", type=float, default=30, help="Decode speed for worst-case times")
+    parser.add_argument("--iterations", type=int, default=10000, help="Estimator calls to time")
+    args = parser.parse_args()
+
+    print(f"Planned max_tokens per analysis profile (before: {FIXED_MAX_TOKENS} for every call); "
+          f"worst case at {args.tokens_per_second:.0f} tokens/s")
+    print_separator()
+
+    header = "".join(f"{profile:>18s}" for profile in PROFILES)
+    print(f"{'Request':22s} {'fields':>6s} {'tokens':>6s}{header}")
+    totals = {profile: 0 for profile in PROFILES}
+    for name, case_details in REQUESTS.items():
+        budgets = {profile: plan_completion(case_details, profile=profile) for profile in PROFILES}
+        standard = budgets["standard"]
+        cells = ""
+        for profile, budget in budgets.items():
+            totals[profile] += budget.max_tokens
+            cells += f"{budget.max_tokens:>9d} ({budget.max_tokens / args.tokens_per_second:4.0f} s)"
+        print(f"{name:22s} {standard.filled_fields:>6d} {standard.content_tokens:>6d}{cells}")
+
+    fixed_total = FIXED_MAX_TOKENS * len(REQUESTS)
+    print()
+    print(f"{'Reserved for the set':36s}" + "".join(f"{total:>18d}" for total in totals.values())
+          + f"   (fixed: {fixed_total})")
+    print(f"{'Compared with fixed 4096':36s}" + "".join(f"{total / fixed_total:>18.0%}" for total in totals.values()))
+    print_separator()
+
+    texts = [str(value) for case_details in REQUESTS.values() for value in case_details.values()]
+    prompt = "\n".join(texts)
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        estimate_tokens(prompt)
+    elapsed = time.perf_counter() - start
+    print(f"Token estimator: {len(prompt)} characters -> {estimate_tokens(prompt)} tokens, "
+          f"{elapsed / args.iterations * 1e6:.0f} us per call")
+    print_separator()
+
+if __name__ == "__main__":
+    main()
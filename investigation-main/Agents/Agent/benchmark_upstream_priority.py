@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for the upstream priority scheduler
+
+This script drives an UpstreamScheduler with a simulated mix of upstream
+completions: a steady backlog of batch and demo calls that alone keeps every
+slot busy, plus interactive and normal calls arriving at random intervals.
+Each call holds its slot for a fixed simulated model time. It runs the mix
+twice, once with every call in the same class (first come, first served, as
+the plain concurrency limit behaved) and once with the real classes, and
+prints the queue wait per class. Aging keeps the batch and demo backlog
+moving, which the maximum waits show.
+
+Usage:
+    python benchmark_upstream_priority.py
+    python benchmark_upstream_priority.py --slots 8 --seconds 30 --aging 5
+
+Author: Augment Agent
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from benchmark_murder_worker import print_separator
+from helpers import percentile
+from upstream import UpstreamScheduler, PRIORITY_CLASSES
+
+def run(scheduler, args, use_classes):
+    """Run the simulated mix against a scheduler for args.seconds; returns queue waits per class."""
+    stop_at = time.time() + args.seconds
+    waits = {name: [] for name in PRIORITY_CLASSES}
+    threads = []
+
+    def call(priority):
+        ticket = scheduler.acquire(priority if use_classes else "normal")
+        waits[priority].append(ticket[2] - ticket[1])
+        time.sleep(args.latency_ms / 1000)
+        scheduler.release(ticket)
+
+    def backlog(priority):
+        # Keeps args.slots calls of this class waiting or running until the end
+        while time.time() < stop_at:
+            call(priority)
+
+    def arrivals(priority, per_second):
+        rng = random.Random(priority)
+        while time.time() < stop_at:
+            time.sleep(rng.expovariate(per_second))
+            thread = threading.Thread(target=call, args=(priority,))
+            thread.start()
+            threads.append(thread)
+
+    workers = [threading.Thread(target=backlog, args=(priority,))
+               for priority in ("batch", "demo") for _ in range(args.slots)]
+    workers += [threading.Thread(target=arrivals, args=("interactive", args.rate)),
+                threading.Thread(target=arrivals, args=("normal", args.rate))]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    for thread in threads:
+        thread.join()
+    return waits
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the upstream priority scheduler")
+    parser.add_argument("--slots", type=int, default=4, help="Concurrent upstream completions")
+    parser.add_argument("--latency-ms", type=float, default=200, help="Simulated model time per call")
+    parser.add_argument("--rate", type=float, default=4, help="Interactive and normal arrivals per second (each)")
+    parser.add_argument("--seconds", type=float, default=15, help="Duration of each run")
+    parser.add_argument("--aging", type=float, default=10, help="Seconds of waiting that promote a call one class")
+    args = parser.parse_args()
+
+    print(f"{args.slots} slots, {args.latency_ms:.0f} ms per call, batch and demo backlog of {args.slots} calls each, "
+          f"{args.rate:.0f} interactive + {args.rate:.0f} normal arrivals/s, aging {args.aging:.0f} s")
+    print_separator()
+
+    for label, use_classes in (("First come, first served", False), ("Priority classes", True)):
+        waits = run(UpstreamScheduler(args.slots, aging_seconds=args.aging), args, use_classes)
+        print(label)
+        for name in PRIORITY_CLASSES:
+            values = sorted(waits[name])
+            if not values:
+                print(f"  {name:12s} no calls")
+                continue
+            print(f"  {name:12s} {len(values):5d} calls, median wait {statistics.median(values) * 1000:7.0f} ms, "
+                  f"p95 {percentile(values, 0.95) * 1000:7.0f} ms, max {values[-1] * 1000:7.0f} ms")
+        print_separator()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Bulkhead - Per-agent bounded worker pools
+
+Each agent of the unified server runs its analyses on its own bounded
+executor with a bounded queue (a bulkhead), so a surge of slow analyses for
+one agent can only fill that agent's workers and queue; every other agent
+keeps its own capacity. When both are full, submit() fails at once with
+BulkheadFull instead of letting work pile up, and the endpoint answers 503.
+
+Cheap work, such as murder intake steps that only validate and store an
+answer, runs on a separate fast lane so it never waits behind analyses.
+
+Sizes come from AGENT_BULKHEADS, e.g. "finance=4:16,murder=8:32"
+(workers:queue per agent); other agents get BULKHEAD_WORKERS workers and a
+queue of BULKHEAD_QUEUE.
+
+Usage:
+    bulkheads = Bulkheads(["murder", "theft", "finance"])
+    analysis = bulkheads["finance"].run(agent.analyze_case, case_details)
+    reply = bulkheads.fast_lane.run(handle_step, message)
+    bulkheads.stats()
+
+Author: Augment Agent
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constants
+BULKHEAD_WORKERS = int(os.getenv("BULKHEAD_WORKERS", "4"))
+BULKHEAD_QUEUE = int(os.getenv("BULKHEAD_QUEUE", "16"))
+FAST_LANE_WORKERS = int(os.getenv("FAST_LANE_WORKERS", "8"))
+FAST_LANE_QUEUE = int(os.getenv("FAST_LANE_QUEUE", "64"))
+FAST_LANE = "fast-lane"
+
+class BulkheadFull(Exception):
+    """Raised when a bulkhead's workers are busy and its queue is full."""
+
+    def __init__(self, name: str):
+        super().__init__(f"The {name} queue is full")
+        self.name = name
+
+class Bulkhead:
+    """
+    A bounded executor with a bounded queue.
+    """
+
+    def __init__(self, name: str, max_workers: int = BULKHEAD_WORKERS, max_queue: int = BULKHEAD_QUEUE):
+        """
+        Initialize the bulkhead.
+
+        Args:
+            name: Agent (or lane) name, used in thread names, errors and stats
+            max_workers: Tasks running at once
+            max_queue: Tasks waiting for a worker before submit() fails
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"bulkhead-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0  # Queued and running
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.peak_queued = 0
+        self.queue_wait_seconds = 0.0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Queue a task.
+
+        Args:
+            fn: Callable to run on one of the bulkhead's workers
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            Future of the result
+
+        Raises:
+            BulkheadFull: If every worker is busy and the queue is full
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise BulkheadFull(self.name)
+            self._pending += 1
+            self.peak_queued = max(self.peak_queued, self._pending - self._running)
+        submitted = time.time()
+
+        def task():
+            with self._lock:
+                self._running += 1
+                self.queue_wait_seconds += time.time() - submitted
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._pending -= 1
+                    self.completed += 1
+
+        try:
+            # Context variables (such as the upstream priority) follow the task to the worker thread
+            return self._executor.submit(contextvars.copy_context().run, task)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Submit a task and wait for its result (raises BulkheadFull or the task's exception)."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth and saturation."""
+        with self._lock:
+            queued = self._pending - self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": queued,
+                "saturation": round(self._running / self.max_workers, 2),
+                "queue_fill": round(queued / self.max_queue, 2) if self.max_queue else 0.0,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "mean_queue_wait_seconds": round(self.queue_wait_seconds / self.completed, 3) if self.completed else 0.0
+            }
+
+    def shutdown(self):
+        """Finish the queued tasks and stop the workers."""
+        self._executor.shutdown(wait=True)
+
+def parse_bulkhead_sizes(spec: Optional[str]) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse "agent=workers:queue,..." (":queue" is optional).
+
+    Args:
+        spec: Size specification, e.g. "finance=4:16,murder=8"
+
+    Returns:
+        Agent name -> (workers, queue)
+    """
+    sizes = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, _, size = item.partition("=")
+        workers, _, queue = size.partition(":")
+        sizes[name.strip()] = (int(workers), int(queue) if queue else BULKHEAD_QUEUE)
+    return sizes
+
+class Bulkheads:
+    """
+    One bulkhead per agent plus the fast lane.
+    """
+
+    def __init__(self, agents: Iterable[str], sizes: Optional[Dict[str, Tuple[int, int]]] = None,
+                 fast_lane_workers: int = FAST_LANE_WORKERS, fast_lane_queue: int = FAST_LANE_QUEUE):
+        """
+        Create the bulkheads.
+
+        Args:
+            agents: Agent names
+            sizes: Agent name -> (workers, queue); defaults to AGENT_BULKHEADS
+            fast_lane_workers: Workers of the fast lane
+            fast_lane_queue: Queue length of the fast lane
+        """
+        if sizes is None:
+            sizes = parse_bulkhead_sizes(os.getenv("AGENT_BULKHEADS"))
+        self._bulkheads = {name: Bulkhead(name, *sizes.get(name, (BULKHEAD_WORKERS, BULKHEAD_QUEUE)))
+                           for name in agents}
+        self.fast_lane = Bulkhead(FAST_LANE, fast_lane_workers, fast_lane_queue)
+        logger.info("Bulkheads: " + ", ".join(f"{name} {bulkhead.max_workers}:{bulkhead.max_queue}"
+                                              for name, bulkhead in self._bulkheads.items()))
+
+    def __getitem__(self, name: str) -> Bulkhead:
+        return self._bulkheads[name]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth and saturation per agent and of the fast lane."""
+        stats = {name: bulkhead.stats() for name, bulkhead in self._bulkheads.items()}
+        stats[FAST_LANE] = self.fast_lane.stats()
+        return stats
@@ -0,0 +1,507 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Case Repository - Indexed Storage for Case Analyses
+
+The agent CLIs used to write every analysis to a loose text file in the working
+directory (analysis_{case_id}.txt, theft_analysis_*.txt, sample_fraud_analysis.txt,
+...), so finding a past case meant scanning the filesystem. This module stores
+cases in a SQLite database instead:
+
+- the structured collected_data (JSON), the analysis text, agent, model and timing
+- indexes on case_id, date_of_crime and agent
+- an FTS5 full-text index over the analyses and case details
+- the analysis split into typed sections (see analysis_sections.py), stored per
+  section so one section can be read for many cases without the full texts
+
+An importer reads the existing text files, so older analyses remain searchable.
+
+Usage:
+    python case_repository.py --import                 # Import *analysis*.txt files
+    python case_repository.py --search "kitchen knife"  # Full-text search
+    python case_repository.py --case SAMPLE-001         # Show a stored case
+    python case_repository.py --export SAMPLE-001       # Print it in the text file format
+    python case_repository.py --section key_evidence    # Key evidence of the latest cases
+
+Author: Augment Agent
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+from analysis_sections import SECTION_TYPES, parse_sections
+
+logger = logging.getLogger(__name__)
+
+# Constants
+AGENT_DIR = Path(__file__).resolve().parent
+DATA_DIR = AGENT_DIR / "data"
+CASES_DB = Path(os.getenv("CASE_REPOSITORY_DB", DATA_DIR / "cases.db"))
+SEPARATOR = "=" * 50
+
+# Field holding the date of the incident for each agent type
+DATE_FIELDS = ["date_of_crime", "date_of_theft", "date_detected"]
+
+# Agent type inferred from the name of an imported text file
+FILE_AGENTS = [
+    ("theft", "theft"),
+    ("fraud", "finance")
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id TEXT,
+    agent TEXT NOT NULL,
+    model TEXT,
+    date_of_crime TEXT,
+    collected_data TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    duration_seconds REAL,
+    source TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cases_case_id ON cases(case_id);
+CREATE INDEX IF NOT EXISTS idx_cases_date_of_crime ON cases(date_of_crime);
+CREATE INDEX IF NOT EXISTS idx_cases_agent ON cases(agent, created_at);
+CREATE INDEX IF NOT EXISTS idx_cases_source ON cases(source);
+CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5(details, analysis, tokenize='porter unicode61');
+-- Clustered by section: reading one section of many cases touches only that section's pages
+CREATE TABLE IF NOT EXISTS case_sections (
+    section TEXT NOT NULL,
+    record_id INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (section, record_id)
+) WITHOUT ROWID;
+"""
+
+def normalize_date(value: Optional[str]) -> Optional[str]:
+    """Return YYYY-MM-DD for ISO-style dates, otherwise the stripped input (dates are free text)."""
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return datetime.strptime(value[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return value
+
+def format_details(collected_data: Dict[str, Any]) -> str:
+    """Format collected data as "Title Case: value" lines (the text file layout)."""
+    return "\n".join(f"{key.replace('_', ' ').title()}: {value}" for key, value in collected_data.items())
+
+def format_case_text(collected_data: Dict[str, Any], analysis: str) -> str:
+    """Render a case in the layout of the legacy analysis text files."""
+    return f"CASE DETAILS:\n{SEPARATOR}\n{format_details(collected_data)}\n\nANALYSIS:\n{SEPARATOR}\n{analysis}"
+
+def parse_analysis_file(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Parse a legacy analysis text file.
+
+    Args:
+        path: Path to the text file
+
+    Returns:
+        Dictionary with collected_data and analysis, or None if the layout is not recognized
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+
+    match = re.match(r"\s*CASE DETAILS:\s*\n=+\n(.*?)\n\s*ANALYSIS:\s*\n=+\n(.*)", text, re.DOTALL)
+    if not match:
+        return None
+
+    collected_data = {}
+    for line in match.group(1).splitlines():
+        if ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        collected_data[re.sub(r"\W+", "_", key.strip().lower()).strip("_")] = value.strip()
+
+    return {"collected_data": collected_data, "analysis": match.group(2).strip()}
+
+class CaseRepository:
+    """
+    SQLite-backed repository of analyzed cases.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Open (and create if needed) the case database.
+
+        Args:
+            path: Database file (defaults to data/cases.db or $CASE_REPOSITORY_DB)
+        """
+        self.path = Path(path) if path else CASES_DB
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One connection shared across threads (Flask request threads), serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._backfill_sections()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a cases row to a dictionary with decoded collected_data."""
+        record = dict(row)
+        record["collected_data"] = json.loads(record["collected_data"])
+        return record
+
+    def _backfill_sections(self):
+        """Split the analyses of cases stored before section columns existed."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, analysis FROM cases WHERE id NOT IN (SELECT record_id FROM case_sections "
+                "WHERE section = ?)", (SECTION_TYPES[0],)
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                self._insert_sections(row["id"], parse_sections(row["analysis"]))
+            self._conn.commit()
+        logger.info(f"Split {len(rows)} stored analyses into sections")
+
+    def _insert_sections(self, record_id: int, sections: Dict[str, str]):
+        """Insert the section rows of a case (caller holds the lock and commits)."""
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO case_sections (section, record_id, content) VALUES (?, ?, ?)",
+            [(section, record_id, sections.get(section) or "") for section in SECTION_TYPES]
+        )
+
+    def add_case(self, agent: str, collected_data: Dict[str, Any], analysis: str,
+                 model: Optional[str] = None, duration_seconds: Optional[float] = None,
+                 source: Optional[str] = None, created_at: Optional[str] = None,
+                 sections: Optional[Dict[str, str]] = None) -> int:
+        """
+        Store an analyzed case.
+
+        Args:
+            agent: Agent type ("murder", "theft", "finance", ...)
+            collected_data: Structured case details
+            analysis: Analysis text
+            model: Model that produced the analysis
+            duration_seconds: Time spent producing the analysis
+            source: Where the case came from ("interactive", "sample", "import:<path>@<content hash>", ...)
+            created_at: ISO timestamp (defaults to now)
+            sections: Analysis split into sections while it streamed (parsed from analysis if omitted)
+
+        Returns:
+            Record ID of the stored case
+        """
+        if sections is None:
+            sections = parse_sections(analysis)
+        date_of_crime = next((collected_data[field] for field in DATE_FIELDS if collected_data.get(field)), None)
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO cases (case_id, agent, model, date_of_crime, collected_data, analysis, "
+                "duration_seconds, source, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (collected_data.get("case_id"), agent, model, normalize_date(date_of_crime),
+                 json.dumps(collected_data), analysis, duration_seconds, source,
+                 created_at or datetime.now().isoformat())
+            )
+            record_id = cursor.lastrowid
+            self._conn.execute(
+                "INSERT INTO cases_fts (rowid, details, analysis) VALUES (?, ?, ?)",
+                (record_id, format_details(collected_data), analysis)
+            )
+            self._insert_sections(record_id, sections)
+            self._conn.commit()
+
+        logger.info(f"Stored {agent} case {collected_data.get('case_id')} as record {record_id}")
+        return record_id
+
+    def get(self, record_id: int) -> Optional[Dict[str, Any]]:
+        """Return a case by record ID."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM cases WHERE id = ?", (record_id,)).fetchone()
+        return self._to_record(row) if row else None
+
+    def find_by_case_id(self, case_id: str, agent: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return every stored analysis of a case ID, newest first."""
+        query = "SELECT * FROM cases WHERE case_id = ?"
+        params = [case_id]
+        if agent:
+            query += " AND agent = ?"
+            params.append(agent)
+
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at DESC", params).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def list_cases(self, agent: Optional[str] = None, date_from: Optional[str] = None,
+                   date_to: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        List cases, optionally filtered by agent and date_of_crime range (inclusive).
+
+        Returns:
+            List of case records, newest first
+        """
+        clauses, params = [], []
+        if agent:
+            clauses.append("agent = ?")
+            params.append(agent)
+        if date_from:
+            clauses.append("date_of_crime >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("date_of_crime <= ?")
+            params.append(date_to)
+
+        query = "SELECT * FROM cases"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def get_sections(self, section: str, agent: Optional[str] = None, record_ids: Optional[List[int]] = None,
+                     limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Return one analysis section for many cases without loading the full analyses.
+
+        Args:
+            section: One of SECTION_TYPES
+            agent: Optional agent filter
+            record_ids: Optional record IDs to fetch (otherwise the latest cases)
+            limit: Maximum number of cases
+
+        Returns:
+            List of {"record_id", "case_id", "agent", "date_of_crime", "content"}, newest record first
+        """
+        if section not in SECTION_TYPES:
+            raise ValueError(f"Unknown section {section}; expected one of {', '.join(SECTION_TYPES)}")
+
+        query = ("SELECT case_sections.record_id, cases.case_id, cases.agent, cases.date_of_crime, "
+                 "case_sections.content FROM case_sections JOIN cases ON cases.id = case_sections.record_id "
+                 "WHERE case_sections.section = ?")
+        params = [section]
+        if agent:
+            query += " AND cases.agent = ?"
+            params.append(agent)
+        if record_ids is not None:
+            record_ids = [int(record_id) for record_id in record_ids][:limit]
+            if not record_ids:
+                return []
+            # Bound as a JSON array to stay under SQLite's variable limit for large ID lists
+            query += " AND case_sections.record_id IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(record_ids))
+        query += " ORDER BY case_sections.record_id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_cases(self, agent: Optional[str] = None, batch_size: int = 1000, after_id: int = 0):
+        """
+        Iterate over all stored cases in record order, in batches.
+
+        Args:
+            agent: Optional agent filter
+            batch_size: Rows fetched per query
+            after_id: Only yield records with a larger record ID
+
+        Yields:
+            Case records
+        """
+        last_id = after_id
+        while True:
+            query = "SELECT * FROM cases WHERE id > ?"
+            params = [last_id]
+            if agent:
+                query += " AND agent = ?"
+                params.append(agent)
+
+            with self._lock:
+                rows = self._conn.execute(query + " ORDER BY id LIMIT ?", params + [batch_size]).fetchall()
+            if not rows:
+                return
+
+            for row in rows:
+                yield self._to_record(row)
+            last_id = rows[-1]["id"]
+
+    def search(self, text: str, agent: Optional[str] = None, limit: int = 20,
+               section: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Full-text search over case details and analyses.
+
+        Args:
+            text: Search words (all must match; quoted as literal terms)
+            agent: Optional agent filter
+            limit: Maximum number of results
+            section: Return only this analysis section of each match instead of the full record
+
+        Returns:
+            List of case records with "snippet" and "rank" (or section rows with "rank"), best match first
+        """
+        terms = [term.replace('"', '""') for term in text.split()]
+        if not terms:
+            return []
+        match_query = " ".join(f'"{term}"' for term in terms)
+
+        if section is not None:
+            if section not in SECTION_TYPES:
+                raise ValueError(f"Unknown section {section}; expected one of {', '.join(SECTION_TYPES)}")
+            query = ("SELECT case_sections.record_id, cases.case_id, cases.agent, cases.date_of_crime, "
+                     "case_sections.content, bm25(cases_fts) AS rank FROM cases_fts "
+                     "JOIN cases ON cases.id = cases_fts.rowid "
+                     "JOIN case_sections ON case_sections.section = ? AND case_sections.record_id = cases.id "
+                     "WHERE cases_fts MATCH ?")
+            params = [section, match_query]
+        else:
+            query = ("SELECT cases.*, snippet(cases_fts, 1, '[', ']', ' ... ', 12) AS snippet, "
+                     "bm25(cases_fts) AS rank FROM cases_fts JOIN cases ON cases.id = cases_fts.rowid "
+                     "WHERE cases_fts MATCH ?")
+            params = [match_query]
+        if agent:
+            query += " AND cases.agent = ?"
+            params.append(agent)
+        query += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        if section is not None:
+            return [dict(row) for row in rows]
+        return [self._to_record(row) for row in rows]
+
+    def count(self, agent: Optional[str] = None) -> int:
+        """Number of stored cases."""
+        with self._lock:
+            if agent:
+                return self._conn.execute("SELECT COUNT(*) FROM cases WHERE agent = ?", (agent,)).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+
+    def import_text_files(self, paths: List[Path]) -> Dict[str, int]:
+        """
+        Import legacy analysis text files, skipping files imported before.
+
+        A file counts as imported before if a case with the same resolved path and content hash
+        was imported, so a same-named file in another folder or a re-export with new content is
+        imported. Cases imported under the older "import:<file name>" source are matched by file
+        name and analysis text.
+
+        Args:
+            paths: Text files to import
+
+        Returns:
+            Dictionary with imported/skipped/invalid counts
+        """
+        counts = {"imported": 0, "skipped": 0, "invalid": 0}
+
+        for path in paths:
+            path = Path(path).resolve()
+            source = f"import:{path}@{hashlib.sha256(path.read_bytes()).hexdigest()[:16]}"
+            with self._lock:
+                exists = self._conn.execute("SELECT 1 FROM cases WHERE source = ? LIMIT 1", (source,)).fetchone()
+            if exists:
+                counts["skipped"] += 1
+                continue
+
+            parsed = parse_analysis_file(path)
+            if parsed is None:
+                logger.warning(f"Skipping {path.name}: not in the analysis file layout")
+                counts["invalid"] += 1
+                continue
+            with self._lock:
+                exists = self._conn.execute("SELECT 1 FROM cases WHERE source = ? AND analysis = ? LIMIT 1",
+                                            (f"import:{path.name}", parsed["analysis"])).fetchone()
+            if exists:
+                counts["skipped"] += 1
+                continue
+
+            agent = next((agent for marker, agent in FILE_AGENTS if marker in path.name.lower()), "murder")
+            created_at = datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+            self.add_case(agent, parsed["collected_data"], parsed["analysis"], source=source, created_at=created_at)
+            counts["imported"] += 1
+
+        return counts
+
+def main():
+    """Main function to manage the case repository."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Case repository")
+    parser.add_argument("--db", help="Path to the case database")
+    parser.add_argument("--import", dest="import_files", nargs="*", metavar="FILE",
+                        help="Import analysis text files (defaults to *analysis*.txt in the agent folder)")
+    parser.add_argument("--search", help="Full-text search over details and analyses")
+    parser.add_argument("--agent", help="Filter by agent type")
+    parser.add_argument("--case", help="Show the stored analyses of a case ID")
+    parser.add_argument("--export", help="Print the latest analysis of a case ID in the text file layout")
+    parser.add_argument("--section", choices=SECTION_TYPES,
+                        help="Print one analysis section (of --search matches, or of the latest cases)")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of cases for --section")
+
+    args = parser.parse_args()
+
+    with CaseRepository(args.db) as repository:
+        if args.import_files is not None:
+            paths = args.import_files or sorted(AGENT_DIR.glob("*analysis*.txt"))
+            counts = repository.import_text_files(paths)
+            print(f"Imported {counts['imported']}, skipped {counts['skipped']} already imported, "
+                  f"{counts['invalid']} not recognized")
+
+        if args.section:
+            if args.search:
+                rows = repository.search(args.search, agent=args.agent, limit=args.limit, section=args.section)
+            else:
+                rows = repository.get_sections(args.section, agent=args.agent, limit=args.limit)
+            for row in rows:
+                print(f"#{row['record_id']} [{row['agent']}] {row['case_id']} ({row['date_of_crime']}):\n"
+                      f"{row['content'] or '(section not present)'}\n")
+
+        elif args.search:
+            for record in repository.search(args.search, agent=args.agent):
+                print(f"#{record['id']} [{record['agent']}] {record['case_id']} ({record['date_of_crime']}): "
+                      f"{record['snippet']}")
+
+        if args.case:
+            for record in repository.find_by_case_id(args.case, agent=args.agent):
+                print(f"#{record['id']} [{record['agent']}] {record['created_at']} model={record['model']} "
+                      f"duration={record['duration_seconds']}")
+
+        if args.export:
+            records = repository.find_by_case_id(args.export, agent=args.agent)
+            if records:
+                print(format_case_text(records[0]["collected_data"], records[0]["analysis"]))
+            else:
+                print(f"No stored analysis for case {args.export}")
+
+        if not any([args.import_files is not None, args.search, args.case, args.export, args.section]):
+            print(f"{repository.count()} cases stored in {repository.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,515 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dataset Ingest - Parallel Multi-Dataset Ingestion Pipeline
+
+This module discovers every xlsx/csv file in the agent dataset folders
+("murder datasets", "theft datasets", "fraud datasets"), parses them in a
+process pool (one file per worker) and normalizes them into a shared columnar
+format under derived/ingested:
+
+- one .npy file per column
+- numeric, boolean and datetime columns are stored as plain arrays
+- all other columns are dictionary-encoded (int32 codes + a JSON dictionary)
+
+A manifest records the schema, row count, size, mtime and SHA-256 checksum of
+every source file, so later runs (and server startup) only re-ingest files that
+actually changed. Loading a normalized dataset is a handful of np.load calls
+instead of an xlsx parse.
+
+Files are parsed into staging folders without holding the manifest lock; the
+lock is only taken to re-read the manifest, move the staged outputs into place
+and write the manifest, so other processes never wait for a whole ingest.
+
+Usage:
+    python dataset_ingest.py              # Ingest new and changed files
+    python dataset_ingest.py --force      # Re-ingest everything
+    python dataset_ingest.py --workers 2  # Limit the process pool
+
+Author: Augment Agent
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from homicide_dataset import clean_homicide_frame
+from homicide_trends import DERIVED_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: ingests from several processes are not serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Constants
+AGENT_DIR = Path(__file__).resolve().parent
+DATASET_DIRS = [
+    AGENT_DIR / "murder datasets",
+    AGENT_DIR / "theft datasets",
+    AGENT_DIR / "fraud datasets"
+]
+INGEST_DIR = DERIVED_DIR / "ingested"
+MANIFEST_FILE = INGEST_DIR / "manifest.json"
+MANIFEST_VERSION = 1  # Bump when the columnar layout changes to force a full re-ingest
+SUPPORTED_SUFFIXES = {".xlsx", ".xls", ".csv"}
+NUMERIC_SHARE = 0.95  # Share of parseable values needed to treat a text column as numeric
+STALE_STAGING_SECONDS = 24 * 3600  # Age after which a staging folder counts as left by a crash (no fcntl)
+
+# Serializes manifest read-modify-write cycles within one process; manifest_lock() adds a file
+# lock for other processes (the server, its supervisor workers and the CLI)
+_manifest_lock = threading.Lock()
+
+@contextmanager
+def manifest_lock(output_root: Path):
+    """
+    Hold the manifest lock of an output root, across threads and processes.
+
+    Args:
+        output_root: Root of the columnar outputs
+    """
+    output_root.mkdir(parents=True, exist_ok=True)
+    with _manifest_lock, open(output_root / f"{MANIFEST_FILE.name}.lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+def normalize_generic(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize a statistics table with no dedicated normalizer.
+
+    Column names and text values are stripped, empty rows and columns are dropped
+    and text columns that are (almost) entirely numeric are converted to numbers.
+
+    Args:
+        frame: Raw DataFrame
+
+    Returns:
+        Normalized DataFrame
+    """
+    frame = frame.dropna(how="all").dropna(axis=1, how="all").copy()
+    frame.columns = [str(column).strip() for column in frame.columns]
+
+    for column in frame.columns:
+        if frame[column].dtype.kind in "iufbM":
+            continue
+
+        text = frame[column].where(frame[column].isna(), frame[column].astype(str).str.strip())
+        present = text.notna().sum()
+        numbers = pd.to_numeric(text.str.rstrip(",").str.replace(",", "", regex=False), errors="coerce")
+        if present and numbers.notna().sum() >= NUMERIC_SHARE * present:
+            frame[column] = numbers
+        else:
+            frame[column] = text
+
+    return frame.reset_index(drop=True)
+
+# Dataset-specific normalizers, matched against the file name in order
+NORMALIZERS = [
+    ("homicide*.xlsx", "homicide", clean_homicide_frame)
+]
+
+def find_normalizer(path: Path):
+    """Return (name, function) of the normalizer for a file."""
+    for pattern, name, normalizer in NORMALIZERS:
+        if fnmatch.fnmatch(path.name.lower(), pattern):
+            return name, normalizer
+    return "generic", normalize_generic
+
+def file_checksum(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def manifest_key(path: Path) -> str:
+    """Manifest key of a source file (path relative to the agent folder when possible)."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(AGENT_DIR).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+def discover_dataset_files(directories: Optional[List[Path]] = None) -> List[Path]:
+    """
+    Find every supported dataset file.
+
+    Args:
+        directories: Folders to scan (defaults to DATASET_DIRS, missing ones are skipped)
+
+    Returns:
+        Sorted list of file paths
+    """
+    files = []
+    for directory in directories or DATASET_DIRS:
+        directory = Path(directory)
+        if not directory.is_dir():
+            continue
+        for path in directory.iterdir():
+            # "~$name.xlsx" files are Office lock files, not datasets
+            if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES and not path.name.startswith("~$"):
+                files.append(path.resolve())
+    return sorted(files)
+
+def read_dataset_file(path: Path) -> pd.DataFrame:
+    """Parse an xlsx/xls (first sheet) or csv file into a raw DataFrame."""
+    if path.suffix.lower() == ".csv":
+        return pd.read_csv(path, low_memory=False, encoding_errors="replace")
+    return pd.read_excel(path)
+
+def write_columns(frame: pd.DataFrame, output_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Write a DataFrame in the columnar format.
+
+    Args:
+        frame: Normalized DataFrame
+        output_dir: Empty directory to write into
+
+    Returns:
+        Schema: one {"name", "dtype", "encoding", "file"} entry per column
+    """
+    schema = []
+    for i, column in enumerate(frame.columns):
+        series = frame[column]
+        file_name = f"c{i}.npy"
+
+        if series.dtype.kind in "iufbM":
+            np.save(output_dir / file_name, series.to_numpy())
+            schema.append({"name": column, "dtype": str(series.dtype), "encoding": "plain", "file": file_name})
+            continue
+
+        # Dictionary encoding: missing values get code -1
+        codes, uniques = pd.factorize(series.map(lambda value: value if pd.isna(value) else str(value)))
+        np.save(output_dir / file_name, codes.astype(np.int32))
+        with open(output_dir / f"c{i}.dict.json", "w", encoding="utf-8") as f:
+            json.dump([str(value) for value in uniques], f, ensure_ascii=False)
+        schema.append({"name": column, "dtype": "string", "encoding": "dictionary", "file": file_name})
+
+    return schema
+
+def read_columns(output_dir: Path, schema: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Read a DataFrame written by write_columns().
+
+    Args:
+        output_dir: Directory holding the column files
+        schema: Schema returned by write_columns()
+
+    Returns:
+        DataFrame
+    """
+    columns = {}
+    for spec in schema:
+        values = np.load(output_dir / spec["file"], allow_pickle=False)
+        if spec["encoding"] == "dictionary":
+            dictionary_file = output_dir / spec["file"].replace(".npy", ".dict.json")
+            with open(dictionary_file, "r", encoding="utf-8") as f:
+                dictionary = np.array(json.load(f) + [None], dtype=object)
+            # Code -1 indexes the trailing None
+            values = dictionary[values]
+        columns[spec["name"]] = values
+    return pd.DataFrame(columns)
+
+def _staging_dir(output_root: Path, output_name: str, owner: str) -> Path:
+    """Staging folder of an output, named after the ingesting process and thread ("<pid>-<thread>")."""
+    return Path(output_root) / f".{output_name}.{owner}.tmp"
+
+def _ingest_file(path: str, output_root: str, checksum: Optional[str], owner: str) -> Dict[str, Any]:
+    """
+    Parse, normalize and stage one file. Runs in a worker process.
+
+    The columns are written to _staging_dir(); the ingesting process moves them into place
+    under the manifest lock.
+
+    Args:
+        path: Source file path
+        output_root: Root directory of the columnar outputs
+        checksum: Precomputed checksum, if known
+        owner: "<pid>-<thread>" of the ingesting process, which names the staging folder
+
+    Returns:
+        Manifest entry for the file
+    """
+    start = time.perf_counter()
+    path = Path(path)
+    stat = path.stat()
+    checksum = checksum or file_checksum(path)
+    normalizer_name, normalizer = find_normalizer(path)
+
+    frame = normalizer(read_dataset_file(path))
+
+    # The output directory name includes the checksum, so an old version stays
+    # readable until the manifest pointing to the new one has been written
+    output_name = f"{path.stem.replace(' ', '_')}-{checksum[:12]}"
+    staging_dir = _staging_dir(output_root, output_name, owner)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir(parents=True)
+    schema = write_columns(frame, staging_dir)
+
+    return {
+        "source": manifest_key(path),
+        "checksum": checksum,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "normalizer": normalizer_name,
+        "rows": len(frame),
+        "schema": schema,
+        "output": output_name,
+        "ingested_at": datetime.now().isoformat(),
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+def load_manifest(path: Optional[Path] = None) -> Dict[str, Any]:
+    """Load the manifest, or return an empty one if it is missing, unreadable or outdated."""
+    path = Path(path) if path else MANIFEST_FILE
+    empty = {"version": MANIFEST_VERSION, "files": {}}
+    if not path.exists():
+        return empty
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable dataset manifest {path}: {str(e)}")
+        return empty
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        logger.info("Dataset manifest version changed, re-ingesting all files")
+        return empty
+    return manifest
+
+def save_manifest(manifest: Dict[str, Any], path: Optional[Path] = None):
+    """Atomically write the manifest."""
+    path = Path(path) if path else MANIFEST_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, path)
+
+def _is_current(entry: Optional[Dict[str, Any]], path: Path, output_root: Path) -> Tuple[bool, Optional[str]]:
+    """
+    Check whether a manifest entry still matches its source file.
+
+    Returns:
+        Tuple of (is current, checksum if one had to be computed)
+    """
+    if entry is None or not (output_root / entry["output"]).is_dir():
+        return False, None
+
+    stat = path.stat()
+    if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return True, None
+
+    # Touched but possibly unchanged (e.g. copied again): compare contents
+    checksum = file_checksum(path)
+    if checksum == entry["checksum"]:
+        entry["size"] = stat.st_size
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True, checksum
+    return False, checksum
+
+def ingest_datasets(files: Optional[List[Path]] = None, directories: Optional[List[Path]] = None,
+                    workers: Optional[int] = None, force: bool = False,
+                    output_root: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Ingest new and changed dataset files in parallel and update the manifest.
+
+    Args:
+        files: Explicit files to check (skips discovery, removal of stale entries and output cleanup)
+        directories: Folders to scan when files is not given
+        workers: Maximum worker processes (defaults to the CPU count, 1 disables the pool)
+        force: Re-ingest files even if the manifest says they are current
+        output_root: Root of the columnar outputs (defaults to INGEST_DIR)
+
+    Returns:
+        Dictionary with ingested/unchanged/removed file keys, failures and the manifest
+    """
+    output_root = Path(output_root) if output_root else INGEST_DIR
+    manifest_path = output_root / MANIFEST_FILE.name
+    discover = files is None
+    paths = discover_dataset_files(directories) if discover else [Path(path).resolve() for path in files]
+
+    # Decide and parse against a snapshot of the manifest (written atomically, so it can be read
+    # without the lock); outputs are only staged here
+    snapshot = load_manifest(manifest_path)["files"]
+    summary = {"ingested": [], "unchanged": [], "removed": [], "failed": {}}
+    owner = f"{os.getpid()}-{threading.get_ident()}"
+
+    pending = []
+    for path in paths:
+        key = manifest_key(path)
+        current, checksum = (False, None) if force else _is_current(snapshot.get(key), path, output_root)
+        if current:
+            summary["unchanged"].append(key)
+        else:
+            pending.append((path, checksum))
+
+    outcomes = []
+    if pending:
+        max_workers = min(len(pending), workers or os.cpu_count() or 1)
+        logger.info(f"Ingesting {len(pending)} dataset file(s) with {max_workers} worker(s)")
+
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = {
+                    pool.submit(_ingest_file, str(path), str(output_root), checksum, owner): path
+                    for path, checksum in pending
+                }
+                for future in as_completed(futures):
+                    try:
+                        outcomes.append((futures[future], future.result(), None))
+                    except Exception as e:
+                        outcomes.append((futures[future], None, e))
+        else:
+            for path, checksum in pending:
+                try:
+                    outcomes.append((path, _ingest_file(str(path), str(output_root), checksum, owner), None))
+                except Exception as e:
+                    outcomes.append((path, None, e))
+
+    # Under the lock: re-read the manifest (another process may have written it meanwhile), move
+    # the staged outputs into place and write the manifest
+    with manifest_lock(output_root):
+        manifest = load_manifest(manifest_path)
+        entries = manifest["files"]
+
+        for key in summary["unchanged"]:
+            # Keep refreshed size/mtime, unless another run stored a different version meanwhile
+            entry = snapshot[key]
+            if entries.get(key, entry)["checksum"] == entry["checksum"]:
+                entries[key] = entry
+
+        for path, entry, error in outcomes:
+            key = manifest_key(path)
+            if error is not None:
+                # The previous entry (if any) stays valid; the file is retried next run
+                summary["failed"][key] = str(error)
+                logger.error(f"Error ingesting {key}: {str(error)}")
+                continue
+            staging_dir = _staging_dir(output_root, entry["output"], owner)
+            output_dir = output_root / entry["output"]
+            previous = entries.get(key)
+            if previous and previous["checksum"] == entry["checksum"] and output_dir.is_dir() and not force:
+                # Another run stored the same version while this one was parsing
+                shutil.rmtree(staging_dir, ignore_errors=True)
+            else:
+                shutil.rmtree(output_dir, ignore_errors=True)
+                os.replace(staging_dir, output_dir)
+                entries[key] = entry
+            summary["ingested"].append(key)
+            logger.info(f"Ingested {key}: {entry['rows']} rows, {len(entry['schema'])} columns "
+                        f"in {entry['seconds']:.2f}s")
+
+        if discover:
+            present = {manifest_key(path) for path in paths}
+            for key in [key for key in entries if key not in present]:
+                del entries[key]
+                summary["removed"].append(key)
+
+        manifest["updated_at"] = datetime.now().isoformat()
+        save_manifest(manifest, manifest_path)
+
+        if discover:
+            _remove_unreferenced(output_root, entries)
+
+    summary["manifest"] = manifest
+    return summary
+
+def _staging_abandoned(staging_dir: Path) -> bool:
+    """Whether a staging folder was left by a run that is gone (its process is no longer running)."""
+    if fcntl is None:
+        # No cheap liveness check without sending a signal on Windows; go by age instead
+        return time.time() - staging_dir.stat().st_mtime > STALE_STAGING_SECONDS
+    try:
+        os.kill(int(staging_dir.name.rsplit(".", 2)[-2].split("-")[0]), 0)
+    except (ValueError, ProcessLookupError):
+        return True
+    except PermissionError:  # Running under another user
+        return False
+    return False
+
+def _remove_unreferenced(output_root: Path, entries: Dict[str, Any]):
+    """
+    Drop columnar outputs no manifest entry points to, and staging files left by crashed runs.
+
+    Only full ingests call this, under the manifest lock: outputs are moved into place and listed
+    in the manifest under that lock, so no other run can have just written an output the manifest
+    does not list yet. Other runs may be staging, so only staging folders of dead runs are removed.
+    """
+    referenced = {entry["output"] for entry in entries.values()}
+    for child in output_root.iterdir():
+        if child.is_dir() and child.name.endswith(".tmp"):
+            if _staging_abandoned(child):
+                shutil.rmtree(child, ignore_errors=True)
+        elif child.is_dir() and child.name not in referenced:
+            shutil.rmtree(child, ignore_errors=True)
+        elif child.is_file() and child.name.endswith(".tmp"):
+            # Manifest temp files are only written under the lock, so any left over are stale
+            child.unlink()
+
+def load_ingested(path: Path, output_root: Optional[Path] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Load the normalized frame of a dataset file, ingesting it first if needed.
+
+    Args:
+        path: Source file path
+        output_root: Root of the columnar outputs (defaults to INGEST_DIR)
+
+    Returns:
+        Tuple of (DataFrame, manifest entry)
+    """
+    output_root = Path(output_root) if output_root else INGEST_DIR
+    key = manifest_key(path)
+    summary = ingest_datasets(files=[path], workers=1, output_root=output_root)
+    if key in summary["failed"]:
+        raise ValueError(f"Could not ingest {key}: {summary['failed'][key]}")
+
+    entry = summary["manifest"]["files"][key]
+    return read_columns(output_root / entry["output"], entry["schema"]), entry
+
+def main():
+    """Main function to run the ingestion pipeline."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Ingest dataset folders into the columnar format")
+    parser.add_argument("--dir", action="append", help="Dataset folder to scan (repeatable, defaults to all)")
+    parser.add_argument("--workers", type=int, help="Maximum number of worker processes")
+    parser.add_argument("--force", action="store_true", help="Re-ingest every file")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = ingest_datasets(directories=args.dir, workers=args.workers, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    print(f"Ingested {len(summary['ingested'])}, unchanged {len(summary['unchanged'])}, "
+          f"removed {len(summary['removed'])}, failed {len(summary['failed'])} in {elapsed:.2f}s")
+    for key, entry in sorted(summary["manifest"]["files"].items()):
+        print(f"- {key}: {entry['rows']} rows, {len(entry['schema'])} columns ({entry['normalizer']})")
+    for key, error in summary["failed"].items():
+        print(f"! {key}: {error}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dataset Manager - Hot-Swappable, Versioned Homicide Snapshots
+
+The unified server keeps the homicide dataset in memory as an immutable
+snapshot (cleaned frame, rollup cube, trends table and location resolver).
+This module watches the "murder datasets" directory for a new or updated
+UNODC export, rebuilds a complete snapshot in a background thread and then
+swaps the active reference atomically.
+
+Requests take one reference with current() at the start and use it until they
+finish, so in-flight queries keep the snapshot they started with. A replaced
+snapshot is released by the garbage collector as soon as the last request
+holding it completes; the manager only keeps weak references for reporting.
+
+Usage:
+    manager = DatasetManager()
+    manager.start()                 # Initial load + background watcher
+    snapshot = manager.current()    # Use for the whole request
+    snapshot.cube.cell(...)
+
+Author: Augment Agent
+"""
+
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+import pandas as pd
+
+from dataset_ingest import load_ingested
+from helpers import file_signature
+from homicide_dataset import DATASETS_DIR, HomicideRollupCube
+from homicide_trends import compute_trends
+from location_resolver import LocationResolver
+
+logger = logging.getLogger(__name__)
+
+# Constants
+HOMICIDE_FILE_PATTERN = "homicide*.xlsx"
+POLL_INTERVAL = 5.0  # Seconds between directory checks
+
+@dataclass(frozen=True, eq=False)
+class HomicideSnapshot:
+    """An immutable, fully built version of the homicide dataset (compared by identity)."""
+    version: int
+    path: Path
+    checksum: str
+    loaded_at: str
+    build_seconds: float
+    frame: pd.DataFrame = field(repr=False)
+    cube: HomicideRollupCube = field(repr=False)
+    trends: pd.DataFrame = field(repr=False)
+    resolver: LocationResolver = field(repr=False)
+
+    def describe(self) -> Dict[str, Any]:
+        """Return a JSON-serializable summary of the snapshot."""
+        return {
+            "version": self.version,
+            "file": self.path.name,
+            "checksum": self.checksum,
+            "loaded_at": self.loaded_at,
+            "build_seconds": round(self.build_seconds, 3),
+            "rows": len(self.frame),
+            "trend_series": len(self.trends),
+            "etag": self.cube.etag
+        }
+
+def build_homicide_snapshot(path: Path, version: int) -> HomicideSnapshot:
+    """
+    Load a homicide export and build every in-memory table and lookup.
+
+    The cleaned frame comes from the columnar ingest cache, so the xlsx is only
+    parsed when it is new or changed.
+
+    Args:
+        path: Path to the xlsx export
+        version: Version number to assign
+
+    Returns:
+        HomicideSnapshot
+    """
+    start = time.perf_counter()
+    frame, entry = load_ingested(path)
+    cube = HomicideRollupCube.from_frame(frame)
+    trends = compute_trends(frame)
+    resolver = LocationResolver.from_frame(frame)
+
+    return HomicideSnapshot(
+        version=version,
+        path=path,
+        checksum=entry["checksum"],
+        loaded_at=datetime.now().isoformat(),
+        build_seconds=time.perf_counter() - start,
+        frame=frame,
+        cube=cube,
+        trends=trends,
+        resolver=resolver
+    )
+
+class DatasetManager:
+    """
+    Watch the datasets directory and hot-swap homicide snapshots.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, pattern: str = HOMICIDE_FILE_PATTERN,
+                 poll_interval: float = POLL_INTERVAL):
+        """
+        Initialize the Dataset Manager.
+
+        Args:
+            directory: Directory to watch (defaults to "murder datasets")
+            pattern: Glob pattern of homicide exports; the newest match is active
+            poll_interval: Seconds between directory checks
+        """
+        self.directory = Path(directory) if directory else DATASETS_DIR
+        self.pattern = pattern
+        self.poll_interval = poll_interval
+
+        self._active = None
+        self._swap_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher = None
+        self._next_version = 1
+        self._loaded_signature = None
+        self._failed_signature = None
+        self._pending_signature = None
+        self._last_error = None
+        # Replaced snapshots still referenced by in-flight requests
+        self._retired = weakref.WeakSet()
+
+    def current(self) -> Optional[HomicideSnapshot]:
+        """
+        Return the active snapshot.
+
+        Callers should keep the returned reference for the whole request instead
+        of calling current() repeatedly, so a swap never mixes two versions.
+        """
+        return self._active
+
+    def _find_latest_file(self) -> Optional[Path]:
+        """Return the newest file matching the pattern, or None."""
+        candidates = [path for path in self.directory.glob(self.pattern)
+                      if path.is_file() and not path.name.startswith("~$")]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda path: path.stat().st_mtime)
+
+    @staticmethod
+    def _signature(path: Path) -> Tuple:
+        """Cheap change signature: the path plus file_signature() ((path,) if the file just vanished)."""
+        return (str(path),) + (file_signature(path) or ())
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Build and activate a snapshot of the newest export if it changed.
+
+        Args:
+            force: Rebuild even if the file signature is unchanged
+
+        Returns:
+            True if a new snapshot was activated
+        """
+        with self._build_lock:
+            path = self._find_latest_file()
+            if path is None:
+                logger.warning(f"No homicide export matching {self.pattern} in {self.directory}")
+                return False
+
+            signature = self._signature(path)
+            if not force and signature in (self._loaded_signature, self._failed_signature):
+                return False
+
+            version = self._next_version
+            logger.info(f"Building homicide snapshot v{version} from {path.name}")
+            try:
+                snapshot = build_homicide_snapshot(path, version)
+            except Exception as e:
+                # Keep serving the previous snapshot; retry only when the file changes again
+                self._failed_signature = signature
+                self._last_error = f"{path.name}: {str(e)}"
+                logger.error(f"Error building homicide snapshot from {path.name}: {str(e)}")
+                return False
+
+            self._next_version += 1
+            self._loaded_signature = signature
+            self._failed_signature = None
+            self._last_error = None
+            self._swap(snapshot)
+            return True
+
+    def _swap(self, snapshot: HomicideSnapshot):
+        """Atomically replace the active snapshot."""
+        with self._swap_lock:
+            previous = self._active
+            self._active = snapshot
+
+        if previous is not None:
+            self._retired.add(previous)
+            weakref.finalize(previous, logger.info, f"Homicide snapshot v{previous.version} released")
+
+        logger.info(f"Activated homicide snapshot v{snapshot.version} "
+                    f"({snapshot.path.name}, built in {snapshot.build_seconds:.2f}s)")
+
+    def _poll_once(self):
+        """Check the directory once; a new file must be stable across two polls before loading."""
+        path = self._find_latest_file()
+        if path is None:
+            return
+
+        signature = self._signature(path)
+        if signature in (self._loaded_signature, self._failed_signature):
+            self._pending_signature = None
+            return
+
+        # Wait until the export has stopped changing (e.g. a copy in progress)
+        if signature != self._pending_signature:
+            self._pending_signature = signature
+            return
+
+        self._pending_signature = None
+        self.reload()
+
+    def _watch(self):
+        """Background watcher loop."""
+        logger.info(f"Watching {self.directory} for new homicide exports every {self.poll_interval}s")
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self._poll_once()
+            except Exception as e:
+                logger.error(f"Error checking for homicide dataset updates: {str(e)}")
+
+    def start(self, load_initial: bool = True):
+        """
+        Load the initial snapshot and start the background watcher.
+
+        Args:
+            load_initial: Build the first snapshot synchronously before returning
+        """
+        if load_initial:
+            self.reload()
+
+        if self._watcher is None or not self._watcher.is_alive():
+            self._stop_event.clear()
+            self._watcher = threading.Thread(target=self._watch, name="dataset-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        """Stop the background watcher."""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval + 1)
+
+    def status(self) -> Dict[str, Any]:
+        """Return the active snapshot summary and watcher state."""
+        snapshot = self._active
+        return {
+            "active": snapshot.describe() if snapshot else None,
+            "retired_in_use": sorted(retired.version for retired in list(self._retired)),
+            "watching": str(self.directory),
+            "pattern": self.pattern,
+            "watcher_running": bool(self._watcher and self._watcher.is_alive()),
+            "last_error": self._last_error
+        }
@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Entity Index - Cross-Case Link Analysis over Murder, Theft and Fraud Cases
+
+Names, weapons, vehicles, addresses and phone numbers recur across the free
+text of stored cases (suspects, witnesses, evidence, locations). This module
+extracts those entities with rules and regular expressions (no external
+services) and keeps an inverted index from normalized entity to the cases
+that mention it, so "which other cases mention this suspect / vehicle /
+address" is a dictionary lookup.
+
+The index is incremental: new cases are added as they are stored, and sync()
+picks up cases written to the repository by other processes (the theft and
+fraud CLIs) by reading only records newer than the last one indexed.
+
+Usage:
+    python entity_index.py --lookup "Robert Johnson"
+    python entity_index.py --lookup "ABC-1234" --type vehicle
+    python entity_index.py --case CASE-001
+
+Author: Augment Agent
+"""
+
+import argparse
+import heapq
+import logging
+import re
+import threading
+from itertools import islice
+from typing import Dict, Any, Optional, List, Tuple
+
+from case_repository import CaseRepository
+
+logger = logging.getLogger(__name__)
+
+# Constants
+ENTITY_TYPES = ["person", "address", "place", "vehicle", "weapon", "phone", "email", "ip"]
+DEFAULT_LIMIT = 20
+# Entities mentioned by more cases than this ("knife", a city-wide place) are too common to count as a link
+MAX_LINK_CASES = 1000
+
+# Fields that identify the entry or hold dates, times and amounts rather than entities
+EXCLUDED_FIELDS = {"case_id", "question", "date_of_crime", "time_of_crime", "date_of_theft", "time_of_theft",
+                   "date_detected", "victim_age", "victim_gender", "estimated_value", "amount_involved"}
+
+# Person names are only taken from fields that describe people
+PERSON_FIELDS = {"victim_name", "witnesses", "suspects", "victim_details", "suspect_information"}
+
+# The location field itself is indexed as a place
+PLACE_FIELDS = {"location"}
+
+# Capitalized words that start sentences or name roles and places, not people
+NON_NAME_WORDS = {
+    "Unknown", "Unidentified", "None", "No", "The", "A", "An", "And", "Or", "But", "He", "She", "They", "His",
+    "Her", "Their", "Victim", "Suspect", "Suspects", "Witness", "Witnesses", "Neighbor", "Neighbour", "Store",
+    "Shop", "Mall", "Bank", "Police", "Officer", "Detective", "Security", "Street", "Road", "Avenue", "Lane",
+    "Drive", "Apartment", "Hotel", "Motel", "Downtown", "North", "South", "East", "West", "Mr", "Mrs", "Ms",
+    "Dr", "Customer", "Service", "Manager", "Clerk", "Owner", "Driver", "Taxi", "Possibly", "Several", "Two",
+    "Three", "Multiple", "CCTV", "DNA", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday",
+    "Sunday"
+}
+
+STREET_SUFFIXES = {
+    "street": "street", "st": "street", "road": "road", "rd": "road", "avenue": "avenue", "ave": "avenue",
+    "lane": "lane", "ln": "lane", "drive": "drive", "dr": "drive", "boulevard": "boulevard", "blvd": "boulevard",
+    "way": "way", "court": "court", "ct": "court", "place": "place", "pl": "place", "highway": "highway",
+    "hwy": "highway", "terrace": "terrace", "parkway": "parkway"
+}
+
+VEHICLE_MAKES = [
+    "toyota", "honda", "ford", "chevrolet", "chevy", "nissan", "bmw", "mercedes", "audi", "volkswagen", "vw",
+    "hyundai", "kia", "mazda", "subaru", "jeep", "dodge", "tesla", "lexus", "volvo", "suzuki", "tata",
+    "mahindra", "maruti", "harley"
+]
+
+# Surface forms mapped to one canonical weapon
+WEAPONS = {
+    "knife": "knife", "kitchen knife": "knife", "blade": "knife", "dagger": "knife", "machete": "machete",
+    "handgun": "handgun", "pistol": "handgun", "revolver": "handgun", "9mm": "handgun", "gun": "firearm",
+    "firearm": "firearm", "rifle": "rifle", "shotgun": "shotgun", "baseball bat": "bat", "bat": "bat",
+    "hammer": "hammer", "claw hammer": "hammer", "crowbar": "crowbar", "screwdriver": "screwdriver",
+    "rope": "rope", "nylon rope": "rope", "wire": "wire", "pillow": "pillow", "brick": "brick",
+    "poison": "poison", "arsenic": "poison", "cyanide": "poison", "axe": "axe", "acid": "acid"
+}
+
+ADDRESS_PATTERN = re.compile(
+    r"\b(\d{1,5})\s+((?:[A-Z][a-zA-Z]+\s+){0,3})(" + "|".join(STREET_SUFFIXES) + r")\b\.?",
+    re.IGNORECASE
+)
+PLATE_PATTERN = re.compile(r"\b(?:plate|registration|reg\.?|license)\s*(?:no\.?|number|#)?\s*:?\s*"
+                           r"([A-Z0-9]{2,4}[- ]?[A-Z0-9]{2,5})\b", re.IGNORECASE)
+VEHICLE_PATTERN = re.compile(r"\b(" + "|".join(VEHICLE_MAKES) + r")(?:\s+([A-Z0-9][a-zA-Z0-9-]+))?",
+                             re.IGNORECASE)
+WEAPON_PATTERN = re.compile(r"\b(" + "|".join(sorted(WEAPONS, key=len, reverse=True)) + r")s?\b",
+                            re.IGNORECASE)
+PHONE_PATTERN = re.compile(r"(?<![\w.])\+?\d[\d\s().-]{7,}\d(?![\w.])")
+EMAIL_PATTERN = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+IP_PATTERN = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
+NAME_PATTERN = re.compile(r"\b(?:(?:Mr|Mrs|Ms|Dr)\.?\s+)?([A-Z][a-z]+(?:[-'][A-Z][a-z]+)?"
+                          r"(?:\s+[A-Z]\.)?(?:\s+[A-Z][a-z]+(?:[-'][A-Z][a-z]+)?){1,2})\b")
+
+def normalize_text(value: str) -> str:
+    """Lower-case text with punctuation and repeated whitespace removed."""
+    return re.sub(r"[^a-z0-9]+", " ", value.lower()).strip()
+
+def normalize_entity(entity_type: str, value: str) -> str:
+    """
+    Normalize an entity value so different spellings of the same entity share one key.
+
+    Args:
+        entity_type: One of ENTITY_TYPES
+        value: Raw entity text
+
+    Returns:
+        Normalized value
+    """
+    if entity_type == "phone":
+        digits = re.sub(r"\D", "", value)
+        # Compare national numbers: "+1 555 010 2233" and "555-010-2233" are the same line
+        return digits[-10:]
+    if entity_type == "vehicle":
+        return re.sub(r"[^a-z0-9]+", "", value.lower()) if re.search(r"\d", value) else normalize_text(value)
+    if entity_type in ("email", "ip"):
+        return value.lower().strip()
+    if entity_type == "weapon":
+        return WEAPONS.get(normalize_text(value), normalize_text(value))
+    if entity_type == "address":
+        words = normalize_text(value).split()
+        return " ".join(STREET_SUFFIXES.get(word, word) for word in words)
+    if entity_type == "person":
+        words = [word for word in normalize_text(value).split() if word not in ("mr", "mrs", "ms", "dr")]
+        return " ".join(word for word in words if len(word) > 1)
+    return normalize_text(value)
+
+def extract_entities(case_details: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    """
+    Extract entities from the free-text fields of a case.
+
+    Args:
+        case_details: Collected case details (any agent)
+
+    Returns:
+        Distinct (entity type, normalized value, field) tuples
+    """
+    found = {}
+    def add(entity_type, value, field):
+        normalized = normalize_entity(entity_type, value)
+        if normalized:
+            found.setdefault((entity_type, normalized), field)
+
+    for field, value in case_details.items():
+        if field in EXCLUDED_FIELDS or not isinstance(value, str) or not value.strip():
+            continue
+
+        for match in EMAIL_PATTERN.finditer(value):
+            add("email", match.group(0), field)
+        for match in IP_PATTERN.finditer(value):
+            add("ip", match.group(0), field)
+        text = IP_PATTERN.sub(" ", EMAIL_PATTERN.sub(" ", value))
+        for match in PHONE_PATTERN.finditer(text):
+            if len(re.sub(r"\D", "", match.group(0))) >= 9:
+                add("phone", match.group(0), field)
+        for match in ADDRESS_PATTERN.finditer(text):
+            add("address", match.group(0), field)
+        for match in PLATE_PATTERN.finditer(text):
+            if re.search(r"\d", match.group(1)):
+                add("vehicle", match.group(1), field)
+        for match in VEHICLE_PATTERN.finditer(text):
+            add("vehicle", match.group(0) if match.group(2) else match.group(1), field)
+        for match in WEAPON_PATTERN.finditer(text):
+            add("weapon", match.group(1), field)
+
+        if field in PERSON_FIELDS:
+            for match in NAME_PATTERN.finditer(text):
+                words = match.group(1).split()
+                if not any(word.strip(".") in NON_NAME_WORDS or word.lower() in VEHICLE_MAKES for word in words):
+                    add("person", match.group(1), field)
+
+        if field in PLACE_FIELDS and value.strip().lower() != "unknown":
+            add("place", value, field)
+
+    return [(entity_type, normalized, field) for (entity_type, normalized), field in found.items()]
+
+class EntityIndex:
+    """
+    Inverted index from normalized entity to the stored cases that mention it.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._lock = threading.Lock()
+        # (entity type, normalized value) -> {record ID: field the entity was found in}
+        self._postings = {}
+        # Record ID -> entity keys, for related-case queries
+        self._case_entities = {}
+        self._cases = {}
+        # Highest record ID read by sync(); cases added directly do not move it, so records stored
+        # by other processes with lower IDs are still picked up
+        self.last_record_id = 0
+
+    def __len__(self) -> int:
+        return len(self._cases)
+
+    @property
+    def entity_count(self) -> int:
+        """Number of distinct entities."""
+        return len(self._postings)
+
+    @classmethod
+    def from_repository(cls, repository, agent: Optional[str] = None) -> "EntityIndex":
+        """
+        Build the index from the stored cases of every agent (or one agent).
+
+        Args:
+            repository: CaseRepository instance
+            agent: Optional agent filter
+
+        Returns:
+            EntityIndex instance
+        """
+        index = cls()
+        index.sync(repository, agent=agent)
+        logger.info(f"Entity index built with {index.entity_count} entities from {len(index)} cases")
+        return index
+
+    def sync(self, repository, agent: Optional[str] = None) -> int:
+        """
+        Index the repository records stored since the last indexed record.
+
+        Args:
+            repository: CaseRepository instance
+            agent: Optional agent filter
+
+        Returns:
+            Number of newly indexed cases
+        """
+        added = 0
+        for record in repository.iter_cases(agent=agent, after_id=self.last_record_id):
+            added += self.add(record["id"], record["agent"], record["collected_data"])
+            with self._lock:
+                self.last_record_id = max(self.last_record_id, record["id"])
+        return added
+
+    def add(self, record_id: int, agent: str, case_details: Dict[str, Any]) -> bool:
+        """
+        Add a stored case to the index.
+
+        Args:
+            record_id: Case repository record ID
+            agent: Agent type of the case
+            case_details: Collected case details
+
+        Returns:
+            False if the case was already indexed
+        """
+        entities = extract_entities(case_details)
+        with self._lock:
+            if record_id in self._cases:
+                return False
+            self._cases[record_id] = {"record_id": record_id, "agent": agent, "case_id": case_details.get("case_id")}
+            keys = []
+            for entity_type, normalized, field in entities:
+                key = (entity_type, normalized)
+                self._postings.setdefault(key, {})[record_id] = field
+                keys.append(key)
+            self._case_entities[record_id] = keys
+        return True
+
+    def lookup(self, entity: str, entity_type: Optional[str] = None,
+               limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Return the cases that mention an entity.
+
+        Args:
+            entity: Entity text as typed ("Robert Johnson", "abc 1234", "12 Elm St")
+            entity_type: Optional entity type; all types are tried otherwise
+            limit: Maximum number of cases
+
+        Returns:
+            List of {"record_id", "agent", "case_id", "entity_type", "entity", "field"}, most recent first
+        """
+        with self._lock:
+            # Each type normalizes differently, so an untyped lookup probes one key per type
+            keys = {(candidate_type, normalize_entity(candidate_type, entity))
+                    for candidate_type in ([entity_type] if entity_type else ENTITY_TYPES)}
+
+            # Postings are in indexing order, so the newest cases of each entity are at the end
+            newest = []
+            for key in keys:
+                postings = self._postings.get(key, {})
+                for record_id in islice(reversed(postings), limit):
+                    newest.append((record_id, key, postings[record_id]))
+
+            return [
+                {**self._cases[record_id], "entity_type": key[0], "entity": key[1], "field": field}
+                for record_id, key, field in heapq.nlargest(limit, newest, key=lambda item: item[0])
+            ]
+
+    def entities(self, record_id: int) -> List[Dict[str, str]]:
+        """Return the entities extracted from a stored case."""
+        with self._lock:
+            return [{"entity_type": entity_type, "entity": normalized}
+                    for entity_type, normalized in self._case_entities.get(record_id, [])]
+
+    def related(self, record_id: int, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Return the other cases that share at least one entity with a stored case.
+
+        Args:
+            record_id: Case repository record ID
+            limit: Maximum number of cases
+
+        Returns:
+            List of case summaries with the "shared" entities, most shared first
+        """
+        with self._lock:
+            shared = {}
+            for key in self._case_entities.get(record_id, []):
+                postings = self._postings.get(key, {})
+                if len(postings) > MAX_LINK_CASES:
+                    continue
+                for other_id in postings:
+                    if other_id != record_id:
+                        shared.setdefault(other_id, []).append({"entity_type": key[0], "entity": key[1]})
+
+            results = [{**self._cases[other_id], "shared": entities} for other_id, entities in shared.items()]
+
+        return heapq.nlargest(limit, results, key=lambda result: (len(result["shared"]), result["record_id"]))
+
+def main():
+    """Main function to query the entity index."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Cross-case entity index")
+    parser.add_argument("--db", help="Path to the case database")
+    parser.add_argument("--lookup", help="Cases mentioning an entity (name, plate, address, phone, ...)")
+    parser.add_argument("--type", choices=ENTITY_TYPES, help="Entity type for --lookup")
+    parser.add_argument("--case", help="Entities and related cases of a case ID")
+    parser.add_argument("--agent", help="Only index cases of one agent")
+
+    args = parser.parse_args()
+
+    with CaseRepository(args.db) as repository:
+        index = EntityIndex.from_repository(repository, agent=args.agent)
+
+        if args.lookup:
+            for result in index.lookup(args.lookup, entity_type=args.type):
+                print(f"#{result['record_id']} [{result['agent']}] {result['case_id']}: "
+                      f"{result['entity_type']} '{result['entity']}' in {result['field']}")
+
+        if args.case:
+            for record in repository.find_by_case_id(args.case):
+                entities = ", ".join(f"{entity['entity_type']}:{entity['entity']}"
+                                     for entity in index.entities(record["id"]))
+                print(f"#{record['id']} [{record['agent']}] {record['case_id']}: {entities or 'no entities'}")
+                for related in index.related(record["id"]):
+                    shared = ", ".join(entity["entity"] for entity in related["shared"])
+                    print(f"  -> #{related['record_id']} [{related['agent']}] {related['case_id']} ({shared})")
+
+        if not args.lookup and not args.case:
+            print(f"{index.entity_count} entities indexed from {len(index)} cases")
+
+if __name__ == "__main__":
+    main()
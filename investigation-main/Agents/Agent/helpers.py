@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Helpers - Small utilities shared by the agent modules and benchmarks
+
+  * percentile(): value at a fraction of a sorted list, for latency and wait
+    percentiles in stats endpoints, batch summaries and benchmarks
+  * file_signature(): cheap (mtime_ns, size) change signature, for files that
+    are reloaded when they change on disk
+
+Usage:
+    p95 = percentile(sorted(latencies), 0.95)
+    if file_signature(path) != last_signature:
+        reload(path)
+
+Author: Augment Agent
+"""
+
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """
+    Value at a fraction of a sorted list (nearest rank, no interpolation).
+
+    Args:
+        sorted_values: Values sorted in ascending order
+        fraction: Fraction between 0 and 1 (0.95 for the p95)
+
+    Returns:
+        The value at that fraction, or 0.0 if the list is empty
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Cheap change signature of a file.
+
+    Args:
+        path: File path
+
+    Returns:
+        (mtime_ns, size), or None if the file does not exist
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Homicide Dataset - Loading and Rollup Cubes
+
+This module loads the UNODC homicide export from the "murder datasets" directory
+and materializes rollup cubes (Region x Subregion x Year x Gender x Indicator)
+as dense arrays, so dashboard totals and rates can be served with O(1) lookups
+instead of being recomputed from the raw rows on every request.
+
+Usage:
+    from homicide_dataset import load_homicide_frame, HomicideRollupCube
+
+    cube = HomicideRollupCube.from_frame(load_homicide_frame())
+    cube.cell("Europe", "All", 2015, "Total (all ages)", "Homicide: # of victims")
+
+Author: Augment Agent
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DATASETS_DIR = Path(__file__).resolve().parent / "murder datasets"
+HOMICIDE_DATASET_FILE = DATASETS_DIR / "homicide_country_download.xlsx"
+ALL_LABEL = "All"
+COUNT_UNIT = "Count"
+RATE_UNIT = "Rate per  100,000 population"
+RATE_SCALE = 100000.0
+
+# Column names used by the UNODC export
+HOMICIDE_COLUMNS = [
+    "Region", "Subregion", "country", "iso3_code", "Indicator", "Disaggregation",
+    "Gender", "Source", "Unit", "Year", "Value", "Footnote"
+]
+
+def load_homicide_frame(path: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Load and clean the UNODC homicide export.
+
+    Args:
+        path: Optional path to the xlsx export (defaults to the bundled file)
+
+    Returns:
+        DataFrame with stripped labels, integer years and numeric values.
+        Rows without a usable value are dropped.
+    """
+    path = Path(path) if path else HOMICIDE_DATASET_FILE
+    logger.info(f"Loading homicide dataset from {path}")
+
+    frame = pd.read_excel(path)
+    return clean_homicide_frame(frame)
+
+def clean_homicide_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize a raw homicide frame.
+
+    Args:
+        frame: Raw DataFrame with the UNODC columns
+
+    Returns:
+        Cleaned DataFrame
+    """
+    missing = [column for column in HOMICIDE_COLUMNS if column not in frame.columns and column != "Footnote"]
+    if missing:
+        raise ValueError(f"Homicide dataset is missing columns: {missing}")
+
+    frame = frame.copy()
+    for column in ["Region", "Subregion", "country", "iso3_code", "Indicator", "Gender", "Unit"]:
+        frame[column] = frame[column].astype(str).str.strip()
+
+    # Values are mostly numeric, but the export contains " NA" and a few "1," style entries
+    values = frame["Value"].astype(str).str.strip().str.rstrip(",")
+    frame["Value"] = pd.to_numeric(values, errors="coerce")
+    frame["Year"] = pd.to_numeric(frame["Year"], errors="coerce")
+
+    frame = frame.dropna(subset=["Value", "Year"])
+    frame["Year"] = frame["Year"].astype(int)
+
+    logger.info(f"Homicide dataset cleaned: {len(frame)} usable rows")
+    return frame.reset_index(drop=True)
+
+class HomicideRollupCube:
+    """
+    Dense rollup cube over Region x Subregion x Year x Gender x Indicator.
+
+    Index 0 of the region and subregion axes is the "All" rollup, so regional,
+    subregional and global totals are all precomputed cells. Each cell holds:
+
+    - count: total number of victims reported
+    - rate: population-weighted rate per 100,000 (from countries reporting both units)
+    - countries: number of countries contributing to the count
+    """
+
+    def __init__(self, regions: List[str], subregions: List[str], years: List[int],
+                 genders: List[str], indicators: List[str], counts: np.ndarray,
+                 rate_counts: np.ndarray, populations: np.ndarray, countries: np.ndarray):
+        """
+        Initialize the cube from precomputed arrays.
+
+        Args:
+            regions: Region labels (index 0 is "All")
+            subregions: Subregion labels (index 0 is "All")
+            years: Contiguous list of years
+            genders: Gender labels
+            indicators: Indicator labels
+            counts: Victim counts per cell
+            rate_counts: Victim counts restricted to countries with a known population
+            populations: Derived population per cell
+            countries: Number of reporting countries per cell
+        """
+        self.regions = regions
+        self.subregions = subregions
+        self.years = years
+        self.genders = genders
+        self.indicators = indicators
+        self.counts = counts
+        self.populations = populations
+        self.countries = countries
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.rates = np.where(populations > 0, rate_counts / populations * RATE_SCALE, np.nan)
+
+        # Label -> index maps for O(1) cell lookup
+        self._region_index = {label: i for i, label in enumerate(regions)}
+        self._subregion_index = {label: i for i, label in enumerate(subregions)}
+        self._gender_index = {label: i for i, label in enumerate(genders)}
+        self._indicator_index = {label: i for i, label in enumerate(indicators)}
+        self._first_year = years[0] if years else 0
+
+        self.etag = self._compute_etag()
+        self._payload_bytes = None
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "HomicideRollupCube":
+        """
+        Build the cube from a cleaned homicide frame.
+
+        Args:
+            frame: DataFrame returned by load_homicide_frame()
+
+        Returns:
+            HomicideRollupCube instance
+
+        Raises:
+            ValueError: If the frame has no rows with a year (e.g. every row failed cleaning)
+        """
+        if frame["Year"].dropna().empty:
+            raise ValueError("no usable rows")
+
+        regions = [ALL_LABEL] + sorted(frame["Region"].unique().tolist())
+        subregions = [ALL_LABEL] + sorted(frame["Subregion"].unique().tolist())
+        genders = sorted(frame["Gender"].unique().tolist())
+        indicators = sorted(frame["Indicator"].unique().tolist())
+        first_year, last_year = int(frame["Year"].min()), int(frame["Year"].max())
+        years = list(range(first_year, last_year + 1))
+
+        shape = (len(regions), len(subregions), len(years), len(genders), len(indicators))
+        counts = np.zeros(shape)
+        rate_counts = np.zeros(shape)
+        populations = np.zeros(shape)
+        countries = np.zeros(shape, dtype=np.int32)
+
+        # Pair every count with the matching rate to derive the population behind it
+        keys = ["Region", "Subregion", "iso3_code", "Indicator", "Gender", "Year"]
+        count_rows = frame[frame["Unit"] == COUNT_UNIT][keys + ["Value"]]
+        rate_rows = frame[frame["Unit"] == RATE_UNIT][keys + ["Value"]]
+        merged = count_rows.merge(rate_rows, on=keys, how="left", suffixes=("_count", "_rate"))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            population = merged["Value_count"].to_numpy() * RATE_SCALE / merged["Value_rate"].to_numpy()
+        has_population = np.isfinite(population) & (population > 0)
+        population = np.where(has_population, population, 0.0)
+        rate_count = np.where(has_population, merged["Value_count"].to_numpy(), 0.0)
+
+        region_idx = merged["Region"].map({label: i for i, label in enumerate(regions)}).to_numpy()
+        subregion_idx = merged["Subregion"].map({label: i for i, label in enumerate(subregions)}).to_numpy()
+        year_idx = merged["Year"].to_numpy() - first_year
+        gender_idx = merged["Gender"].map({label: i for i, label in enumerate(genders)}).to_numpy()
+        indicator_idx = merged["Indicator"].map({label: i for i, label in enumerate(indicators)}).to_numpy()
+        all_idx = np.zeros_like(region_idx)
+
+        # Scatter every row into its own cell and the three rollup cells above it
+        for r_idx, s_idx in [(region_idx, subregion_idx), (region_idx, all_idx),
+                             (all_idx, subregion_idx), (all_idx, all_idx)]:
+            index = (r_idx, s_idx, year_idx, gender_idx, indicator_idx)
+            np.add.at(counts, index, merged["Value_count"].to_numpy())
+            np.add.at(rate_counts, index, rate_count)
+            np.add.at(populations, index, population)
+            np.add.at(countries, index, 1)
+
+        logger.info(f"Built homicide rollup cube with shape {shape} from {len(merged)} count rows")
+        return cls(regions, subregions, years, genders, indicators,
+                   counts, rate_counts, populations, countries)
+
+    def _compute_etag(self) -> str:
+        """Compute a content hash used as the HTTP ETag for this cube."""
+        digest = hashlib.sha1()
+        digest.update(json.dumps([self.regions, self.subregions, self.years,
+                                  self.genders, self.indicators]).encode("utf-8"))
+        for array in (self.counts, self.populations, self.countries):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def _offset(self, region: str, subregion: str, year: int, gender: str, indicator: str) -> Optional[tuple]:
+        """Translate labels into an array index, or None if any label is unknown."""
+        year_idx = int(year) - self._first_year
+        if not 0 <= year_idx < len(self.years):
+            return None
+
+        try:
+            return (
+                self._region_index[region],
+                self._subregion_index[subregion],
+                year_idx,
+                self._gender_index[gender],
+                self._indicator_index[indicator]
+            )
+        except KeyError:
+            return None
+
+    def cell(self, region: str, subregion: str, year: int, gender: str, indicator: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a single cube cell.
+
+        Args:
+            region: Region label or "All"
+            subregion: Subregion label or "All"
+            year: Year
+            gender: Gender label
+            indicator: Indicator label
+
+        Returns:
+            Dictionary with count, rate and countries, or None if a label is unknown
+        """
+        index = self._offset(region, subregion, year, gender, indicator)
+        if index is None:
+            return None
+
+        rate = self.rates[index]
+        return {
+            "count": float(self.counts[index]),
+            "rate": None if np.isnan(rate) else round(float(rate), 4),
+            "countries": int(self.countries[index])
+        }
+
+    def series(self, region: str, subregion: str, gender: str, indicator: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the yearly series for one Region/Subregion/Gender/Indicator slice.
+
+        Returns:
+            Dictionary of parallel year/count/rate/countries lists, or None if a label is unknown
+        """
+        index = self._offset(region, subregion, self._first_year, gender, indicator)
+        if index is None:
+            return None
+
+        r_idx, s_idx, _, g_idx, i_idx = index
+        rates = self.rates[r_idx, s_idx, :, g_idx, i_idx]
+        return {
+            "years": self.years,
+            "count": self.counts[r_idx, s_idx, :, g_idx, i_idx].tolist(),
+            "rate": [None if np.isnan(rate) else round(float(rate), 4) for rate in rates],
+            "countries": self.countries[r_idx, s_idx, :, g_idx, i_idx].tolist()
+        }
+
+    def to_payload(self) -> Dict[str, Any]:
+        """
+        Serialize the whole cube as flat row-major arrays.
+
+        The offset of a cell is computed from "shape" in the same order as "dimensions".
+        """
+        rates = np.round(self.rates, 4).ravel()
+        return {
+            "etag": self.etag,
+            "dimensions": {
+                "region": self.regions,
+                "subregion": self.subregions,
+                "year": self.years,
+                "gender": self.genders,
+                "indicator": self.indicators
+            },
+            "shape": list(self.counts.shape),
+            "measures": {
+                "count": self.counts.ravel().tolist(),
+                "rate": [None if np.isnan(rate) else float(rate) for rate in rates],
+                "countries": self.countries.ravel().tolist()
+            }
+        }
+
+    def payload_bytes(self) -> bytes:
+        """Return the serialized payload, computing it only once per cube."""
+        if self._payload_bytes is None:
+            self._payload_bytes = json.dumps(self.to_payload(), separators=(",", ":")).encode("utf-8")
+        return self._payload_bytes
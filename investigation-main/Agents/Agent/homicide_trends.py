@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Homicide Trends - Batched Trend and Anomaly Detection
+
+This module computes year-over-year change, rolling z-scores and least-squares
+trend slopes for every country/indicator/gender/unit series in the homicide
+dataset in one vectorized pass over a (series x year) matrix. The result is a
+precomputed table that the Murder Agent can cite in its analyses.
+
+Usage:
+    python homicide_trends.py                # Compute and store the trends table
+    python homicide_trends.py --country MEX  # Print the statements for one country
+
+Author: Augment Agent
+"""
+
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+import pandas as pd
+
+from homicide_dataset import load_homicide_frame, RATE_UNIT
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DERIVED_DIR = Path(__file__).resolve().parent / "derived"
+TRENDS_FILE = DERIVED_DIR / "homicide_trends.csv"
+SERIES_KEYS = ["iso3_code", "country", "Region", "Subregion", "Indicator", "Gender", "Unit"]
+ZSCORE_WINDOW = 5
+ANOMALY_ZSCORE = 3.0
+RECENT_YEARS = 5
+# Whole-population slice, by preference: victim counts use the first, perpetrator indicators the second
+TOTAL_GENDERS = ["Total (all ages)", "All"]
+
+def build_series_matrix(frame: pd.DataFrame):
+    """
+    Pivot the homicide frame into a dense (series x year) matrix.
+
+    Args:
+        frame: Cleaned homicide frame
+
+    Returns:
+        Tuple of (series index DataFrame, years array, values matrix with NaN gaps)
+    """
+    pivot = frame.pivot_table(index=SERIES_KEYS, columns="Year", values="Value", aggfunc="first")
+    first_year, last_year = int(pivot.columns.min()), int(pivot.columns.max())
+    years = np.arange(first_year, last_year + 1)
+    pivot = pivot.reindex(columns=years)
+
+    series = pivot.index.to_frame(index=False)
+    return series, years, pivot.to_numpy(dtype=float)
+
+def _last_valid(values: np.ndarray):
+    """Return (column index, value) of the last non-NaN entry in every row (-1/NaN if none)."""
+    valid = ~np.isnan(values)
+    reversed_idx = np.argmax(valid[:, ::-1], axis=1)
+    last_idx = values.shape[1] - 1 - reversed_idx
+    has_any = valid.any(axis=1)
+    last_idx = np.where(has_any, last_idx, -1)
+    last_value = np.where(has_any, values[np.arange(len(values)), np.clip(last_idx, 0, None)], np.nan)
+    return last_idx, last_value
+
+def _first_valid(values: np.ndarray):
+    """Return (column index, value) of the first non-NaN entry in every row (-1/NaN if none)."""
+    valid = ~np.isnan(values)
+    first_idx = np.argmax(valid, axis=1)
+    has_any = valid.any(axis=1)
+    first_idx = np.where(has_any, first_idx, -1)
+    first_value = np.where(has_any, values[np.arange(len(values)), np.clip(first_idx, 0, None)], np.nan)
+    return first_idx, first_value
+
+def year_over_year_change(values: np.ndarray) -> np.ndarray:
+    """
+    Relative change against the previous year for every cell.
+
+    Returns:
+        Matrix of the same shape, NaN where either year is missing or the base is zero
+    """
+    change = np.full_like(values, np.nan)
+    previous = values[:, :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change[:, 1:] = np.where(previous != 0, (values[:, 1:] - previous) / previous, np.nan)
+    return change
+
+def rolling_zscores(values: np.ndarray, window: int = ZSCORE_WINDOW) -> np.ndarray:
+    """
+    Z-score of every value against the preceding `window` years of the same series.
+
+    At least 3 prior observations with non-zero spread are required, otherwise NaN.
+    """
+    n_series, n_years = values.shape
+    padded = np.concatenate([np.full((n_series, window), np.nan), values], axis=1)
+    # windows[:, t] covers the `window` years strictly before year t
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)[:, :n_years]
+
+    # nanmean/nanstd written out by hand to avoid "empty slice" warnings on sparse series
+    observed = (~np.isnan(windows)).sum(axis=2)
+    filled = np.nan_to_num(windows, nan=0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=2) / observed
+        centered = np.where(np.isnan(windows), 0.0, windows - mean[:, :, None])
+        std = np.sqrt((centered * centered).sum(axis=2) / observed)
+        zscores = (values - mean) / std
+
+    return np.where((observed >= 3) & (std > 0), zscores, np.nan)
+
+def trend_slopes(values: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """
+    Least-squares slope (units per year) of every series, ignoring missing years.
+
+    Returns:
+        Array with one slope per series, NaN for series with fewer than two points
+    """
+    mask = ~np.isnan(values)
+    n = mask.sum(axis=1)
+    x = np.broadcast_to(years.astype(float), values.shape)
+    y = np.where(mask, values, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.where(mask, x, 0.0).sum(axis=1) / n
+        y_mean = y.sum(axis=1) / n
+        dx = np.where(mask, x - x_mean[:, None], 0.0)
+        dy = np.where(mask, y - y_mean[:, None], 0.0)
+        slopes = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+
+    return np.where(n >= 2, slopes, np.nan)
+
+def compute_trends(frame: pd.DataFrame, window: int = ZSCORE_WINDOW,
+                   recent_years: int = RECENT_YEARS) -> pd.DataFrame:
+    """
+    Compute the trends table for every series in the dataset.
+
+    Args:
+        frame: Cleaned homicide frame
+        window: Rolling window (years) for the z-scores
+        recent_years: Horizon (years) for the recent change and slope
+
+    Returns:
+        DataFrame with one row per country/indicator/gender/unit series
+    """
+    series, years, values = build_series_matrix(frame)
+
+    yoy = year_over_year_change(values)
+    zscores = rolling_zscores(values, window)
+    slopes = trend_slopes(values, years)
+
+    last_idx, last_value = _last_valid(values)
+    first_idx, first_value = _first_valid(values)
+    rows = np.arange(len(values))
+    safe_last = np.clip(last_idx, 0, None)
+
+    # Recent horizon: the `recent_years` years ending at each series' latest observation
+    offsets = np.arange(values.shape[1])[None, :] - safe_last[:, None]
+    recent_mask = (offsets <= 0) & (offsets > -(recent_years + 1))
+    recent_values = np.where(recent_mask, values, np.nan)
+    recent_start_idx, recent_start_value = _first_valid(recent_values)
+    recent_slopes = trend_slopes(recent_values, years)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        recent_change = np.where(recent_start_value != 0,
+                                 (last_value - recent_start_value) / recent_start_value, np.nan)
+
+    abs_z = np.abs(np.nan_to_num(zscores, nan=0.0))
+    anomaly_cells = abs_z >= ANOMALY_ZSCORE
+    anomaly_years = [
+        ",".join(str(year) for year in years[row_mask]) for row_mask in anomaly_cells
+    ]
+
+    table = series.copy()
+    table["first_year"] = np.where(first_idx >= 0, years[np.clip(first_idx, 0, None)], -1)
+    table["last_year"] = np.where(last_idx >= 0, years[safe_last], -1)
+    table["observations"] = (~np.isnan(values)).sum(axis=1)
+    table["first_value"] = first_value
+    table["last_value"] = last_value
+    table["yoy_change"] = yoy[rows, safe_last]
+    table["zscore_last"] = zscores[rows, safe_last]
+    table["max_abs_zscore"] = abs_z.max(axis=1)
+    table["anomaly_years"] = anomaly_years
+    table["slope"] = slopes
+    table["recent_start_year"] = np.where(recent_start_idx >= 0, years[np.clip(recent_start_idx, 0, None)], -1)
+    table["recent_change"] = recent_change
+    table["recent_slope"] = recent_slopes
+
+    return table[table["observations"] > 0].reset_index(drop=True)
+
+def save_trends(table: pd.DataFrame, path: Optional[Path] = None) -> Path:
+    """Store the trends table as CSV and return its path."""
+    path = Path(path) if path else TRENDS_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(path, index=False)
+    logger.info(f"Stored {len(table)} trend rows in {path}")
+    return path
+
+def load_trends(path: Optional[Path] = None) -> Optional[pd.DataFrame]:
+    """Load a previously stored trends table, or None if it does not exist."""
+    path = Path(path) if path else TRENDS_FILE
+    if not path.exists():
+        return None
+    return pd.read_csv(path, keep_default_na=False, na_values=[""])
+
+def describe_country_trends(table: pd.DataFrame, iso3_code: str,
+                            gender: Optional[str] = None, limit: int = 3) -> List[str]:
+    """
+    Build citable sentences about a country's recent homicide trends.
+
+    Args:
+        table: Trends table from compute_trends()
+        iso3_code: ISO3 country code
+        gender: Gender slice to describe ("Female", "Male"); None means each indicator's total
+        limit: Maximum number of sentences
+
+    Returns:
+        List of sentences such as "Homicide rates in Mexico rose 30% over 5 years (2015-2020)."
+    """
+    rows = table[(table["iso3_code"] == iso3_code) & (table["Unit"] == RATE_UNIT)]
+    if gender is None or gender in TOTAL_GENDERS:
+        # Indicators name their total differently; keep the first of TOTAL_GENDERS each one has
+        rows = rows[rows["Gender"].isin(TOTAL_GENDERS)]
+        rank = rows["Gender"].map(TOTAL_GENDERS.index)
+        rows = rows[rank == rank.groupby(rows["Indicator"]).transform("min")]
+    else:
+        rows = rows[rows["Gender"] == gender]
+    statements = []
+
+    for _, row in rows.iterrows():
+        if pd.isna(row["recent_change"]) or row["recent_start_year"] < 0:
+            continue
+
+        span = int(row["last_year"]) - int(row["recent_start_year"])
+        if span <= 0:
+            continue
+
+        subject = "Homicide rates" if row["Indicator"] == "Homicide: # of victims" else f"Rates of {row['Indicator'].split(' - ')[-1]} homicide"
+        years = f"over {span} years ({int(row['recent_start_year'])}-{int(row['last_year'])})"
+        percent = abs(row["recent_change"]) * 100
+        if round(percent) == 0:
+            statement = f"{subject} in {row['country']} were unchanged {years}, at {row['last_value']:.2f} per 100,000."
+        else:
+            direction = "rose" if row["recent_change"] > 0 else "fell"
+            statement = (f"{subject} in {row['country']} {direction} {percent:.0f}% {years}, "
+                         f"reaching {row['last_value']:.2f} per 100,000.")
+        recent_anomalies = [year for year in str(row["anomaly_years"] or "").split(",")
+                            if year and int(year) >= row["recent_start_year"]]
+        if recent_anomalies:
+            statement += f" Unusual year(s) against the prior trend: {', '.join(recent_anomalies)}."
+        statements.append(statement)
+
+        if len(statements) >= limit:
+            break
+
+    return statements
+
+def run_trends_job(dataset_path: Optional[Path] = None, output_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Load the dataset, compute the trends table and store it.
+
+    Returns:
+        Dictionary with the table, output path and stage timings in seconds
+    """
+    start = time.perf_counter()
+    frame = load_homicide_frame(dataset_path)
+    loaded = time.perf_counter()
+    table = compute_trends(frame)
+    computed = time.perf_counter()
+    path = save_trends(table, output_path)
+    stored = time.perf_counter()
+
+    return {
+        "table": table,
+        "path": path,
+        "timings": {
+            "load": loaded - start,
+            "compute": computed - loaded,
+            "store": stored - computed
+        }
+    }
+
+def main():
+    """Main function to run the trends job."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Homicide trend and anomaly detection")
+    parser.add_argument("--dataset", help="Path to the homicide xlsx export")
+    parser.add_argument("--output", help="Path of the trends CSV to write")
+    parser.add_argument("--country", help="ISO3 code to describe after computing")
+
+    args = parser.parse_args()
+
+    result = run_trends_job(args.dataset, args.output)
+    timings = result["timings"]
+    print(f"Computed {len(result['table'])} series in {timings['compute'] * 1000:.1f} ms "
+          f"(load {timings['load']:.2f} s), stored in {result['path']}")
+
+    if args.country:
+        for statement in describe_country_trends(result["table"], args.country.upper()):
+            print(f"- {statement}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Location Resolver - Free-Text Location to ISO3
+
+Case locations are free text such as "789 Elm Street, Apartment 3C" or
+"Calle 5, Guadalajara, Mexico". This module resolves them to a country of the
+homicide dataset so cases can be joined with the national statistics.
+
+The resolver keeps three in-memory indexes built once from the dataset:
+
+- a token trie over country names, subregions and an alias table (exact phrases)
+- an ISO3 code table (upper-case 3-letter tokens)
+- a character trigram index that shortlists country names for scored fuzzy
+  matching of misspelled names
+
+Place names followed by a street suffix or preceded by a venue word ("Jordan
+Road", "Hotel Panama") are part of a street or venue name and do not match.
+
+Results are memoized in an LRU cache, so repeated locations cost a dict lookup.
+
+Usage:
+    from location_resolver import LocationResolver
+
+    resolver = LocationResolver.from_frame(load_homicide_frame())
+    match = resolver.resolve("12 Rua Augusta, Lisboa, Portgal")
+    match.iso3_code  # "PRT"
+
+Author: Augment Agent
+"""
+
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constants
+CACHE_SIZE = 10000
+MAX_PHRASE_TOKENS = 6
+FUZZY_MIN_LENGTH = 5
+FUZZY_THRESHOLD = 0.8
+MIN_SCORE = 0.5
+
+# Base scores by match kind (the best-scoring candidate wins)
+KIND_SCORES = {
+    "country": 1.0,
+    "alias": 0.95,
+    "iso3": 0.85,
+    "fuzzy": 0.9,  # Multiplied by the edit similarity
+    "subregion": 0.6
+}
+
+# Common names and sub-national places that do not appear verbatim in the dataset.
+# "Georgia" is deliberately left to the country, not the US state.
+LOCATION_ALIASES = {
+    "usa": "USA", "u s a": "USA", "u s": "USA", "united states": "USA",
+    "uk": "GBR", "u k": "GBR", "great britain": "GBR", "britain": "GBR", "england": "GBR",
+    "scotland": "GBR", "wales": "GBR", "northern ireland": "GBR",
+    "russia": "RUS", "south korea": "KOR", "korea": "KOR", "moldova": "MDA",
+    "iran": "IRN", "syria": "SYR", "vietnam": "VNM", "bolivia": "BOL", "venezuela": "VEN",
+    "tanzania": "TZA", "czech republic": "CZE", "macedonia": "MKD", "swaziland": "SWZ",
+    "cape verde": "CPV", "east timor": "TLS", "holland": "NLD", "the netherlands": "NLD",
+    "uae": "ARE", "emirates": "ARE", "hong kong": "HKG", "macao": "MAC", "macau": "MAC",
+    "taiwan": "TWN", "palestine": "PSE", "kosovo": "KOS", "burma": "MMR", "turkiye": "TUR",
+    "brunei": "BRN", "micronesia": "FSM", "vatican": "VAT",
+    # US states and DC
+    "alabama": "USA", "alaska": "USA", "arizona": "USA", "arkansas": "USA", "california": "USA",
+    "colorado": "USA", "connecticut": "USA", "delaware": "USA", "florida": "USA", "hawaii": "USA",
+    "idaho": "USA", "illinois": "USA", "indiana": "USA", "iowa": "USA", "kansas": "USA",
+    "kentucky": "USA", "louisiana": "USA", "maine": "USA", "maryland": "USA",
+    "massachusetts": "USA", "michigan": "USA", "minnesota": "USA", "mississippi": "USA",
+    "missouri": "USA", "montana": "USA", "nebraska": "USA", "nevada": "USA",
+    "new hampshire": "USA", "new jersey": "USA", "new mexico": "USA", "new york": "USA",
+    "north carolina": "USA", "north dakota": "USA", "ohio": "USA", "oklahoma": "USA",
+    "oregon": "USA", "pennsylvania": "USA", "rhode island": "USA", "south carolina": "USA",
+    "south dakota": "USA", "tennessee": "USA", "texas": "USA", "utah": "USA", "vermont": "USA",
+    "virginia": "USA", "washington": "USA", "west virginia": "USA", "wisconsin": "USA",
+    "wyoming": "USA", "district of columbia": "USA",
+    # Canadian provinces and Australian states
+    "ontario": "CAN", "quebec": "CAN", "british columbia": "CAN", "alberta": "CAN",
+    "manitoba": "CAN", "saskatchewan": "CAN", "nova scotia": "CAN",
+    "new south wales": "AUS", "victoria": "AUS", "queensland": "AUS", "tasmania": "AUS"
+}
+
+# Words that make a place name part of a street or venue name ("Jordan Road", "Hotel Panama",
+# "Calle Mexico") rather than the place itself
+STREET_SUFFIXES = {
+    "street", "st", "road", "rd", "avenue", "ave", "av", "lane", "ln", "boulevard", "blvd", "drive", "dr",
+    "way", "place", "pl", "court", "ct", "square", "sq", "terrace", "crescent", "close", "row", "alley",
+    "highway", "hwy", "parkway", "pkwy", "gardens", "walk", "mews"
+}
+VENUE_WORDS = {
+    "hotel", "motel", "hostel", "inn", "restaurant", "cafe", "bar", "pub", "club", "casino", "cinema",
+    "theatre", "theater", "calle", "avenida", "rua", "rue", "via", "strasse"
+}
+
+@dataclass(frozen=True)
+class LocationMatch:
+    """A resolved location."""
+    iso3_code: Optional[str]
+    country: Optional[str]
+    subregion: Optional[str]
+    region: Optional[str]
+    score: float
+    kind: str
+    matched_text: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the match to a JSON-serializable dictionary."""
+        return {
+            "iso3_code": self.iso3_code,
+            "country": self.country,
+            "subregion": self.subregion,
+            "region": self.region,
+            "score": round(self.score, 4),
+            "kind": self.kind,
+            "matched_text": self.matched_text
+        }
+
+def normalize_text(text: str) -> str:
+    """Lower-case, strip accents and collapse everything but letters/digits to single spaces."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+def _trigrams(text: str) -> set:
+    """Character trigrams of a padded string."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class LocationResolver:
+    """
+    Resolve free-text locations to countries of the homicide dataset.
+    """
+
+    def __init__(self, countries: List[Tuple[str, str, str, str]],
+                 aliases: Optional[Dict[str, str]] = None, cache_size: int = CACHE_SIZE):
+        """
+        Initialize the resolver.
+
+        Args:
+            countries: List of (iso3_code, country, subregion, region) tuples
+            aliases: Optional alias table (normalized phrase -> ISO3), defaults to LOCATION_ALIASES
+            cache_size: Size of the LRU memo
+        """
+        self._countries = {}
+        self._subregions = {}
+        # Token trie: nested dicts keyed by token; the None key holds (kind, target, display)
+        self._trie = {}
+        self._trigram_index = defaultdict(set)
+        self._fuzzy_names = {}
+
+        for iso3_code, country, subregion, region in countries:
+            self._countries[iso3_code] = (country, subregion, region)
+            self._subregions[subregion] = region
+
+            names = {normalize_text(country)}
+            # "Bolivia (Plurinational State of)" -> "bolivia"
+            base_name = normalize_text(re.sub(r"\(.*?\)", "", country))
+            if base_name:
+                names.add(base_name)
+
+            for name in names:
+                self._insert(name, ("country", iso3_code, country))
+                self._fuzzy_names[name] = iso3_code
+                for trigram in _trigrams(name):
+                    self._trigram_index[trigram].add(name)
+
+        for subregion in self._subregions:
+            self._insert(normalize_text(subregion), ("subregion", subregion, subregion))
+
+        for alias, iso3_code in (aliases if aliases is not None else LOCATION_ALIASES).items():
+            if iso3_code in self._countries:
+                self._insert(normalize_text(alias), ("alias", iso3_code, alias))
+
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+        # Street and city words recur across addresses, so fuzzy phrase lookups are memoized too
+        self._fuzzy_lookup = lru_cache(maxsize=cache_size)(self._fuzzy_lookup)
+        logger.info(f"Location resolver built with {len(self._countries)} countries and {len(self._subregions)} subregions")
+
+    @classmethod
+    def from_frame(cls, frame, **kwargs) -> "LocationResolver":
+        """
+        Build the resolver from a homicide frame or trends table.
+
+        Args:
+            frame: DataFrame with iso3_code, country, Subregion and Region columns
+
+        Returns:
+            LocationResolver instance
+        """
+        rows = frame[["iso3_code", "country", "Subregion", "Region"]].drop_duplicates("iso3_code")
+        return cls(list(rows.itertuples(index=False, name=None)), **kwargs)
+
+    def _insert(self, phrase: str, payload: Tuple[str, str, str]):
+        """Insert a normalized phrase into the token trie."""
+        node = self._trie
+        for token in phrase.split():
+            node = node.setdefault(token, {})
+        # Countries win over aliases and subregions for the same phrase
+        existing = node.get(None)
+        if existing is None or KIND_SCORES[payload[0]] > KIND_SCORES[existing[0]]:
+            node[None] = payload
+
+    def _make_match(self, kind: str, target: str, matched_text: str, score: float) -> LocationMatch:
+        """Build a LocationMatch for a country or subregion target."""
+        if kind == "subregion":
+            return LocationMatch(None, None, target, self._subregions.get(target), score, kind, matched_text)
+
+        country, subregion, region = self._countries[target]
+        return LocationMatch(target, country, subregion, region, score, kind, matched_text)
+
+    def _fuzzy_lookup(self, phrase: str) -> Optional[Tuple[str, float]]:
+        """Return (name, similarity) of the closest country name, if any is close enough."""
+        grams = _trigrams(phrase)
+        overlaps = defaultdict(int)
+        for gram in grams:
+            for name in self._trigram_index.get(gram, ()):
+                overlaps[name] += 1
+
+        # Only names sharing enough trigrams are scored with the (slower) edit similarity
+        min_shared = max(3, len(grams) // 3)
+        best_name, best_similarity = None, 0.0
+        for name, shared in overlaps.items():
+            if shared < min_shared or abs(len(name) - len(phrase)) > 3:
+                continue
+            similarity = SequenceMatcher(None, phrase, name).ratio()
+            if similarity > best_similarity:
+                best_name, best_similarity = name, similarity
+
+        if best_name and best_similarity >= FUZZY_THRESHOLD:
+            return best_name, best_similarity
+        return None
+
+    @staticmethod
+    def _names_street_or_venue(tokens: List[str], start: int, end: int) -> bool:
+        """Whether tokens[start:end] are part of a street or venue name rather than a place."""
+        return ((end < len(tokens) and tokens[end] in STREET_SUFFIXES)
+                or (start > 0 and tokens[start - 1] in VENUE_WORDS))
+
+    def resolve_all(self, text: str) -> List[LocationMatch]:
+        """
+        Return every candidate match in the text, best first.
+
+        Args:
+            text: Free-text location
+
+        Returns:
+            List of LocationMatch sorted by descending score
+        """
+        if not text:
+            return []
+
+        tokens = normalize_text(text).split()
+        n_tokens = len(tokens)
+        candidates = []
+
+        # Exact phrases: greedy longest match, resuming after each matched phrase
+        start = 0
+        while start < n_tokens:
+            node, best = self._trie, None
+            for end in range(start, min(n_tokens, start + MAX_PHRASE_TOKENS)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if None in node:
+                    best = (end, node[None])
+            if best is None:
+                start += 1
+                continue
+
+            end, (kind, target, _) = best
+            if self._names_street_or_venue(tokens, start, end + 1):
+                start = end + 1
+                continue
+            # Later mentions (", Mexico" at the end of an address) get a small bonus
+            position_bonus = 0.05 * (end + 1) / n_tokens
+            score = KIND_SCORES[kind] + position_bonus
+            candidates.append(self._make_match(kind, target, " ".join(tokens[start:end + 1]), score))
+            start = end + 1
+
+        # ISO3 codes only count when written in upper case ("MEX", not "and")
+        for code in re.findall(r"\b[A-Z]{3}\b", text):
+            if code in self._countries:
+                candidates.append(self._make_match("iso3", code, code, KIND_SCORES["iso3"]))
+
+        # Fuzzy matching only when nothing matched exactly
+        if not candidates:
+            for start in range(n_tokens):
+                for length in (1, 2, 3):
+                    if start + length > n_tokens:
+                        break
+                    phrase = " ".join(tokens[start:start + length])
+                    if (len(phrase) < FUZZY_MIN_LENGTH or phrase.isdigit()
+                            or self._names_street_or_venue(tokens, start, start + length)):
+                        continue
+                    found = self._fuzzy_lookup(phrase)
+                    if found:
+                        name, similarity = found
+                        score = KIND_SCORES["fuzzy"] * similarity + 0.05 * (start + length) / n_tokens
+                        candidates.append(self._make_match("fuzzy", self._fuzzy_names[name], phrase, score))
+
+        candidates.sort(key=lambda match: match.score, reverse=True)
+        return candidates
+
+    def _resolve(self, text: str) -> Optional[LocationMatch]:
+        """Uncached implementation of resolve()."""
+        candidates = self.resolve_all(text)
+        if candidates and candidates[0].score >= MIN_SCORE:
+            return candidates[0]
+        return None
+
+    def cache_info(self):
+        """Return LRU cache statistics."""
+        return self.resolve.cache_info()
+
+    def clear_cache(self):
+        """Clear the LRU memos."""
+        self.resolve.cache_clear()
+        self._fuzzy_lookup.cache_clear()
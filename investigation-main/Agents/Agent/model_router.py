@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Model Router - Latency-aware choice between the Nemotron models per request
+
+Every hosted agent asks the router which model should answer a request. The
+routing policy (model_routing.json, or $MODEL_ROUTING_POLICY_FILE) lists, per
+agent and request kind (a direct question or a full case analysis), the
+candidate models in order of preference. The router takes the first
+candidate whose expected p95 latency fits the caller's latency budget, and
+the fastest one when none does. Without a budget the first candidate is used.
+
+The expected p95 of a model is the one observed over its recent calls of the
+same prompt size class (prompts of at least large_prompt_tokens are "large",
+others "small"); until min_samples calls have been seen, the policy's
+expected_p95_seconds is used instead. Latencies are measured from when the
+call got its upstream slot, so queueing in the local scheduler does not make
+a model look slow. The policy file is re-read when it changes, so routing
+can be tuned without a restart.
+
+Every routed call is appended to a JSON lines log (data/model_routing.jsonl,
+or $MODEL_ROUTING_LOG) with the decision, its reason and the observed
+latency, for offline analysis.
+
+Usage:
+    router = ModelRouter()
+    with latency_budget(20), router.routed("murder", "analysis", prompt) as model:
+        response = client.chat.completions.create(model=model, ...)
+    router.stats()
+
+Author: Augment Agent
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from helpers import file_signature, percentile
+from token_budget import estimate_tokens
+from upstream import slot_grants
+
+logger = logging.getLogger(__name__)
+
+# Constants
+AGENT_DIR = Path(__file__).resolve().parent
+MODEL_ROUTING_POLICY_FILE = Path(os.getenv("MODEL_ROUTING_POLICY_FILE", AGENT_DIR / "model_routing.json"))
+MODEL_ROUTING_LOG = Path(os.getenv("MODEL_ROUTING_LOG", AGENT_DIR / "data" / "model_routing.jsonl"))
+POLICY_CHECK_INTERVAL = 1.0  # Seconds between policy file checks
+LATENCY_SAMPLES = 200  # Recent calls per model and size class kept for percentiles
+
+ULTRA_MODEL = "nvidia/llama-3.1-nemotron-ultra-253b-v1"
+SUPER_MODEL = "nvidia/llama-3.3-nemotron-super-49b-v1"
+
+# Used when the policy file is missing; the file overrides any of these keys
+DEFAULT_POLICY = {
+    "agents": {
+        "murder": {"question": [SUPER_MODEL, ULTRA_MODEL], "analysis": [ULTRA_MODEL, SUPER_MODEL]},
+        "theft": {"question": [SUPER_MODEL], "analysis": [SUPER_MODEL]},
+        "finance": {"question": [SUPER_MODEL], "analysis": [SUPER_MODEL]}
+    },
+    "large_prompt_tokens": 1500,
+    "min_samples": 20,
+    "expected_p95_seconds": {ULTRA_MODEL: 60, SUPER_MODEL: 20}
+}
+
+_latency_budget = contextvars.ContextVar("latency_budget", default=None)
+_decisions = contextvars.ContextVar("routing_decisions", default=None)
+_routed_call = contextvars.ContextVar("routed_call", default=None)
+
+def current_latency_budget() -> Optional[float]:
+    """Latency budget in seconds of the current request (None if it has none)."""
+    return _latency_budget.get()
+
+@contextmanager
+def latency_budget(seconds: Optional[float]):
+    """
+    Set the latency budget of model calls routed inside the with block.
+
+    Args:
+        seconds: Time the caller is willing to wait for the model, or None for no budget
+    """
+    token = _latency_budget.set(seconds if seconds and seconds > 0 else None)
+    try:
+        yield
+    finally:
+        _latency_budget.reset(token)
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    """The model chosen for one request and why."""
+    agent: str
+    kind: str
+    model: str
+    reason: str
+    prompt_tokens: int
+    size: str
+    budget_seconds: Optional[float]
+    expected_p95_seconds: float
+    decided_at: float
+
+class ModelRouter:
+    """
+    Chooses a model per request from the routing policy, the latency budget and observed latencies.
+    """
+
+    def __init__(self, policy_path: Optional[Path] = None, log_path: Optional[Path] = None):
+        """
+        Initialize the router.
+
+        Args:
+            policy_path: Routing policy file (defaults to MODEL_ROUTING_POLICY_FILE)
+            log_path: Decision log (defaults to MODEL_ROUTING_LOG)
+        """
+        self.policy_path = Path(policy_path) if policy_path else MODEL_ROUTING_POLICY_FILE
+        self.log_path = Path(log_path) if log_path else MODEL_ROUTING_LOG
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._policy = dict(DEFAULT_POLICY)
+        self._signature = None
+        self._checked_at = 0.0
+        self._last_error = None
+        self._latencies: Dict[Tuple[str, str], deque] = {}
+        self._errors: Dict[str, int] = {}
+        self._decisions: Dict[str, int] = {}
+        self._load_policy()
+
+    def _load_policy(self):
+        """(Re)load the policy file if it changed; keeps the previous policy if it cannot be read."""
+        signature = file_signature(self.policy_path)
+        if signature == self._signature:
+            return
+        policy = dict(DEFAULT_POLICY)
+        if signature is not None:
+            try:
+                with open(self.policy_path, "r", encoding="utf-8") as f:
+                    policy.update(json.load(f))
+            except (OSError, ValueError) as e:
+                self._last_error = f"{self.policy_path.name}: {str(e)}"
+                logger.error(f"Error reading model routing policy {self.policy_path}: {str(e)}")
+                return
+        self._policy = policy
+        self._signature = signature
+        self._last_error = None
+        logger.info(f"Loaded model routing policy from {self.policy_path if signature else 'defaults'}")
+
+    def policy(self) -> Dict[str, Any]:
+        """The active policy, re-read first if the file changed since the last check."""
+        now = time.time()
+        with self._lock:
+            if now - self._checked_at >= POLICY_CHECK_INTERVAL:
+                self._checked_at = now
+                self._load_policy()
+            return self._policy
+
+    def expected_p95(self, model: str, size: str, policy: Optional[Dict[str, Any]] = None) -> float:
+        """
+        Expected p95 latency of a model for prompts of a size class.
+
+        Args:
+            model: Model name
+            size: "small" or "large"
+            policy: Policy to take defaults from (defaults to the active one)
+
+        Returns:
+            Observed p95 in seconds once min_samples calls were seen, else the policy's expectation
+        """
+        policy = policy or self.policy()
+        with self._lock:
+            samples = sorted(self._latencies.get((model, size), ()))
+        if len(samples) >= policy["min_samples"]:
+            return percentile(samples, 0.95)
+        return float(policy["expected_p95_seconds"].get(model, 0.0))
+
+    def route(self, agent: str, kind: str, prompt: str, default_model: Optional[str] = None) -> RoutingDecision:
+        """
+        Choose the model for a request.
+
+        Args:
+            agent: Agent name (an AGENTS key of the unified server)
+            kind: DIRECT_QUESTION or CASE_ANALYSIS
+            prompt: The prompt that will be sent
+            default_model: Model used when the policy has no candidates for the agent and kind
+
+        Returns:
+            The decision
+        """
+        policy = self.policy()
+        budget = current_latency_budget()
+        prompt_tokens = estimate_tokens(prompt)
+        size = "large" if prompt_tokens >= policy["large_prompt_tokens"] else "small"
+        candidates = list(policy["agents"].get(agent, {}).get(kind) or [])
+        if not candidates:
+            candidates = [default_model or SUPER_MODEL]
+
+        expected = [(model, self.expected_p95(model, size, policy)) for model in candidates]
+        if budget is None:
+            (model, p95), reason = expected[0], "preferred"
+        else:
+            fitting = [(model, p95) for model, p95 in expected if p95 <= budget]
+            if fitting:
+                (model, p95) = fitting[0]
+                reason = "preferred" if model == candidates[0] else "preferred model exceeds budget"
+            else:
+                (model, p95), reason = min(expected, key=lambda item: item[1]), "fastest, no model fits budget"
+
+        decision = RoutingDecision(agent, kind, model, reason, prompt_tokens, size, budget, round(p95, 3), time.time())
+        with self._lock:
+            key = f"{agent}/{kind} -> {model}"
+            self._decisions[key] = self._decisions.get(key, 0) + 1
+        logger.info(f"Routing {agent} {kind} ({prompt_tokens} tokens, budget {budget}) to {model}: {reason}")
+        return decision
+
+    def record(self, decision: RoutingDecision, seconds: float, error: Optional[str] = None):
+        """
+        Record the outcome of a routed call and append it to the decision log.
+
+        Args:
+            decision: Decision returned by route()
+            seconds: Observed latency
+            error: Error message if the call failed (failed calls do not count towards the p95)
+        """
+        with self._lock:
+            if error is None:
+                self._latencies.setdefault((decision.model, decision.size), deque(maxlen=LATENCY_SAMPLES)).append(seconds)
+            else:
+                self._errors[decision.model] = self._errors.get(decision.model, 0) + 1
+
+        entry = dict(asdict(decision), latency_seconds=round(seconds, 3), error=error)
+        try:
+            with self._log_lock:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            logger.error(f"Error writing model routing log {self.log_path}: {str(e)}")
+
+    @contextmanager
+    def routed(self, agent: str, kind: str, prompt: str, default_model: Optional[str] = None) -> Iterator[str]:
+        """
+        Route a request and time the model call made inside the with block.
+
+        The latency is measured from when the call got its upstream slot, so waiting in the local
+        scheduler does not count; calls marked with discard_routed_latency() are not recorded.
+
+        Yields:
+            The model to call
+        """
+        decision = self.route(agent, kind, prompt, default_model)
+        collected = _decisions.get()
+        if collected is not None:
+            collected.append(decision)
+        call = {"discard": False}
+        token = _routed_call.set(call)
+        start = time.time()
+        try:
+            with slot_grants() as grants:
+                yield decision.model
+        except Exception as e:
+            self.record(decision, time.time() - (grants[0] if grants else start), error=str(e))
+            raise
+        finally:
+            _routed_call.reset(token)
+        if not call["discard"]:
+            self.record(decision, time.time() - (grants[0] if grants else start))
+
+    def stats(self) -> Dict[str, Any]:
+        """Observed latencies per model and size class, errors and decision counts."""
+        policy = self.policy()
+        with self._lock:
+            latencies = {f"{model} ({size})": sorted(samples) for (model, size), samples in self._latencies.items()}
+            errors = dict(self._errors)
+            decisions = dict(self._decisions)
+        return {
+            "policy_file": str(self.policy_path),
+            "policy_loaded": self._signature is not None,
+            "last_error": self._last_error,
+            "min_samples": policy["min_samples"],
+            "large_prompt_tokens": policy["large_prompt_tokens"],
+            "latencies": {
+                name: {
+                    "samples": len(samples),
+                    "p50_seconds": round(percentile(samples, 0.5), 3),
+                    "p95_seconds": round(percentile(samples, 0.95), 3)
+                }
+                for name, samples in latencies.items()
+            },
+            "errors": errors,
+            "decisions": decisions
+        }
+
+def discard_routed_latency():
+    """Do not record the latency of the current routed call (e.g. a stream cancelled early)."""
+    call = _routed_call.get()
+    if call is not None:
+        call["discard"] = True
+
+@contextmanager
+def routing_decisions() -> Iterator[List[RoutingDecision]]:
+    """
+    Collect the routing decisions made inside the with block, including in bulkhead workers.
+
+    Yields:
+        List the decisions are appended to
+    """
+    collected: List[RoutingDecision] = []
+    token = _decisions.set(collected)
+    try:
+        yield collected
+    finally:
+        _decisions.reset(token)
+
+@contextmanager
+def routed_model(router: Optional[ModelRouter], agent: str, kind: str, prompt: str,
+                 default_model: str) -> Iterator[str]:
+    """
+    router.routed() if there is a router, else just the agent's default model.
+
+    Yields:
+        The model to call
+    """
+    if router is None:
+        yield default_model
+        return
+    with router.routed(agent, kind, prompt, default_model) as model:
+        yield model
@@ -9,23 +9,34 @@ trained on murder datasets to provide solutions based on user-provided case data
 
 Usage:
     python murder_agent_main.py
+    python murder_agent_main.py --batch cases.jsonl  # Analyze a JSONL file of cases
     python murder_agent_main.py --api  # Run as API server
+    python murder_agent_main.py --case_file case.json  # Analyze one case from a JSON file
+    python murder_agent_main.py --worker  # Resident worker, JSON lines on stdin/stdout
+    python murder_agent_main.py --worker --socket /tmp/murder_agent.sock  # Resident worker on a Unix socket
 
 Author: Augment Agent
 """
 
 import os
+import sys
 import argparse
 import logging
 import json
 import time
 import uuid
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 from pathlib import Path
 from datetime import datetime
 from openai import OpenAI
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from case_repository import CaseRepository
+from batch_runner import run_batch, print_summary, DEFAULT_CONCURRENCY, ANALYSIS_ERROR_PREFIX
+from token_budget import plan_completion, budget_stats
 
 # Configure logging
 logging.basicConfig(
@@ -42,6 +53,8 @@ logger = logging.getLogger(__name__)
 ENV_FILE = ".env"
 API_KEY_VAR = "NVIDIA_API_KEY"
 MODEL_NAME = "nvidia/llama-3.1-nemotron-ultra-253b-v1"
+API_BASE_URL = os.getenv("NVIDIA_API_BASE_URL", "https://integrate.api.nvidia.com/v1")
+WORKER_THREADS = int(os.getenv("MURDER_WORKER_THREADS", "16"))  # Concurrent analyses per resident worker
 
 # Dictionary to store conversation states
 # Format: {session_id: {current_step: step_name, collected_data: {field: value}}}
@@ -380,25 +393,27 @@ class MurderAgent:
         """
         self.api_key = api_key
         self.client = OpenAI(
-            base_url="https://integrate.api.nvidia.com/v1",
+            base_url=API_BASE_URL,
             api_key=api_key
         )
         logger.info(f"Murder Agent initialized with model: {MODEL_NAME}")
 
-    def analyze_case(self, case_details):
+    def analyze_case(self, case_details, usage=None):
         """
         Analyze a murder case using the NVIDIA model.
 
         Args:
             case_details: Dictionary containing case details
+            usage: Optional dictionary filled with the token usage reported by the API
 
         Returns:
             Analysis and solutions for the case
         """
         logger.info("Analyzing case")
 
-        # Format the case details into a prompt
-        prompt = self._format_case_prompt(case_details)
+        # Format the case details into a prompt, sized for the generation budget of the request
+        budget = plan_completion(case_details)
+        prompt = self._format_case_prompt(case_details) + budget.guidance
 
         try:
             # Call the NVIDIA API with the real API key
@@ -414,18 +429,24 @@ class MurderAgent:
                 ],
                 temperature=0.6,
                 top_p=0.95,
-                max_tokens=4096,
+                max_tokens=budget.max_tokens,
                 frequency_penalty=0,
                 presence_penalty=0
             )
 
             analysis = response.choices[0].message.content
+            budget_stats.record(budget, response.usage.completion_tokens if response.usage else None,
+                                truncated=response.choices[0].finish_reason == "length")
+            if usage is not None and response.usage:
+                usage.update(prompt_tokens=response.usage.prompt_tokens,
+                             completion_tokens=response.usage.completion_tokens,
+                             total_tokens=response.usage.total_tokens)
             logger.info("Case analysis completed (using NVIDIA API)")
             return analysis
 
         except Exception as e:
             logger.error(f"Error analyzing case: {str(e)}")
-            return f"Error analyzing case: {str(e)}"
+            return f"{ANALYSIS_ERROR_PREFIX}{str(e)}"
 
     def process_message(self, message, session_id=None, force_new_session=False, reset_conversation=False):
         """
@@ -520,7 +541,7 @@ class MurderAgent:
                     return session_id, analysis, False, "analysis"
                 except Exception as e:
                     logger.error(f"Error analyzing case: {str(e)}")
-                    return session_id, f"Error analyzing case: {str(e)}", False, "analysis"
+                    return session_id, f"{ANALYSIS_ERROR_PREFIX}{str(e)}", False, "analysis"
 
             # Return the next question
             if current_step and current_step["message"]:
@@ -748,32 +769,28 @@ class MurderAgent:
             if user_input.lower() == "exit":
                 break
 
-            # Process the message
+            # Process the message (timed, since the last step runs the analysis)
+            start_time = time.time()
             session_id, response, is_collecting_info, current_step = self.process_message(user_input, session_id)
+            duration = time.time() - start_time
 
             # Print the response
             print("\n" + response)
 
             # If we've reached the analysis step, ask if the user wants to save the analysis
             if current_step == "analysis":
-                save_option = input("\nWould you like to save this analysis? (y/n): ")
-                if save_option.lower() == 'y':
+                if response.startswith(ANALYSIS_ERROR_PREFIX):
+                    print("The analysis failed, so there is nothing to save.")
+                elif input("\nWould you like to save this analysis? (y/n): ").lower() == 'y':
                     # Get the collected data
-                    collected_data = conversation_states[session_id]["collected_data"]
-                    case_id = collected_data.get("case_id", f"case_{int(time.time())}")
-                    filename = f"analysis_{case_id}.txt"
+                    collected_data = dict(conversation_states[session_id]["collected_data"])
+                    collected_data.setdefault("case_id", f"case_{int(time.time())}")
 
-                    with open(filename, "w") as f:
-                        f.write("CASE DETAILS:\n")
-                        f.write("="*50 + "\n")
-                        for key, value in collected_data.items():
-                            f.write(f"{key.replace('_', ' ').title()}: {value}\n")
+                    with CaseRepository() as repository:
+                        record_id = repository.add_case("murder", collected_data, response, model=MODEL_NAME,
+                                                        duration_seconds=duration, source="interactive")
 
-                        f.write("\nANALYSIS:\n")
-                        f.write("="*50 + "\n")
-                        f.write(response)
-
-                    print(f"Analysis saved to {filename}")
+                    print(f"Analysis saved to the case repository (record #{record_id})")
 
                 # Reset the conversation state for a new case
                 session_id = create_new_conversation_state()
@@ -843,28 +860,234 @@ def analyze_sample_case(agent):
         print(f"{key.replace('_', ' ').title()}: {value}")
 
     # Analyze the case
+    start_time = time.time()
     analysis = agent.analyze_case(sample_case)
+    duration = time.time() - start_time
+
+    print_analysis(analysis)
+    if analysis.startswith(ANALYSIS_ERROR_PREFIX):
+        print("\nThe sample analysis failed, so it was not saved.")
+        return
+
+    # Save the analysis
+    with CaseRepository() as repository:
+        record_id = repository.add_case("murder", sample_case, analysis, model=MODEL_NAME,
+                                        duration_seconds=duration, source="sample")
+
+    print(f"\nAnalysis saved to the case repository (record #{record_id})")
+    print("\nThis was a sample case analysis. You can now enter your own case details.")
+
+def print_analysis(analysis):
+    """
+    Print an analysis between the banner lines the Next.js murder-agent route extracts it from.
 
+    Args:
+        analysis: Analysis text
+    """
     print("\n" + "="*50)
     print("MURDER AGENT ANALYSIS")
     print("="*50)
     print(analysis)
     print("="*50)
 
-    # Save the analysis
-    filename = "sample_case_analysis.txt"
-    with open(filename, "w") as f:
-        f.write("CASE DETAILS:\n")
-        f.write("="*50 + "\n")
-        for key, value in sample_case.items():
-            f.write(f"{key.replace('_', ' ').title()}: {value}\n")
-
-        f.write("\nANALYSIS:\n")
-        f.write("="*50 + "\n")
-        f.write(analysis)
-
-    print(f"\nAnalysis saved to {filename}")
-    print("\nThis was a sample case analysis. You can now enter your own case details.")
+def analyze_case_file(agent, case_file):
+    """
+    Analyze the case details in a JSON file (the one-off process the murder-agent route spawns).
+
+    Args:
+        agent: Initialized MurderAgent instance
+        case_file: Path to a JSON object of case details
+
+    Returns:
+        True if the analysis succeeded
+    """
+    with open(case_file, "r", encoding="utf-8") as f:
+        case_details = json.load(f)
+
+    start_time = time.time()
+    analysis = agent.analyze_case(case_details)
+    duration = time.time() - start_time
+    print_analysis(analysis)
+
+    if analysis.startswith(ANALYSIS_ERROR_PREFIX):
+        return False
+    with CaseRepository() as repository:
+        repository.add_case("murder", case_details, analysis, model=MODEL_NAME,
+                            duration_seconds=duration, source="case_file")
+    return True
+
+class MurderWorker:
+    """
+    Long-lived worker that answers case analysis requests with one warm agent and client.
+
+    Requests and responses are JSON lines. A request is {"id": ..., "case_details": {...}}
+    (or {"id": ..., "op": "ping"}); its response echoes the id with success, analysis,
+    error, duration_seconds and record_id. Requests run concurrently on a thread pool,
+    so responses are written as analyses finish, not in request order.
+    """
+
+    def __init__(self, agent, max_workers=WORKER_THREADS):
+        """
+        Initialize the worker.
+
+        Args:
+            agent: Initialized MurderAgent instance
+            max_workers: Maximum number of concurrent analyses
+        """
+        self.agent = agent
+        self.max_workers = max_workers
+        self.repository = CaseRepository()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="murder-worker")
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.served = 0
+
+    def submit(self, line, write):
+        """
+        Decode a request line and answer it through write() once it completes.
+
+        Args:
+            line: Request line (str or bytes)
+            write: Callable taking the response dictionary, called from a pool thread
+
+        Returns:
+            Future of the request, or None if the line was answered immediately
+        """
+        try:
+            request_data = json.loads(line)
+        except ValueError as e:
+            write({"id": None, "success": False, "analysis": None, "error": f"Invalid JSON: {str(e)}"})
+            return None
+        if not isinstance(request_data, dict):
+            write({"id": None, "success": False, "analysis": None, "error": "Request must be a JSON object"})
+            return None
+
+        with self._lock:
+            self.in_flight += 1
+        future = self.executor.submit(self._handle, request_data)
+        future.add_done_callback(lambda done: write(done.result()))
+        return future
+
+    def _handle(self, request_data):
+        """Run one request and build its response."""
+        response = {"id": request_data.get("id"), "success": False, "analysis": None, "error": None}
+        try:
+            if request_data.get("op", "analyze") == "ping":
+                response.update(success=True, in_flight=self.in_flight, served=self.served)
+                return response
+
+            case_details = request_data.get("case_details")
+            if not isinstance(case_details, dict):
+                response["error"] = "Missing case_details object"
+                return response
+
+            start_time = time.time()
+            analysis = self.agent.analyze_case(case_details)
+            duration = time.time() - start_time
+            response["duration_seconds"] = round(duration, 3)
+            if analysis.startswith(ANALYSIS_ERROR_PREFIX):
+                response["error"] = analysis[len(ANALYSIS_ERROR_PREFIX):]
+                return response
+
+            response["record_id"] = self.repository.add_case("murder", case_details, analysis, model=MODEL_NAME,
+                                                             duration_seconds=duration, source="worker")
+            response.update(success=True, analysis=analysis)
+            return response
+        except Exception as e:
+            logger.error(f"Error handling worker request {response['id']}: {str(e)}")
+            response["error"] = str(e)
+            return response
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.served += 1
+
+    def serve_stdio(self, stdin=None, stdout=None):
+        """
+        Serve requests from stdin until it closes, writing responses to stdout.
+
+        Logging goes to stderr, so stdout carries nothing but response lines.
+
+        Args:
+            stdin: Input stream (defaults to sys.stdin)
+            stdout: Output stream (defaults to sys.stdout)
+        """
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        write_lock = threading.Lock()
+
+        def write(response):
+            with write_lock:
+                stdout.write(json.dumps(response) + "\n")
+                stdout.flush()
+
+        logger.info(f"Murder Agent worker serving JSON lines on stdin/stdout ({self.max_workers} threads)")
+        for line in stdin:
+            if line.strip():
+                self.submit(line, write)
+        self.close()
+
+    def serve_socket(self, socket_path):
+        """
+        Serve requests on a Unix socket until interrupted.
+
+        Each connection may pipeline any number of request lines.
+
+        Args:
+            socket_path: Filesystem path of the socket
+        """
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = WorkerSocketServer(socket_path, WorkerRequestHandler)
+        server.worker = self
+        os.chmod(socket_path, 0o600)
+        logger.info(f"Murder Agent worker listening on {socket_path} ({self.max_workers} threads)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            os.unlink(socket_path)
+            self.close()
+
+    def close(self):
+        """Wait for in-flight requests, then release the pool and the repository."""
+        self.executor.shutdown(wait=True)
+        self.repository.close()
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class WorkerSocketServer(socketserver.ThreadingUnixStreamServer):
+        """Unix socket server with one thread per connection."""
+        daemon_threads = True
+else:
+    WorkerSocketServer = None
+
+class WorkerRequestHandler(socketserver.StreamRequestHandler):
+    """Reads request lines from a connection and hands them to the server's MurderWorker."""
+
+    def handle(self):
+        answered = threading.Condition()
+        counts = {"requests": 0, "responses": 0}
+
+        def write(response):
+            with answered:
+                try:
+                    self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                except OSError:
+                    logger.warning(f"Worker client disconnected before response {response.get('id')}")
+                counts["responses"] += 1
+                answered.notify()
+
+        for line in self.rfile:
+            if line.strip():
+                with answered:
+                    counts["requests"] += 1
+                self.server.worker.submit(line, write)
+        # Finish answering before the connection is closed
+        with answered:
+            answered.wait_for(lambda: counts["responses"] == counts["requests"])
 
 def run_api_server(api_key):
     """
@@ -1002,7 +1225,15 @@ def main():
     parser.add_argument("--api_key", help="NVIDIA API key (optional if stored in .env file)")
     parser.add_argument("--setup", action="store_true", help="Set up the API key")
     parser.add_argument("--sample", action="store_true", help="Analyze a sample case")
+    parser.add_argument("--batch", help="Analyze every case in a JSONL file (one JSON object per line)")
+    parser.add_argument("--output", help="Output JSONL for --batch (defaults to <batch>.results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent analyses for --batch")
     parser.add_argument("--api", action="store_true", help="Run as API server")
+    parser.add_argument("--case_file", help="Analyze the case details in a JSON file and exit")
+    parser.add_argument("--worker", action="store_true",
+                        help="Run as a resident worker serving JSON-lines requests (stdin/stdout unless --socket)")
+    parser.add_argument("--socket", help="Unix socket path for the resident worker")
+    parser.add_argument("--threads", type=int, default=WORKER_THREADS, help="Concurrent analyses in worker mode")
 
     args = parser.parse_args()
 
@@ -1039,6 +1270,29 @@ def main():
         analyze_sample_case(agent)
         return
 
+    # Analyze a batch of cases if requested
+    if args.batch:
+        summary = run_batch(agent, "murder", args.batch, args.output, args.concurrency, model=MODEL_NAME)
+        print_summary(summary)
+        return
+
+    # Analyze a case file if requested
+    if args.case_file:
+        if not analyze_case_file(agent, args.case_file):
+            sys.exit(1)
+        return
+
+    # Run as a resident worker if requested
+    if args.worker:
+        worker = MurderWorker(agent, max_workers=args.threads)
+        if args.socket:
+            if WorkerSocketServer is None:
+                parser.error("--socket requires Unix socket support; use the stdin/stdout worker instead")
+            worker.serve_socket(args.socket)
+        else:
+            worker.serve_stdio()
+        return
+
     # Start interactive session
     agent.interactive_session()
 
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Near Duplicates - MinHash/LSH Detection of Re-Entered Cases
+
+The same incident is often entered several times by different officers with
+slightly different wording, and each entry pays for a full Nemotron completion.
+This module fingerprints the standardized case text with MinHash signatures
+over character shingles and indexes them with locality-sensitive hashing
+(banded signatures), so a new case can be matched against every analyzed case
+in roughly constant time. When the estimated Jaccard similarity crosses the
+threshold, the prior analysis can be offered instead of a new completion.
+
+Usage:
+    from near_duplicates import NearDuplicateIndex
+
+    index = NearDuplicateIndex()
+    index.add(standardized_details, record_id=12)
+    match = index.query(new_standardized_details)  # None or {"record_id", "similarity", ...}
+
+Author: Augment Agent
+"""
+
+import logging
+import re
+import threading
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
+
+from batch_runner import ANALYSIS_ERROR_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# Constants
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.75
+# Missing a duplicate costs a full completion; an extra LSH candidate costs one signature comparison
+FALSE_NEGATIVE_WEIGHT = 0.9
+MAX_HASH = (1 << 32) - 1
+SEED = 1
+
+# Fields that identify the entry rather than the incident
+EXCLUDED_FIELDS = {"case_id", "question"}
+
+def fingerprint_text(case_details: Dict[str, Any]) -> str:
+    """
+    Canonical text of a standardized case: sorted "field: value" pairs,
+    lower-cased with punctuation and repeated whitespace removed.
+    """
+    parts = [f"{key} {value}" for key, value in sorted(case_details.items())
+             if key not in EXCLUDED_FIELDS and value and value != "Unknown"]
+    return re.sub(r"[^a-z0-9]+", " ", " ".join(parts).lower()).strip()
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    Distinct character shingles of a text, each packed losslessly into one integer.
+
+    The fingerprint text is ASCII, so a shingle of up to 8 characters is its bytes
+    read as a little-endian uint64 (no hashing, no collisions).
+    """
+    data = np.frombuffer(text.encode("ascii", "ignore").ljust(size), dtype=np.uint8).astype(np.uint64)
+    windows = np.lib.stride_tricks.sliding_window_view(data, size)
+    packed = (windows << (np.arange(size, dtype=np.uint64) * np.uint64(8))).sum(axis=1, dtype=np.uint64)
+    return np.unique(packed)
+
+def optimal_bands(threshold: float, num_perm: int,
+                  false_negative_weight: float = FALSE_NEGATIVE_WEIGHT) -> Tuple[int, int]:
+    """
+    Choose (bands, rows) with bands * rows <= num_perm minimizing the weighted
+    false-positive and false-negative probability mass around the threshold.
+    """
+    def band_probability(similarity, bands, rows):
+        return 1.0 - (1.0 - similarity ** rows) ** bands
+
+    below = np.linspace(0.0, threshold, 200)
+    above = np.linspace(threshold, 1.0, 200)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        # Mean value x interval width approximates the integrals
+        false_positive = band_probability(below, bands, rows).mean() * threshold
+        false_negative = (1.0 - band_probability(above, bands, rows)).mean() * (1.0 - threshold)
+        error = (1.0 - false_negative_weight) * false_positive + false_negative_weight * false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+class MinHasher:
+    """
+    MinHash signatures with multiply-shift hash functions ((a * x + b) mod 2^64) >> 32.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = SEED):
+        """
+        Initialize the hash functions.
+
+        Args:
+            num_perm: Number of hash functions (signature length)
+            seed: Random seed for the hash parameters
+        """
+        rng = np.random.RandomState(seed)
+        # Random odd 64-bit multipliers and 64-bit offsets; uint64 arithmetic wraps mod 2^64
+        self.a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2)
+        self.num_perm = num_perm
+
+    def signature(self, shingle_values: np.ndarray) -> np.ndarray:
+        """Return the MinHash signature (uint32 array) of a set of shingles."""
+        if len(shingle_values) == 0:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+        hashed = (shingle_values[:, None] * self.a + self.b) >> np.uint64(32)
+        return hashed.min(axis=0).astype(np.uint32)
+
+class NearDuplicateIndex:
+    """
+    LSH index over MinHash signatures of analyzed cases.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = NUM_PERM):
+        """
+        Initialize an empty index.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity for a near duplicate
+            num_perm: Signature length
+        """
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = []
+        self._metadata = []
+        self._lock = threading.Lock()
+        logger.info(f"Near-duplicate index: threshold {threshold}, {self.bands} bands x {self.rows} rows")
+
+    def __len__(self) -> int:
+        return len(self._metadata)
+
+    @classmethod
+    def from_repository(cls, repository, standardize, agent: str = "murder", **kwargs) -> "NearDuplicateIndex":
+        """
+        Build the index from every successfully analyzed case of an agent.
+
+        Args:
+            repository: CaseRepository instance
+            standardize: Function returning the standardized details of a case
+            agent: Agent type to index
+
+        Returns:
+            NearDuplicateIndex instance
+        """
+        index = cls(**kwargs)
+        for record in repository.iter_cases(agent=agent):
+            if record["analysis"].startswith(ANALYSIS_ERROR_PREFIX):
+                continue
+            index.add(standardize(record["collected_data"]), record_id=record["id"])
+        logger.info(f"Near-duplicate index built with {len(index)} {agent} cases")
+        return index
+
+    def signature(self, case_details: Dict[str, Any]) -> np.ndarray:
+        """MinHash signature of a standardized case."""
+        return self.hasher.signature(shingles(fingerprint_text(case_details)))
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        """One bucket key per band."""
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def add(self, case_details: Dict[str, Any], record_id: Optional[int] = None) -> int:
+        """
+        Add an analyzed case.
+
+        Args:
+            case_details: Standardized case details
+            record_id: Case repository record ID
+
+        Returns:
+            Position of the case in the index
+        """
+        signature = self.signature(case_details)
+        with self._lock:
+            position = len(self._metadata)
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, []).append(position)
+            self._signatures.append(signature)
+            self._metadata.append({"record_id": record_id, "case_id": case_details.get("case_id")})
+        return position
+
+    def candidates(self, case_details: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Return every indexed case sharing an LSH bucket, with its estimated similarity.
+
+        Args:
+            case_details: Standardized case details
+
+        Returns:
+            List of {"record_id", "case_id", "similarity"} sorted by similarity
+        """
+        signature = self.signature(case_details)
+        with self._lock:
+            positions = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                positions.update(self._buckets[band].get(key, ()))
+
+            positions = list(positions)
+            if not positions:
+                return []
+            # Fraction of equal signature slots estimates the Jaccard similarity
+            similarities = (np.stack([self._signatures[position] for position in positions]) == signature).mean(axis=1)
+            results = [
+                {**self._metadata[position], "similarity": round(float(similarity), 4)}
+                for position, similarity in zip(positions, similarities)
+            ]
+
+        results.sort(key=lambda result: result["similarity"], reverse=True)
+        return results
+
+    def query(self, case_details: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Return the most similar analyzed case if it crosses the threshold.
+
+        Args:
+            case_details: Standardized case details
+
+        Returns:
+            {"record_id", "case_id", "similarity"} or None
+        """
+        results = self.candidates(case_details)
+        if results and results[0]["similarity"] >= self.threshold:
+            return results[0]
+        return None
@@ -5,7 +5,6 @@ import json
 import logging
 from dotenv import load_dotenv
 import requests
-import time
 
 # Load environment variables
 load_dotenv()
@@ -136,60 +135,44 @@ for agent_name, agent_config in AGENTS.items():
 
 @app.route("/api/health", methods=["GET"])
 def health_check():
-    """Health check endpoint."""
-    return jsonify({"status": "healthy", "agents": list(AGENTS.keys())})
+    """Health check endpoint (with per-worker health and load when run under the supervisor)."""
+    payload = {"status": "healthy", "agents": list(AGENTS.keys())}
+    if supervisor:
+        payload["workers"] = supervisor.status()
+    return jsonify(payload)
+
+# Set when the agents run as pre-forked workers; workers inherit it and read its status table
+supervisor = None
 
 if __name__ == "__main__":
-    # Get the port from command line arguments or use default
     import sys
-    import subprocess
+    import argparse
     import platform
-
-    if len(sys.argv) > 1:
-        agent_name = sys.argv[1]
-        if agent_name in AGENTS:
-            port = AGENTS[agent_name]["port"]
-            logger.info(f"Starting {agent_name} agent on port {port}")
-            app.run(host="0.0.0.0", port=port)
+    import subprocess
+    from supervisor import Supervisor, DEFAULT_WORKERS
+
+    parser = argparse.ArgumentParser(description="Agent API servers")
+    parser.add_argument("agent", nargs="?", choices=list(AGENTS), help="Serve only this agent")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Worker processes per agent (default $SERVER_WORKERS or 2)")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to listen on")
+    args = parser.parse_args()
+
+    agent_names = [args.agent] if args.agent else list(AGENTS)
+    logger.info(f"Starting {', '.join(agent_names)} agent(s)")
+
+    if platform.system() == "Windows":
+        # No fork on Windows: one process per agent, as before
+        if args.agent:
+            app.run(host=args.host, port=AGENTS[args.agent]["port"], threaded=True)
         else:
-            logger.error(f"Unknown agent: {agent_name}")
-            sys.exit(1)
+            for agent_name in agent_names[1:]:
+                logger.info(f"Starting {agent_name} agent in a separate process on port {AGENTS[agent_name]['port']}")
+                subprocess.Popen([sys.executable, __file__, agent_name, "--host", args.host])
+            app.run(host=args.host, port=AGENTS[agent_names[0]]["port"], threaded=True)
     else:
-        # Start all agents
-        logger.info("No agent specified. Starting all agents...")
-
-        # On Windows, we need to use subprocess instead of fork
-        if platform.system() == "Windows":
-            # Start the first agent in the current process
-            first_agent = list(AGENTS.keys())[0]
-            port = AGENTS[first_agent]["port"]
-            logger.info(f"Starting {first_agent} agent on port {port}")
-
-            # Start other agents in separate processes
-            for agent_name, agent_config in list(AGENTS.items())[1:]:
-                port = agent_config["port"]
-                logger.info(f"Starting {agent_name} agent in a separate process on port {port}")
-
-                # Use subprocess to start a new process
-                subprocess.Popen([
-                    sys.executable,
-                    __file__,
-                    agent_name
-                ])
-
-            # Run the first agent in the current process
-            app.run(host="0.0.0.0", port=AGENTS[first_agent]["port"])
-        else:
-            # Unix-like systems can use fork
-            for agent_name, agent_config in AGENTS.items():
-                port = agent_config["port"]
-                # Fork a new process for each agent
-                if os.fork() == 0:
-                    logger.info(f"Starting {agent_name} agent on port {port}")
-                    app.run(host="0.0.0.0", port=port)
-                    sys.exit(0)
-                time.sleep(1)  # Give each process time to start
-
-            # Keep the parent process running
-            while True:
-                time.sleep(1)
+        # Pre-forked workers sharing one listening socket per agent, restarted when they crash;
+        # send SIGHUP for a rolling restart and SIGUSR1 to log worker status
+        supervisor = Supervisor(app, {name: AGENTS[name]["port"] for name in agent_names},
+                                workers=args.workers, host=args.host)
+        supervisor.run()
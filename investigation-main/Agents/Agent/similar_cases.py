@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Similar Cases - Top-k TF-IDF Retrieval over Completed Murder Cases
+
+When a murder intake completes, investigators want to see "cases like this
+one". This module keeps a TF-IDF index over the descriptive fields of every
+completed case (cause of death, weapon, crime scene, evidence, suspects) and
+answers top-k cosine similarity queries.
+
+The index stores raw term frequencies in a sparse CSR matrix and applies IDF
+weights at query time, so new cases are appended incrementally without
+refitting. New cases first go to a small side matrix that queries score
+separately, so a query after an add() only pays for the side rows. Once the
+side matrix holds SIDE_MATRIX_ROWS cases it is merged into the main matrix,
+and IDF weights, document norms and the column-major (CSC) copy used for
+queries are refreshed. Between merges, terms keep the IDF weight of the last
+merge (new terms get theirs when they first appear).
+
+Usage:
+    from similar_cases import SimilarCaseIndex
+
+    index = SimilarCaseIndex.from_repository(CaseRepository())
+    index.query(case_details, k=5)
+
+Author: Augment Agent
+"""
+
+import logging
+import re
+import threading
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+# Constants
+SIMILARITY_FIELDS = ["cause_of_death", "weapon_used", "crime_scene_description", "evidence_found", "suspects"]
+DEFAULT_TOP_K = 5
+MIN_SCORE = 0.05
+SIDE_MATRIX_ROWS = 2048  # New cases scored separately before they are merged into the main matrix
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "had", "has", "have", "he", "her",
+    "his", "in", "is", "it", "its", "no", "not", "of", "on", "or", "she", "that", "the", "their",
+    "there", "they", "this", "to", "was", "were", "with", "unknown", "none"
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens without stop words or pure numbers."""
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower())
+            if len(token) > 1 and token not in STOP_WORDS and not token.isdigit()]
+
+def case_text(case_details: Dict[str, Any]) -> str:
+    """Concatenate the similarity fields of a case."""
+    return " ".join(str(case_details.get(field) or "") for field in SIMILARITY_FIELDS)
+
+class SimilarCaseIndex:
+    """
+    Incremental sparse TF-IDF index with top-k cosine queries.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._lock = threading.Lock()
+        self._vocabulary = {}
+        self._doc_freq = np.zeros(0, dtype=np.int64)
+        self._matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        # Column-major copy: a query only touches the postings of its own terms
+        self._columns = None
+        self._metadata = []
+        self._case_positions = {}
+        # Rows added since the last consolidation: (term ids, term frequencies)
+        self._pending = []
+        self._norms = None
+        self._idf = None
+        # Side matrix of the pending rows and their norms, rebuilt on the first query after an add
+        self._side = None
+        self._side_norms = None
+
+    def __len__(self) -> int:
+        return len(self._metadata)
+
+    @classmethod
+    def from_repository(cls, repository, agent: str = "murder") -> "SimilarCaseIndex":
+        """
+        Build the index from every stored case of an agent.
+
+        Args:
+            repository: CaseRepository instance
+            agent: Agent type to index
+
+        Returns:
+            SimilarCaseIndex instance
+        """
+        index = cls()
+        for record in repository.iter_cases(agent=agent):
+            index.add(record["collected_data"], record_id=record["id"])
+        logger.info(f"Similar-case index built with {len(index)} {agent} cases")
+        return index
+
+    def _term_counts(self, tokens: List[str], grow: bool):
+        """Map tokens to (term ids, counts), adding unseen terms to the vocabulary if grow is set."""
+        counts = {}
+        for token in tokens:
+            term_id = self._vocabulary.get(token)
+            if term_id is None:
+                if not grow:
+                    continue
+                term_id = len(self._vocabulary)
+                self._vocabulary[token] = term_id
+            counts[term_id] = counts.get(term_id, 0) + 1
+
+        term_ids = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        frequencies = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        return term_ids, frequencies
+
+    def add(self, case_details: Dict[str, Any], record_id: Optional[int] = None):
+        """
+        Add a completed case to the index.
+
+        Args:
+            case_details: Collected case details
+            record_id: Case repository record ID
+        """
+        with self._lock:
+            term_ids, frequencies = self._term_counts(tokenize(case_text(case_details)), grow=True)
+            if len(self._doc_freq) < len(self._vocabulary):
+                self._doc_freq = np.concatenate([
+                    self._doc_freq, np.zeros(len(self._vocabulary) - len(self._doc_freq), dtype=np.int64)
+                ])
+            self._doc_freq[term_ids] += 1
+
+            # Sublinear term frequency
+            self._pending.append((term_ids, 1.0 + np.log(frequencies)))
+            self._case_positions.setdefault(case_details.get("case_id"), []).append(len(self._metadata))
+            self._metadata.append({
+                "record_id": record_id,
+                "case_id": case_details.get("case_id"),
+                "date_of_crime": case_details.get("date_of_crime"),
+                "location": case_details.get("location"),
+                "cause_of_death": case_details.get("cause_of_death"),
+                "weapon_used": case_details.get("weapon_used")
+            })
+            self._side = None
+
+    def _pending_block(self) -> sparse.csr_matrix:
+        """CSR matrix of the pending rows over the current vocabulary."""
+        lengths = [len(term_ids) for term_ids, _ in self._pending]
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        indices = np.concatenate([term_ids for term_ids, _ in self._pending])
+        data = np.concatenate([weights for _, weights in self._pending])
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(self._pending), len(self._vocabulary)))
+
+    def _consolidate(self):
+        """Merge pending rows into the main CSR matrix and refresh IDF weights and document norms."""
+        n_terms = len(self._vocabulary)
+        if self._pending:
+            matrix = self._matrix
+            matrix.resize((matrix.shape[0], n_terms))
+            self._matrix = sparse.vstack([matrix, self._pending_block()], format="csr")
+            self._pending = []
+
+        n_docs = self._matrix.shape[0]
+        self._idf = (np.log((1.0 + n_docs) / (1.0 + self._doc_freq)) + 1.0).astype(np.float32)
+        # ||d|| under the current IDF: sqrt(sum_t (tf_dt * idf_t)^2)
+        squared = self._matrix.multiply(self._matrix) @ (self._idf * self._idf)
+        self._norms = np.sqrt(np.asarray(squared).ravel())
+        self._columns = self._matrix.tocsc()
+        self._side = sparse.csr_matrix((0, n_terms), dtype=np.float32)
+        self._side_norms = np.zeros(0, dtype=np.float32)
+
+    def _refresh_side(self):
+        """Rebuild the side matrix of pending rows; terms new since the last merge get an IDF weight."""
+        n_terms = len(self._vocabulary)
+        if len(self._idf) < n_terms:
+            n_docs = len(self._metadata)
+            new_terms = self._doc_freq[len(self._idf):n_terms]
+            self._idf = np.concatenate([
+                self._idf, (np.log((1.0 + n_docs) / (1.0 + new_terms)) + 1.0).astype(np.float32)
+            ])
+        self._side = self._pending_block() if self._pending else sparse.csr_matrix((0, n_terms), dtype=np.float32)
+        squared = self._side.multiply(self._side) @ (self._idf * self._idf)
+        self._side_norms = np.sqrt(np.asarray(squared).ravel())
+
+    def query(self, case_details: Dict[str, Any], k: int = DEFAULT_TOP_K,
+              exclude_case_id: Optional[str] = None, min_score: float = MIN_SCORE) -> List[Dict[str, Any]]:
+        """
+        Return the k most similar indexed cases.
+
+        Args:
+            case_details: Case details to compare against
+            k: Number of results
+            exclude_case_id: Case ID to leave out (usually the query case itself)
+            min_score: Minimum cosine similarity
+
+        Returns:
+            List of case summaries with a "score", most similar first
+        """
+        with self._lock:
+            if not self._metadata:
+                return []
+            if self._norms is None or len(self._pending) >= SIDE_MATRIX_ROWS:
+                self._consolidate()
+            elif self._side is None:
+                self._refresh_side()
+
+            term_ids, frequencies = self._term_counts(tokenize(case_text(case_details)), grow=False)
+            if len(term_ids) == 0:
+                return []
+
+            query_weights = (1.0 + np.log(frequencies)) * self._idf[term_ids]
+            query_norm = float(np.sqrt((query_weights * query_weights).sum()))
+
+            # Cosine numerator: sum_t tf_dt * idf_t * q_t over the query's terms only; the main matrix
+            # has no columns for terms that first appeared in the side matrix
+            weights = query_weights * self._idf[term_ids]
+            merged = term_ids < self._columns.shape[1]
+            dots = np.concatenate([
+                np.asarray(self._columns[:, term_ids[merged]] @ weights[merged]).ravel(),
+                np.asarray(self._side[:, term_ids] @ weights).ravel()
+            ])
+            norms = np.concatenate([self._norms, self._side_norms])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = np.where(norms > 0, dots / (norms * query_norm), 0.0)
+
+            if exclude_case_id:
+                scores[self._case_positions.get(exclude_case_id, [])] = 0.0
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {**self._metadata[position], "score": round(float(scores[position]), 4)}
+                for position in top if scores[position] >= min_score
+            ]
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Speculative Analysis - Start murder analyses before the last intake answer
+
+The last intake step (additional notes) is usually answered with "none", yet
+the analysis used to start only after that answer arrived. When a session
+reaches the last step, the murder agent starts the analysis in the
+background on the details collected so far. When the final answer arrives:
+
+  * if it is empty or trivial ("none", "n/a", ...), the speculative result is
+    used, waiting for it if it is still running
+  * otherwise the speculation is cancelled (a queued one never starts, a
+    running one stops streaming) and the analysis runs on the full details
+
+A speculation that has not started by then is cancelled too, so the final
+message never waits for a worker behind its own speculation. Hits, misses,
+the time saved and the tokens spent on discarded speculations are counted.
+
+Usage:
+    speculations = SpeculativeAnalyses(bulkhead.submit)
+    speculations.start(session_id, collected_data, run)     # run(details, cancel_event, usage)
+    result = speculations.take(session_id, collected_data)  # None: run the analysis normally
+    speculations.stats()
+
+Author: Augment Agent
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Constants
+SPECULATION_TTL = int(os.getenv("SPECULATION_TTL_SECONDS", "1800"))  # Unclaimed results are dropped after this
+FINAL_FIELD = "additional_notes"
+TRIVIAL_ANSWERS = {
+    "", "none", "no", "nope", "nil", "nothing", "na", "n a", "not applicable", "not available",
+    "no notes", "no additional notes", "none at this time", "nothing else", "nothing to add", "unknown"
+}
+
+def is_trivial_answer(answer: Any) -> bool:
+    """
+    Whether an answer adds nothing to the case ("None.", "n/a", "-", ...).
+
+    Args:
+        answer: The answer as stored
+
+    Returns:
+        True if it is empty or a known way of saying "nothing"
+    """
+    normalized = re.sub(r"[^a-z0-9]+", " ", str(answer or "").lower()).strip()
+    return normalized in TRIVIAL_ANSWERS
+
+class _Speculation:
+    """A background analysis for one session."""
+
+    def __init__(self, case_details: Dict[str, Any]):
+        self.case_details = case_details
+        self.cancel_event = threading.Event()
+        self.usage: Dict[str, int] = {}
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.future: Optional[Future] = None
+
+    def tokens(self) -> int:
+        return self.usage.get("prompt_tokens", 0) + self.usage.get("completion_tokens", 0)
+
+class SpeculativeAnalyses:
+    """
+    Speculative analyses per session and their hit and waste counters.
+    """
+
+    def __init__(self, submit: Callable[..., Future], ttl: float = SPECULATION_TTL):
+        """
+        Initialize the speculations.
+
+        Args:
+            submit: Queues a task and returns its Future (e.g. a Bulkhead's submit); may raise when full
+            ttl: Seconds after which an unclaimed speculation is dropped
+        """
+        self.submit = submit
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._speculations: Dict[str, _Speculation] = {}
+        self.counts = {"started": 0, "skipped": 0, "hits": 0, "misses": 0, "not_started": 0,
+                       "failed": 0, "discarded": 0}
+        self.saved_seconds = 0.0
+        self.used_tokens = 0
+        self.wasted_tokens = 0
+
+    def start(self, session_id: str, case_details: Dict[str, Any],
+              run: Callable[[Dict[str, Any], threading.Event, Dict[str, int]], Any]) -> bool:
+        """
+        Start a speculative analysis for a session (replacing any earlier one).
+
+        Args:
+            session_id: Session the analysis belongs to
+            case_details: Details collected so far (copied)
+            run: run(case_details, cancel_event, usage) performs the analysis; it should stop early when
+                cancel_event is set, fill usage with prompt_tokens and completion_tokens, and raise if
+                the analysis failed
+
+        Returns:
+            Whether the speculation was queued
+        """
+        self._expire()
+        speculation = _Speculation(dict(case_details))
+
+        def task():
+            try:
+                return run(speculation.case_details, speculation.cancel_event, speculation.usage)
+            finally:
+                speculation.finished = time.time()
+
+        try:
+            speculation.future = self.submit(task)
+        except Exception as e:
+            logger.info(f"Skipped speculative analysis for session {session_id}: {str(e)}")
+            with self._lock:
+                self.counts["skipped"] += 1
+            return False
+
+        with self._lock:
+            previous = self._speculations.pop(session_id, None)
+            self._speculations[session_id] = speculation
+            self.counts["started"] += 1
+        if previous is not None:
+            self._cancel(previous, "discarded")
+        logger.info(f"Started speculative analysis for session {session_id}")
+        return True
+
+    def take(self, session_id: str, case_details: Dict[str, Any], final_field: str = FINAL_FIELD) -> Optional[Any]:
+        """
+        Claim the speculative result for a session that has answered the last step.
+
+        Args:
+            session_id: The session
+            case_details: All collected details, including the final answer
+            final_field: Field of the last step
+
+        Returns:
+            The result of run() if the speculation matches and the final answer is trivial, else None
+            (any speculation is then cancelled and the caller runs the analysis itself)
+        """
+        with self._lock:
+            speculation = self._speculations.pop(session_id, None)
+        if speculation is None:
+            return None
+
+        others = {key: value for key, value in case_details.items() if key != final_field}
+        if not is_trivial_answer(case_details.get(final_field)) or others != speculation.case_details:
+            self._cancel(speculation, "misses")
+            return None
+        if speculation.future.cancel():
+            # Still queued: a fresh run is no slower, and waiting could block the worker it needs
+            self._count("not_started")
+            return None
+
+        waited_from = time.time()
+        try:
+            result = speculation.future.result()
+        except Exception as e:
+            logger.error(f"Speculative analysis for session {session_id} failed: {str(e)}")
+            self._count("failed")
+            return None
+        waited = time.time() - waited_from
+        with self._lock:
+            self.counts["hits"] += 1
+            self.saved_seconds += max(0.0, (speculation.finished or time.time()) - speculation.started - waited)
+            self.used_tokens += speculation.tokens()
+        logger.info(f"Used speculative analysis for session {session_id} (waited {waited:.1f}s)")
+        return result
+
+    def discard(self, session_id: str):
+        """Cancel the speculation of a session, e.g. when it is reset."""
+        with self._lock:
+            speculation = self._speculations.pop(session_id, None)
+        if speculation is not None:
+            self._cancel(speculation, "discarded")
+
+    def _cancel(self, speculation: _Speculation, outcome: str):
+        """Stop a speculation and count its tokens as wasted once it has stopped."""
+        speculation.cancel_event.set()
+        speculation.future.cancel()
+        self._count(outcome)
+
+        def add_waste(_):
+            with self._lock:
+                self.wasted_tokens += speculation.tokens()
+
+        speculation.future.add_done_callback(add_waste)
+
+    def _expire(self):
+        """Drop speculations nobody claimed within the TTL."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [session_id for session_id, speculation in self._speculations.items()
+                       if speculation.started < cutoff]
+            speculations = [self._speculations.pop(session_id) for session_id in expired]
+        for speculation in speculations:
+            self._cancel(speculation, "discarded")
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, time saved and tokens used and wasted."""
+        with self._lock:
+            resolved = self.counts["hits"] + self.counts["misses"] + self.counts["not_started"] + self.counts["failed"]
+            return dict(
+                self.counts,
+                pending=len(self._speculations),
+                hit_rate=round(self.counts["hits"] / resolved, 3) if resolved else 0.0,
+                mean_saved_seconds=round(self.saved_seconds / self.counts["hits"], 3) if self.counts["hits"] else 0.0,
+                used_tokens=self.used_tokens,
+                wasted_tokens=self.wasted_tokens
+            )
@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Supervisor - Pre-forked worker processes for the agent servers
+
+This module runs a WSGI app as several pre-forked worker processes per agent.
+The supervisor binds each agent's listening socket once, and every worker of
+that agent accepts from the shared socket, so the kernel spreads connections
+across them; each worker is a threaded server. The supervisor restarts a
+worker that exits, backing off exponentially when the same worker keeps
+crashing, kills and replaces a worker whose heartbeat stops, and on SIGHUP
+performs a rolling restart that starts each replacement before stopping the
+worker it replaces, so the agent never drops below its worker count. Workers
+whose supervisor dies stop serving, so the ports are free for a new one.
+
+Workers publish their pid, heartbeat, requests served and requests in flight
+to a status table in shared memory, which any worker (for /api/health) or the
+supervisor (periodically in the log, or on SIGUSR1) can read.
+
+Unix only (it relies on fork and inherited sockets).
+
+Usage:
+    supervisor = Supervisor(app, {"murder": 5000, "theft": 5001}, workers=4)
+    supervisor.run()
+
+    kill -HUP <supervisor pid>   # rolling restart
+    kill -USR1 <supervisor pid>  # log worker status
+
+Author: Augment Agent
+"""
+
+import logging
+import mmap
+import os
+import signal
+import socket
+import struct
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_WORKERS = int(os.getenv("SERVER_WORKERS", "2"))  # Worker processes per agent
+LISTEN_BACKLOG = 128
+HEARTBEAT_INTERVAL = 1.0  # Seconds between worker heartbeats
+HEARTBEAT_TIMEOUT = 30.0  # A worker silent this long is killed and replaced
+MONITOR_INTERVAL = 0.5  # Seconds between supervisor checks
+RESTART_BASE_DELAY = 1.0  # Backoff after the first crash, doubled for each further one
+RESTART_MAX_DELAY = 60.0
+STABLE_SECONDS = 30.0  # A worker that lived this long resets its crash count
+GRACEFUL_TIMEOUT = 30.0  # Seconds a stopping worker gets to finish requests in flight
+STATUS_LOG_INTERVAL = 60.0
+
+# One status slot per worker: pid, in_flight, restarts, started_at, heartbeat, requests
+SLOT = struct.Struct("<iiIddQ")
+PID, IN_FLIGHT, RESTARTS, HEARTBEAT, REQUESTS = (
+    struct.Struct("<i"), struct.Struct("<i"), struct.Struct("<I"), struct.Struct("<d"), struct.Struct("<Q"))
+OFFSETS = {"pid": 0, "in_flight": 4, "restarts": 8, "started_at": 12, "heartbeat": 20, "requests": 28}
+
+class Worker:
+    """Supervisor-side record of one worker process."""
+
+    def __init__(self, agent: str, slot: int):
+        self.agent = agent
+        self.slot = slot
+        self.pid: Optional[int] = None
+        self.started_at = 0.0
+        self.crashes = 0
+        self.restart_at: Optional[float] = None  # Pending restart time after an exit
+
+class Supervisor:
+    """
+    Pre-forks and supervises worker processes serving a WSGI app on one port per agent.
+    """
+
+    def __init__(self, app, ports: Dict[str, int], workers: int = DEFAULT_WORKERS, host: str = "0.0.0.0"):
+        """
+        Initialize the supervisor.
+
+        Args:
+            app: WSGI application served by every worker
+            ports: Agent name -> port
+            workers: Worker processes per agent
+            host: Interface to listen on
+        """
+        self.app = app
+        self.ports = ports
+        self.workers_per_agent = workers
+        self.host = host
+        self.sockets: Dict[str, socket.socket] = {}
+        self.workers: Dict[str, List[Worker]] = {}
+        self._processes: Dict[int, Worker] = {}  # pid -> worker, including replacements not yet in workers
+        # One spare slot per agent so a rolling restart can start a replacement first
+        self.slots_per_agent = workers + 1
+        self._agents = list(ports)
+        self._table = mmap.mmap(-1, SLOT.size * self.slots_per_agent * len(self._agents))
+        self._stopping = False
+        self._rolling = False
+        self._log_status = False
+
+    # Shared status table
+
+    def _slot_offset(self, agent: str, slot: int) -> int:
+        return SLOT.size * (self._agents.index(agent) * self.slots_per_agent + slot)
+
+    def _write(self, agent: str, slot: int, field: str, fmt: struct.Struct, value):
+        fmt.pack_into(self._table, self._slot_offset(agent, slot) + OFFSETS[field], value)
+
+    def _read_slot(self, agent: str, slot: int) -> Dict[str, Any]:
+        pid, in_flight, restarts, started_at, heartbeat, requests = SLOT.unpack_from(
+            self._table, self._slot_offset(agent, slot))
+        return {"pid": pid, "in_flight": in_flight, "restarts": restarts, "started_at": started_at,
+                "heartbeat": heartbeat, "requests": requests}
+
+    def status(self) -> List[Dict[str, Any]]:
+        """
+        Health and load of every running worker, readable from the supervisor or any worker.
+
+        Returns:
+            One dictionary per worker with agent, slot, pid, healthy, in_flight, requests,
+            uptime_seconds, heartbeat_age_seconds and restarts
+        """
+        now = time.time()
+        workers = []
+        for agent in self._agents:
+            for slot in range(self.slots_per_agent):
+                data = self._read_slot(agent, slot)
+                if not data["pid"]:
+                    continue
+                heartbeat_age = now - data["heartbeat"] if data["heartbeat"] else None
+                workers.append({
+                    "agent": agent,
+                    "slot": slot,
+                    "pid": data["pid"],
+                    "healthy": heartbeat_age is not None and heartbeat_age < HEARTBEAT_TIMEOUT,
+                    "in_flight": data["in_flight"],
+                    "requests": data["requests"],
+                    "uptime_seconds": round(now - data["started_at"], 1),
+                    "heartbeat_age_seconds": round(heartbeat_age, 1) if heartbeat_age is not None else None,
+                    "restarts": data["restarts"]
+                })
+        return workers
+
+    # Worker process
+
+    def _serve(self, agent: str, slot: int, supervisor_pid: int):
+        """Body of a worker process: serve the shared socket until told to stop or the supervisor dies."""
+        from werkzeug.serving import make_server
+
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is handled by the supervisor
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+        lock = threading.Lock()
+        counters = {"in_flight": 0, "requests": 0}
+
+        def counted_app(environ, start_response):
+            with lock:
+                counters["in_flight"] += 1
+                self._write(agent, slot, "in_flight", IN_FLIGHT, counters["in_flight"])
+            try:
+                return self.app(environ, start_response)
+            finally:
+                with lock:
+                    counters["in_flight"] -= 1
+                    counters["requests"] += 1
+                    self._write(agent, slot, "in_flight", IN_FLIGHT, counters["in_flight"])
+                    self._write(agent, slot, "requests", REQUESTS, counters["requests"])
+
+        for other, listener in self.sockets.items():
+            if other != agent:
+                listener.close()
+        server = make_server(self.host, self.ports[agent], counted_app, threaded=True,
+                             fd=self.sockets[agent].fileno())
+
+        def stop(signum=None, frame=None):
+            # serve_forever runs in this thread, so shut it down from another one
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        # Heartbeats come from the accept loop itself (serve_forever calls service_actions about
+        # twice a second), so a worker whose loop is stuck stops beating even if the process lives
+        last_beat = [0.0]
+        orphaned = threading.Event()
+
+        def heartbeat():
+            now = time.time()
+            if now - last_beat[0] >= HEARTBEAT_INTERVAL:
+                last_beat[0] = now
+                self._write(agent, slot, "heartbeat", HEARTBEAT, now)
+            # The supervisor was killed: stop, so the port is free for the next supervisor
+            if os.getppid() != supervisor_pid and not orphaned.is_set():
+                orphaned.set()
+                logger.warning(f"{agent} worker {slot} lost its supervisor (pid {supervisor_pid}); stopping")
+                stop()
+
+        server.service_actions = heartbeat
+        signal.signal(signal.SIGTERM, stop)
+        heartbeat()
+        server.serve_forever()
+
+        # Let requests in flight finish before exiting
+        deadline = time.time() + GRACEFUL_TIMEOUT
+        while counters["in_flight"] and time.time() < deadline:
+            time.sleep(0.05)
+
+    def _spawn(self, worker: Worker, keep_restarts: bool = True):
+        """
+        Fork a worker process into its slot.
+
+        Args:
+            worker: Worker to start
+            keep_restarts: Keep the slot's restart count (a rolling replacement starts from 0)
+        """
+        now = time.time()
+        restarts = self._read_slot(worker.agent, worker.slot)["restarts"] if keep_restarts else 0
+        supervisor_pid = os.getpid()
+        # Heartbeat 0 marks the slot as starting until the new worker writes its first one
+        SLOT.pack_into(self._table, self._slot_offset(worker.agent, worker.slot),
+                       0, 0, restarts, now, 0.0, 0)
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                self._serve(worker.agent, worker.slot, supervisor_pid)
+            except BaseException:
+                logger.exception(f"{worker.agent} worker {worker.slot} failed")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        worker.pid = pid
+        self._processes[pid] = worker
+        worker.started_at = now
+        worker.restart_at = None
+        self._write(worker.agent, worker.slot, "pid", PID, pid)
+        logger.info(f"Started {worker.agent} worker {worker.slot} (pid {pid}) on port {self.ports[worker.agent]}")
+
+    # Supervisor process
+
+    @staticmethod
+    def _signal(worker: Worker, signum: int):
+        """Send a signal to a worker that may already have exited."""
+        try:
+            os.kill(worker.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self):
+        """Collect exited workers and schedule their restart with backoff."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            worker = self._processes.pop(pid, None)
+            if not worker:
+                continue
+            worker.pid = None
+            self._write(worker.agent, worker.slot, "pid", PID, 0)
+            if self._stopping or worker.restart_at == -1:
+                continue  # Stopped on purpose
+            lived = time.time() - worker.started_at
+            worker.crashes = 1 if lived >= STABLE_SECONDS else worker.crashes + 1
+            delay = min(RESTART_MAX_DELAY, RESTART_BASE_DELAY * 2 ** (worker.crashes - 1))
+            worker.restart_at = time.time() + delay
+            logger.warning(f"{worker.agent} worker {worker.slot} (pid {pid}) exited with status {status} after "
+                           f"{lived:.1f} s; restarting in {delay:.0f} s")
+
+    def _restart_due(self):
+        """Restart workers whose backoff has elapsed."""
+        now = time.time()
+        for workers in self.workers.values():
+            for worker in workers:
+                if worker.pid is None and worker.restart_at is not None and worker.restart_at != -1 \
+                        and worker.restart_at <= now:
+                    restarts = self._read_slot(worker.agent, worker.slot)["restarts"]
+                    self._write(worker.agent, worker.slot, "restarts", RESTARTS, restarts + 1)
+                    self._spawn(worker)
+
+    def _check_heartbeats(self):
+        """Kill workers that stopped sending heartbeats (they are restarted once reaped)."""
+        now = time.time()
+        for workers in self.workers.values():
+            for worker in workers:
+                if worker.pid is None:
+                    continue
+                heartbeat = self._read_slot(worker.agent, worker.slot)["heartbeat"] or worker.started_at
+                if now - heartbeat > HEARTBEAT_TIMEOUT:
+                    logger.error(f"{worker.agent} worker {worker.slot} (pid {worker.pid}) missed heartbeats; "
+                                 f"killing it")
+                    self._signal(worker, signal.SIGKILL)
+
+    def _stop_worker(self, worker: Worker, timeout: float = GRACEFUL_TIMEOUT + 5):
+        """Stop a worker gracefully (SIGTERM), killing it if it outlives the timeout."""
+        pid = worker.pid
+        if pid is None:
+            return
+        worker.restart_at = -1  # Do not restart when reaped
+        self._signal(worker, signal.SIGTERM)
+        deadline = time.time() + timeout
+        while worker.pid == pid and time.time() < deadline:
+            time.sleep(0.05)
+            self._reap()
+        if worker.pid == pid:
+            self._signal(worker, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self._processes.pop(pid, None)
+            worker.pid = None
+            self._write(worker.agent, worker.slot, "pid", PID, 0)
+
+    def _wait_ready(self, worker: Worker, timeout: float = HEARTBEAT_TIMEOUT) -> bool:
+        """Wait for a new worker's first heartbeat."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if worker.pid is None:
+                return False
+            if self._read_slot(worker.agent, worker.slot)["heartbeat"]:
+                return True
+            time.sleep(0.05)
+            self._reap()
+        return False
+
+    def rolling_restart(self):
+        """Replace every worker one at a time, starting each replacement before stopping the old worker."""
+        logger.info("Rolling restart started")
+        for agent, workers in self.workers.items():
+            for position, old in enumerate(list(workers)):
+                used = {worker.slot for worker in workers}
+                spare = next(slot for slot in range(self.slots_per_agent) if slot not in used)
+                new = Worker(agent, spare)
+                self._spawn(new, keep_restarts=False)
+                if not self._wait_ready(new):
+                    logger.error(f"Replacement for {agent} worker {old.slot} did not start; "
+                                 f"keeping the old worker and stopping the rolling restart")
+                    self._stop_worker(new)
+                    return
+                workers[position] = new
+                self._stop_worker(old)
+        logger.info("Rolling restart finished")
+
+    def log_status(self):
+        """Log one line per worker with its health and load."""
+        for worker in self.status():
+            logger.info(f"{worker['agent']} worker {worker['slot']} pid {worker['pid']}: "
+                        f"{'healthy' if worker['healthy'] else 'UNHEALTHY'}, {worker['in_flight']} in flight, "
+                        f"{worker['requests']} served, up {worker['uptime_seconds']:.0f} s, "
+                        f"{worker['restarts']} restarts")
+
+    def _handle_signal(self, signum, frame):
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            self._stopping = True
+        elif signum == signal.SIGHUP:
+            self._rolling = True
+        elif signum == signal.SIGUSR1:
+            self._log_status = True
+
+    def run(self):
+        """Bind the agents' sockets, pre-fork the workers and supervise them until SIGTERM/SIGINT."""
+        for agent, port in self.ports.items():
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((self.host, port))
+            listener.listen(LISTEN_BACKLOG)
+            listener.set_inheritable(True)
+            self.sockets[agent] = listener
+            self.workers[agent] = [Worker(agent, slot) for slot in range(self.workers_per_agent)]
+            for worker in self.workers[agent]:
+                self._spawn(worker)
+
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGUSR1):
+            signal.signal(signum, self._handle_signal)
+        logger.info(f"Supervisor {os.getpid()} running {self.workers_per_agent} workers for "
+                    f"{', '.join(self.ports)}")
+
+        last_status = time.time()
+        while not self._stopping:
+            time.sleep(MONITOR_INTERVAL)
+            self._reap()
+            self._restart_due()
+            self._check_heartbeats()
+            if self._rolling:
+                self._rolling = False
+                self.rolling_restart()
+            if self._log_status or time.time() - last_status >= STATUS_LOG_INTERVAL:
+                self._log_status = False
+                last_status = time.time()
+                self.log_status()
+
+        logger.info("Supervisor stopping workers")
+        for workers in self.workers.values():
+            for worker in workers:
+                if worker.pid is not None:
+                    worker.restart_at = -1
+                    self._signal(worker, signal.SIGTERM)
+        for workers in self.workers.values():
+            for worker in workers:
+                self._stop_worker(worker)
+        for listener in self.sockets.values():
+            listener.close()
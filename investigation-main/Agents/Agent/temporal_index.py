@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Temporal Index - Time-Window Queries over Completed Cases
+
+validate_input normalizes date_of_crime to YYYY-MM-DD and time_of_crime to HH:MM,
+but nothing indexed them, so "what else happened around then, around there"
+meant scanning every case. This module keeps the start minute of every case
+(minutes since the Unix epoch) in a sorted compact array and answers window
+queries with two bisections:
+
+- all cases within +/- N minutes (e.g. 2 hours or 3 days) of a case
+- optionally restricted to the same normalized location string, or to
+  locations within N km when both locations contain coordinates
+
+Cases without a usable time are indexed as spanning their whole day. The index
+is persisted to data/temporal_index.npz and caught up from the case repository
+(records newer than the last indexed one) when it is loaded.
+
+Usage:
+    from temporal_index import TemporalIndex
+
+    index = TemporalIndex.load_or_build(CaseRepository())
+    index.query(case_details, window_minutes=120, radius_km=5, same_location=True)
+
+Author: Augment Agent
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
+
+from entity_index import normalize_entity
+
+logger = logging.getLogger(__name__)
+
+# Constants
+AGENT_DIR = Path(__file__).resolve().parent
+TEMPORAL_INDEX_FILE = Path(os.getenv("TEMPORAL_INDEX_FILE", AGENT_DIR / "data" / "temporal_index.npz"))
+INDEX_VERSION = 1
+EPOCH = datetime(1970, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_LIMIT = 50
+
+# Field holding the date and time of the incident for each agent type
+DATE_FIELDS = ["date_of_crime", "date_of_theft", "date_detected"]
+TIME_FIELDS = ["time_of_crime", "time_of_theft"]
+
+TIME_PATTERN = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b")
+# Decimal "lat, lon" pairs typed into a location ("Riverside Park (40.8010, -73.9720)")
+COORDINATES_PATTERN = re.compile(r"(-?\d{1,2}\.\d{2,})\s*,\s*(-?\d{1,3}\.\d{2,})")
+
+def case_minutes(case_details: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """
+    Start minute (since the Unix epoch) and duration in minutes of a case.
+
+    Args:
+        case_details: Collected case details (any agent)
+
+    Returns:
+        (start minute, span) where span is 0 for a known time and a full day otherwise,
+        or None if the case has no parseable date
+    """
+    date_value = next((case_details[field] for field in DATE_FIELDS if case_details.get(field)), None)
+    if not date_value:
+        return None
+    try:
+        day = datetime.strptime(str(date_value).strip()[:10], "%Y-%m-%d")
+    except ValueError:
+        return None
+    start = int((day - EPOCH).total_seconds() // 60)
+
+    time_value = next((case_details[field] for field in TIME_FIELDS if case_details.get(field)), None)
+    match = TIME_PATTERN.search(str(time_value)) if time_value else None
+    if match is None:
+        return start, MINUTES_PER_DAY - 1
+    return start + int(match.group(1)) * 60 + int(match.group(2)), 0
+
+def location_key(location: Optional[str]) -> str:
+    """Normalized location string without coordinates ("12 Elm St." and "12 elm street" share a key)."""
+    if not location or str(location).strip().lower() == "unknown":
+        return ""
+    return normalize_entity("address", COORDINATES_PATTERN.sub(" ", str(location)))
+
+def location_coordinates(location: Optional[str]) -> Tuple[float, float]:
+    """Latitude and longitude written in a location string, or (nan, nan)."""
+    match = COORDINATES_PATTERN.search(str(location or ""))
+    if match:
+        latitude, longitude = float(match.group(1)), float(match.group(2))
+        if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+            return latitude, longitude
+    return math.nan, math.nan
+
+def _encode_strings(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Dictionary-encode strings as (UTF-8 blob of the distinct values, int32 codes)."""
+    codes = {}
+    encoded = np.array([codes.setdefault(value, len(codes)) for value in values], dtype=np.int32)
+    return np.frombuffer("\x1f".join(codes).encode("utf-8"), dtype=np.uint8), encoded
+
+def _decode_strings(blob: np.ndarray, codes: np.ndarray) -> List[str]:
+    """Inverse of _encode_strings."""
+    distinct = blob.tobytes().decode("utf-8").split("\x1f")
+    return [distinct[code] for code in codes.tolist()]
+
+def haversine_km(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """Great-circle distance in kilometres."""
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+class TemporalIndex:
+    """
+    Sorted index of case start minutes with window, location and distance filters.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._lock = threading.Lock()
+        # Parallel arrays sorted by start minute
+        self._starts = array("q")
+        self._record_ids = array("q")
+        # Record ID -> (case ID, agent, span, location key, latitude, longitude)
+        self._cases = {}
+        # Highest record ID read by sync(); cases added directly do not move it, so records stored
+        # by other processes with lower IDs are still picked up
+        self.last_record_id = 0
+        self._unsaved = 0
+
+    def __len__(self) -> int:
+        return len(self._cases)
+
+    @classmethod
+    def load_or_build(cls, repository, path: Optional[Path] = None) -> "TemporalIndex":
+        """
+        Load the persisted index and catch up with the repository, or build it from scratch.
+
+        Args:
+            repository: CaseRepository instance
+            path: Index file (defaults to data/temporal_index.npz or $TEMPORAL_INDEX_FILE)
+
+        Returns:
+            TemporalIndex instance
+        """
+        path = Path(path) if path else TEMPORAL_INDEX_FILE
+        index = cls()
+        if path.exists():
+            try:
+                index._load(path)
+            except Exception as e:
+                logger.warning(f"Rebuilding temporal index, could not load {path}: {str(e)}")
+                index = cls()
+
+        added = index.sync(repository)
+        if added:
+            index.save(path)
+        logger.info(f"Temporal index ready with {len(index)} cases ({added} added from the repository)")
+        return index
+
+    def sync(self, repository) -> int:
+        """
+        Index the repository records stored since the last indexed record.
+
+        Returns:
+            Number of newly indexed cases
+        """
+        added = 0
+        for record in repository.iter_cases(after_id=self.last_record_id):
+            added += self.add(record["id"], record["agent"], record["collected_data"])
+            with self._lock:
+                self.last_record_id = max(self.last_record_id, record["id"])
+        return added
+
+    def add(self, record_id: int, agent: str, case_details: Dict[str, Any]) -> bool:
+        """
+        Add a completed case.
+
+        Args:
+            record_id: Case repository record ID
+            agent: Agent type
+            case_details: Collected case details
+
+        Returns:
+            False if the case has no parseable date (it is not indexed) or was already indexed
+        """
+        timing = case_minutes(case_details)
+        with self._lock:
+            if timing is None or record_id in self._cases:
+                return False
+            start, span = timing
+            latitude, longitude = location_coordinates(case_details.get("location"))
+            self._cases[record_id] = (case_details.get("case_id"), agent, span,
+                                      location_key(case_details.get("location")), latitude, longitude)
+            # Keep the parallel arrays aligned: insert at the rightmost position of equal starts
+            position = bisect_right(self._starts, start)
+            self._starts.insert(position, start)
+            self._record_ids.insert(position, record_id)
+            self._unsaved += 1
+            return True
+
+    def query(self, case_details: Dict[str, Any], window_minutes: int, radius_km: Optional[float] = None,
+              same_location: bool = False, exclude_record_id: Optional[int] = None,
+              exclude_case_id: Optional[str] = None, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Return the cases whose time overlaps a window around a case.
+
+        Args:
+            case_details: Case to search around (needs a date; the time is optional)
+            window_minutes: Half-width of the window (120 for +/- 2 hours, 4320 for +/- 3 days)
+            radius_km: Keep cases within this distance (only when both locations have coordinates)
+            same_location: Keep cases with the same normalized location string
+            exclude_record_id: Record to leave out (usually the case itself)
+            exclude_case_id: Case ID to leave out
+            limit: Maximum number of results
+
+        Returns:
+            List of {"record_id", "case_id", "agent", "minutes_apart", "distance_km", "same_location"},
+            closest in time first. With radius_km or same_location, a case is kept if it matches either.
+        """
+        timing = case_minutes(case_details)
+        if timing is None:
+            return []
+        start, span = timing
+        low, high = start - window_minutes, start + span + window_minutes
+        key = location_key(case_details.get("location"))
+        latitude, longitude = location_coordinates(case_details.get("location"))
+        filter_location = radius_km is not None or same_location
+
+        results = []
+        with self._lock:
+            # A stored case overlaps [low, high] if it starts before high and ends after low;
+            # spans are at most a day, so only starts from low - one day need checking
+            first = bisect_left(self._starts, low - (MINUTES_PER_DAY - 1))
+            last = bisect_right(self._starts, high)
+            for position in range(first, last):
+                other_start = self._starts[position]
+                record_id = self._record_ids[position]
+                case_id, agent, other_span, other_key, other_latitude, other_longitude = self._cases[record_id]
+                if other_start + other_span < low or record_id == exclude_record_id:
+                    continue
+                if exclude_case_id is not None and case_id == exclude_case_id:
+                    continue
+
+                matches_location = bool(key) and key == other_key
+                distance = None
+                if not (math.isnan(latitude) or math.isnan(other_latitude)):
+                    distance = haversine_km(latitude, longitude, other_latitude, other_longitude)
+                if filter_location and not ((same_location and matches_location) or
+                                            (radius_km is not None and distance is not None
+                                             and distance <= radius_km)):
+                    continue
+
+                # Zero when the intervals overlap
+                apart = max(0, other_start - (start + span), start - (other_start + other_span))
+                results.append({
+                    "record_id": record_id,
+                    "case_id": case_id,
+                    "agent": agent,
+                    "minutes_apart": apart,
+                    "time_known": other_span == 0,
+                    "distance_km": round(distance, 2) if distance is not None else None,
+                    "same_location": matches_location
+                })
+
+        results.sort(key=lambda result: (result["minutes_apart"], -result["record_id"]))
+        return results[:limit]
+
+    def save(self, path: Optional[Path] = None):
+        """Persist the index (written to a temporary file and renamed)."""
+        path = Path(path) if path else TEMPORAL_INDEX_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            record_ids = list(self._cases)
+            rows = [self._cases[record_id] for record_id in record_ids]
+            arrays = {
+                "version": np.array([INDEX_VERSION, self.last_record_id], dtype=np.int64),
+                "starts": np.frombuffer(self._starts, dtype=np.int64).copy(),
+                "positions": np.frombuffer(self._record_ids, dtype=np.int64).copy(),
+                "record_ids": np.array(record_ids, dtype=np.int64),
+                "spans": np.array([row[2] for row in rows], dtype=np.int32),
+                "coordinates": np.array([(row[4], row[5]) for row in rows], dtype=np.float64).reshape(-1, 2)
+            }
+            for name, column in [("case_ids", 0), ("agents", 1), ("locations", 3)]:
+                arrays[f"{name}_blob"], arrays[f"{name}_codes"] = _encode_strings([row[column] or "" for row in rows])
+            self._unsaved = 0
+
+        # Unique per saving thread, so concurrent saves do not write to the same temporary file
+        temporary = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npz")
+        np.savez(temporary, **arrays)
+        os.replace(temporary, path)
+
+    def save_if_dirty(self, path: Optional[Path] = None, min_changes: int = 1):
+        """Persist the index if at least min_changes cases were added since the last save."""
+        if self._unsaved >= min_changes:
+            self.save(path)
+
+    def _load(self, path: Path):
+        """Load a persisted index."""
+        with np.load(path, allow_pickle=False) as data:
+            version, last_record_id = (int(value) for value in data["version"])
+            if version != INDEX_VERSION:
+                raise ValueError(f"index version {version}, expected {INDEX_VERSION}")
+            self._starts = array("q", data["starts"].tobytes())
+            self._record_ids = array("q", data["positions"].tobytes())
+            case_ids, agents, locations = (_decode_strings(data[f"{name}_blob"], data[f"{name}_codes"])
+                                           for name in ("case_ids", "agents", "locations"))
+            self._cases = {
+                record_id: (case_id or None, agent, span, location, latitude, longitude)
+                for record_id, case_id, agent, span, location, (latitude, longitude) in zip(
+                    data["record_ids"].tolist(), case_ids, agents, data["spans"].tolist(), locations,
+                    data["coordinates"].tolist()
+                )
+            }
+            self.last_record_id = last_record_id
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for agent config version adoption across processes.
+
+This script runs two AgentConfigStore instances on one config file, as two
+server processes would, and checks that each adopts the other's newer
+versions (by polling and through the watcher), that updates from both are
+merged instead of lost, and that an older version on disk is not adopted.
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from agent_config import AgentConfigStore
+
+DEFAULTS = {
+    "murder": {"system_prompt": "Murder prompt", "enabled": True},
+    "theft": {"system_prompt": "Theft prompt", "enabled": False},
+    "fraud": {"system_prompt": "Fraud prompt", "enabled": False}
+}
+TIMEOUT = 5  # Seconds to wait for the watcher
+
+def test_adopt_newer_version():
+    """An update in one store is adopted by the other, with its listeners called once."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "agent_config.json"
+        first, second = AgentConfigStore(DEFAULTS, path), AgentConfigStore(DEFAULTS, path)
+        assert first.current().version == second.current().version == 0
+
+        swaps = []
+        second.add_listener(lambda previous, snapshot: swaps.append((previous.version, snapshot.version)))
+        snapshot = first.update({"theft": True})
+        assert snapshot.version == 1 and first.current() is snapshot
+
+        second._poll_once()
+        assert second.current().version == 1 and second.current().is_enabled("theft")
+        assert second.current().agents["theft"]["system_prompt"] == "Theft prompt"
+        second._poll_once()
+        assert swaps == [(0, 1)], swaps
+    print("Adopt a newer version: OK")
+
+def test_updates_merge():
+    """An update starts from the newest version on disk, so neither store's change is lost."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "agent_config.json"
+        first, second = AgentConfigStore(DEFAULTS, path), AgentConfigStore(DEFAULTS, path)
+
+        first.update({"theft": True})
+        # The second store has not polled yet and still holds version 0
+        snapshot = second.update({"fraud": True})
+        assert snapshot.version == 2
+        assert snapshot.enabled_agents() == {"murder": True, "theft": True, "fraud": True}
+
+        first._poll_once()
+        assert first.current().version == 2 and first.current().enabled_agents() == snapshot.enabled_agents()
+        assert AgentConfigStore(DEFAULTS, path).current().version == 2
+    print("Updates from two stores merge: OK")
+
+def test_older_version_ignored():
+    """A config file with a lower version than the active one is not adopted."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "agent_config.json"
+        store = AgentConfigStore(DEFAULTS, path)
+        store.update({"theft": True})
+        store.update({"fraud": True})
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "updated_at": 0, "agents": {"theft": {"enabled": False}}}, f)
+        store._poll_once()
+        assert store.current().version == 2 and store.current().is_enabled("theft")
+    print("Older version ignored: OK")
+
+def test_watcher():
+    """The background watcher picks up the other store's update without an explicit poll."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "agent_config.json"
+        first = AgentConfigStore(DEFAULTS, path, poll_interval=0.05)
+        second = AgentConfigStore(DEFAULTS, path, poll_interval=0.05)
+        second.start()
+        try:
+            first.update({"murder": False})
+            deadline = time.monotonic() + TIMEOUT
+            while second.current().version < 1 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert second.current().version == 1 and not second.current().is_enabled("murder")
+            assert second.status()["watcher_running"]
+        finally:
+            second.stop()
+        assert not second.status()["watcher_running"]
+    print("Watcher adoption: OK")
+
+if __name__ == "__main__":
+    test_adopt_newer_version()
+    test_updates_merge()
+    test_older_version_ignored()
+    test_watcher()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for compaction of the analysis archive.
+
+This script deletes a case whose live record sits in a segment that is not
+rewritten, compacts the segment holding the tombstone, and reopens the
+archive to check that the case stays deleted and the other cases survive.
+"""
+
+import random
+import string
+import tempfile
+
+from analysis_archive import AnalysisArchive
+
+SEGMENT_SIZE = 4096
+
+def document(case_id, seed):
+    """Analysis document that does not compress away."""
+    rng = random.Random(seed)
+    return {"case_id": case_id, "analysis": "".join(rng.choice(string.ascii_letters) for _ in range(400))}
+
+def test_delete_compact_reopen():
+    """A deleted case must not come back after compaction and reopening."""
+    with tempfile.TemporaryDirectory() as directory:
+        with AnalysisArchive(directory, segment_size=SEGMENT_SIZE) as archive:
+            # Segment 1: the deleted case among live ones, filled until the last one starts segment 2
+            archive.put("DELETED-1", document("DELETED-1", 0))
+            kept = []
+            while archive.stats()["segments"] == 1:
+                kept.append(f"KEPT-{len(kept)}")
+                archive.put(kept[-1], document(kept[-1], len(kept)))
+            # Segment 2: the tombstone among superseded rewrites of one case, so it is rewritten
+            assert archive.delete("DELETED-1")
+            for number in range(12):
+                archive.put("REWRITTEN-1", document("REWRITTEN-1", 100 + number))
+
+            stats = archive.compact()
+            print(f"Compaction: {stats}")
+            assert stats["segments"] >= 1, "the segment with the tombstone should be rewritten"
+            assert archive.get("DELETED-1") is None
+
+        with AnalysisArchive(directory, segment_size=SEGMENT_SIZE) as archive:
+            assert archive.get("DELETED-1") is None, "deleted case came back after reopening"
+            assert archive.get("REWRITTEN-1") == document("REWRITTEN-1", 111)
+            for number, case_id in enumerate(kept, 1):
+                assert archive.get(case_id) == document(case_id, number)
+
+            # Once the older segment is gone, the carried tombstone is dropped as well
+            archive.compact(recompress=True)
+        with AnalysisArchive(directory, segment_size=SEGMENT_SIZE) as archive:
+            assert archive.get("DELETED-1") is None
+            assert len(archive) == len(kept) + 1
+    print("Delete, compact and reopen: OK")
+
+if __name__ == "__main__":
+    test_delete_compact_reopen()
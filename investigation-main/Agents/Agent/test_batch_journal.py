@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the batch journal and resumable batch runs.
+
+This script replays a journal with a torn last line, injects a journal
+write error and checks that both the journal and a running batch fail
+instead of hanging, and resumes a batch whose journal holds done and
+in-flight entries.
+"""
+
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+import batch_runner
+import case_repository
+from batch_journal import BatchJournal, JournalError
+from batch_runner import run_batch
+from case_repository import CaseRepository
+
+TIMEOUT = 30  # Seconds before a failure path counts as hanging
+
+class FailingJournal(BatchJournal):
+    """Journal whose disk fails after its first group commit."""
+
+    def _write(self, data):
+        if self.syncs >= 1:
+            raise OSError("No space left on device")
+        super()._write(data)
+
+class EchoAgent:
+    """Agent stand-in that records which cases it analyzed."""
+
+    def __init__(self):
+        self.analyzed = []
+
+    def analyze_case(self, case_details, usage=None):
+        self.analyzed.append(case_details["case_id"])
+        return f"Analysis of {case_details['case_id']}"
+
+def run_in_thread(function, *args, **kwargs):
+    """Run a call with a timeout; returns (result, exception) or fails if it hangs."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = function(*args, **kwargs)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(TIMEOUT)
+    assert not thread.is_alive(), f"{function.__name__} did not return within {TIMEOUT} s"
+    return outcome.get("result"), outcome.get("error")
+
+def write_cases(path, count):
+    """Input JSONL with cases BATCH-0 .. BATCH-<count - 1>."""
+    with open(path, "w", encoding="utf-8") as f:
+        for number in range(count):
+            f.write(json.dumps({"case_id": f"BATCH-{number}", "location": "Leeds"}) + "\n")
+
+def test_replay():
+    """Reopening keeps the latest status per case and drops a torn last line."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "cases.results.jsonl.journal"
+        with BatchJournal(path) as journal:
+            journal.record(0, "pending", case_id="A")
+            journal.record(0, "in_flight", wait=True, case_id="A", attempt=1)
+            journal.record(0, "done", case_id="A", record_id=7)
+            journal.record(1, "in_flight", case_id="B", attempt=1)
+        with open(path, "ab") as f:
+            f.write(b'{"index": 1, "status": "do')
+
+        with BatchJournal(path) as journal:
+            assert journal.status(0)["status"] == "done" and journal.status(0)["record_id"] == 7
+            assert journal.status(1)["status"] == "in_flight"
+            assert journal.counts() == {"pending": 0, "in_flight": 1, "done": 1, "failed": 0}
+        assert path.read_bytes().endswith(b"\n"), "torn entry was not cut off"
+    print("Journal replay: OK")
+
+def test_write_error():
+    """A failed fsync wakes waiting callers with JournalError, and later records fail too."""
+    with tempfile.TemporaryDirectory() as directory:
+        journal = FailingJournal(Path(directory) / "journal")
+        journal.record(0, "in_flight", wait=True, case_id="A")
+
+        _, error = run_in_thread(journal.record, 1, "in_flight", wait=True, case_id="B")
+        assert isinstance(error, JournalError), error
+        _, error = run_in_thread(journal.record, 2, "pending", case_id="C")
+        assert isinstance(error, JournalError), error
+        _, error = run_in_thread(journal.close)
+        assert isinstance(error, JournalError), error
+    print("Journal write error: OK")
+
+def test_batch_fails_on_journal_error():
+    """A batch whose journal fails raises instead of hanging."""
+    with tempfile.TemporaryDirectory() as directory:
+        case_repository.CASES_DB = Path(directory) / "cases.db"
+        input_path = Path(directory) / "cases.jsonl"
+        write_cases(input_path, 40)
+
+        batch_runner.BatchJournal = FailingJournal
+        try:
+            _, error = run_in_thread(run_batch, EchoAgent(), "theft", input_path, concurrency=4)
+        finally:
+            batch_runner.BatchJournal = BatchJournal
+        assert isinstance(error, JournalError), error
+    print("Batch with a failing journal: OK")
+
+def test_resume_in_flight_and_done():
+    """Done cases and cases stored just before a crash are skipped; the rest are analyzed again."""
+    with tempfile.TemporaryDirectory() as directory:
+        case_repository.CASES_DB = Path(directory) / "cases.db"
+        input_path = Path(directory) / "cases.jsonl"
+        write_cases(input_path, 4)
+        output_path = batch_runner.default_output_path(input_path)
+        source = f"batch:{input_path.resolve()}"
+
+        # Earlier run: case 0 done, case 1 stored but its done entry lost in the crash,
+        # case 2 interrupted before it was stored, case 3 never started
+        with CaseRepository() as repository, \
+                BatchJournal(output_path.with_name(output_path.name + ".journal")) as journal:
+            done_id = repository.add_case("theft", {"case_id": "BATCH-0"}, "Earlier analysis 0", source=source)
+            journal.record(0, "done", case_id="BATCH-0", attempt=1, record_id=done_id)
+            journal.record(1, "in_flight", wait=True, case_id="BATCH-1", attempt=1)
+            stored_id = repository.add_case("theft", {"case_id": "BATCH-1"}, "Earlier analysis 1", source=source)
+            journal.record(2, "in_flight", wait=True, case_id="BATCH-2", attempt=1)
+
+        agent = EchoAgent()
+        summary, error = run_in_thread(run_batch, agent, "theft", input_path, concurrency=2)
+        assert error is None, error
+        assert sorted(agent.analyzed) == ["BATCH-2", "BATCH-3"], agent.analyzed
+        assert summary["resumed"] == 2 and summary["succeeded"] == 4, summary
+
+        with open(output_path, "r", encoding="utf-8") as f:
+            results = [json.loads(line) for line in f]
+        assert [result["index"] for result in results] == [0, 1, 2, 3]
+        assert results[0]["record_id"] == done_id and results[1]["record_id"] == stored_id
+        assert results[1]["analysis"] == "Earlier analysis 1"
+        with BatchJournal(output_path.with_name(output_path.name + ".journal")) as journal:
+            assert journal.counts()["done"] == 4
+    print("Resume from done and in-flight entries: OK")
+
+if __name__ == "__main__":
+    test_replay()
+    test_write_error()
+    test_batch_fails_on_journal_error()
+    test_resume_in_flight_and_done()
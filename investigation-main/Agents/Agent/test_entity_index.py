@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the entity index sync watermark.
+
+This script checks that sync() only reads records newer than the last one
+it indexed, that cases added directly (with a higher record ID) neither move
+the watermark nor get indexed twice, and that records stored afterwards by
+another repository connection are still picked up.
+"""
+
+import tempfile
+from pathlib import Path
+
+from case_repository import CaseRepository
+from entity_index import EntityIndex
+
+def theft_case(case_id, suspect):
+    """Theft case that mentions one suspect."""
+    return {"case_id": case_id, "location": "Leeds", "suspect_information": f"Seen with {suspect}"}
+
+def test_sync_watermark():
+    """sync() reads only new records and leaves directly added cases alone."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "cases.db"
+        with CaseRepository(path) as repository, CaseRepository(path) as other_process:
+            first = repository.add_case("theft", theft_case("T-1", "Robert Johnson"), "Analysis")
+            index = EntityIndex.from_repository(repository)
+            assert len(index) == 1 and index.last_record_id == first
+
+            # The server indexes its own case as it is stored; the watermark stays put
+            own = repository.add_case("theft", theft_case("T-2", "Maria Lopez"), "Analysis")
+            assert index.add(own, "theft", theft_case("T-2", "Maria Lopez"))
+            assert index.last_record_id == first
+
+            # A CLI stores a case from another connection
+            stored = other_process.add_case("fraud", theft_case("F-1", "Robert Johnson"), "Analysis")
+            assert stored > own
+
+            assert index.sync(repository) == 1, "sync() re-indexed the directly added case or missed a new one"
+            assert index.last_record_id == stored
+            assert index.sync(repository) == 0
+
+            matches = index.lookup("robert johnson", entity_type="person")
+            assert [match["record_id"] for match in matches] == [stored, first], matches
+            assert [match["record_id"] for match in index.lookup("Maria Lopez")] == [own]
+    print("Entity index sync watermark: OK")
+
+def test_sync_agent_filter():
+    """An agent-filtered sync does not index the other agents' records."""
+    with tempfile.TemporaryDirectory() as directory:
+        with CaseRepository(Path(directory) / "cases.db") as repository:
+            repository.add_case("theft", theft_case("T-1", "Robert Johnson"), "Analysis")
+            fraud = repository.add_case("fraud", theft_case("F-1", "Robert Johnson"), "Analysis")
+
+            index = EntityIndex.from_repository(repository, agent="fraud")
+            assert len(index) == 1 and index.last_record_id == fraud
+            assert [match["agent"] for match in index.lookup("Robert Johnson")] == ["fraud"]
+    print("Entity index agent filter: OK")
+
+if __name__ == "__main__":
+    test_sync_watermark()
+    test_sync_agent_filter()
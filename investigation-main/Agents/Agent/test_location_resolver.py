@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the free-text location resolver.
+
+This script resolves labelled addresses, including streets and venues named
+after countries, against a small country table and reports any mismatch.
+"""
+
+from location_resolver import LocationResolver
+
+COUNTRIES = [
+    ("JOR", "Jordan", "Western Asia", "Asia"),
+    ("OMN", "Oman", "Western Asia", "Asia"),
+    ("GEO", "Georgia", "Western Asia", "Asia"),
+    ("PAN", "Panama", "Latin America and the Caribbean", "Americas"),
+    ("MEX", "Mexico", "Latin America and the Caribbean", "Americas"),
+    ("PRT", "Portugal", "Southern Europe", "Europe"),
+    ("GBR", "United Kingdom of Great Britain and Northern Ireland", "Northern Europe", "Europe"),
+    ("USA", "United States of America", "Northern America", "Americas")
+]
+
+# Address -> expected ISO3 (None: no country can be told from the address)
+LABELLED_ADDRESSES = {
+    "12 Jordan Road, Leeds": None,
+    "Oman Street": None,
+    "Hotel Panama, Berlin": None,
+    "Calle Mexico 14, Madrid": None,
+    "Georgia Avenue, Washington DC": "USA",
+    "Victoria Street, London, UK": "GBR",
+    "Hotel Mexico, Cancun, Mexico": "MEX",
+    "Amman, Jordan": "JOR",
+    "Muscat, Oman": "OMN",
+    "Tbilisi, Georgia": "GEO",
+    "Panama City, Panama": "PAN",
+    "Calle 5, Guadalajara, Mexico": "MEX",
+    "12 Rua Augusta, Lisboa, Portgal": "PRT",
+    "789 Elm Street, Apartment 3C": None
+}
+
+def test_labelled_addresses():
+    """Every labelled address resolves to its country, and street or venue names to none."""
+    resolver = LocationResolver(COUNTRIES)
+    failures = []
+    for address, expected in LABELLED_ADDRESSES.items():
+        match = resolver.resolve(address)
+        resolved = match.iso3_code if match else None
+        if resolved != expected:
+            failures.append(f"{address!r}: expected {expected}, got {resolved}")
+    assert not failures, "\n".join(failures)
+    print(f"Resolved {len(LABELLED_ADDRESSES)} labelled addresses: OK")
+
+if __name__ == "__main__":
+    test_labelled_addresses()
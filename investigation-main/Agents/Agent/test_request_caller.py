@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the fair-queuing caller identity of the unified server.
+
+This script checks that identity and role headers sent by clients are
+ignored unless they come from the trusted proxy, and that only listed
+bearer tokens give a token identity.
+"""
+
+import unified_server
+from unified_server import app, request_caller
+from upstream import UNASSIGNED_ROLE
+
+PROXY = "127.0.0.1"
+CLIENT = "203.0.113.7"
+
+def caller_for(remote_addr, headers=None):
+    """Caller and role the server derives for a request."""
+    with app.test_request_context("/api/augment/theft", method="POST", json={},
+                                  headers=headers or {}, environ_base={"REMOTE_ADDR": remote_addr}):
+        return request_caller()
+
+def test_client_role_ignored():
+    """A client's own X-User-Role and X-User-Id do not give it a weight or an identity."""
+    assert PROXY in unified_server.TRUSTED_PROXIES
+    caller, role = caller_for(CLIENT, {"X-User-Id": "chief", "X-User-Role": "inspector"})
+    assert role == UNASSIGNED_ROLE, f"client-supplied role was accepted: {role}"
+    assert caller == f"address:{CLIENT}", caller
+    print("Client-supplied identity and role ignored: OK")
+
+def test_proxy_headers_trusted():
+    """The trusted proxy's identity and role headers are used."""
+    caller, role = caller_for(PROXY, {"X-User-Id": "1", "X-User-Role": "inspector"})
+    assert (caller, role) == ("user:1", "inspector"), (caller, role)
+    print("Trusted proxy identity and role: OK")
+
+def test_unlisted_bearer_ignored():
+    """Random bearer tokens do not give a fresh identity per request; listed ones do."""
+    first, _ = caller_for(CLIENT, {"Authorization": "Bearer random-1"})
+    second, _ = caller_for(CLIENT, {"Authorization": "Bearer random-2"})
+    assert first == second == f"address:{CLIENT}", (first, second)
+
+    listed = set(unified_server.API_TOKENS)
+    unified_server.API_TOKENS.add("batch-token")
+    try:
+        caller, role = caller_for(CLIENT, {"Authorization": "Bearer batch-token", "X-User-Role": "inspector"})
+    finally:
+        unified_server.API_TOKENS.intersection_update(listed)
+    assert caller.startswith("token:") and role == UNASSIGNED_ROLE, (caller, role)
+    print("Bearer tokens: OK")
+
+if __name__ == "__main__":
+    test_client_role_ignored()
+    test_proxy_headers_trusted()
+    test_unlisted_bearer_ignored()
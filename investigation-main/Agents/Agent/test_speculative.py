@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for speculative murder analyses.
+
+This script runs speculations on a one-worker thread pool and checks a hit
+(trivial final answer), misses (a real final answer or changed details),
+cancellation of running and queued speculations, and the hit, waste and
+skip counters.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from speculative import SpeculativeAnalyses, is_trivial_answer
+
+TIMEOUT = 10  # Seconds a speculation may run before the test counts it as stuck
+DETAILS = {"case_id": "CASE-001", "cause_of_death": "stab wounds", "weapon_used": "kitchen knife"}
+
+class FakeAnalysis:
+    """run() stand-in that reports tokens and either finishes at once or runs until cancelled."""
+
+    def __init__(self, until_cancelled=False):
+        self.until_cancelled = until_cancelled
+        self.calls = 0
+        self.started = threading.Event()
+        self.cancelled = threading.Event()
+
+    def __call__(self, case_details, cancel_event, usage):
+        self.calls += 1
+        usage["prompt_tokens"] = 100
+        self.started.set()
+        if self.until_cancelled:
+            assert cancel_event.wait(TIMEOUT), "speculation was not cancelled"
+            self.cancelled.set()
+            usage["completion_tokens"] = 20
+            raise RuntimeError("cancelled")
+        usage["completion_tokens"] = 50
+        return f"Analysis of {case_details['case_id']}"
+
+def final_details(notes):
+    """Collected details after the last intake answer."""
+    return dict(DETAILS, additional_notes=notes)
+
+def test_trivial_answers():
+    """Ways of saying nothing are trivial; real notes are not."""
+    assert all(is_trivial_answer(answer) for answer in ["", None, "None.", "n/a", "N.A.", "-", "Nothing to add"])
+    assert not is_trivial_answer("Victim owed money to a neighbour")
+    print("Trivial answers: OK")
+
+def test_hit():
+    """A trivial final answer returns the speculative result without a second run."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        speculations = SpeculativeAnalyses(executor.submit)
+        run = FakeAnalysis()
+        assert speculations.start("session-1", DETAILS, run)
+        assert speculations.take("session-1", final_details("none")) == "Analysis of CASE-001"
+        assert speculations.take("session-1", final_details("none")) is None, "a result was claimed twice"
+    stats = speculations.stats()
+    assert run.calls == 1 and stats["hits"] == 1 and stats["hit_rate"] == 1.0, stats
+    assert stats["used_tokens"] == 150 and stats["wasted_tokens"] == 0 and stats["pending"] == 0, stats
+    print("Speculation hit: OK")
+
+def test_miss_cancels_running():
+    """A real final answer cancels the running speculation and counts its tokens as wasted."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        speculations = SpeculativeAnalyses(executor.submit)
+        run = FakeAnalysis(until_cancelled=True)
+        speculations.start("session-1", DETAILS, run)
+        assert run.started.wait(TIMEOUT)
+        assert speculations.take("session-1", final_details("Victim owed money to a neighbour")) is None
+        assert run.cancelled.wait(TIMEOUT)
+    stats = speculations.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 0 and stats["wasted_tokens"] == 120, stats
+    print("Speculation miss: OK")
+
+def test_miss_on_changed_details():
+    """Details edited after the speculation started make it a miss even with a trivial answer."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        speculations = SpeculativeAnalyses(executor.submit)
+        speculations.start("session-1", DETAILS, FakeAnalysis())
+        changed = dict(final_details("none"), weapon_used="hammer")
+        assert speculations.take("session-1", changed) is None
+    assert speculations.stats()["misses"] == 1
+    print("Miss on changed details: OK")
+
+def test_cancel_queued():
+    """A speculation still queued behind other work is cancelled at take() and never runs."""
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(release.wait, TIMEOUT)
+        speculations = SpeculativeAnalyses(executor.submit)
+        run = FakeAnalysis()
+        speculations.start("session-1", DETAILS, run)
+        assert speculations.take("session-1", final_details("none")) is None
+        release.set()
+    assert run.calls == 0, "the cancelled speculation ran"
+    assert speculations.stats()["not_started"] == 1
+    print("Queued speculation cancelled: OK")
+
+def test_discard_and_replace():
+    """Starting again replaces the earlier speculation, and discard() cancels the current one."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        speculations = SpeculativeAnalyses(executor.submit)
+        first, second = FakeAnalysis(until_cancelled=True), FakeAnalysis(until_cancelled=True)
+        speculations.start("session-1", DETAILS, first)
+        assert first.started.wait(TIMEOUT)
+        speculations.start("session-1", DETAILS, second)
+        assert first.cancelled.wait(TIMEOUT)
+        assert second.started.wait(TIMEOUT)
+        speculations.discard("session-1")
+        assert second.cancelled.wait(TIMEOUT)
+    stats = speculations.stats()
+    assert stats["discarded"] == 2 and stats["pending"] == 0 and stats["wasted_tokens"] == 240, stats
+    print("Discard and replace: OK")
+
+def test_skipped_when_full():
+    """A full worker pool skips the speculation instead of raising."""
+    def submit(task):
+        raise RuntimeError("bulkhead full")
+
+    speculations = SpeculativeAnalyses(submit)
+    assert not speculations.start("session-1", DETAILS, FakeAnalysis())
+    assert speculations.take("session-1", final_details("none")) is None
+    assert speculations.stats()["skipped"] == 1
+    print("Skipped when full: OK")
+
+if __name__ == "__main__":
+    test_trivial_answers()
+    test_hit()
+    test_miss_cancels_running()
+    test_miss_on_changed_details()
+    test_cancel_queued()
+    test_discard_and_replace()
+    test_skipped_when_full()
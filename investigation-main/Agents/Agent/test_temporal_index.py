@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the temporal index window and location filters.
+
+This script indexes a handful of cases around one evening and checks which
+of them a query finds with a time window, with a same-location filter, with
+a radius around typed coordinates, and when the query or a stored case has
+no known time of day.
+"""
+
+import tempfile
+from pathlib import Path
+
+from temporal_index import TemporalIndex
+
+PARK = "Riverside Park (40.8010, -73.9720)"
+NEARBY = "Harlem Pier (40.8180, -73.9600)"    # About 2 km from the park
+FAR_AWAY = "Coney Island (40.5750, -73.9700)"  # About 25 km from the park
+
+def build_index():
+    """Index with cases at increasing distance in time and space from 2024-03-01 21:00 at the park."""
+    index = TemporalIndex()
+    index.add(1, "murder", {"case_id": "M-1", "date_of_crime": "2024-03-01", "time_of_crime": "21:30",
+                            "location": PARK})
+    index.add(2, "theft", {"case_id": "T-1", "date_of_theft": "2024-03-01", "time_of_theft": "22:45",
+                           "location": NEARBY})
+    index.add(3, "theft", {"case_id": "T-2", "date_of_theft": "2024-03-02", "time_of_theft": "02:00",
+                           "location": FAR_AWAY})
+    index.add(4, "fraud", {"case_id": "F-1", "date_detected": "2024-03-01", "location": "12 Elm St."})
+    index.add(5, "murder", {"case_id": "M-2", "date_of_crime": "2024-03-05", "time_of_crime": "21:00",
+                            "location": PARK})
+    assert not index.add(6, "murder", {"case_id": "M-3", "location": PARK}), "a case without a date was indexed"
+    return index
+
+def record_ids(results):
+    """Record IDs of query results, in result order."""
+    return [result["record_id"] for result in results]
+
+def test_window():
+    """Only cases overlapping the window are returned, closest in time first."""
+    index = build_index()
+    query = {"case_id": "Q", "date_of_crime": "2024-03-01", "time_of_crime": "21:00", "location": PARK}
+
+    # The fraud case has no time, so it spans the whole day and overlaps any window on that day
+    assert record_ids(index.query(query, window_minutes=60)) == [4, 1], index.query(query, window_minutes=60)
+    assert record_ids(index.query(query, window_minutes=120)) == [4, 1, 2]
+    assert record_ids(index.query(query, window_minutes=6 * 60)) == [4, 1, 2, 3]
+    assert record_ids(index.query(query, window_minutes=4 * 24 * 60)) == [4, 1, 2, 3, 5]
+
+    results = index.query(query, window_minutes=120)
+    assert [result["minutes_apart"] for result in results] == [0, 30, 105]
+    assert [result["time_known"] for result in results] == [False, True, True]
+    assert record_ids(index.query(query, window_minutes=120, exclude_record_id=1)) == [4, 2]
+    assert record_ids(index.query(query, window_minutes=120, exclude_case_id="F-1")) == [1, 2]
+    print("Temporal window: OK")
+
+def test_untimed_query():
+    """A query without a time of day searches the whole day plus the window."""
+    index = build_index()
+    query = {"case_id": "Q", "date_of_crime": "2024-03-02"}
+    assert record_ids(index.query(query, window_minutes=0)) == [3]
+    # The untimed fraud case on the day before ends at 23:59, one minute before the query day
+    assert record_ids(index.query(query, window_minutes=120)) == [3, 4, 2]
+    assert index.query({"case_id": "Q", "date_of_crime": "sometime"}, window_minutes=120) == []
+    print("Query without a time: OK")
+
+def test_location_filters():
+    """same_location matches normalized location strings; radius_km needs coordinates on both sides."""
+    index = build_index()
+    query = {"case_id": "Q", "date_of_crime": "2024-03-01", "time_of_crime": "21:00", "location": PARK}
+    week = 7 * 24 * 60
+
+    assert record_ids(index.query(query, window_minutes=week, same_location=True)) == [1, 5]
+    assert record_ids(index.query(query, window_minutes=week, radius_km=5)) == [1, 2, 5]
+    assert record_ids(index.query(query, window_minutes=week, radius_km=50)) == [1, 2, 3, 5]
+    distances = {result["record_id"]: result["distance_km"] for result in index.query(query, window_minutes=week)}
+    assert distances[1] == 0.0 and 1 < distances[2] < 3 and 20 < distances[3] < 30 and distances[4] is None
+
+    # Spelling differences in a street address still count as the same location
+    elm = {"case_id": "Q", "date_detected": "2024-03-01", "location": "12 elm street"}
+    assert record_ids(index.query(elm, window_minutes=0, same_location=True)) == [4]
+    assert index.query(elm, window_minutes=0, radius_km=5) == [], "a case without coordinates matched a radius"
+    print("Location filters: OK")
+
+def test_save_and_load():
+    """A saved index answers the same queries after loading."""
+    index = build_index()
+    query = {"case_id": "Q", "date_of_crime": "2024-03-01", "time_of_crime": "21:00", "location": PARK}
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "temporal_index.npz"
+        index.save(path)
+        loaded = TemporalIndex()
+        loaded._load(path)
+    assert len(loaded) == len(index)
+    assert loaded.query(query, window_minutes=6 * 60, radius_km=5) == index.query(query, window_minutes=6 * 60,
+                                                                                  radius_km=5)
+    print("Save and load: OK")
+
+if __name__ == "__main__":
+    test_window()
+    test_untimed_query()
+    test_location_filters()
+    test_save_and_load()
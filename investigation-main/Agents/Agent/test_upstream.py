@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the upstream scheduler's grant order.
+
+This script holds the only slot of an UpstreamScheduler, queues waiters with
+different priority classes, callers and roles, then releases the slot and
+records the order in which the waiters are granted: priority classes first,
+weighted fair queuing tags within a class, and aging of long waits.
+"""
+
+import threading
+import time
+
+from upstream import UpstreamScheduler
+
+TIMEOUT = 10  # Seconds before a waiter counts as stuck
+ROLE_WEIGHTS = {"inspector": 4.0, "officer": 1.0}
+
+def grant_order(scheduler, waiters, pause=0.0):
+    """
+    Queue waiters behind a held slot, release it and return their names in grant order.
+
+    Args:
+        scheduler: UpstreamScheduler with max_concurrency=1
+        waiters: (name, priority, caller, role) tuples, queued in this order
+        pause: Seconds to wait after queueing the first waiter
+    """
+    order = []
+    holder = scheduler.acquire("normal", caller="holder", role="officer")
+
+    def wait(name, priority, caller, role):
+        ticket = scheduler.acquire(priority, caller=caller, role=role)
+        order.append(name)
+        scheduler.release(ticket)
+
+    threads = []
+    for number, waiter in enumerate(waiters, start=1):
+        thread = threading.Thread(target=wait, args=waiter, daemon=True)
+        thread.start()
+        threads.append(thread)
+        # Queue one at a time so the enqueue order (and the fair queuing tags) is known
+        deadline = time.monotonic() + TIMEOUT
+        while scheduler.stats()["waiting"] < number:
+            assert time.monotonic() < deadline, f"{waiter[0]} was not queued"
+            time.sleep(0.001)
+        if number == 1:
+            time.sleep(pause)
+
+    scheduler.release(holder)
+    for thread in threads:
+        thread.join(TIMEOUT)
+        assert not thread.is_alive(), "a waiter was never granted"
+    assert scheduler.stats()["in_flight"] == 0
+    return order
+
+def test_priority_classes():
+    """Better priority classes are granted first; a class is FIFO for one caller."""
+    scheduler = UpstreamScheduler(max_concurrency=1, aging_seconds=1000, role_weights=ROLE_WEIGHTS)
+    order = grant_order(scheduler, [
+        ("demo", "demo", "demo-user", "officer"),
+        ("batch-1", "batch", "batch-user", "officer"),
+        ("batch-2", "batch", "batch-user", "officer"),
+        ("interactive", "interactive", "desk", "officer")
+    ])
+    assert order == ["interactive", "batch-1", "batch-2", "demo"], order
+    print("Priority classes: OK")
+
+def test_weighted_fair_queuing():
+    """Within a class, a caller with four times the weight is served ahead of a backlog queued earlier."""
+    scheduler = UpstreamScheduler(max_concurrency=1, aging_seconds=1000, role_weights=ROLE_WEIGHTS)
+    order = grant_order(scheduler, [
+        ("officer-1", "normal", "officer-a", "officer"),
+        ("officer-2", "normal", "officer-a", "officer"),
+        ("officer-3", "normal", "officer-a", "officer"),
+        ("inspector-1", "normal", "inspector-a", "inspector"),
+        ("inspector-2", "normal", "inspector-a", "inspector"),
+        ("inspector-3", "normal", "inspector-a", "inspector"),
+        # A role without a configured weight counts as weight 1, not as the role it claims
+        ("guest-1", "normal", "guest", "chief")
+    ])
+    # Tags: officer 2, 3, 4; inspector 1.25, 1.5, 1.75; guest 2 (ties go to the earlier waiter)
+    assert order == ["inspector-1", "inspector-2", "inspector-3", "officer-1", "guest-1", "officer-2",
+                     "officer-3"], order
+    roles = scheduler.stats()["fair_queuing"]["roles"]
+    assert roles["inspector"]["completed"] == 3 and roles["unassigned"]["completed"] == 1, roles
+    print("Weighted fair queuing: OK")
+
+def test_aging():
+    """A demo call that has waited several aging periods overtakes newer interactive calls."""
+    scheduler = UpstreamScheduler(max_concurrency=1, aging_seconds=0.1, role_weights=ROLE_WEIGHTS)
+    # After 0.5 s the demo call has climbed five classes, above any interactive call queued just now
+    order = grant_order(scheduler, [
+        ("demo", "demo", "demo-user", "officer"),
+        ("interactive-1", "interactive", "desk", "officer"),
+        ("interactive-2", "interactive", "desk", "officer")
+    ], pause=0.5)
+    assert order == ["demo", "interactive-1", "interactive-2"], order
+
+    scheduler = UpstreamScheduler(max_concurrency=1, aging_seconds=1000, role_weights=ROLE_WEIGHTS)
+    order = grant_order(scheduler, [
+        ("demo", "demo", "demo-user", "officer"),
+        ("interactive-1", "interactive", "desk", "officer")
+    ], pause=0.5)
+    assert order == ["interactive-1", "demo"], order
+    print("Aging: OK")
+
+if __name__ == "__main__":
+    test_priority_classes()
+    test_weighted_fair_queuing()
+    test_aging()
@@ -9,6 +9,7 @@ trained on theft datasets to provide solutions based on user-provided case data.
 
 Usage:
     python theft_agent_main.py
+    python theft_agent_main.py --batch cases.jsonl  # Analyze a JSONL file of cases
 
 Author: Augment Agent
 """
@@ -21,6 +22,10 @@ import time
 from typing import Dict, Any
 from pathlib import Path
 from openai import OpenAI
+from case_repository import CaseRepository
+from batch_runner import run_batch, print_summary, DEFAULT_CONCURRENCY, ANALYSIS_ERROR_PREFIX
+from model_router import routed_model
+from token_budget import plan_completion, budget_stats
 
 # Configure logging
 logging.basicConfig(
@@ -114,34 +119,40 @@ class TheftAgent:
     Main interface for the Theft Agent that analyzes theft cases using the NVIDIA API.
     """
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, client=None, model_router=None):
         """
         Initialize the Theft Agent.
         
         Args:
             api_key: NVIDIA API key
+            client: Optional shared API client (e.g. from an UpstreamPool); a private one is created otherwise
+            model_router: Optional ModelRouter choosing the model per request; MODEL_NAME is used otherwise
         """
         self.api_key = api_key
-        self.client = OpenAI(
+        self.client = client or OpenAI(
             base_url="https://integrate.api.nvidia.com/v1",
             api_key=api_key
         )
+        self.model_router = model_router
+        self.model_name = MODEL_NAME
         logger.info(f"Theft Agent initialized with model: {MODEL_NAME}")
     
-    def analyze_case(self, case_details):
+    def analyze_case(self, case_details, usage=None):
         """
         Analyze a theft case using the NVIDIA model.
         
         Args:
             case_details: Dictionary containing case details
+            usage: Optional dictionary filled with the token usage reported by the API
             
         Returns:
             Analysis and solutions for the case
         """
         logger.info("Analyzing theft case")
         
-        # Format the case details into a prompt
-        prompt = self._format_case_prompt(case_details)
+        # Format the case details into a prompt, sized for the generation budget of the request
+        budget = plan_completion(case_details)
+        prompt = self._format_case_prompt(case_details) + budget.guidance
         
         try:
             # Call the NVIDIA API with the real API key
@@ -149,26 +160,33 @@ class TheftAgent:
             
             system_prompt = "You are a Theft Agent, an AI assistant specialized in analyzing and solving theft cases. Provide detailed analysis, insights, and investigative approaches based solely on the case details provided. Focus on the specific information given and avoid making assumptions beyond what's in the data."
             
-            response = self.client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.6,
-                top_p=0.95,
-                max_tokens=4096,
-                frequency_penalty=0,
-                presence_penalty=0
-            )
+            with routed_model(self.model_router, "theft", budget.kind, prompt, MODEL_NAME) as model:
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.6,
+                    top_p=0.95,
+                    max_tokens=budget.max_tokens,
+                    frequency_penalty=0,
+                    presence_penalty=0
+                )
             
             analysis = response.choices[0].message.content
+            budget_stats.record(budget, response.usage.completion_tokens if response.usage else None,
+                                truncated=response.choices[0].finish_reason == "length")
+            if usage is not None and response.usage:
+                usage.update(prompt_tokens=response.usage.prompt_tokens,
+                             completion_tokens=response.usage.completion_tokens,
+                             total_tokens=response.usage.total_tokens)
             logger.info("Case analysis completed (using NVIDIA API)")
             return analysis
             
         except Exception as e:
             logger.error(f"Error analyzing case: {str(e)}")
-            return f"Error analyzing case: {str(e)}"
+            return f"{ANALYSIS_ERROR_PREFIX}{str(e)}"
     
     def _format_case_prompt(self, case_details):
         """
@@ -236,7 +254,9 @@ class TheftAgent:
                 continue
             
             print("\nAnalyzing case...")
+            start_time = time.time()
             analysis = self.analyze_case(case_details)
+            duration = time.time() - start_time
             
             print("\n" + "="*50)
             print("THEFT AGENT ANALYSIS")
@@ -244,22 +264,16 @@ class TheftAgent:
             print(analysis)
             print("="*50)
             
-            save_option = input("\nWould you like to save this analysis? (y/n): ")
-            if save_option.lower() == 'y':
-                case_id = case_details.get("case_id", f"case_{int(time.time())}")
-                filename = f"theft_analysis_{case_id}.txt"
+            if analysis.startswith(ANALYSIS_ERROR_PREFIX):
+                print("The analysis failed, so there is nothing to save.")
+            elif input("\nWould you like to save this analysis? (y/n): ").lower() == 'y':
+                case_details.setdefault("case_id", f"case_{int(time.time())}")
                 
-                with open(filename, "w") as f:
-                    f.write("CASE DETAILS:\n")
-                    f.write("="*50 + "\n")
-                    for key, value in case_details.items():
-                        f.write(f"{key.replace('_', ' ').title()}: {value}\n")
-                    
-                    f.write("\nANALYSIS:\n")
-                    f.write("="*50 + "\n")
-                    f.write(analysis)
+                with CaseRepository() as repository:
+                    record_id = repository.add_case("theft", case_details, analysis, model=MODEL_NAME,
+                                                    duration_seconds=duration, source="interactive")
                 
-                print(f"Analysis saved to {filename}")
+                print(f"Analysis saved to the case repository (record #{record_id})")
             
             continue_option = input("\nWould you like to analyze another case? (y/n): ")
             if continue_option.lower() != 'y':
@@ -301,27 +315,25 @@ def analyze_sample_case(agent):
         print(f"{key.replace('_', ' ').title()}: {value}")
     
     # Analyze the case
+    start_time = time.time()
     analysis = agent.analyze_case(sample_case)
+    duration = time.time() - start_time
     
     print("\n" + "="*50)
     print("THEFT AGENT ANALYSIS")
     print("="*50)
     print(analysis)
     print("="*50)
+    if analysis.startswith(ANALYSIS_ERROR_PREFIX):
+        print("\nThe sample analysis failed, so it was not saved.")
+        return
     
     # Save the analysis
-    filename = "sample_theft_analysis.txt"
-    with open(filename, "w") as f:
-        f.write("CASE DETAILS:\n")
-        f.write("="*50 + "\n")
-        for key, value in sample_case.items():
-            f.write(f"{key.replace('_', ' ').title()}: {value}\n")
-        
-        f.write("\nANALYSIS:\n")
-        f.write("="*50 + "\n")
-        f.write(analysis)
+    with CaseRepository() as repository:
+        record_id = repository.add_case("theft", sample_case, analysis, model=MODEL_NAME,
+                                        duration_seconds=duration, source="sample")
     
-    print(f"\nAnalysis saved to {filename}")
+    print(f"\nAnalysis saved to the case repository (record #{record_id})")
     print("\nThis was a sample case analysis. You can now enter your own case details.")
 
 def setup_api_key():
@@ -355,6 +367,9 @@ def main():
     parser.add_argument("--api_key", help="NVIDIA API key (optional if stored in .env file)")
     parser.add_argument("--setup", action="store_true", help="Set up the API key")
     parser.add_argument("--sample", action="store_true", help="Analyze a sample case")
+    parser.add_argument("--batch", help="Analyze every case in a JSONL file (one JSON object per line)")
+    parser.add_argument("--output", help="Output JSONL for --batch (defaults to <batch>.results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent analyses for --batch")
     
     args = parser.parse_args()
     
@@ -375,6 +390,12 @@ def main():
         analyze_sample_case(agent)
         return
     
+    # Analyze a batch of cases if requested
+    if args.batch:
+        summary = run_batch(agent, "theft", args.batch, args.output, args.concurrency, model=MODEL_NAME)
+        print_summary(summary)
+        return
+    
     # Start interactive session
     agent.interactive_session()
 
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Token Budget - Local token estimates and adaptive max_tokens per analysis
+
+Instead of asking the model for up to 4096 tokens on every call, the agents
+size the generation budget from the request: its kind (a direct question or
+a full case analysis), how many case fields were filled in and how much text
+they hold, and the analysis profile:
+
+  * brief: a short assessment and next steps
+  * standard: the full analysis at a length that follows the case data (default)
+  * deep: the most detailed analysis, up to the previous 4096 tokens
+
+The prompt gets a matching length instruction, so the model plans its answer
+to fit instead of being cut off. A request selects its profile with
+analysis_profile(), which callers set around their work (a context variable,
+so it follows work handed to the bulkhead executors); ANALYSIS_PROFILE sets
+the default.
+
+Token counts are estimated locally without a tokenizer: words, numbers and
+punctuation are counted roughly the way byte-pair encodings split them.
+The estimate only sizes budgets, so it does not need to be exact.
+
+Usage:
+    with analysis_profile("brief"):
+        budget = plan_completion(case_details)
+    prompt += budget.guidance
+    client.chat.completions.create(..., max_tokens=budget.max_tokens)
+    budget_stats.record(budget, truncated=finish_reason == "length")
+
+Author: Augment Agent
+"""
+
+import contextvars
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DIRECT_QUESTION = "question"
+CASE_ANALYSIS = "analysis"
+REQUEST_KINDS = [DIRECT_QUESTION, CASE_ANALYSIS]
+
+# base + per_field * filled fields + content_ratio * case text tokens, capped at max_tokens
+PROFILES = {
+    "brief": {"base": 384, "per_field": 32, "content_ratio": 0.5, "max_tokens": 1024},
+    "standard": {"base": 768, "per_field": 96, "content_ratio": 1.0, "max_tokens": 2560},
+    "deep": {"base": 1536, "per_field": 160, "content_ratio": 2.0, "max_tokens": 4096}
+}
+DEFAULT_PROFILE = os.getenv("ANALYSIS_PROFILE", "standard")
+QUESTION_SCALE = 0.5  # Direct questions get half the budget of an analysis
+MIN_MAX_TOKENS = 256
+WORDS_PER_TOKEN = 0.75
+
+# Letters, digit runs, single other characters (punctuation, symbols, non-Latin text)
+_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+_profile = contextvars.ContextVar("analysis_profile", default=None)
+
+def current_profile() -> str:
+    """Analysis profile of the current context."""
+    profile = _profile.get()
+    return profile if profile in PROFILES else (DEFAULT_PROFILE if DEFAULT_PROFILE in PROFILES else "standard")
+
+@contextmanager
+def analysis_profile(profile: Optional[str]):
+    """
+    Set the analysis profile of completions planned inside the with block.
+
+    Args:
+        profile: One of PROFILES (anything else means the default profile)
+    """
+    token = _profile.set(profile if profile in PROFILES else None)
+    try:
+        yield
+    finally:
+        _profile.reset(token)
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count: one per word of up to six letters and one more per further four letters,
+        one per three digits, one per punctuation mark or other character
+    """
+    tokens = 0
+    for piece in _PIECES.findall(text or ""):
+        first = piece[0]
+        if first.isascii() and first.isalpha():
+            tokens += 1 + max(0, len(piece) - 3) // 4
+        elif first.isdigit():
+            tokens += (len(piece) + 2) // 3
+        else:
+            tokens += 1
+    return tokens
+
+def request_kind(case_details: Dict[str, Any]) -> str:
+    """
+    Classify a request as a direct question or a full case analysis.
+
+    Args:
+        case_details: Case details as received (before any standardization)
+
+    Returns:
+        DIRECT_QUESTION if a question comes with at most two other filled-in fields, else CASE_ANALYSIS
+    """
+    filled = [key for key, value in case_details.items() if value]
+    if case_details.get("question") and len(filled) <= 3:
+        return DIRECT_QUESTION
+    return CASE_ANALYSIS
+
+@dataclass(frozen=True)
+class CompletionBudget:
+    """The generation budget planned for one completion."""
+    profile: str
+    kind: str
+    filled_fields: int
+    content_tokens: int
+    max_tokens: int
+
+    @property
+    def guidance(self) -> str:
+        """Length instruction for the end of the prompt."""
+        words = int(self.max_tokens * WORDS_PER_TOKEN * 0.8) // 50 * 50
+        if self.profile == "brief":
+            return f"\n\nKeep the response brief and focused on the most important points, within about {words} words."
+        return f"\n\nKeep the response within about {words} words."
+
+def plan_completion(case_details: Dict[str, Any], kind: Optional[str] = None,
+                    profile: Optional[str] = None) -> CompletionBudget:
+    """
+    Plan the max_tokens of a completion.
+
+    Args:
+        case_details: Case details of the request
+        kind: DIRECT_QUESTION or CASE_ANALYSIS (classified from case_details if omitted)
+        profile: Analysis profile (defaults to the one set with analysis_profile())
+
+    Returns:
+        The budget
+    """
+    kind = kind or request_kind(case_details)
+    profile = profile if profile in PROFILES else current_profile()
+    settings = PROFILES[profile]
+    values = [str(value) for value in case_details.values() if value]
+    content_tokens = sum(estimate_tokens(value) for value in values)
+
+    max_tokens = settings["base"] + settings["per_field"] * len(values) + settings["content_ratio"] * content_tokens
+    if kind == DIRECT_QUESTION:
+        max_tokens *= QUESTION_SCALE
+    max_tokens = int(min(settings["max_tokens"], max(MIN_MAX_TOKENS, max_tokens)))
+    return CompletionBudget(profile, kind, len(values), content_tokens, max_tokens)
+
+class BudgetStats:
+    """
+    Planned budgets and truncated completions per profile, to tune PROFILES.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, Dict[str, int]] = {}
+
+    def record(self, budget: CompletionBudget, completion_tokens: Optional[int] = None, truncated: bool = False):
+        """
+        Record a finished completion.
+
+        Args:
+            budget: The budget it was planned with
+            completion_tokens: Tokens generated, if the API reported them
+            truncated: Whether it stopped at max_tokens (finish_reason "length")
+        """
+        with self._lock:
+            stats = self._profiles.setdefault(budget.profile, {"completions": 0, "max_tokens": 0, "reported": 0,
+                                                               "completion_tokens": 0, "truncated": 0})
+            stats["completions"] += 1
+            stats["max_tokens"] += budget.max_tokens
+            if completion_tokens is not None:
+                stats["reported"] += 1
+                stats["completion_tokens"] += completion_tokens
+            if truncated:
+                stats["truncated"] += 1
+        if truncated:
+            logger.warning(f"Completion reached max_tokens={budget.max_tokens} ({budget.profile} {budget.kind})")
+
+    def stats(self) -> Dict[str, Any]:
+        """Mean planned budget, mean tokens used and truncation rate per profile."""
+        with self._lock:
+            return {
+                profile: {
+                    "completions": stats["completions"],
+                    "mean_max_tokens": round(stats["max_tokens"] / stats["completions"]),
+                    "mean_completion_tokens": round(stats["completion_tokens"] / stats["reported"]) if stats["reported"] else None,
+                    "truncated": stats["truncated"],
+                    "truncation_rate": round(stats["truncated"] / stats["completions"], 3)
+                }
+                for profile, stats in self._profiles.items()
+            }
+
+# Shared by the agents of a process
+budget_stats = BudgetStats()
@@ -5,15 +5,36 @@ import json
 import logging
 import uuid
 import re
+import hashlib
+import threading
+import atexit
 from dotenv import load_dotenv
 import requests
 import time
 import platform
 import sys
-from openai import OpenAI
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, Any, Tuple, Optional, List
+from homicide_dataset import ALL_LABEL
+from homicide_trends import describe_country_trends
+from dataset_manager import DatasetManager
+from dataset_ingest import ingest_datasets
+from case_repository import CaseRepository
+from similar_cases import SimilarCaseIndex
+from near_duplicates import NearDuplicateIndex
+from entity_index import EntityIndex, ENTITY_TYPES
+from analysis_sections import SectionParser, SECTION_TYPES
+from temporal_index import TemporalIndex, MINUTES_PER_DAY
+from upstream import UpstreamPool, upstream_priority, upstream_caller, PRIORITY_CLASSES, UNASSIGNED_ROLE
+from model_router import ModelRouter, latency_budget, routing_decisions, routed_model, discard_routed_latency
+from token_budget import (plan_completion, budget_stats, analysis_profile, request_kind, estimate_tokens,
+                          DIRECT_QUESTION, PROFILES)
+from speculative import SpeculativeAnalyses, FINAL_FIELD
+from agent_registry import AgentRegistry
+from agent_config import AgentConfigStore
+from bulkhead import Bulkheads, BulkheadFull
+from batch_runner import ANALYSIS_ERROR_PREFIX
 
 # Load environment variables
 load_dotenv()
@@ -44,6 +65,19 @@ ENV_FILE = ".env"
 API_KEY_VAR = "NVIDIA_API_KEY"
 MURDER_MODEL_NAME = "nvidia/llama-3.1-nemotron-ultra-253b-v1"
 
+# Add the most similar completed cases to analysis prompts unless a caller overrides it
+SIMILAR_CASES_IN_PROMPT = os.getenv('MURDER_SIMILAR_CASES_IN_PROMPT', 'false').lower() == 'true'
+SIMILAR_CASES_PROMPT_K = 3
+
+# Offer the stored analysis of a near-identical case instead of a new completion
+REUSE_DUPLICATE_ANALYSES = os.getenv('MURDER_REUSE_DUPLICATE_ANALYSES', 'true').lower() == 'true'
+
+# Cases reported with each analysis: within +/- 3 days at the same location or within 5 km
+NEARBY_WINDOW_MINUTES = 3 * MINUTES_PER_DAY
+NEARBY_RADIUS_KM = float(os.getenv('MURDER_NEARBY_RADIUS_KM', '5'))
+# The temporal index is also caught up from the repository on startup, so it is saved in batches
+TEMPORAL_INDEX_SAVE_EVERY = 20
+
 def retrieve_api_key():
     """
     Retrieve the API key from the .env file.
@@ -90,7 +124,7 @@ if not NVIDIA_API_KEY:
 # Main port for the unified server
 MAIN_PORT = int(os.getenv('MAIN_PORT', 5000))
 
-# Agent configuration
+# Agent defaults; the active configuration (with persisted toggles) is agent_config.current()
 AGENTS = {
     "murder": {
         "system_prompt": "You are a specialized Murder Investigation AI Agent. Your role is to analyze murder cases, provide insights, and help investigators solve crimes. Use forensic knowledge, criminal psychology, and investigative techniques in your responses.",
@@ -123,61 +157,109 @@ class MurderAgent:
     Main interface for the Murder Agent that analyzes murder cases using the NVIDIA API.
     """
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, client=None, model_router: Optional[ModelRouter] = None,
+                 speculations: Optional[SpeculativeAnalyses] = None):
         """
         Initialize the Murder Agent.
 
         Args:
             api_key: NVIDIA API key
+            client: Optional shared API client (e.g. from an UpstreamPool); a private one is created otherwise
+            model_router: Optional router choosing the model per request; MURDER_MODEL_NAME is used otherwise
+            speculations: Optional speculative analyses started when an intake reaches its last step
         """
         self.api_key = api_key
-        self.client = OpenAI(
-            base_url="https://integrate.api.nvidia.com/v1",
-            api_key=api_key
-        )
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(
+                base_url="https://integrate.api.nvidia.com/v1",
+                api_key=api_key
+            )
+        self.client = client
+        self.model_router = model_router
+        self.speculations = speculations
+        self.model_name = MURDER_MODEL_NAME
         logger.info(f"Murder Agent initialized with model: {MURDER_MODEL_NAME}")
 
-    def analyze_case(self, case_details):
+    def analyze_case(self, case_details, include_similar_cases: Optional[bool] = None,
+                     section_parser: Optional[SectionParser] = None, usage: Optional[Dict[str, int]] = None,
+                     cancel_event: Optional[threading.Event] = None):
         """
         Analyze a murder case using the NVIDIA model.
 
         Args:
             case_details: Dictionary containing case details
+            include_similar_cases: Add similar completed cases to the prompt
+                (defaults to SIMILAR_CASES_IN_PROMPT)
+            section_parser: If given, the completion is streamed and split into sections as tokens arrive
+            usage: Optional dictionary filled with prompt_tokens and completion_tokens (estimated when streamed)
+            cancel_event: When set, a streamed completion stops early and the partial analysis is returned
 
         Returns:
             Analysis and solutions for the case
         """
         logger.info("Analyzing case with Murder Agent")
 
-        # Format the case details into a prompt
-        prompt = self._format_case_prompt(case_details)
+        if include_similar_cases is None:
+            include_similar_cases = SIMILAR_CASES_IN_PROMPT
+
+        # Format the case details into a prompt, sized for the generation budget of the request
+        budget = plan_completion(case_details)
+        prompt = self._format_case_prompt(case_details, include_similar_cases) + budget.guidance
 
         try:
             # Call the NVIDIA API with the real API key
-            logger.info("Calling NVIDIA API for murder analysis")
+            logger.info(f"Calling NVIDIA API for murder analysis ({budget.profile}, max_tokens={budget.max_tokens})")
 
             system_prompt = "You are a Murder Agent, an AI assistant specialized in analyzing and solving murder cases. Provide detailed analysis, insights, and investigative approaches based solely on the case details provided. Focus on the specific information given and avoid making assumptions beyond what's in the data."
 
-            response = self.client.chat.completions.create(
-                model=MURDER_MODEL_NAME,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.6,
-                top_p=0.95,
-                max_tokens=4096,
-                frequency_penalty=0,
-                presence_penalty=0
-            )
-
-            analysis = response.choices[0].message.content
+            with routed_model(self.model_router, "murder", budget.kind, prompt, MURDER_MODEL_NAME) as model:
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.6,
+                    top_p=0.95,
+                    max_tokens=budget.max_tokens,
+                    frequency_penalty=0,
+                    presence_penalty=0,
+                    stream=section_parser is not None
+                )
+
+                if section_parser is None:
+                    analysis = response.choices[0].message.content
+                    finish_reason = response.choices[0].finish_reason
+                    completion_tokens = response.usage.completion_tokens if response.usage else None
+                else:
+                    parts = []
+                    finish_reason, completion_tokens = None, None
+                    for chunk in response:
+                        if cancel_event is not None and cancel_event.is_set():
+                            # Closing the stream ends the upstream request and frees its slot
+                            response.close()
+                            finish_reason = "cancelled"
+                            # A truncated call says nothing about the model's latency
+                            discard_routed_latency()
+                            break
+                        content = chunk.choices[0].delta.content if chunk.choices else None
+                        if content:
+                            parts.append(content)
+                            section_parser.feed(content)
+                        if chunk.choices and chunk.choices[0].finish_reason:
+                            finish_reason = chunk.choices[0].finish_reason
+                    analysis = "".join(parts)
+            if usage is not None:
+                usage.update(prompt_tokens=estimate_tokens(system_prompt + prompt),
+                             completion_tokens=completion_tokens if completion_tokens is not None else estimate_tokens(analysis))
+            budget_stats.record(budget, completion_tokens, truncated=finish_reason == "length")
             logger.info("Case analysis completed (using Murder Agent)")
             return analysis
 
         except Exception as e:
             logger.error(f"Error analyzing case with Murder Agent: {str(e)}")
-            return f"Error analyzing case: {str(e)}"
+            return f"{ANALYSIS_ERROR_PREFIX}{str(e)}"
 
     def process_message(self, message: str, session_id: Optional[str] = None, force_new_session: bool = False, reset_conversation: bool = False) -> Tuple[str, str, bool, str, Optional[str]]:
         """
@@ -198,6 +280,8 @@ class MurderAgent:
         # Check for special commands or flags
         if message and message.lower() in ["reset", "restart", "start over"] or force_new_session:
             logger.info(f"Reset command detected or force_new_session is True")
+            if session_id and self.speculations is not None:
+                self.speculations.discard(session_id)
 
             # If we have a session ID and it exists, delete it
             if session_id and session_id in conversation_states and not reset_conversation:
@@ -268,6 +352,10 @@ class MurderAgent:
             current_step_id = updated_state["current_step"]
             current_step = get_step_by_id(current_step_id)
 
+            # Start analyzing while the user answers the last step, which rarely adds anything
+            if current_step_id == FINAL_FIELD and self.speculations is not None:
+                self.speculations.start(session_id, updated_state["collected_data"], self._speculate)
+
             # If we've reached the analysis step, perform the analysis
             if current_step_id == "analysis":
                 try:
@@ -275,14 +363,28 @@ class MurderAgent:
                     collected_data = updated_state["collected_data"]
                     logger.info(f"Performing analysis with collected data: {collected_data}")
 
-                    # Perform the analysis
-                    analysis = self.analyze_case(collected_data)
+                    # Offer the analysis of a near-identical case first; any further message
+                    # in this session runs a fresh analysis
+                    if "duplicate_of" not in updated_state:
+                        prior = self._find_prior_analysis(collected_data)
+                        if prior:
+                            updated_state["duplicate_of"] = prior["match"]
+                            if self.speculations is not None:
+                                self.speculations.discard(session_id)
+                            return session_id, prior["response"], False, "analysis", None
+
+                    updated_state["nearby_cases"] = self._find_nearby_cases(collected_data)
+
+                    # Use the analysis started before the last answer if that answer added nothing
+                    speculated = self.speculations.take(session_id, collected_data) if self.speculations else None
+                    analysis, sections, model, duration = speculated or self._run_analysis(collected_data)
+                    self._store_completed_case(collected_data, analysis, duration, sections=sections, model=model)
 
                     # Return the analysis
                     return session_id, analysis, False, "analysis", None
                 except Exception as e:
                     logger.error(f"Error analyzing case: {str(e)}")
-                    return session_id, f"Error analyzing case: {str(e)}", False, "analysis", str(e)
+                    return session_id, f"{ANALYSIS_ERROR_PREFIX}{str(e)}", False, "analysis", str(e)
 
             # Return the next question
             if current_step and current_step["message"]:
@@ -293,12 +395,123 @@ class MurderAgent:
         current_step = get_step_by_id(current_step_id)
         return session_id, current_step["message"] if current_step else "What would you like to know?", True, current_step_id, None
 
-    def _format_case_prompt(self, case_details: Dict[str, Any]) -> str:
+    def _run_analysis(self, collected_data: Dict[str, Any], cancel_event: Optional[threading.Event] = None,
+                      usage: Optional[Dict[str, int]] = None) -> Tuple[str, Dict[str, str], str, float]:
+        """
+        Analyze a completed intake, streaming the completion into sections.
+
+        Args:
+            collected_data: Collected case details
+            cancel_event: Stops the completion early when set
+            usage: Optional dictionary filled with the token usage
+
+        Returns:
+            Tuple of (analysis, sections, model, duration in seconds)
+        """
+        start_time = time.time()
+        section_parser = SectionParser()
+        with routing_decisions() as decisions:
+            analysis = self.analyze_case(collected_data, section_parser=section_parser, usage=usage,
+                                         cancel_event=cancel_event)
+        model = decisions[-1].model if decisions else self.model_name
+        return analysis, section_parser.close(), model, time.time() - start_time
+
+    def _speculate(self, collected_data: Dict[str, Any], cancel_event: threading.Event,
+                   usage: Dict[str, int]) -> Tuple[str, Dict[str, str], str, float]:
+        """Speculative analysis run by SpeculativeAnalyses; raises if the analysis failed."""
+        result = self._run_analysis(collected_data, cancel_event, usage)
+        if result[0].startswith(ANALYSIS_ERROR_PREFIX):
+            raise RuntimeError(result[0])
+        return result
+
+    def _store_completed_case(self, collected_data: Dict[str, Any], analysis: str, duration: float,
+                              sections: Optional[Dict[str, str]] = None, model: str = MURDER_MODEL_NAME):
+        """
+        Persist a completed intake and add it to the similar-case, near-duplicate and entity indexes.
+
+        Args:
+            collected_data: Collected case details
+            analysis: Analysis text
+            duration: Analysis time in seconds
+            sections: Analysis sections parsed while the completion streamed
+            model: Model that wrote the analysis
+        """
+        if case_repository is None or analysis.startswith(ANALYSIS_ERROR_PREFIX):
+            return
+
+        try:
+            record_id = case_repository.add_case("murder", dict(collected_data), analysis, model=model,
+                                                 duration_seconds=duration, source="intake", sections=sections)
+            if similar_case_index is not None:
+                similar_case_index.add(collected_data, record_id=record_id)
+            if near_duplicate_index is not None:
+                near_duplicate_index.add(self._standardize_case_details(collected_data), record_id=record_id)
+            if entity_index is not None:
+                entity_index.add(record_id, "murder", collected_data)
+            if temporal_index is not None:
+                temporal_index.add(record_id, "murder", collected_data)
+                temporal_index.save_if_dirty(min_changes=TEMPORAL_INDEX_SAVE_EVERY)
+        except Exception as e:
+            logger.error(f"Error storing completed case: {str(e)}")
+
+    def _find_nearby_cases(self, collected_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Find stored cases close in time and place to an intake.
+
+        Args:
+            collected_data: Collected case details
+
+        Returns:
+            Cases within NEARBY_WINDOW_MINUTES at the same location or within NEARBY_RADIUS_KM
+        """
+        if temporal_index is None:
+            return []
+        try:
+            return temporal_index.query(collected_data, NEARBY_WINDOW_MINUTES, radius_km=NEARBY_RADIUS_KM,
+                                        same_location=True, exclude_case_id=collected_data.get("case_id"))
+        except Exception as e:
+            logger.error(f"Error querying the temporal index: {str(e)}")
+            return []
+
+    def _find_prior_analysis(self, collected_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Look for an analyzed case that is a near duplicate of this one.
+
+        Args:
+            collected_data: Collected case details
+
+        Returns:
+            {"match": match details, "response": message with the prior analysis} or None
+        """
+        if not REUSE_DUPLICATE_ANALYSES or near_duplicate_index is None or case_repository is None:
+            return None
+
+        try:
+            match = near_duplicate_index.query(self._standardize_case_details(collected_data))
+            record = case_repository.get(match["record_id"]) if match else None
+        except Exception as e:
+            logger.error(f"Error checking for duplicate cases: {str(e)}")
+            return None
+
+        if record is None:
+            return None
+
+        logger.info(f"Case matches analyzed case {record['case_id']} (similarity {match['similarity']})")
+        response = (f"This case closely matches previously analyzed case {record['case_id']} "
+                    f"(estimated similarity {match['similarity']:.0%}), so here is its analysis. "
+                    f"Send any message to run a fresh analysis of this case instead.\n\n{record['analysis']}")
+        return {
+            "match": {**match, "created_at": record["created_at"]},
+            "response": response
+        }
+
+    def _format_case_prompt(self, case_details: Dict[str, Any], include_similar_cases: bool = False) -> str:
         """
         Format case details into a prompt for the model.
 
         Args:
             case_details: Dictionary containing case details
+            include_similar_cases: Add the most similar completed cases as context
 
         Returns:
             Formatted prompt string
@@ -306,8 +519,9 @@ class MurderAgent:
         # Standardize and clean the case details
         standardized_details = self._standardize_case_details(case_details)
 
-        # Check if this is a direct question
-        if "question" in standardized_details and len(standardized_details) <= 3:  # Only question and maybe case_id/additional_notes
+        # Check if this is a direct question (only a question and maybe case_id/additional_notes; the
+        # standardized details always contain the required fields, so the raw details are checked)
+        if request_kind(case_details) == DIRECT_QUESTION:
             question = standardized_details["question"]
             prompt = f"As a Murder Investigation AI Agent specialized in homicide investigations and forensic analysis, please answer the following question:\n\n{question}\n\n"
 
@@ -334,9 +548,50 @@ class MurderAgent:
         prompt += "5. Possible solutions or conclusions that follow directly from the data\n"
         prompt += "\nImportant: Base your analysis ONLY on the information provided in this case. Do not use generic templates or assumptions not supported by the data."
 
+        # Add precomputed national homicide trends the analysis can cite
+        statistics = self._homicide_statistics_context(standardized_details)
+        if statistics:
+            prompt += "\n\nReference homicide statistics (UNODC, precomputed) that you may cite where relevant:\n"
+            prompt += "\n".join(f"- {statement}" for statement in statistics)
+
+        # Add similar completed cases for comparison
+        if include_similar_cases and similar_case_index is not None:
+            similar = similar_case_index.query(standardized_details, k=SIMILAR_CASES_PROMPT_K,
+                                               exclude_case_id=standardized_details.get("case_id"))
+            if similar:
+                prompt += "\n\nSimilar past cases (for comparison only; do not assume they are connected):\n"
+                prompt += "\n".join(
+                    f"- Case {case['case_id']} ({case['date_of_crime'] or 'date unknown'}): "
+                    f"{case['cause_of_death'] or 'cause unknown'}, weapon: {case['weapon_used'] or 'unknown'} "
+                    f"(similarity {case['score']:.2f})"
+                    for case in similar
+                )
+
         return prompt
 
-    def _standardize_case_details(self, case_details: Dict[str, Any]) -> Dict[str, Any]:
+    def _homicide_statistics_context(self, standardized_details: Dict[str, Any]) -> List[str]:
+        """
+        Look up precomputed homicide trends for the country mentioned in the case location.
+
+        Args:
+            standardized_details: Standardized case details
+
+        Returns:
+            List of citable trend statements (empty if no country is recognized)
+        """
+        location = standardized_details.get("location")
+        snapshot = dataset_manager.current()
+        if snapshot is None or not location or location == "Unknown":
+            return []
+
+        match = snapshot.resolver.resolve(location)
+        if match is None or not match.iso3_code:
+            return []
+
+        return describe_country_trends(snapshot.trends, match.iso3_code)
+
+    @staticmethod
+    def _standardize_case_details(case_details: Dict[str, Any]) -> Dict[str, Any]:
         """
         Standardize and clean the case details to ensure they're in the correct format.
 
@@ -416,11 +671,13 @@ def call_nvidia_api(prompt, system_prompt):
             "max_tokens": 1024
         }
 
-        response = requests.post(
-            "https://api.nvidia.com/v1/chat/completions",
-            headers=headers,
-            json=payload
-        )
+        # Scheduled with the completions of the hosted agents
+        with upstream_pool.scheduler.slot():
+            response = requests.post(
+                "https://api.nvidia.com/v1/chat/completions",
+                headers=headers,
+                json=payload
+            )
 
         if response.status_code != 200:
             logger.error(f"NVIDIA API error: {response.status_code} - {response.text}")
@@ -965,9 +1222,235 @@ def process_user_input(session_id: str, user_input: str) -> Tuple[str, Dict[str,
     # Return the updated conversation state
     return session_id, conversation_states[session_id], None
 
-# Initialize the Murder Agent
-murder_agent = MurderAgent(NVIDIA_API_KEY)
-logger.info("Murder Agent initialized in unified server")
+# Every agent hosted here shares one upstream connection pool and concurrency limit
+upstream_pool = UpstreamPool(NVIDIA_API_KEY)
+
+# Chooses between the Nemotron models per request (see model_routing.json)
+model_router = ModelRouter()
+
+def build_murder_agent():
+    """Build the Murder Agent on the shared upstream pool."""
+    return MurderAgent(NVIDIA_API_KEY, client=upstream_pool.client(), model_router=model_router,
+                       speculations=speculative_analyses if SPECULATIVE_ANALYSIS else None)
+
+def build_theft_agent():
+    """Import and build the Theft Agent on the shared upstream pool."""
+    # Agent modules are imported on first use; logging is configured by then, so their own
+    # basicConfig calls leave this server's handlers in place
+    import theft_agent_main
+    return theft_agent_main.TheftAgent(theft_agent_main.API_KEY,
+                                       client=upstream_pool.client(theft_agent_main.API_KEY),
+                                       model_router=model_router)
+
+def build_finance_agent():
+    """Import and build the Financial Fraud Agent on the shared upstream pool."""
+    import financial_fraud_agent_main
+    return financial_fraud_agent_main.FinancialFraudAgent(financial_fraud_agent_main.API_KEY,
+                                                          client=upstream_pool.client(financial_fraud_agent_main.API_KEY),
+                                                          model_router=model_router)
+
+# Agents with their own implementation are built when enabled or first requested and dropped when
+# disabled; the theft and fraud agents run in this process instead of one server process each
+agent_registry = AgentRegistry()
+agent_registry.register("murder", build_murder_agent)
+agent_registry.register("theft", build_theft_agent)
+agent_registry.register("finance", build_finance_agent)
+
+# Build the enabled agents at startup instead of on their first request
+PRELOAD_AGENTS = os.getenv('PRELOAD_AGENTS', 'false').lower() == 'true'
+
+# Each agent's analyses run on its own bounded pool; cheap murder intake steps use the fast lane
+agent_bulkheads = Bulkheads(AGENTS)
+BUSY_RETRY_AFTER_SECONDS = 5
+
+# Murder analyses start on the murder bulkhead when an intake reaches its last step
+SPECULATIVE_ANALYSIS = os.getenv('SPECULATIVE_ANALYSIS', 'true').lower() == 'true'
+speculative_analyses = SpeculativeAnalyses(agent_bulkheads["murder"].submit)
+
+# Proxies whose X-User-Id and X-User-Role headers are trusted for fair queuing: by default the
+# Next.js server on the same host, which sets them from its validated login and never forwards the
+# browser's own. Headers from anyone else are ignored, so clients cannot claim a role or an identity
+TRUSTED_PROXIES = {address.strip() for address in os.getenv('FAIR_QUEUE_TRUSTED_PROXIES', '127.0.0.1,::1').split(',')
+                   if address.strip()}
+
+# Bearer tokens of direct API clients (e.g. batch jobs); each is one fair-queuing identity. Other
+# bearer tokens are ignored, so a client cannot take a fresh identity by sending random ones
+API_TOKENS = {token.strip() for token in os.getenv('FAIR_QUEUE_API_TOKENS', '').split(',') if token.strip()}
+
+# Upstream priority class per agent when the request does not set one (others are "normal");
+# the sample case is a demo
+AGENT_PRIORITIES = {
+    "murder": "interactive"
+}
+
+def request_priority(default: str) -> str:
+    """
+    Upstream priority class for the current request.
+
+    Args:
+        default: Class used when the request sets none
+
+    Returns:
+        The X-Priority header or "priority" field of the JSON body if it names a class, else default
+    """
+    body = request.get_json(silent=True)
+    priority = request.headers.get("X-Priority") or (body.get("priority") if isinstance(body, dict) else None)
+    return priority if priority in PRIORITY_CLASSES else default
+
+def request_analysis_profile() -> Optional[str]:
+    """
+    Analysis profile of the current request.
+
+    Returns:
+        The X-Analysis-Profile header or "analysis_profile" field of the JSON body if it names a profile
+        (brief, standard, deep), else None for the default profile
+    """
+    body = request.get_json(silent=True)
+    profile = request.headers.get("X-Analysis-Profile") or (body.get("analysis_profile") if isinstance(body, dict) else None)
+    return profile if profile in PROFILES else None
+
+def request_latency_budget() -> Optional[float]:
+    """
+    Latency budget of the current request for model routing.
+
+    Returns:
+        Seconds from the X-Latency-Budget header or "latency_budget_seconds" field of the JSON body,
+        or None if the request sets no (valid) budget
+    """
+    body = request.get_json(silent=True)
+    budget = request.headers.get("X-Latency-Budget") or (body.get("latency_budget_seconds") if isinstance(body, dict) else None)
+    try:
+        return float(budget) if budget is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def request_caller() -> Tuple[str, str]:
+    """
+    Caller identity and police role for fair sharing of upstream capacity between users.
+
+    The identity is a hash of the Authorization bearer token if it is one of API_TOKENS, else a
+    murder session the server issued, else the X-User-Id header if the request comes from a
+    trusted proxy, else the client address. The role is the X-User-Role header of a trusted proxy;
+    other callers have no role.
+
+    Returns:
+        (caller, role)
+    """
+    trusted = request.remote_addr in TRUSTED_PROXIES
+    role = (request.headers.get("X-User-Role") if trusted else None) or UNASSIGNED_ROLE
+    authorization = request.headers.get("Authorization", "")
+    token = authorization[7:].strip() if authorization.startswith("Bearer ") else ""
+    if token in API_TOKENS:
+        return f"token:{hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]}", role
+    body = request.get_json(silent=True)
+    session_id = body.get("session_id") if isinstance(body, dict) else None
+    if session_id and session_id in conversation_states:
+        return f"session:{session_id}", role
+    if trusted and request.headers.get("X-User-Id"):
+        return f"user:{request.headers['X-User-Id']}", role
+    return f"address:{request.remote_addr}", role
+
+def busy_response(error: BulkheadFull):
+    """503 response for a full bulkhead."""
+    logger.warning(f"Rejected request: {str(error)}")
+    response = jsonify({
+        "success": False,
+        "error": str(error),
+        "data": {
+            "analysis": "The agent is busy with other analyses. Please try again shortly."
+        }
+    })
+    response.headers["Retry-After"] = str(BUSY_RETRY_AFTER_SECONDS)
+    return response, 503
+
+def message_runs_analysis(session_id: Optional[str], message: str) -> bool:
+    """
+    Whether a murder intake message will run an analysis rather than only record an answer.
+
+    Args:
+        session_id: Session the message belongs to
+        message: The user's message
+
+    Returns:
+        True if the message answers the last intake step or follows a finished analysis
+    """
+    conv_state = conversation_states.get(session_id) if session_id else None
+    if not conv_state or not message or message.lower() in ["reset", "restart", "start over"]:
+        return False
+    if conv_state["current_step"] == "analysis":
+        return True
+    next_step = get_next_step(conv_state["current_step"])
+    return bool(next_step and next_step["id"] == "analysis")
+
+# Enabled flags are persisted and shared with the other server processes using the same file
+agent_config = AgentConfigStore(AGENTS)
+
+def release_disabled_agents(previous, snapshot):
+    """Release the instances of agents a config change disabled, whichever process made it."""
+    for agent_id in snapshot.agents:
+        if agent_id in agent_registry and previous.is_enabled(agent_id) and not snapshot.is_enabled(agent_id):
+            agent_registry.release(agent_id)
+
+agent_config.add_listener(release_disabled_agents)
+agent_config.start()
+
+def set_agents_enabled(changes: Dict[str, bool]):
+    """
+    Enable or disable agents in one config update, building the instances of enabled agents.
+
+    Args:
+        changes: AGENTS key -> new enabled status
+
+    Returns:
+        The new config snapshot
+    """
+    for agent_id, enabled in changes.items():
+        if enabled and agent_id in agent_registry:
+            # Built before the update, so a failed build leaves the agent disabled
+            agent_registry.get(agent_id)
+    return agent_config.update(changes)
+
+# Route names used by the frontend that differ from the AGENTS keys
+AGENT_ALIASES = {
+    "financial-fraud": "finance"
+}
+
+# When run as the server, normalize new or changed files in the dataset folders first, so the
+# snapshot below reads the ingest cache (unchanged files are skipped via the manifest)
+if __name__ == "__main__":
+    try:
+        ingest_summary = ingest_datasets()
+        logger.info(f"Dataset ingest: {len(ingest_summary['ingested'])} ingested, "
+                    f"{len(ingest_summary['unchanged'])} unchanged, {len(ingest_summary['failed'])} failed")
+    except Exception as e:
+        logger.error(f"Error ingesting datasets: {str(e)}")
+
+# Load the homicide dataset snapshot (rollup cube, trends, resolver) and watch for new exports
+dataset_manager = DatasetManager()
+dataset_manager.start()
+
+# Completed murder intakes are persisted and indexed for similar-case retrieval
+try:
+    case_repository = CaseRepository()
+    similar_case_index = SimilarCaseIndex.from_repository(case_repository, agent="murder")
+    near_duplicate_index = NearDuplicateIndex.from_repository(case_repository, MurderAgent._standardize_case_details,
+                                                              agent="murder")
+    # Entity links span every agent's cases, including those stored by the theft and fraud CLIs
+    entity_index = EntityIndex.from_repository(case_repository)
+    temporal_index = TemporalIndex.load_or_build(case_repository)
+    atexit.register(temporal_index.save_if_dirty)
+except Exception as e:
+    case_repository = None
+    similar_case_index = None
+    near_duplicate_index = None
+    entity_index = None
+    temporal_index = None
+    logger.error(f"Error loading case repository: {str(e)}")
+
+if PRELOAD_AGENTS:
+    for agent_id, enabled in agent_config.current().enabled_agents().items():
+        if enabled and agent_id in agent_registry:
+            agent_registry.get(agent_id)
 
 # Create a specialized endpoint for the Murder Agent
 @app.route('/api/augment/murder', methods=['POST'])
@@ -976,7 +1459,7 @@ def murder_agent_endpoint():
     logger.info("Received request for Murder Agent")
 
     # Check if the agent is enabled
-    if not AGENTS["murder"]["enabled"]:
+    if not agent_config.current().is_enabled("murder"):
         return jsonify({
             "success": False,
             "error": "Murder Agent is not enabled",
@@ -1028,13 +1511,25 @@ def murder_agent_endpoint():
     logger.info(f"Received request with session_id: {session_id}, user_input: {user_input}")
     logger.info(f"force_new_session: {force_new_session}, reset_conversation: {reset_conversation}")
 
-    # Process the message using the new process_message method with the special flags
-    session_id, response, is_collecting_info, current_step, error_message = murder_agent.process_message(
-        user_input,
-        session_id,
-        force_new_session=force_new_session,
-        reset_conversation=reset_conversation
-    )
+    # Process the message using the new process_message method with the special flags; only a
+    # message that completes the intake waits for the murder bulkhead
+    if not force_new_session and message_runs_analysis(session_id, user_input):
+        lane = agent_bulkheads["murder"]
+    else:
+        lane = agent_bulkheads.fast_lane
+    try:
+        with upstream_priority(request_priority(AGENT_PRIORITIES.get("murder", "normal"))), \
+                upstream_caller(*request_caller()), latency_budget(request_latency_budget()), \
+                analysis_profile(request_analysis_profile()):
+            session_id, response, is_collecting_info, current_step, error_message = lane.run(
+                agent_registry.get("murder").process_message,
+                user_input,
+                session_id,
+                force_new_session=force_new_session,
+                reset_conversation=reset_conversation
+            )
+    except BulkheadFull as e:
+        return busy_response(e)
 
     # Return the response with the session ID and conversation state
     return jsonify({
@@ -1044,65 +1539,86 @@ def murder_agent_endpoint():
             "is_collecting_info": is_collecting_info,
             "current_step": current_step,
             "collected_data": conversation_states[session_id]["collected_data"] if session_id in conversation_states else {},
+            "duplicate_of": conversation_states[session_id].get("duplicate_of") if session_id in conversation_states else None,
+            "nearby_cases": conversation_states[session_id].get("nearby_cases") if session_id in conversation_states else None,
             "error": error_message
         },
         "session_id": session_id,
         "message": "Message processed successfully"
     })
 
-# Create endpoints for other agents
-for agent_name, agent_config in AGENTS.items():
-    # Skip the murder agent as we've already created a specialized endpoint for it
-    if agent_name == "murder":
-        continue
-
-    # Create a closure to capture the agent_name variable
-    def create_endpoint(agent):
-        def endpoint_func():
-            logger.info(f"Received request for {agent} agent")
-
-            # Check if the agent is enabled
-            if not AGENTS[agent]["enabled"]:
-                return jsonify({"error": f"Agent {agent} is not enabled"}), 403
-
-            # Get case details from request
-            case_details = request.json
-            if not case_details:
-                return jsonify({"error": "No case details provided"}), 400
-
-            # Format the case details into a prompt
-            prompt = format_case_details(case_details)
+# Route every other agent through one endpoint
+@app.route('/api/augment/<agent>', methods=['POST'])
+def agent_endpoint(agent):
+    """
+    Analysis endpoint for the theft, financial fraud and remaining agents.
 
-            # Get the system prompt for this agent
-            system_prompt = AGENTS[agent]["system_prompt"]
+    Args:
+        agent: Agent name from the URL (an AGENTS key or an alias such as financial-fraud)
+    """
+    agent = AGENT_ALIASES.get(agent, agent)
+    logger.info(f"Received request for {agent} agent")
 
-            # Call the NVIDIA API
-            response = call_nvidia_api(prompt, system_prompt)
+    config = agent_config.current()
+    if agent not in config:
+        return jsonify({"error": f"Unknown agent: {agent}"}), 404
 
-            # Return the response
-            return jsonify({"response": response})
+    # Check if the agent is enabled
+    if not config.is_enabled(agent):
+        return jsonify({"error": f"Agent {agent} is not enabled"}), 403
 
-        # Set the function name
-        endpoint_func.__name__ = f"{agent}_endpoint"
-        return endpoint_func
+    # Get case details from request
+    case_details = request.get_json(silent=True)
+    if not case_details:
+        return jsonify({"error": "No case details provided"}), 400
+
+    # The priority, role, latency budget and analysis profile are request metadata, not case details
+    priority = request_priority(AGENT_PRIORITIES.get(agent, "normal"))
+    caller = request_caller()
+    budget = request_latency_budget()
+    profile = request_analysis_profile()
+    case_details = {key: value for key, value in case_details.items()
+                    if key not in ("priority", "role", "latency_budget_seconds", "analysis_profile")}
+
+    if agent not in agent_registry:
+        # Agents without a dedicated implementation use the generic prompt
+        prompt = format_case_details(case_details)
+        try:
+            with upstream_priority(priority), upstream_caller(*caller):
+                response = agent_bulkheads[agent].run(call_nvidia_api, prompt, config.agents[agent]["system_prompt"])
+        except BulkheadFull as e:
+            return busy_response(e)
+        return jsonify({"response": response})
+
+    hosted_agent = agent_registry.get(agent)
+    start_time = time.time()
+    try:
+        with upstream_priority(priority), upstream_caller(*caller), latency_budget(budget), \
+                analysis_profile(profile), routing_decisions() as decisions:
+            analysis = agent_bulkheads[agent].run(hosted_agent.analyze_case, case_details)
+    except BulkheadFull as e:
+        return busy_response(e)
+    duration = round(time.time() - start_time, 3)
+    if analysis.startswith(ANALYSIS_ERROR_PREFIX):
+        return jsonify({"error": analysis, "agent": agent, "duration_seconds": duration}), 502
 
-    # Register the route with a unique function for each agent
-    app.add_url_rule(
-        f"/api/augment/{agent_name}",
-        endpoint=f"{agent_name}_endpoint",
-        view_func=create_endpoint(agent_name),
-        methods=["POST"]
-    )
+    return jsonify({
+        "response": analysis,
+        "agent": agent,
+        "model": decisions[-1].model if decisions else hosted_agent.model_name,
+        "duration_seconds": duration
+    })
 
 # Health check endpoint
 @app.route('/health')
 def health_check():
     """Health check endpoint."""
     logger.info("Received GET request for health endpoint")
+    config = agent_config.current()
     return jsonify({
         "status": "healthy",
-        "agents": list(AGENTS.keys()),
-        "enabled_agents": {name: config["enabled"] for name, config in AGENTS.items()},
+        "agents": list(config.agents),
+        "enabled_agents": config.enabled_agents(),
         "murder_agent": {
             "status": "integrated",
             "model": MURDER_MODEL_NAME
@@ -1115,15 +1631,24 @@ def health_check():
 def full_health_check():
     """Full health check endpoint with detailed information."""
     logger.info("Received GET request for full health endpoint")
+    config = agent_config.current()
     return jsonify({
         "status": "healthy",
-        "agents": list(AGENTS.keys()),
-        "enabled_agents": {name: config["enabled"] for name, config in AGENTS.items()},
+        "agents": list(config.agents),
+        "enabled_agents": config.enabled_agents(),
+        "agent_config": agent_config.status(),
         "murder_agent": {
             "status": "integrated",
             "model": MURDER_MODEL_NAME,
             "api_key_source": "env" if os.getenv('NVIDIA_API_KEY') else (".env file" if retrieve_api_key() else "default")
         },
+        "hosted_agents": {name: dict(build, enabled=config.is_enabled(name))
+                          for name, build in agent_registry.stats().items()},
+        "upstream": upstream_pool.stats(),
+        "model_routing": model_router.stats(),
+        "token_budgets": budget_stats.stats(),
+        "speculative_analysis": speculative_analyses.stats(),
+        "bulkheads": agent_bulkheads.stats(),
         "system_info": {
             "python_version": platform.python_version(),
             "platform": platform.platform(),
@@ -1138,7 +1663,7 @@ def toggle_agent():
     logger.info(f"Received {request.method} request for toggle-agent endpoint")
     if request.method == "GET":
         # Return the current enabled status of all agents
-        enabled_agents = {name: config["enabled"] for name, config in AGENTS.items()}
+        enabled_agents = agent_config.current().enabled_agents()
         return jsonify({
             "success": True,
             "data": enabled_agents,
@@ -1161,14 +1686,14 @@ def toggle_agent():
             enabled = data["enabled"]
 
             # Validate agent ID
-            if agent_id not in AGENTS:
+            if agent_id not in agent_config.current():
                 return jsonify({
                     "success": False,
                     "error": f"Invalid agent ID: {agent_id}"
                 }), 400
 
             # Update the agent's enabled status
-            AGENTS[agent_id]["enabled"] = enabled
+            snapshot = set_agents_enabled({agent_id: enabled})
 
             logger.info(f"Agent {agent_id} {'enabled' if enabled else 'disabled'}")
 
@@ -1176,7 +1701,8 @@ def toggle_agent():
                 "success": True,
                 "data": {
                     "agentId": agent_id,
-                    "enabled": enabled
+                    "enabled": enabled,
+                    "version": snapshot.version
                 },
                 "message": f"Agent {agent_id} has been {'enabled' if enabled else 'disabled'}"
             })
@@ -1205,16 +1731,17 @@ def update_agents():
 
         agents_data = data["agents"]
 
-        # Update each agent's enabled status
-        for agent_id, enabled in agents_data.items():
-            if agent_id in AGENTS:
-                AGENTS[agent_id]["enabled"] = enabled
-                logger.info(f"Agent {agent_id} {'enabled' if enabled else 'disabled'}")
+        # Update every agent's enabled status in one config version
+        changes = {agent_id: enabled for agent_id, enabled in agents_data.items() if agent_id in AGENTS}
+        snapshot = set_agents_enabled(changes)
+        for agent_id, enabled in changes.items():
+            logger.info(f"Agent {agent_id} {'enabled' if enabled else 'disabled'}")
 
         return jsonify({
             "success": True,
             "data": {
-                "agents": {name: config["enabled"] for name, config in AGENTS.items()}
+                "agents": snapshot.enabled_agents(),
+                "version": snapshot.version
             },
             "message": "Agent statuses updated successfully"
         })
@@ -1275,8 +1802,9 @@ def murder_agent_reset():
 
     logger.info(f"Resetting conversation for session {session_id}")
 
-    # Delete the conversation state
+    # Delete the conversation state and stop its speculative analysis
     del conversation_states[session_id]
+    speculative_analyses.discard(session_id)
 
     # Create a new conversation state
     new_session_id = create_new_conversation_state()
@@ -1322,7 +1850,9 @@ def murder_agent_sample():
 
     # Analyze the sample case
     try:
-        analysis = murder_agent.analyze_case(sample_case)
+        with upstream_priority(request_priority("demo")), upstream_caller(*request_caller()), \
+                analysis_profile(request.headers.get("X-Analysis-Profile") or request.args.get("analysis_profile")):
+            analysis = agent_bulkheads["murder"].run(agent_registry.get("murder").analyze_case, sample_case)
 
         # Return the response in the format expected by the frontend
         return jsonify({
@@ -1333,6 +1863,8 @@ def murder_agent_sample():
             },
             "message": "Sample case analysis completed successfully"
         })
+    except BulkheadFull as e:
+        return busy_response(e)
     except Exception as e:
         logger.error(f"Error analyzing sample case with Murder Agent: {str(e)}")
         return jsonify({
@@ -1343,6 +1875,332 @@ def murder_agent_sample():
             }
         }), 500
 
+# Top-k similar completed murder cases
+@app.route('/api/augment/murder/similar', methods=['POST'])
+def murder_similar_cases():
+    """
+    Return the completed cases most similar to a case.
+
+    The body is either case details ({"cause_of_death": ..., "weapon_used": ..., ...})
+    or {"session_id": ...} to use the details collected in a conversation. Optional "k".
+    """
+    if similar_case_index is None:
+        return jsonify({
+            "success": False,
+            "error": "Similar-case index is not available"
+        }), 503
+
+    data = request.json or {}
+    session_id = data.get("session_id")
+    if session_id:
+        if session_id not in conversation_states:
+            return jsonify({
+                "success": False,
+                "error": f"Session {session_id} not found"
+            }), 404
+        case_details = conversation_states[session_id]["collected_data"]
+    else:
+        case_details = data
+
+    try:
+        k = max(1, min(int(data.get("k", 5)), 50))
+    except (TypeError, ValueError):
+        return jsonify({
+            "success": False,
+            "error": "k must be an integer"
+        }), 400
+
+    start_time = time.time()
+    similar = similar_case_index.query(case_details, k=k, exclude_case_id=case_details.get("case_id"))
+    return jsonify({
+        "success": True,
+        "data": {
+            "similar_cases": similar,
+            "indexed_cases": len(similar_case_index),
+            "query_ms": round((time.time() - start_time) * 1000, 2)
+        }
+    })
+
+def _entity_index_or_error():
+    """Return the entity index synced with the repository, or an error response."""
+    if entity_index is None:
+        return None, (jsonify({
+            "success": False,
+            "error": "Entity index is not available"
+        }), 503)
+    # Pick up cases stored by other processes since the last request
+    entity_index.sync(case_repository)
+    return entity_index, None
+
+# Cases (any agent) mentioning a suspect, vehicle, address, phone number, ...
+@app.route('/api/cases/entities', methods=['GET'])
+def case_entity_lookup():
+    """
+    Return the stored cases that mention an entity.
+
+    Query parameters: "entity" (required), optional "type" (one of ENTITY_TYPES) and "limit".
+    """
+    index, error = _entity_index_or_error()
+    if error:
+        return error
+
+    entity = request.args.get("entity", "").strip()
+    entity_type = request.args.get("type")
+    if not entity:
+        return jsonify({
+            "success": False,
+            "error": "entity is required"
+        }), 400
+    if entity_type and entity_type not in ENTITY_TYPES:
+        return jsonify({
+            "success": False,
+            "error": f"type must be one of {', '.join(ENTITY_TYPES)}"
+        }), 400
+
+    try:
+        limit = max(1, min(int(request.args.get("limit", 20)), 200))
+    except ValueError:
+        return jsonify({
+            "success": False,
+            "error": "limit must be an integer"
+        }), 400
+
+    start_time = time.time()
+    cases = index.lookup(entity, entity_type=entity_type, limit=limit)
+    return jsonify({
+        "success": True,
+        "data": {
+            "cases": cases,
+            "indexed_cases": len(index),
+            "query_ms": round((time.time() - start_time) * 1000, 3)
+        }
+    })
+
+# Entities of a stored case and the other cases sharing them
+@app.route('/api/cases/<int:record_id>/links', methods=['GET'])
+def case_entity_links(record_id):
+    """Return the entities extracted from a stored case and the cases linked to it through them."""
+    index, error = _entity_index_or_error()
+    if error:
+        return error
+
+    record = case_repository.get(record_id)
+    if record is None:
+        return jsonify({
+            "success": False,
+            "error": f"Case record {record_id} not found"
+        }), 404
+
+    return jsonify({
+        "success": True,
+        "data": {
+            "record_id": record_id,
+            "agent": record["agent"],
+            "case_id": record["case_id"],
+            "entities": index.entities(record_id),
+            "linked_cases": index.related(record_id)
+        }
+    })
+
+# Cases close in time (and optionally place) to a date/time
+@app.route('/api/cases/nearby', methods=['GET'])
+def nearby_cases():
+    """
+    Return stored cases (any agent) within a time window of a date and time.
+
+    Query parameters: "date" (YYYY-MM-DD, required), "time" (HH:MM), "location", "hours" or
+    "days" (window half-width, default 2 hours), "radius_km", "same_location" (true/false), "limit".
+    A case passes the location filter if it is at the same location or within radius_km.
+    """
+    if temporal_index is None:
+        return jsonify({
+            "success": False,
+            "error": "Temporal index is not available"
+        }), 503
+
+    if not request.args.get("date"):
+        return jsonify({
+            "success": False,
+            "error": "date is required"
+        }), 400
+
+    try:
+        if request.args.get("days"):
+            window_minutes = int(float(request.args["days"]) * MINUTES_PER_DAY)
+        else:
+            window_minutes = int(float(request.args.get("hours", 2)) * 60)
+        radius_km = float(request.args["radius_km"]) if request.args.get("radius_km") else None
+        limit = max(1, min(int(request.args.get("limit", 50)), 500))
+    except ValueError:
+        return jsonify({
+            "success": False,
+            "error": "hours, days, radius_km and limit must be numbers"
+        }), 400
+
+    case_details = {
+        "date_of_crime": request.args["date"],
+        "time_of_crime": request.args.get("time"),
+        "location": request.args.get("location")
+    }
+    temporal_index.sync(case_repository)
+    start_time = time.time()
+    cases = temporal_index.query(case_details, window_minutes, radius_km=radius_km,
+                                 same_location=request.args.get("same_location", "").lower() == "true",
+                                 limit=limit)
+    return jsonify({
+        "success": True,
+        "data": {
+            "cases": cases,
+            "indexed_cases": len(temporal_index),
+            "query_ms": round((time.time() - start_time) * 1000, 3)
+        }
+    })
+
+# One analysis section (e.g. key evidence) for many stored cases, for report panels
+@app.route('/api/cases/sections/<section>', methods=['GET'])
+def case_sections(section):
+    """
+    Return one analysis section of stored cases without the full analyses.
+
+    Query parameters: optional "agent", "record_ids" (comma-separated), "q" (full-text search
+    whose matches are returned) and "limit" (default 100, at most 1000).
+    """
+    if case_repository is None:
+        return jsonify({
+            "success": False,
+            "error": "Case repository is not available"
+        }), 503
+    if section not in SECTION_TYPES:
+        return jsonify({
+            "success": False,
+            "error": f"section must be one of {', '.join(SECTION_TYPES)}"
+        }), 404
+
+    try:
+        limit = max(1, min(int(request.args.get("limit", 100)), 1000))
+        record_ids = request.args.get("record_ids")
+        record_ids = [int(record_id) for record_id in record_ids.split(",") if record_id] if record_ids else None
+    except ValueError:
+        return jsonify({
+            "success": False,
+            "error": "limit and record_ids must be integers"
+        }), 400
+
+    agent = request.args.get("agent")
+    search_text = request.args.get("q")
+    start_time = time.time()
+    if search_text:
+        cases = case_repository.search(search_text, agent=agent, limit=limit, section=section)
+    else:
+        cases = case_repository.get_sections(section, agent=agent, record_ids=record_ids, limit=limit)
+    return jsonify({
+        "success": True,
+        "data": {
+            "section": section,
+            "cases": cases,
+            "query_ms": round((time.time() - start_time) * 1000, 2)
+        }
+    })
+
+# Read-only homicide rollup endpoint for the dashboard charts
+@app.route('/api/datasets/homicide/rollups', methods=['GET'])
+def homicide_rollups():
+    """
+    Serve the precomputed homicide rollup cube.
+
+    Without query parameters the whole cube is returned as flat arrays. With
+    ?indicator=...&gender=... (and optional region/subregion, default "All") only
+    the yearly series for that slice is returned. Both honour If-None-Match.
+    """
+    snapshot = dataset_manager.current()
+    if snapshot is None:
+        return jsonify({
+            "success": False,
+            "error": "Homicide dataset is not loaded"
+        }), 503
+
+    homicide_cube = snapshot.cube
+    indicator = request.args.get('indicator')
+    gender = request.args.get('gender')
+
+    if indicator or gender:
+        if not indicator or not gender:
+            return jsonify({
+                "success": False,
+                "error": "Both indicator and gender are required for a series query"
+            }), 400
+
+        region = request.args.get('region', ALL_LABEL)
+        subregion = request.args.get('subregion', ALL_LABEL)
+        series = homicide_cube.series(region, subregion, gender, indicator)
+        if series is None:
+            return jsonify({
+                "success": False,
+                "error": "Unknown region, subregion, gender or indicator"
+            }), 404
+
+        response = jsonify({
+            "success": True,
+            "data": {
+                "region": region,
+                "subregion": subregion,
+                "gender": gender,
+                "indicator": indicator,
+                **series
+            }
+        })
+        etag = f"{homicide_cube.etag}-{hashlib.sha1(request.query_string).hexdigest()[:12]}"
+    else:
+        response = app.response_class(homicide_cube.payload_bytes(), mimetype='application/json')
+        etag = homicide_cube.etag
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=0, must-revalidate'
+    return response.make_conditional(request)
+
+# Resolve a free-text location to a country of the homicide dataset
+@app.route('/api/datasets/homicide/resolve-location', methods=['GET'])
+def resolve_location():
+    """Resolve ?location=... to an ISO3 country code."""
+    location = request.args.get('location', '')
+    if not location:
+        return jsonify({
+            "success": False,
+            "error": "Missing required parameter: location"
+        }), 400
+
+    snapshot = dataset_manager.current()
+    if snapshot is None:
+        return jsonify({
+            "success": False,
+            "error": "Homicide dataset is not loaded"
+        }), 503
+
+    match = snapshot.resolver.resolve(location)
+    return jsonify({
+        "success": True,
+        "data": match.to_dict() if match else None,
+        "message": "Location resolved" if match else "No country recognized in location"
+    })
+
+# Report the active homicide snapshot, or rebuild it from the newest export
+@app.route('/api/datasets/homicide/status', methods=['GET', 'POST'])
+def homicide_dataset_status():
+    """GET returns the active snapshot version; POST forces a rebuild in the background."""
+    if request.method == 'POST':
+        threading.Thread(target=dataset_manager.reload, kwargs={"force": True},
+                         name="dataset-reload", daemon=True).start()
+        return jsonify({
+            "success": True,
+            "data": dataset_manager.status(),
+            "message": "Homicide dataset rebuild started"
+        }), 202
+
+    return jsonify({
+        "success": True,
+        "data": dataset_manager.status()
+    })
+
 # Simple test endpoints
 @app.route('/')
 def home():
@@ -1357,12 +2215,14 @@ def test():
 @app.route('/agents')
 def list_agents():
     logger.info("Received GET request for agents endpoint")
+    config = agent_config.current()
     return jsonify({
-        "agents": list(AGENTS.keys()),
-        "enabled_agents": {name: config["enabled"] for name, config in AGENTS.items()}
+        "agents": list(config.agents),
+        "enabled_agents": config.enabled_agents()
     })
 
 if __name__ == "__main__":
     logger.info(f"Starting unified agent server on port {MAIN_PORT}")
-    # Enable debug mode for development
-    app.run(host="0.0.0.0", port=MAIN_PORT, debug=True)
+    # Enable debug mode for development; the reloader would run all of the startup above again in
+    # a child process (ingest, dataset snapshot, indexes, watchers)
+    app.run(host="0.0.0.0", port=MAIN_PORT, debug=True, use_reloader=False)
@@ -0,0 +1,433 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Upstream Pool - Shared NVIDIA API client and priority scheduler
+
+This module lets every agent hosted in one process share a single OpenAI
+client for the NVIDIA endpoint, and with it one HTTP connection pool, while
+still using its own API key (per-key clients are derived with with_options,
+which reuses the underlying HTTP client). Every chat completion made through
+the pool holds a slot of one shared scheduler for the duration of the call
+(including streamed responses until the stream is consumed), so a burst on
+one agent cannot open unbounded concurrent upstream requests.
+
+When every slot is busy, a freed slot goes to the waiting call with the best
+priority class (interactive, normal, batch, demo), first come first served
+within a class. Waiting ages a call up one class every PRIORITY_AGING_SECONDS,
+so lower classes are delayed but never starved. The class is taken from
+upstream_priority(), which callers set around their work; it is held in a
+context variable, so it follows work handed to the bulkhead executors.
+
+Within a class, waiting calls are ordered by weighted fair queuing over
+callers (self-clocked fair queuing): each call gets a virtual finish tag of
+max(virtual time, the caller's last tag) + 1 / weight, and the smallest tag
+goes first. A user with a dozen queued analyses therefore takes turns with a
+user who has one, instead of holding every slot until the backlog clears.
+The caller (a user id or session) and its role are set with upstream_caller();
+FAIR_QUEUE_ROLE_WEIGHTS (e.g. "inspector=3,ips=3,ds=2,officer=1") gives each
+role its share, and calls with no caller share one "anonymous" queue.
+
+Usage:
+    pool = UpstreamPool(api_key)
+    agent = TheftAgent(api_key, client=pool.client(api_key))
+    with upstream_priority("interactive"), upstream_caller("user-42", "inspector"):
+        agent.analyze_case(case_details)
+    pool.stats()
+
+Author: Augment Agent
+"""
+
+import contextvars
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+from helpers import percentile
+
+logger = logging.getLogger(__name__)
+
+# Constants
+API_BASE_URL = os.getenv("NVIDIA_API_BASE_URL", "https://integrate.api.nvidia.com/v1")
+UPSTREAM_CONCURRENCY = int(os.getenv("UPSTREAM_CONCURRENCY", "16"))  # Completions in flight across all agents
+PRIORITY_CLASSES = ["interactive", "normal", "batch", "demo"]  # Best first
+DEFAULT_PRIORITY = "normal"
+PRIORITY_AGING_SECONDS = float(os.getenv("UPSTREAM_PRIORITY_AGING_SECONDS", "10"))
+LATENCY_SAMPLES = 1000  # Recent calls per class kept for percentiles
+DEFAULT_ROLE_WEIGHTS = "inspector=3,ips=3,ds=2,officer=1"
+ANONYMOUS_CALLER = "anonymous"
+UNASSIGNED_ROLE = "unassigned"  # Callers without a role, or with one that has no configured weight
+
+_priority = contextvars.ContextVar("upstream_priority", default=DEFAULT_PRIORITY)
+_caller = contextvars.ContextVar("upstream_caller", default=(ANONYMOUS_CALLER, UNASSIGNED_ROLE))
+_grants = contextvars.ContextVar("upstream_grants", default=None)
+
+def current_priority() -> str:
+    """Priority class of upstream calls made in the current context."""
+    return _priority.get()
+
+@contextmanager
+def upstream_priority(priority: str):
+    """
+    Set the priority class of upstream calls made inside the with block.
+
+    Args:
+        priority: One of PRIORITY_CLASSES (anything else means DEFAULT_PRIORITY)
+    """
+    token = _priority.set(priority if priority in PRIORITY_CLASSES else DEFAULT_PRIORITY)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_caller() -> Tuple[str, str]:
+    """(caller, role) of upstream calls made in the current context."""
+    return _caller.get()
+
+@contextmanager
+def upstream_caller(caller: Optional[str], role: Optional[str] = None):
+    """
+    Set the caller whose fair share upstream calls made inside the with block count against.
+
+    Args:
+        caller: User id, session id or other stable identity (empty means ANONYMOUS_CALLER)
+        role: Police role used to look up the caller's weight
+    """
+    token = _caller.set((caller or ANONYMOUS_CALLER, role or UNASSIGNED_ROLE))
+    try:
+        yield
+    finally:
+        _caller.reset(token)
+
+@contextmanager
+def slot_grants():
+    """
+    Collect the times at which pooled completions made inside the with block got their slot,
+    so callers can time the upstream call without the local queue wait.
+
+    Yields:
+        List the grant times (time.time()) are appended to
+    """
+    grants: List[float] = []
+    token = _grants.set(grants)
+    try:
+        yield grants
+    finally:
+        _grants.reset(token)
+
+def parse_role_weights(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Parse "role=weight,...".
+
+    Args:
+        spec: Weight specification, e.g. "inspector=3,officer=1"
+
+    Returns:
+        Role -> weight (weights must be positive)
+    """
+    weights = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        role, _, weight = item.partition("=")
+        weight = float(weight)
+        if weight <= 0:
+            raise ValueError(f"Weight of role {role.strip()} must be positive")
+        weights[role.strip()] = weight
+    return weights
+
+class _Waiter:
+    """A call waiting for an upstream slot."""
+    __slots__ = ("rank", "enqueued", "sequence", "caller", "tag", "event")
+
+    def __init__(self, rank: int, enqueued: float, sequence: int, caller: str, tag: float):
+        self.rank = rank
+        self.enqueued = enqueued
+        self.sequence = sequence
+        self.caller = caller
+        self.tag = tag
+        self.event = threading.Event()
+
+class UpstreamScheduler:
+    """
+    Bounds the number of upstream completions in flight and hands free slots to waiting callers by priority class.
+
+    A waiter's effective rank improves by one class for every aging_seconds it has waited, so batch and demo
+    work still gets through while interactive traffic keeps arriving. Waiters of the same effective class are
+    served in order of their callers' weighted fair queuing tags.
+    """
+
+    def __init__(self, max_concurrency: int = UPSTREAM_CONCURRENCY, aging_seconds: float = PRIORITY_AGING_SECONDS,
+                 role_weights: Optional[Dict[str, float]] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Maximum completions in flight
+            aging_seconds: Waiting time that promotes a waiter by one priority class
+            role_weights: Role -> fair share weight; defaults to FAIR_QUEUE_ROLE_WEIGHTS (other roles weigh 1)
+        """
+        self.max_concurrency = max_concurrency
+        self.aging_seconds = aging_seconds
+        if role_weights is None:
+            role_weights = parse_role_weights(os.getenv("FAIR_QUEUE_ROLE_WEIGHTS", DEFAULT_ROLE_WEIGHTS))
+        self.role_weights = role_weights
+        self._lock = threading.Lock()
+        self._waiters: List[_Waiter] = []
+        self._sequence = 0
+        self._virtual_time = 0.0
+        self._callers: Dict[str, Dict[str, Any]] = {}  # Callers with calls waiting or in flight
+        self._roles: Dict[str, Dict[str, Any]] = {}
+        self.in_flight = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._classes = {name: {"completed": 0, "wait_seconds": 0.0,
+                                "waits": deque(maxlen=LATENCY_SAMPLES), "durations": deque(maxlen=LATENCY_SAMPLES)}
+                         for name in PRIORITY_CLASSES}
+
+    def weight(self, role: str) -> float:
+        """Fair share weight of a role."""
+        return self.role_weights.get(role, 1.0)
+
+    def acquire(self, priority: Optional[str] = None, caller: Optional[str] = None,
+                role: Optional[str] = None) -> Tuple[str, float, float, str, str]:
+        """
+        Wait for a free slot.
+
+        Args:
+            priority: Priority class (defaults to the one set with upstream_priority())
+            caller: Caller identity (defaults to the one set with upstream_caller())
+            role: Caller's role (defaults to the one set with upstream_caller())
+
+        Returns:
+            Ticket to pass to release()
+        """
+        priority = priority if priority in PRIORITY_CLASSES else current_priority()
+        if caller is None:
+            caller, role = current_caller()
+        role = role if role in self.role_weights else UNASSIGNED_ROLE
+        requested = time.time()
+        with self._lock:
+            state = self._callers.setdefault(caller, {"role": role, "finish": self._virtual_time,
+                                                      "in_flight": 0, "waiting": 0})
+            state["role"] = role
+            tag = max(self._virtual_time, state["finish"]) + 1 / self.weight(role)
+            state["finish"] = tag
+            if self.in_flight < self.max_concurrency and not self._waiters:
+                self.in_flight += 1
+                state["in_flight"] += 1
+                self._virtual_time = tag
+                waiter = None
+            else:
+                self._sequence += 1
+                state["waiting"] += 1
+                waiter = _Waiter(PRIORITY_CLASSES.index(priority), requested, self._sequence, caller, tag)
+                self._waiters.append(waiter)
+        if waiter is not None:
+            waiter.event.wait()
+        return priority, requested, time.time(), caller, role
+
+    def release(self, ticket: Tuple[str, float, float, str, str]):
+        """Free a slot taken by acquire() and record its wait and duration."""
+        priority, requested, granted, caller, role = ticket
+        now = time.time()
+        waited = granted - requested
+        with self._lock:
+            self.in_flight -= 1
+            state = self._callers[caller]
+            state["in_flight"] -= 1
+            if not state["in_flight"] and not state["waiting"]:
+                del self._callers[caller]
+            role_stats = self._roles.setdefault(role, {"completed": 0, "wait_seconds": 0.0,
+                                                       "waits": deque(maxlen=LATENCY_SAMPLES)})
+            role_stats["completed"] += 1
+            role_stats["wait_seconds"] += waited
+            role_stats["waits"].append(waited)
+            self.completed += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            stats = self._classes[priority]
+            stats["completed"] += 1
+            stats["wait_seconds"] += waited
+            stats["waits"].append(waited)
+            stats["durations"].append(now - requested)
+            self._grant(now)
+
+    def _grant(self, now: float):
+        """Hand free slots to the waiters with the best effective class, smallest fair queuing tag first; needs the lock."""
+        while self._waiters and self.in_flight < self.max_concurrency:
+            best = min(self._waiters, key=lambda waiter: (
+                waiter.rank - math.floor((now - waiter.enqueued) / self.aging_seconds), waiter.tag, waiter.sequence))
+            self._waiters.remove(best)
+            self.in_flight += 1
+            self._virtual_time = max(self._virtual_time, best.tag)
+            state = self._callers[best.caller]
+            state["waiting"] -= 1
+            state["in_flight"] += 1
+            best.event.set()
+
+    @contextmanager
+    def slot(self, priority: Optional[str] = None):
+        """Hold a slot for the duration of a with block."""
+        ticket = self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current load, wait times, per-class latencies and per-role fair queuing."""
+        with self._lock:
+            waiting = {name: 0 for name in PRIORITY_CLASSES}
+            for waiter in self._waiters:
+                waiting[PRIORITY_CLASSES[waiter.rank]] += 1
+            classes = {}
+            for name, stats in self._classes.items():
+                waits, durations = sorted(stats["waits"]), sorted(stats["durations"])
+                classes[name] = {
+                    "completed": stats["completed"],
+                    "waiting": waiting[name],
+                    "mean_wait_seconds": round(stats["wait_seconds"] / stats["completed"], 3) if stats["completed"] else 0.0,
+                    "p95_wait_seconds": round(percentile(waits, 0.95), 3),
+                    "p50_latency_seconds": round(percentile(durations, 0.5), 3),
+                    "p95_latency_seconds": round(percentile(durations, 0.95), 3)
+                }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                "completed": self.completed,
+                "mean_wait_seconds": round(self.wait_seconds / self.completed, 3) if self.completed else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+                "aging_seconds": self.aging_seconds,
+                "classes": classes,
+                "fair_queuing": self._fair_queuing_stats()
+            }
+
+    def _fair_queuing_stats(self) -> Dict[str, Any]:
+        """Active callers and wait times per role; needs the lock."""
+        roles = {}
+        for role in sorted(set(self._roles) | {state["role"] for state in self._callers.values()}):
+            stats = self._roles.get(role, {"completed": 0, "wait_seconds": 0.0, "waits": ()})
+            active = [state for state in self._callers.values() if state["role"] == role]
+            roles[role] = {
+                "weight": self.weight(role),
+                "active_callers": len(active),
+                "in_flight": sum(state["in_flight"] for state in active),
+                "waiting": sum(state["waiting"] for state in active),
+                "completed": stats["completed"],
+                "mean_wait_seconds": round(stats["wait_seconds"] / stats["completed"], 3) if stats["completed"] else 0.0,
+                "p95_wait_seconds": round(percentile(sorted(stats["waits"]), 0.95), 3)
+            }
+        return {"active_callers": len(self._callers), "roles": roles}
+
+class _LimitedCompletions:
+    """chat.completions stand-in that runs create() under the scheduler."""
+
+    def __init__(self, completions, scheduler: UpstreamScheduler):
+        self._completions = completions
+        self._scheduler = scheduler
+
+    def create(self, **kwargs):
+        ticket = self._scheduler.acquire()
+        grants = _grants.get()
+        if grants is not None:
+            grants.append(ticket[2])
+        try:
+            response = self._completions.create(**kwargs)
+        except BaseException:
+            self._scheduler.release(ticket)
+            raise
+        if not kwargs.get("stream"):
+            self._scheduler.release(ticket)
+            return response
+        return self._stream(response, ticket)
+
+    def _stream(self, response, ticket):
+        # A streamed completion keeps its slot until the last chunk has been read
+        try:
+            for chunk in response:
+                yield chunk
+        finally:
+            # Closing early (e.g. a cancelled analysis) also closes the upstream connection
+            close = getattr(response, "close", None)
+            if close:
+                close()
+            self._scheduler.release(ticket)
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+class _LimitedChat:
+    def __init__(self, chat, scheduler: UpstreamScheduler):
+        self._chat = chat
+        self.completions = _LimitedCompletions(chat.completions, scheduler)
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+class LimitedClient:
+    """
+    OpenAI client wrapper whose chat completions go through an UpstreamScheduler.
+    """
+
+    def __init__(self, client, scheduler: UpstreamScheduler):
+        self._client = client
+        self.chat = _LimitedChat(client.chat, scheduler)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+class UpstreamPool:
+    """
+    One NVIDIA API client (connection pool) and scheduler shared by the agents of a process.
+    """
+
+    def __init__(self, api_key: str, base_url: str = API_BASE_URL, max_concurrency: int = UPSTREAM_CONCURRENCY):
+        """
+        Initialize the pool.
+
+        Args:
+            api_key: Default API key
+            base_url: NVIDIA API base URL
+            max_concurrency: Maximum completions in flight across all agents
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.scheduler = UpstreamScheduler(max_concurrency)
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _base_client(self):
+        """The shared OpenAI client, created (and the openai package imported) on first use."""
+        with self._lock:
+            if self._client is None:
+                from openai import OpenAI
+                self._client = OpenAI(base_url=self.base_url, api_key=self.api_key)
+                logger.info(f"Upstream pool for {self.base_url} with {self.scheduler.max_concurrency} concurrent completions")
+            return self._client
+
+    def client(self, api_key: Optional[str] = None) -> LimitedClient:
+        """
+        Client for an agent, sharing the pool's connections and scheduler.
+
+        Args:
+            api_key: Agent-specific API key (defaults to the pool's key)
+
+        Returns:
+            Client usable wherever an OpenAI client is expected for chat completions
+        """
+        client = self._base_client()
+        if api_key:
+            client = client.with_options(api_key=api_key)
+        return LimitedClient(client, self.scheduler)
+
+    def stats(self) -> Dict[str, Any]:
+        """Scheduler load, wait times, per-class latencies and per-role fair queuing."""
+        return self.scheduler.stats()
@@ -0,0 +1,23 @@
+import mockApi from '@/mocks/api';
+
+/**
+ * Identity headers for proxied calls to the agent server
+ * The agent server trusts X-User-Id and X-User-Role from this server to share model capacity
+ * fairly between users, so they are set here from the validated login token. The browser's own
+ * Authorization and X-User-* headers are never forwarded; without a valid token none are sent.
+ */
+export function agentIdentityHeaders(request: Request): Record<string, string> {
+  const authHeader = request.headers.get('Authorization') || '';
+  const token = authHeader.startsWith('Bearer ') ? authHeader.slice(7).trim() : '';
+
+  // Same check as /api/auth/validate: the demo login issues a single token for its user
+  const { token: issuedToken, user } = mockApi['/auth/login'];
+  if (!token || token !== issuedToken) {
+    return {};
+  }
+
+  return {
+    'x-user-id': user.id,
+    'x-user-role': user.role,
+  };
+}
@@ -1,8 +1,9 @@
 import { NextResponse } from 'next/server';
 import { ChatContext } from '@/app/types';
+import { agentIdentityHeaders } from '@/app/api/agentIdentity';
 
 // Financial Fraud Agent API URL
-const FINANCIAL_FRAUD_AGENT_API_URL = process.env.NEXT_PUBLIC_FINANCIAL_FRAUD_AGENT_API_URL || 'http://localhost:5002/api/augment/financial-fraud';
+const FINANCIAL_FRAUD_AGENT_API_URL = process.env.NEXT_PUBLIC_FINANCIAL_FRAUD_AGENT_API_URL || 'http://localhost:5000/api/augment/financial-fraud';
 
 /**
  * Direct proxy to the Financial Fraud Agent backend
@@ -45,6 +46,9 @@ export async function POST(request: Request) {
 
     console.log('Calling Financial Fraud Agent backend directly from Next.js API route:', FINANCIAL_FRAUD_AGENT_API_URL);
 
+    // Identify the logged-in user so the agent server can share model capacity fairly between users
+    const identityHeaders = agentIdentityHeaders(request);
+
     // Set a timeout for the API call
     const controller = new AbortController();
     const timeoutId = setTimeout(() => controller.abort(), 15000);
@@ -55,6 +59,7 @@ export async function POST(request: Request) {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          ...identityHeaders,
         },
         body: JSON.stringify(caseDetails),
         signal: controller.signal
@@ -0,0 +1,43 @@
+import { NextResponse } from 'next/server';
+
+// Unified agent server URL for the homicide rollup cubes
+const HOMICIDE_ROLLUPS_API_URL = process.env.NEXT_PUBLIC_HOMICIDE_ROLLUPS_API_URL || 'http://127.0.0.1:5000/api/datasets/homicide/rollups';
+
+/**
+ * Proxy for the precomputed homicide rollup cubes
+ * Forwards the query string and If-None-Match so unchanged cubes come back as 304
+ */
+export async function GET(request: Request) {
+  try {
+    const { search } = new URL(request.url);
+    const ifNoneMatch = request.headers.get('if-none-match');
+
+    const response = await fetch(`${HOMICIDE_ROLLUPS_API_URL}${search}`, {
+      method: 'GET',
+      headers: ifNoneMatch ? { 'If-None-Match': ifNoneMatch } : {},
+      cache: 'no-store',
+      signal: AbortSignal.timeout(5000) // 5 second timeout
+    });
+
+    const etag = response.headers.get('etag');
+    const cacheHeaders: Record<string, string> = {
+      'Cache-Control': 'public, max-age=0, must-revalidate',
+      ...(etag ? { ETag: etag } : {})
+    };
+
+    // The cube has not changed since the browser last fetched it
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: cacheHeaders });
+    }
+
+    const data = await response.json();
+    return NextResponse.json(data, { status: response.status, headers: cacheHeaders });
+  } catch (error: any) {
+    console.error('Error fetching homicide rollups:', error);
+    return NextResponse.json({
+      success: false,
+      error: 'Error connecting to the homicide rollup service',
+      details: error.message
+    }, { status: 502 });
+  }
+}
@@ -1,12 +1,104 @@
 import { NextResponse } from 'next/server';
 import { ChatContext } from '@/app/types';
-import { spawn } from 'child_process';
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
 import path from 'path';
 import fs from 'fs';
+import readline from 'readline';
 
 // Get Augment AI API key from environment variables
 const AUGMENT_AI_API_KEY = process.env.NEXT_PUBLIC_AUGMENT_AI_API_KEY || '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';
 
+// Timeout for one analysis (15 seconds)
+const TIMEOUT_MS = 15000;
+
+interface PendingRequest {
+  resolve: (analysis: string) => void;
+  reject: (error: Error) => void;
+}
+
+interface MurderWorker {
+  process: ChildProcessWithoutNullStreams;
+  pending: Map<string, PendingRequest>;
+  nextId: number;
+}
+
+// One resident worker per server process (kept on globalThis so module reloads in development reuse it)
+const workerGlobal = globalThis as unknown as { murderWorker?: MurderWorker | null };
+
+/**
+ * Returns the resident Murder Agent worker (murder_agent_main.py --worker), starting it if needed.
+ * The worker keeps one warm client and answers JSON-line requests concurrently.
+ */
+function getMurderWorker(agentPath: string): MurderWorker {
+  if (workerGlobal.murderWorker) {
+    return workerGlobal.murderWorker;
+  }
+
+  const child = spawn(process.platform === 'win32' ? 'python' : 'python3', [
+    path.join(agentPath, 'murder_agent_main.py'),
+    '--worker',
+    '--api_key', AUGMENT_AI_API_KEY
+  ], { cwd: agentPath });
+  const worker: MurderWorker = { process: child, pending: new Map(), nextId: 0 };
+
+  readline.createInterface({ input: child.stdout }).on('line', (line) => {
+    let response;
+    try {
+      response = JSON.parse(line);
+    } catch {
+      console.error('Unexpected Murder Agent worker output:', line);
+      return;
+    }
+    const request = worker.pending.get(String(response.id));
+    if (!request) {
+      return;
+    }
+    worker.pending.delete(String(response.id));
+    if (response.success) {
+      request.resolve(response.analysis);
+    } else {
+      request.reject(new Error(response.error || 'Murder Agent worker request failed'));
+    }
+  });
+
+  // Logging goes to stderr; drain it so the pipe never fills up
+  child.stderr.on('data', () => {});
+
+  const stop = (error: Error) => {
+    if (workerGlobal.murderWorker === worker) {
+      workerGlobal.murderWorker = null;
+    }
+    for (const request of worker.pending.values()) {
+      request.reject(error);
+    }
+    worker.pending.clear();
+  };
+  child.on('exit', (code) => stop(new Error(`Murder Agent worker exited with code ${code}`)));
+  child.on('error', stop);
+  child.stdin.on('error', stop);
+
+  workerGlobal.murderWorker = worker;
+  return worker;
+}
+
+/**
+ * Sends case details to the resident worker and waits for the analysis
+ */
+function requestWorkerAnalysis(worker: MurderWorker, caseDetails: object): Promise<string> {
+  const id = String(++worker.nextId);
+  return new Promise<string>((resolve, reject) => {
+    const timer = setTimeout(() => {
+      worker.pending.delete(id);
+      reject(new Error(`Murder Agent worker timed out after ${TIMEOUT_MS}ms`));
+    }, TIMEOUT_MS);
+    worker.pending.set(id, {
+      resolve: (analysis) => { clearTimeout(timer); resolve(analysis); },
+      reject: (error) => { clearTimeout(timer); reject(error); }
+    });
+    worker.process.stdin.write(JSON.stringify({ id, case_details: caseDetails }) + '\n');
+  });
+}
+
 /**
  * Connects to the Murder Agent Python backend to get live analysis
  *
@@ -47,13 +139,23 @@ async function getMurderAgentResponse(question: string, context?: ChatContext):
       return getMockResponse(question, context);
     }
 
+    // Prefer the resident worker; spawn a one-off process only if the worker is disabled or has died
+    if (process.env.MURDER_AGENT_WORKER !== 'false') {
+      const worker = getMurderWorker(agentPath);
+      try {
+        return await requestWorkerAnalysis(worker, caseDetails);
+      } catch (error) {
+        console.error('Murder Agent worker error:', error);
+        if (workerGlobal.murderWorker === worker) {
+          return getFallbackResponse(question, context);
+        }
+      }
+    }
+
     // Create a temporary JSON file with the case details
     const tempFilePath = path.join(agentPath, `temp_case_${Date.now()}.json`);
     fs.writeFileSync(tempFilePath, JSON.stringify(caseDetails, null, 2));
 
-    // Set a timeout for the Python process (15 seconds)
-    const TIMEOUT_MS = 15000;
-
     // Run the Murder Agent Python script with a timeout
     return Promise.race([
       new Promise<string>((resolve, reject) => {
@@ -1,8 +1,9 @@
 import { NextResponse } from 'next/server';
 import { ChatContext } from '@/app/types';
+import { agentIdentityHeaders } from '@/app/api/agentIdentity';
 
 // Theft Agent API URL
-const THEFT_AGENT_API_URL = process.env.NEXT_PUBLIC_THEFT_AGENT_API_URL || 'http://localhost:5001/api/augment/theft';
+const THEFT_AGENT_API_URL = process.env.NEXT_PUBLIC_THEFT_AGENT_API_URL || 'http://localhost:5000/api/augment/theft';
 
 /**
  * Direct proxy to the Theft Agent backend
@@ -46,6 +47,9 @@ export async function POST(request: Request) {
 
     console.log('Calling Theft Agent backend directly from Next.js API route:', THEFT_AGENT_API_URL);
 
+    // Identify the logged-in user so the agent server can share model capacity fairly between users
+    const identityHeaders = agentIdentityHeaders(request);
+
     // Set a timeout for the API call
     const controller = new AbortController();
     const timeoutId = setTimeout(() => controller.abort(), 15000);
@@ -56,6 +60,7 @@ export async function POST(request: Request) {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          ...identityHeaders,
         },
         body: JSON.stringify(caseDetails),
         signal: controller.signal
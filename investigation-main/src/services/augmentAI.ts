@@ -13,8 +13,8 @@ const NVIDIA_API_KEY = process.env.NEXT_PUBLIC_NVIDIA_API_KEY || 'nvapi-lJ8Gpn1m
 
 // Agent API URLs
 const MURDER_AGENT_API_URL = process.env.NEXT_PUBLIC_MURDER_AGENT_API_URL || 'http://127.0.0.1:5000/api/augment/murder';
-const THEFT_AGENT_API_URL = process.env.NEXT_PUBLIC_THEFT_AGENT_API_URL || 'http://127.0.0.1:5001/api/augment/theft';
-const FINANCIAL_FRAUD_AGENT_API_URL = process.env.NEXT_PUBLIC_FINANCIAL_FRAUD_AGENT_API_URL || 'http://127.0.0.1:5002/api/augment/financial-fraud';
+const THEFT_AGENT_API_URL = process.env.NEXT_PUBLIC_THEFT_AGENT_API_URL || 'http://127.0.0.1:5000/api/augment/theft';
+const FINANCIAL_FRAUD_AGENT_API_URL = process.env.NEXT_PUBLIC_FINANCIAL_FRAUD_AGENT_API_URL || 'http://127.0.0.1:5000/api/augment/financial-fraud';
 
 console.log('Augment AI Enabled:', AUGMENT_AI_ENABLED);
 console.log('Augment AI API Key:', AUGMENT_AI_API_KEY ? 'Set' : 'Not Set');
@@ -29,6 +29,14 @@ setInterval(() => {
   responseCache.clear();
 }, 5 * 60 * 1000);
 
+/**
+ * Login token for the agent proxy routes, which identify the user from it for fair queuing
+ */
+const authHeaders = (): Record<string, string> => {
+  const token = typeof window !== 'undefined' ? localStorage.getItem('token') : null;
+  return token ? { Authorization: `Bearer ${token}` } : {};
+};
+
 /**
  * Get agent assignments dynamically from API or settings
  * This ensures we're not using hardcoded values
@@ -276,6 +284,7 @@ const getTheftAgentResponse = async (
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        ...authHeaders(),
       },
       body: JSON.stringify({ question, context }),
       signal: controller.signal
@@ -351,6 +360,7 @@ const getFinancialFraudAgentResponse = async (
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        ...authHeaders(),
       },
       body: JSON.stringify({ question, context }),
       signal: controller.signal